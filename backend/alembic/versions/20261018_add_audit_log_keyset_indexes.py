@@ -0,0 +1,30 @@
+"""add índices de keyset em audit_logs
+
+Revision ID: 20261018_audit_keyset
+Revises: 20261018_bot_search
+Create Date: 2026-10-18
+
+Índices criados:
+  - ix_audit_logs_tenant_created (tenant_id, created_at, id): listagem do
+    tenant ordenada por created_at DESC, id DESC com cursor.
+  - ix_audit_logs_tenant_action_created (tenant_id, action, created_at, id):
+    o mesmo com filtro de ação.
+"""
+from alembic import op
+
+revision = "20261018_audit_keyset"
+down_revision = "20261018_bot_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_audit_logs_tenant_created", "audit_logs", ["tenant_id", "created_at", "id"])
+    op.create_index(
+        "ix_audit_logs_tenant_action_created", "audit_logs", ["tenant_id", "action", "created_at", "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_logs_tenant_action_created", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_tenant_created", table_name="audit_logs")
@@ -0,0 +1,67 @@
+"""add tabela background_jobs (fila de jobs em background)
+
+Revision ID: 20261018_background_jobs
+Revises: 20261018_sla_notifications
+Create Date: 2026-10-18
+
+Fila genérica de app/core/job_queue.py. Índices:
+  - ix_background_jobs_claim (status, priority, run_at): claim do próximo job;
+  - uq_background_jobs_active_dedup: único parcial em dedup_key enquanto o
+    job está queued/running (deduplicação sem corrida).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_background_jobs"
+down_revision = "20261018_sla_notifications"
+branch_labels = None
+depends_on = None
+
+ACTIVE_DEDUP = sa.text("status IN ('queued', 'running') AND dedup_key IS NOT NULL")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "background_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("tenant_id", sa.Integer(), sa.ForeignKey("stores.id", ondelete="RESTRICT"), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("task", sa.String(100), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("dedup_key", sa.String(200), nullable=True),
+        sa.Column("run_at", sa.DateTime(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="3"),
+        sa.Column("locked_by", sa.String(200), nullable=True),
+        sa.Column("locked_at", sa.DateTime(), nullable=True),
+        sa.Column("progress", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("progress_message", sa.String(255), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.true()),
+    )
+    op.create_index("ix_background_jobs_id", "background_jobs", ["id"])
+    op.create_index("ix_background_jobs_tenant_id", "background_jobs", ["tenant_id"])
+    op.create_index("ix_background_jobs_claim", "background_jobs", ["status", "priority", "run_at"])
+    op.create_index(
+        "uq_background_jobs_active_dedup",
+        "background_jobs",
+        ["dedup_key"],
+        unique=True,
+        postgresql_where=ACTIVE_DEDUP,
+        sqlite_where=ACTIVE_DEDUP,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_background_jobs_active_dedup", table_name="background_jobs")
+    op.drop_index("ix_background_jobs_claim", table_name="background_jobs")
+    op.drop_index("ix_background_jobs_tenant_id", table_name="background_jobs")
+    op.drop_index("ix_background_jobs_id", table_name="background_jobs")
+    op.drop_table("background_jobs")
@@ -0,0 +1,103 @@
+"""add busca indexada do bot do WhatsApp (search_text, stock_sizes, phone_normalized)
+
+Revision ID: 20261018_bot_search
+Revises: 20261018_user_token_version
+Create Date: 2026-10-18
+
+Colunas adicionadas:
+  - public_catalog_items.search_text: nome/marca/categoria sem acento e em
+    minúsculas; no PostgreSQL ganha índice GIN trigram (pg_trgm) para
+    LIKE '%termo%'.
+  - public_catalog_items.stock_sizes: tamanhos com estoque.
+  - customers.phone_normalized: DDD + últimos 8 dígitos, índice
+    (tenant_id, phone_normalized). Backfill feito aqui, em Python, com a
+    mesma regra de app.utils.text.normalize_phone.
+
+A projeção é esvaziada: o startup (ensure_catalog_projection) a reconstrói
+já com as colunas novas preenchidas.
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_bot_search"
+down_revision = "20261018_user_token_version"
+branch_labels = None
+depends_on = None
+
+
+def _normalize_phone(raw):
+    # Cópia de app.utils.text.normalize_phone (migrations não importam o app)
+    if not raw:
+        return None
+    digits = re.sub(r"\D", "", raw)
+    if len(digits) >= 12 and digits.startswith("55"):
+        digits = digits[2:]
+    digits = digits.lstrip("0")
+    if len(digits) < 10:
+        return None
+    return digits[:2] + digits[-8:]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    is_postgres = bind.dialect.name == "postgresql"
+
+    op.add_column(
+        "public_catalog_items",
+        sa.Column("stock_sizes", sa.JSON(), nullable=False, server_default="[]"),
+    )
+    op.add_column(
+        "public_catalog_items",
+        sa.Column("search_text", sa.String(500), nullable=False, server_default=""),
+    )
+    op.execute("DELETE FROM public_catalog_items")
+    if is_postgres:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX ix_public_catalog_search_trgm "
+            "ON public_catalog_items USING gin (search_text gin_trgm_ops)"
+        )
+
+    op.add_column(
+        "customers",
+        sa.Column(
+            "phone_normalized",
+            sa.String(10),
+            nullable=True,
+            comment="DDD + last 8 digits of phone (see normalize_phone)",
+        ),
+    )
+    op.create_index("ix_customers_tenant_phone", "customers", ["tenant_id", "phone_normalized"])
+
+    customers = sa.table(
+        "customers",
+        sa.column("id", sa.Integer),
+        sa.column("phone", sa.String),
+        sa.column("phone_normalized", sa.String),
+    )
+    rows = bind.execute(
+        sa.select(customers.c.id, customers.c.phone).where(customers.c.phone.isnot(None))
+    ).all()
+    updates = [
+        {"cid": cid, "key": key}
+        for cid, phone in rows
+        if (key := _normalize_phone(phone)) is not None
+    ]
+    if updates:
+        bind.execute(
+            customers.update()
+            .where(customers.c.id == sa.bindparam("cid"))
+            .values(phone_normalized=sa.bindparam("key")),
+            updates,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_customers_tenant_phone", table_name="customers")
+    op.drop_column("customers", "phone_normalized")
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_public_catalog_search_trgm")
+    op.drop_column("public_catalog_items", "search_text")
+    op.drop_column("public_catalog_items", "stock_sizes")
@@ -0,0 +1,63 @@
+"""add índice único parcial inventory (tenant_id, product_id)
+
+Revision ID: 20261018_inventory_product_unique
+Revises: 20261018_background_jobs
+Create Date: 2026-10-18
+
+Alvo do upsert em lote do rebuild FIFO (INSERT ... ON CONFLICT DO UPDATE):
+uma linha por produto nas linhas legadas sem variante. Antes de criar o
+índice, duplicatas são fundidas na linha de menor id (movimentações são
+reapontadas para ela); a quantidade é recalculada no próximo rebuild.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_inventory_product_unique"
+down_revision = "20261018_background_jobs"
+branch_labels = None
+depends_on = None
+
+PRODUCT_LEVEL = sa.text("product_id IS NOT NULL AND variant_id IS NULL")
+
+KEEPER = """
+    SELECT MIN(k.id) FROM inventory k
+    WHERE k.tenant_id IS inv.tenant_id AND k.product_id = inv.product_id
+      AND k.variant_id IS NULL
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    keeper = KEEPER
+    if bind.dialect.name == "postgresql":
+        keeper = keeper.replace("k.tenant_id IS inv.tenant_id", "k.tenant_id IS NOT DISTINCT FROM inv.tenant_id")
+
+    op.execute(sa.text(f"""
+        UPDATE inventory_movements SET inventory_id = (
+            SELECT ({keeper}) FROM inventory inv WHERE inv.id = inventory_movements.inventory_id
+        )
+        WHERE inventory_id IN (
+            SELECT inv.id FROM inventory inv
+            WHERE inv.product_id IS NOT NULL AND inv.variant_id IS NULL
+              AND inv.id <> ({keeper})
+        )
+    """))
+    op.execute(sa.text(f"""
+        DELETE FROM inventory WHERE id IN (
+            SELECT inv.id FROM inventory inv
+            WHERE inv.product_id IS NOT NULL AND inv.variant_id IS NULL
+              AND inv.id <> ({keeper})
+        )
+    """))
+    op.create_index(
+        "uq_inventory_tenant_product",
+        "inventory",
+        ["tenant_id", "product_id"],
+        unique=True,
+        postgresql_where=PRODUCT_LEVEL,
+        sqlite_where=PRODUCT_LEVEL,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_inventory_tenant_product", table_name="inventory")
@@ -0,0 +1,30 @@
+"""add print queue fields to print_jobs (attempts, next_attempt_at)
+
+Revision ID: 20261018_print_queue
+Revises: 20261018_sequence_counters
+Create Date: 2026-10-18
+
+Campos usados pela fila assíncrona de impressão (app/services/print_queue.py):
+  - attempts:        tentativas de envio já feitas
+  - next_attempt_at: quando o job volta a ser elegível após falha (backoff)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_print_queue"
+down_revision = "20261018_sequence_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("print_jobs", sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("print_jobs", sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True))
+    # Worker busca os jobs pendentes de cada impressora em ordem
+    op.create_index("ix_print_jobs_printer_status", "print_jobs", ["printer_id", "status", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_print_jobs_printer_status", table_name="print_jobs")
+    op.drop_column("print_jobs", "next_attempt_at")
+    op.drop_column("print_jobs", "attempts")
@@ -0,0 +1,52 @@
+"""add public_catalog_items (projeção denormalizada do catálogo público)
+
+Revision ID: 20261018_catalog_projection
+Revises: 20261018_print_queue
+Create Date: 2026-10-18
+
+Tabela criada:
+  - public_catalog_items: uma linha por produto publicado, com preço mínimo,
+    in_stock, tamanhos/cores, capa e categoria já calculados. Mantida pelos
+    hooks de sessão de CatalogProjectionService; o backfill é feito no
+    startup (ensure_catalog_projection) quando a tabela está vazia.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_catalog_projection"
+down_revision = "20261018_print_queue"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "public_catalog_items",
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("tenant_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("sale_price", sa.Numeric(10, 2), nullable=False, server_default="0"),
+        sa.Column("image_url", sa.String(500), nullable=True),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("category_name", sa.String(100), nullable=True),
+        sa.Column("in_stock", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("variant_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sizes", sa.JSON(), nullable=False),
+        sa.Column("colors", sa.JSON(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("brand", sa.String(100), nullable=True),
+        sa.Column("gender", sa.String(20), nullable=True),
+        sa.Column("material", sa.String(100), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_public_catalog_listing", "public_catalog_items", ["tenant_id", "in_stock", "name"])
+    op.create_index(
+        "ix_public_catalog_category", "public_catalog_items", ["tenant_id", "category_id", "in_stock", "name"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_public_catalog_category", table_name="public_catalog_items")
+    op.drop_index("ix_public_catalog_listing", table_name="public_catalog_items")
+    op.drop_table("public_catalog_items")
@@ -0,0 +1,30 @@
+"""add tabela scheduler_leases (líder do scheduler e locks de job)
+
+Revision ID: 20261018_scheduler_leases
+Revises: 20261018_log_partitions
+Create Date: 2026-10-18
+
+Uma linha por lease nomeado ("scheduler:leader", "job:<id>"): quem detém
+(holder) e até quando (expires_at). Ver app/core/scheduler_lock.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_scheduler_leases"
+down_revision = "20261018_log_partitions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduler_leases",
+        sa.Column("name", sa.String(100), primary_key=True),
+        sa.Column("holder", sa.String(200), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("acquired_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scheduler_leases")
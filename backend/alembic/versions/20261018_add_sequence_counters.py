@@ -0,0 +1,35 @@
+"""add sequence_counters (alocação atômica de barcode, SKU e código de entrada)
+
+Revision ID: 20261018_sequence_counters
+Revises: 20260510_label_printing
+Create Date: 2026-10-18
+
+Tabela criada:
+  - sequence_counters: último valor alocado por (tenant_id, kind, prefix).
+    Os contadores são semeados sob demanda a partir dos dados existentes
+    na primeira geração — nenhum backfill é necessário.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_sequence_counters"
+down_revision = "20260510_label_printing"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sequence_counters",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("tenant_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(30), nullable=False),
+        sa.Column("prefix", sa.String(100), nullable=False, server_default=""),
+        sa.Column("last_value", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("tenant_id", "kind", "prefix", name="uq_sequence_counters_scope"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sequence_counters")
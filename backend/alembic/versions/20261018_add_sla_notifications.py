@@ -0,0 +1,93 @@
+"""add tabela sla_notifications (notificações de SLA por horário exato)
+
+Revision ID: 20261018_sla_notifications
+Revises: 20261018_scheduler_leases
+Create Date: 2026-10-18
+
+Uma linha por envio condicional e tipo (departure/return) com o instante
+exato da notificação (due_at). O índice (status, due_at) atende o
+"próximo vencimento" e o claim do sla_dispatcher. O upgrade já agenda os
+envios ativos cujo SLA ainda não passou.
+"""
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_sla_notifications"
+down_revision = "20261018_scheduler_leases"
+branch_labels = None
+depends_on = None
+
+# Mesmas antecedências de app/services/conditional_notification_service.py
+DEPARTURE_LEAD = timedelta(minutes=5)
+RETURN_LEAD = timedelta(minutes=15)
+
+
+def upgrade() -> None:
+    sla_notifications = op.create_table(
+        "sla_notifications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("tenant_id", sa.Integer(), sa.ForeignKey("stores.id"), nullable=False),
+        sa.Column(
+            "shipment_id",
+            sa.Integer(),
+            sa.ForeignKey("conditional_shipments.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("event_at", sa.DateTime(), nullable=False),
+        sa.Column("due_at", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("claimed_by", sa.String(200), nullable=True),
+        sa.Column("claimed_at", sa.DateTime(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.UniqueConstraint("shipment_id", "kind", name="uq_sla_notifications_shipment_kind"),
+    )
+    op.create_index("ix_sla_notifications_id", "sla_notifications", ["id"])
+    op.create_index("ix_sla_notifications_tenant_id", "sla_notifications", ["tenant_id"])
+    op.create_index("ix_sla_notifications_status_due", "sla_notifications", ["status", "due_at"])
+
+    # Backfill: envios ativos com SLA futuro (antes eram achados pela varredura de 1 min)
+    now = datetime.utcnow()
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, tenant_id, status, departure_datetime, return_datetime, deadline "
+        "FROM conditional_shipments "
+        "WHERE is_active = :active AND status IN ('PENDING', 'SENT')"
+    ), {"active": True}).all()
+
+    schedule = []
+    for shipment_id, tenant_id, status, departure, return_at, deadline in rows:
+        if status == "PENDING":
+            kind, event_at, lead = "departure", departure, DEPARTURE_LEAD
+        else:
+            kind, event_at, lead = "return", return_at or deadline, RETURN_LEAD
+        if event_at is None or event_at <= now:
+            continue
+        schedule.append({
+            "tenant_id": tenant_id,
+            "shipment_id": shipment_id,
+            "kind": kind,
+            "event_at": event_at,
+            "due_at": event_at - lead,
+            "status": "pending",
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+            "is_active": True,
+        })
+    if schedule:
+        op.bulk_insert(sla_notifications, schedule)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sla_notifications_status_due", table_name="sla_notifications")
+    op.drop_index("ix_sla_notifications_tenant_id", table_name="sla_notifications")
+    op.drop_index("ix_sla_notifications_id", table_name="sla_notifications")
+    op.drop_table("sla_notifications")
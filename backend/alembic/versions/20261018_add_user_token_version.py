@@ -0,0 +1,36 @@
+"""add users.token_version (revogação de access tokens)
+
+Revision ID: 20261018_user_token_version
+Revises: 20261018_catalog_projection
+Create Date: 2026-10-18
+
+Coluna adicionada:
+  - users.token_version: espelhada no claim "tv" do access token. É
+    incrementada quando role/is_active/tenant/senha mudam ou as sessões
+    são revogadas; get_current_user recusa tokens com versão anterior e
+    usa (user_id, tv) como chave do cache de usuários.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_user_token_version"
+down_revision = "20261018_catalog_projection"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "token_version",
+            sa.Integer(),
+            nullable=False,
+            server_default="0",
+            comment="Version of issued access tokens (claim tv)",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
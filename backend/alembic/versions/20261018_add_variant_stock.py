@@ -0,0 +1,47 @@
+"""add variant_stock (saldo em estoque por variante)
+
+Revision ID: 20261018_variant_stock
+Revises: 20261018_inventory_product_unique
+Create Date: 2026-10-18
+
+Contador on_hand por variante mantido por app/services/stock_ledger_service.py
+a cada escrita FIFO. O backfill soma os lotes ativos de cada variante
+(mesma regra de StockLedgerService.check_consistency).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_variant_stock"
+down_revision = "20261018_inventory_product_unique"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "variant_stock",
+        sa.Column("variant_id", sa.Integer(), sa.ForeignKey("product_variants.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("tenant_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("on_hand", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_variant_stock_tenant_product", "variant_stock", ["tenant_id", "product_id"])
+    op.execute(sa.text("""
+        INSERT INTO variant_stock (variant_id, tenant_id, product_id, on_hand, updated_at)
+        SELECT pv.id, pv.tenant_id, pv.product_id,
+               COALESCE((
+                   SELECT SUM(ei.quantity_remaining)
+                   FROM entry_items ei JOIN stock_entries se ON se.id = ei.entry_id
+                   WHERE ei.variant_id = pv.id AND ei.tenant_id = pv.tenant_id
+                     AND ei.is_active = true AND se.is_active = true
+               ), 0),
+               CURRENT_TIMESTAMP
+        FROM product_variants pv
+        WHERE pv.tenant_id IS NOT NULL
+    """))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_variant_stock_tenant_product", table_name="variant_stock")
+    op.drop_table("variant_stock")
@@ -6,7 +6,7 @@ from sqladmin.authentication import AuthenticationBackend
 from starlette.requests import Request
 from starlette.responses import RedirectResponse
 
-from app.core.security import verify_password, create_access_token, decode_token
+from app.core.security import verify_password_async, create_access_token, decode_token
 from app.core.database import async_session_maker
 from app.models.user import User, UserRole
 from sqlalchemy import select
@@ -29,7 +29,7 @@ class AdminAuth(AuthenticationBackend):
 
         if not user:
             return False
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return False
         if user.role != UserRole.ADMIN:
             return False
@@ -0,0 +1,57 @@
+"""
+Painel SQLAdmin montado sob demanda.
+
+Montar o Admin no import (sqladmin + jinja2 + wtforms e um formulário por
+ModelView) custava centenas de ms no cold start, para um painel que quase
+nenhuma requisição usa. LazyAdmin é o app ASGI montado em /admin: o painel
+real só é construído na primeira requisição (ou no primeiro url_for que o
+atravesse).
+"""
+from starlette.applications import Starlette
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+
+
+class LazyAdmin:
+    def __init__(self, engine, *, base_url: str = "/admin", title: str = "Fitness Store Admin"):
+        self._engine = engine
+        self._base_url = base_url
+        self._title = title
+        self._app = None
+
+    def _build(self):
+        from sqladmin import Admin
+
+        from app.admin.auth import AdminAuth
+        from app.admin.views import ALL_VIEWS
+
+        # O Admin se monta num Starlette descartável; servimos só o app interno dele
+        admin = Admin(
+            Starlette(),
+            engine=self._engine,
+            authentication_backend=AdminAuth(secret_key=settings.SECRET_KEY),
+            title=self._title,
+            base_url=self._base_url,
+        )
+        for view in ALL_VIEWS:
+            admin.add_view(view)
+        return admin.admin
+
+    @property
+    def app(self):
+        if self._app is None:
+            self._app = self._build()
+        return self._app
+
+    @property
+    def routes(self):
+        # Mount.url_path_for("admin:...") percorre as rotas do app montado
+        return self.app.routes
+
+    @property
+    def is_built(self) -> bool:
+        return self._app is not None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.app(scope, receive, send)
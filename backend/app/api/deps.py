@@ -10,6 +10,8 @@ from typing import List
 
 from app.core.database import get_db
 from app.core.config import settings
+from app.core.logging_config import bind_tenant
+from app.core.user_cache import user_cache
 from app.repositories.user_repository import UserRepository
 from app.models.user import User, UserRole
 from app.models.store import Store
@@ -26,6 +28,11 @@ async def get_current_user(
     """
     Obtém usuário atual a partir do JWT token.
 
+    O usuário vem do cache por worker (user_cache), chaveado por id + claim
+    "tv"; só em miss há consulta ao banco. Tokens com "tv" anterior ao
+    token_version do usuário (senha/role trocada, sessões revogadas) são
+    recusados.
+
     Args:
         credentials: Credenciais extraídas do header Authorization
         db: Sessão do banco de dados
@@ -63,6 +70,7 @@ async def get_current_user(
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
+        token_version = int(payload.get("tv") or 0)
 
     except ExpiredSignatureError:
         logger.info("JWT expirado")
@@ -74,6 +82,10 @@ async def get_current_user(
         logger.error(f"Error in get_current_user (token processing): {e}", exc_info=True)
         raise credentials_exception
 
+    cached = user_cache.get(int(user_id), token_version)
+    if cached is not None:
+        return cached
+
     # Buscar usuário no banco de dados
     try:
         user_repo = UserRepository(db)
@@ -83,7 +95,12 @@ async def get_current_user(
             logger.error(f"User {user_id} not found in database")
             raise credentials_exception
 
-        logger.info(f"User {user_id} authenticated successfully")
+        if token_version < (user.token_version or 0):
+            logger.info(f"Token revogado para user {user_id} (tv={token_version})")
+            raise credentials_exception
+
+        user_cache.set(user)
+        logger.debug("User authenticated", extra={"user_id": int(user_id)})
         return user
     except HTTPException:
         raise
@@ -172,7 +189,15 @@ async def get_current_tenant_id(
     4) Header 'X-Store-Slug' (slug)
     5) Host header (domain) mapeado em Store.domain
     6) Store com is_default = True
+
+    O tenant resolvido também vai para o contexto de log da requisição.
     """
+    tenant_id = await _resolve_tenant_id(request, current_user, db)
+    bind_tenant(tenant_id)
+    return tenant_id
+
+
+async def _resolve_tenant_id(request: Request, current_user: User, db: AsyncSession) -> int:
     # 1) Prioridade: tenant_id do usuário autenticado
     if current_user and current_user.tenant_id:
         return current_user.tenant_id
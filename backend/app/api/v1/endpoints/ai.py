@@ -1,17 +1,27 @@
 """
 Endpoints de IA para análise de produtos.
 """
+import json
 import time
 import logging
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.api.deps import get_current_active_user, get_current_tenant_id
 from app.models.user import User
-from app.schemas.ai import ProductScanResponse, ProductScanResult, AIStatusResponse
+from app.schemas.ai import (
+    AIStatusResponse,
+    BatchScanItem,
+    BatchScanResponse,
+    ProductScanResponse,
+    ProductScanResult,
+)
+from app.services.ai_batch_scan_service import BatchStatus, ScanBatch, ai_batch_scanner
 from app.services.ai_scan_service import AIScanService
 
 logger = logging.getLogger(__name__)
@@ -63,6 +73,72 @@ def _convert_to_jpeg(image_bytes: bytes) -> bytes:
         raise ValueError(f"Nao foi possivel converter imagem para JPEG: {e}")
 
 
+async def _read_scan_image(image: UploadFile) -> tuple[bytes, str]:
+    """Lê e valida a imagem enviada; converte HEIC/TIFF/BMP para JPEG. Retorna (bytes, media_type)."""
+    # Validar content type
+    # React Native/Expo pode enviar application/octet-stream mesmo para imagens JPEG.
+    # Nesse caso, inferir o tipo pela extensão do filename antes de rejeitar.
+    content_type = image.content_type or "application/octet-stream"
+
+    # Verificar se o tipo é suportado diretamente ou precisa de conversão
+    all_known_types = set(SUPPORTED_MEDIA_TYPES.keys()) | CONVERTIBLE_MEDIA_TYPES
+    if content_type not in all_known_types:
+        # Tentar inferir pelo nome do arquivo
+        filename = image.filename or ""
+        ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        inferred = {
+            "jpg": "image/jpeg",
+            "jpeg": "image/jpeg",
+            "png": "image/png",
+            "webp": "image/webp",
+            "gif": "image/gif",
+            "heic": "image/heic",
+            "heif": "image/heif",
+            "tiff": "image/tiff",
+            "tif": "image/tiff",
+            "bmp": "image/bmp",
+        }.get(ext)
+
+        if inferred:
+            logger.info(
+                f"content_type '{content_type}' nao reconhecido, "
+                f"inferido como '{inferred}' pela extensao '{ext}'"
+            )
+            content_type = inferred
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Formato nao suportado: {content_type}. Use JPEG, PNG, WebP, GIF ou HEIC.",
+            )
+
+    # Ler imagem
+    image_bytes = await image.read()
+
+    # Validar tamanho
+    if len(image_bytes) > MAX_IMAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Imagem muito grande. Máximo: 10MB (recebido: {len(image_bytes) / (1024*1024):.1f}MB)",
+        )
+
+    if len(image_bytes) < 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Arquivo de imagem inválido ou corrompido.",
+        )
+
+    # Converter HEIC/HEIF/TIFF/BMP para JPEG (OpenAI nao suporta esses formatos)
+    if content_type in CONVERTIBLE_MEDIA_TYPES:
+        logger.info(f"Convertendo {content_type} para JPEG...")
+        image_bytes = _convert_to_jpeg(image_bytes)
+        content_type = "image/jpeg"
+        logger.info(f"Conversao concluida: {len(image_bytes)} bytes JPEG")
+
+    logger.info(f"Processing image scan: size={len(image_bytes)} bytes, type={content_type}")
+
+    return image_bytes, content_type
+
+
 @router.post("/scan-product", response_model=ProductScanResponse)
 async def scan_product(
     image: UploadFile = File(..., description="Imagem do produto (JPEG, PNG, WebP, GIF)"),
@@ -105,66 +181,7 @@ async def scan_product(
     start_time = time.time()
 
     try:
-        # Validar content type
-        # React Native/Expo pode enviar application/octet-stream mesmo para imagens JPEG.
-        # Nesse caso, inferir o tipo pela extensão do filename antes de rejeitar.
-        content_type = image.content_type or "application/octet-stream"
-
-        # Verificar se o tipo é suportado diretamente ou precisa de conversão
-        all_known_types = set(SUPPORTED_MEDIA_TYPES.keys()) | CONVERTIBLE_MEDIA_TYPES
-        if content_type not in all_known_types:
-            # Tentar inferir pelo nome do arquivo
-            filename = image.filename or ""
-            ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
-            inferred = {
-                "jpg": "image/jpeg",
-                "jpeg": "image/jpeg",
-                "png": "image/png",
-                "webp": "image/webp",
-                "gif": "image/gif",
-                "heic": "image/heic",
-                "heif": "image/heif",
-                "tiff": "image/tiff",
-                "tif": "image/tiff",
-                "bmp": "image/bmp",
-            }.get(ext)
-
-            if inferred:
-                logger.info(
-                    f"content_type '{content_type}' nao reconhecido, "
-                    f"inferido como '{inferred}' pela extensao '{ext}'"
-                )
-                content_type = inferred
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Formato nao suportado: {content_type}. Use JPEG, PNG, WebP, GIF ou HEIC.",
-                )
-
-        # Ler imagem
-        image_bytes = await image.read()
-
-        # Validar tamanho
-        if len(image_bytes) > MAX_IMAGE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"Imagem muito grande. Máximo: 10MB (recebido: {len(image_bytes) / (1024*1024):.1f}MB)",
-            )
-
-        if len(image_bytes) < 100:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Arquivo de imagem inválido ou corrompido.",
-            )
-
-        # Converter HEIC/HEIF/TIFF/BMP para JPEG (OpenAI nao suporta esses formatos)
-        if content_type in CONVERTIBLE_MEDIA_TYPES:
-            logger.info(f"Convertendo {content_type} para JPEG...")
-            image_bytes = _convert_to_jpeg(image_bytes)
-            content_type = "image/jpeg"
-            logger.info(f"Conversao concluida: {len(image_bytes)} bytes JPEG")
-
-        logger.info(f"Processing image scan: size={len(image_bytes)} bytes, type={content_type}")
+        image_bytes, content_type = await _read_scan_image(image)
 
         # Executar análise
         service = AIScanService(db)
@@ -222,6 +239,124 @@ async def scan_product(
         )
 
 
+def _batch_response(batch: ScanBatch) -> BatchScanResponse:
+    return BatchScanResponse(
+        batch_id=batch.id,
+        status=batch.status,
+        total=len(batch.items),
+        completed=batch.completed,
+        failed=batch.failed,
+        items=[
+            BatchScanItem(
+                index=item.index,
+                filename=item.filename,
+                status=item.status,
+                attempts=item.attempts,
+                data=item.result,
+                error=item.error,
+                batch_duplicates=item.batch_duplicates,
+            )
+            for item in batch.items
+        ],
+    )
+
+
+@router.post(
+    "/scan-batch",
+    response_model=BatchScanResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def scan_batch(
+    images: List[UploadFile] = File(..., description="Imagens dos produtos (uma peça por imagem)"),
+    context: Optional[str] = Form(None, description="Contexto comum a todas as imagens"),
+    check_duplicates: bool = Form(True, description="Verificar duplicados (estoque e dentro do lote)"),
+    suggest_price: bool = Form(True, description="Sugerir preço de venda"),
+    tenant_id: int = Depends(get_current_tenant_id),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Analisa um lote de imagens (cadastro de coleção) em background.
+
+    Responde 202 com o batch_id; acompanhe por polling em
+    `GET /ai/scan-batch/{batch_id}` ou por SSE em
+    `GET /ai/scan-batch/{batch_id}/events`. Duplicados são verificados uma
+    vez para o lote inteiro, inclusive entre as imagens enviadas
+    (`batch_duplicates`).
+    """
+    if not settings.AI_SCAN_ENABLED:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="AI Scan está desabilitado")
+    if len(images) > settings.AI_BATCH_MAX_IMAGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {settings.AI_BATCH_MAX_IMAGES} imagens por lote",
+        )
+
+    prepared = []
+    for position, image in enumerate(images):
+        try:
+            image_bytes, content_type = await _read_scan_image(image)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        prepared.append((image.filename or f"imagem-{position + 1}", image_bytes, content_type))
+
+    try:
+        batch = ai_batch_scanner.submit(
+            tenant_id, current_user.id, prepared,
+            context=context, check_duplicates=check_duplicates, suggest_price=suggest_price,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return _batch_response(batch)
+
+
+@router.get("/scan-batch/{batch_id}", response_model=BatchScanResponse)
+async def get_scan_batch(
+    batch_id: str,
+    tenant_id: int = Depends(get_current_tenant_id),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Estado do lote (polling)."""
+    batch = ai_batch_scanner.get(batch_id, tenant_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Lote não encontrado ou expirado")
+    return _batch_response(batch)
+
+
+@router.get("/scan-batch/{batch_id}/events")
+async def scan_batch_events(
+    batch_id: str,
+    tenant_id: int = Depends(get_current_tenant_id),
+    current_user: User = Depends(get_current_active_user),
+):
+    """SSE: um evento `item` por imagem concluída e um `batch` final com duplicados. Timeout: 10 min."""
+    batch = ai_batch_scanner.get(batch_id, tenant_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Lote não encontrado ou expirado")
+
+    async def generate():
+        deadline = time.monotonic() + 600
+        sent = set()
+        while True:
+            finished = batch.status == BatchStatus.DONE
+            for item in _batch_response(batch).items:
+                if item.status in ("done", "error") and item.index not in sent:
+                    sent.add(item.index)
+                    yield f"event: item\ndata: {item.model_dump_json()}\n\n"
+            if finished:
+                yield f"event: batch\ndata: {_batch_response(batch).model_dump_json()}\n\n"
+                return
+            if time.monotonic() > deadline:
+                yield f"event: timeout\ndata: {json.dumps({'batch_id': batch.id})}\n\n"
+                return
+            await ai_batch_scanner.wait_for_update(batch.id, timeout=5)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/status", response_model=AIStatusResponse)
 async def get_ai_status(
     db: AsyncSession = Depends(get_db),
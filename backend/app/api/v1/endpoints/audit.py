@@ -1,14 +1,24 @@
 """
 Endpoints de consulta ao audit log (somente ADMIN).
+
+Paginação por keyset: a resposta traz o header X-Next-Cursor, que vai em
+?cursor= na próxima página (ordem created_at DESC, id DESC, via índice
+ix_audit_logs_tenant_created). ?skip= continua aceito por compatibilidade.
+date_from/date_to limitam o período — no PostgreSQL só as partições mensais
+do intervalo são lidas.
 """
-from fastapi import APIRouter, Depends, Query
+import base64
+import binascii
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from typing import Optional
+from sqlalchemy import and_, or_, select, desc
+from typing import Optional, Tuple
 from app.core.database import get_db
 from app.api.deps import require_role, get_current_tenant_id
 from app.models.audit_log import AuditLog
 from app.models.user import UserRole
+from app.services.log_retention_service import within_period
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -30,19 +40,37 @@ class AuditLogResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+def _encode_cursor(entry: AuditLog) -> str:
+    raw = f"{entry.created_at.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, entry_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(entry_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
 @router.get(
     "/",
     response_model=list[AuditLogResponse],
     dependencies=[Depends(require_role([UserRole.ADMIN]))],
 )
 async def list_audit_logs(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     tenant_id: int = Depends(get_current_tenant_id),
     action: Optional[str] = Query(None),
     entity: Optional[str] = Query(None),
     user_id: Optional[int] = Query(None),
+    date_from: Optional[datetime] = Query(None, description="created_at >= date_from"),
+    date_to: Optional[datetime] = Query(None, description="created_at < date_to"),
     limit: int = Query(50, le=200),
-    skip: int = Query(0),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    skip: int = Query(0, description="Obsoleto: prefira cursor"),
 ):
     """Lista audit logs do tenant. Filtros: action, entity, user_id."""
     stmt = select(AuditLog).where(AuditLog.tenant_id == tenant_id)
@@ -52,6 +80,18 @@ async def list_audit_logs(
         stmt = stmt.where(AuditLog.entity == entity)
     if user_id:
         stmt = stmt.where(AuditLog.user_id == user_id)
-    stmt = stmt.order_by(desc(AuditLog.created_at)).offset(skip).limit(limit)
+    stmt = within_period(stmt, AuditLog.created_at, date_from, date_to)
+    if cursor:
+        created_at, entry_id = _decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            AuditLog.created_at < created_at,
+            and_(AuditLog.created_at == created_at, AuditLog.id < entry_id),
+        ))
+    elif skip:
+        stmt = stmt.offset(skip)
+    stmt = stmt.order_by(desc(AuditLog.created_at), desc(AuditLog.id)).limit(limit)
     result = await db.execute(stmt)
-    return result.scalars().all()
+    entries = result.scalars().all()
+    if len(entries) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(entries[-1])
+    return entries
@@ -423,7 +423,7 @@ async def forgot_password(
     """
     import secrets
     import string
-    from app.core.security import get_password_hash
+    from app.core.security import get_password_hash_async
 
     email = request.get("email", "").strip().lower()
 
@@ -452,7 +452,7 @@ async def forgot_password(
     temp_password = ''.join(secrets.choice(alphabet) for _ in range(8))
 
     # Atualizar senha no banco
-    user.hashed_password = get_password_hash(temp_password)
+    user.hashed_password = await get_password_hash_async(temp_password)
     await db.commit()
 
     logger.info(f"Password reset for user: {email}")
@@ -834,7 +834,7 @@ async def check_sla_notifications(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Verifica SLAs e envia notificações (rodar via cron a cada 1 min)"""
+    """Envia agora as notificações de SLA vencidas (o sla_dispatcher já dispara no horário)"""
     service = ConditionalNotificationService()
     result = await service.check_and_send_sla_notifications(db)
     return result
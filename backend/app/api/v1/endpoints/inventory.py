@@ -11,14 +11,19 @@ Endpoints:
     - GET /inventory/product/{product_id}: Consultar estoque atual
     - GET /inventory/alerts: Listar produtos com estoque baixo
     - GET /inventory/movements/{product_id}: Histórico de movimentações
+    - POST /inventory/rebuild/jobs: Rebuild FIFO em background (202 + job)
+    - POST /inventory/reconciliation/jobs: Reconciliação de custo em background (202 + job)
 """
 
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.job_queue import job_queue
 from app.schemas.inventory import (
     StockMovementCreate,
     StockMovementResponse,
@@ -26,13 +31,18 @@ from app.schemas.inventory import (
     InventoryRebuildResult,
     InventoryRebuildDelta,
     CostReconciliationResponse,
+    StockLedgerConsistencyResponse,
 )
+from app.schemas.job import JobResponse
 from app.services.inventory_service import InventoryService
+from app.services.stock_ledger_service import StockLedgerService
 from app.repositories.inventory_repository import InventoryRepository
 from app.api.deps import get_current_active_user, require_role, get_current_tenant_id
 from app.models.user import User, UserRole
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/inventory", tags=["Estoque"])
 
 
@@ -225,7 +235,7 @@ async def remove_stock(
     except ValueError as e:
         # Erros de validação (estoque insuficiente, produto não encontrado)
         error_detail = str(e)
-        print(f"[ERROR] Erro de validação ao remover estoque: {error_detail}")
+        logger.warning("Erro de validação ao remover estoque: %s", error_detail)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=error_detail
@@ -234,7 +244,7 @@ async def remove_stock(
         raise
     except Exception as e:
         error_msg = f"Erro ao remover estoque: {str(e)}"
-        print(f"[ERROR] {error_msg}")
+        logger.exception(error_msg)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=error_msg
@@ -526,6 +536,27 @@ async def rebuild_inventory_from_fifo(
         raise HTTPException(status_code=500, detail=f"Erro no rebuild: {str(e)}")
 
 
+@router.post(
+    "/rebuild/jobs",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Rebuild do inventário a partir do FIFO (background)",
+    description="Enfileira o rebuild de todos os produtos do tenant e retorna o job; acompanhe em GET /jobs/{id}. Um rebuild já na fila/em execução é reaproveitado."
+)
+async def enqueue_inventory_rebuild(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.MANAGER])),
+    tenant_id: int = Depends(get_current_tenant_id),
+):
+    return await job_queue.enqueue(
+        db,
+        "inventory.rebuild_fifo",
+        tenant_id=tenant_id,
+        user_id=current_user.id,
+        dedup_key=f"inventory.rebuild_fifo:{tenant_id}",
+    )
+
+
 @router.get(
     "/reconciliation",
     response_model=CostReconciliationResponse,
@@ -547,3 +578,44 @@ async def get_cost_reconciliation(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro na reconciliação: {str(e)}")
+
+
+@router.post(
+    "/reconciliation/jobs",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Reconciliação de custo FIFO (background)",
+    description="Enfileira a reconciliação e retorna o job; o resumo sai em result de GET /jobs/{id}."
+)
+async def enqueue_cost_reconciliation(
+    product_id: int | None = Query(None, description="Opcional: produto específico"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.MANAGER])),
+    tenant_id: int = Depends(get_current_tenant_id),
+):
+    return await job_queue.enqueue(
+        db,
+        "inventory.reconcile_costs",
+        {"product_id": product_id},
+        tenant_id=tenant_id,
+        user_id=current_user.id,
+        dedup_key=f"inventory.reconcile_costs:{tenant_id}:{product_id or 'all'}",
+    )
+
+
+@router.get(
+    "/stock-ledger/consistency",
+    response_model=StockLedgerConsistencyResponse,
+    summary="Verificar ledger de estoque por variante",
+    description="Compara o saldo de cada variante (variant_stock) com a soma dos lotes FIFO ativos. Com repair=true, reconta as divergentes."
+)
+async def check_stock_ledger(
+    repair: bool = Query(False, description="Recontar variantes divergentes"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.MANAGER])),
+    tenant_id: int = Depends(get_current_tenant_id),
+):
+    result = await StockLedgerService(db).check_consistency(tenant_id=tenant_id, repair=repair)
+    if repair and result["repaired"]:
+        await db.commit()
+    return result
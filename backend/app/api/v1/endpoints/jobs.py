@@ -0,0 +1,61 @@
+"""
+Endpoints de status dos jobs em background (app/core/job_queue.py).
+
+Endpoints:
+    GET  /jobs              — jobs recentes do tenant (?status=)
+    GET  /jobs/{id}         — status, progresso e resultado (polling)
+    POST /jobs/{id}/cancel  — cancela job na fila ou em execução
+
+Quem enfileira (ex.: POST /inventory/rebuild/jobs) responde 202 com o
+JobResponse; o cliente acompanha por aqui.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_active_user, get_current_tenant_id
+from app.core.database import get_db
+from app.core.job_queue import job_queue
+from app.models.user import User
+from app.schemas.job import JobListResponse, JobResponse
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/", response_model=JobListResponse, summary="Listar jobs em background")
+async def list_jobs(
+    status: Optional[str] = Query(None, description="queued | running | succeeded | failed | cancelled"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    tenant_id: int = Depends(get_current_tenant_id),
+):
+    jobs = await job_queue.list_jobs(db, tenant_id, status=status, limit=limit)
+    return JobListResponse(items=[JobResponse.model_validate(j) for j in jobs], total=len(jobs))
+
+
+@router.get("/{job_id}", response_model=JobResponse, summary="Status de um job")
+async def get_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    tenant_id: int = Depends(get_current_tenant_id),
+):
+    job = await job_queue.get(db, job_id, tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse, summary="Cancelar job")
+async def cancel_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    tenant_id: int = Depends(get_current_tenant_id),
+):
+    job = await job_queue.cancel(db, job_id, tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
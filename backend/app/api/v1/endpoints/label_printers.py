@@ -15,15 +15,25 @@ Endpoints:
 
     Jobs de Impressão:
         POST   /label-printers/print         — imprimir uma variante
-        POST   /label-printers/print/batch   — imprimir múltiplas variantes
+        POST   /label-printers/print/batch   — imprimir múltiplas variantes (um único envio)
         GET    /label-printers/print/jobs    — histórico de jobs
-        GET    /label-printers/print/preview — ver ZPL sem imprimir
+        GET    /label-printers/print/jobs/{id}        — status de um job (polling)
+        GET    /label-printers/print/jobs/{id}/events — status de um job via SSE
+        GET    /label-printers/print/preview — ver ZPL sem imprimir (cache de render)
+
+    Com "queued": true os endpoints de impressão gravam o job como QUEUED e
+    retornam na hora; o worker da impressora (print_queue) faz o envio.
 """
 
+import json
+import time
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 
+from app.core import database
 from app.core.database import get_db
 from app.api.deps import get_current_active_user, get_current_tenant_id, require_role
 from app.models.user import User, UserRole
@@ -41,6 +51,7 @@ from app.schemas.label_printer import (
     ZplPreviewResponse,
 )
 from app.services.print_job_service import print_job_service
+from app.services.print_queue import print_queue, TERMINAL_STATUSES
 
 router = APIRouter(prefix="/label-printers", tags=["Etiquetas e Impressão"])
 
@@ -177,6 +188,12 @@ async def print_label(
     tenant_id: int = Depends(get_current_tenant_id),
 ):
     try:
+        if data.queued:
+            job = await print_job_service.enqueue(db, data, tenant_id)
+            await db.commit()
+            print_queue.notify(data.printer_id)
+            return job
+
         job = await print_job_service.create_and_print(db, data, tenant_id)
         await db.commit()
         return job
@@ -189,6 +206,11 @@ async def print_label(
     response_model=PrintJobListResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Imprimir etiquetas em lote (múltiplas variantes)",
+    description=(
+        "Renderiza todas as etiquetas e as envia num único stream pela conexão "
+        "persistente da impressora. product_id é opcional — sem ele o lote pode "
+        "conter variantes de produtos diferentes (ex: todas as peças de uma entrada)."
+    ),
 )
 async def print_labels_batch(
     data: PrintJobBatchCreate,
@@ -197,6 +219,13 @@ async def print_labels_batch(
     tenant_id: int = Depends(get_current_tenant_id),
 ):
     try:
+        if data.queued:
+            jobs = await print_job_service.enqueue_batch(db, data, tenant_id)
+            await db.commit()
+            if jobs:
+                print_queue.notify(data.printer_id)
+            return PrintJobListResponse(items=jobs, total=len(jobs))
+
         jobs = await print_job_service.create_batch_and_print(db, data, tenant_id)
         await db.commit()
         return PrintJobListResponse(items=jobs, total=len(jobs))
@@ -220,6 +249,68 @@ async def list_print_jobs(
     return PrintJobListResponse(items=jobs, total=len(jobs))
 
 
+@router.get(
+    "/print/jobs/{job_id}",
+    response_model=PrintJobResponse,
+    summary="Status de um job de impressão (polling)",
+)
+async def get_print_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    tenant_id: int = Depends(get_current_tenant_id),
+):
+    job = await print_job_service.get_job(db, job_id, tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} não encontrado.")
+    return job
+
+
+@router.get(
+    "/print/jobs/{job_id}/events",
+    summary="Status de um job de impressão via SSE",
+)
+async def print_job_events(
+    job_id: int,
+    current_user: User = Depends(get_current_active_user),
+    tenant_id: int = Depends(get_current_tenant_id),
+):
+    """SSE: emite o status do job a cada mudança até DONE/ERROR/CANCELLED. Timeout: 2 min.
+    Sinalizado pelo worker da impressora; relê o banco a cada 5s como fallback
+    (job processado por outro worker uvicorn)."""
+
+    async def generate():
+        deadline = time.monotonic() + 120
+        last = None
+        while True:
+            # Sessão curta por leitura — não segura conexão durante o stream
+            async with database.async_session_maker() as db:
+                job = await print_job_service.get_job(db, job_id, tenant_id)
+            if job is None:
+                yield f"data: {json.dumps({'status': 'not_found'})}\n\n"
+                return
+
+            payload = {
+                "id": job.id,
+                "status": job.status.value,
+                "attempts": job.attempts,
+                "error_message": job.error_message,
+            }
+            if payload != last:
+                yield f"data: {json.dumps(payload)}\n\n"
+                last = payload
+
+            if job.status in TERMINAL_STATUSES or time.monotonic() > deadline:
+                return
+            await print_queue.wait_for_update(job_id, timeout=5)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     "/print/preview",
     response_model=ZplPreviewResponse,
@@ -3,6 +3,7 @@ Endpoints de galeria de mídia de produtos.
 
 Rotas:
   GET    /products/{product_id}/media              — lista todas as mídias do produto
+                                                      (?size=thumb|medium|large → versões WebP)
   POST   /products/{product_id}/media/upload       — upload FormData (foto produto)
   POST   /products/{product_id}/media/upload/base64 — upload base64 (foto produto)
   PATCH  /products/{product_id}/media/{media_id}/cover — define como capa
@@ -18,6 +19,7 @@ from app.core.database import get_db
 from app.api.deps import get_current_user, get_current_tenant_id, require_role
 from app.models.user import User, UserRole
 from app.schemas.product_media import ProductMediaResponse, ProductMediaReorderItem
+from app.services.image_pipeline import ImageSize, image_pipeline
 from app.services.product_media_service import ProductMediaService
 
 router = APIRouter(prefix="/products", tags=["Galeria de Produtos"])
@@ -57,6 +59,7 @@ async def list_product_media(
     product_id: int,
     variant_id: Optional[int] = Query(None, description="Filtrar por variação (null = só produto)"),
     scope: Optional[str] = Query(None, description="'product' para só produto-nível, 'variant' para só variações"),
+    size: Optional[ImageSize] = Query(None, description="Versão WebP (thumb, medium, large); omitido = original"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
     tenant_id: int = Depends(get_current_tenant_id),
@@ -65,7 +68,7 @@ async def list_product_media(
     try:
         variant_id_filter = scope in ("product", "variant") or variant_id is not None
         resolved_variant_id = None if scope == "product" else variant_id
-        return await svc.list_product_media(
+        media = await svc.list_product_media(
             product_id, tenant_id,
             variant_id=resolved_variant_id,
             variant_id_filter=variant_id_filter,
@@ -73,6 +76,15 @@ async def list_product_media(
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    if not size:
+        return media
+    return [
+        ProductMediaResponse.model_validate(m).model_copy(
+            update={"url": image_pipeline.sized_url(m.url, size)}
+        )
+        for m in media
+    ]
+
 
 @router.post(
     "/{product_id}/media/upload",
@@ -92,15 +92,14 @@ async def build_product_response(
     """)
     variant_params = {"pid": product.id, "tid": tenant_id}
 
+    # Estoque por variante vem do ledger (variant_stock), sem somar entry_items
     all_variants_query = text("""
         SELECT
             pv.id, pv.sku, pv.size, pv.color, pv.price, pv.cost_price, pv.is_active,
-            COALESCE(SUM(CASE WHEN se.is_active = true THEN ei.quantity_remaining ELSE 0 END), 0) as current_stock
+            COALESCE(vs.on_hand, 0) as current_stock
         FROM product_variants pv
-        LEFT JOIN entry_items ei ON ei.variant_id = pv.id AND ei.is_active = true
-        LEFT JOIN stock_entries se ON se.id = ei.entry_id
+        LEFT JOIN variant_stock vs ON vs.variant_id = pv.id
         WHERE pv.product_id = :pid AND pv.tenant_id = :tid AND pv.is_active = true
-        GROUP BY pv.id
         ORDER BY pv.size, pv.color
     """)
     all_variants_result = await db.execute(all_variants_query, {"pid": product.id, "tid": tenant_id})
@@ -712,17 +711,15 @@ async def get_product(
         )
         variant_row = variant_result.fetchone()
 
-        # Todas as variantes com estoque FIFO por variante
+        # Todas as variantes com o saldo do ledger (variant_stock)
         all_variants_result = await db.execute(
             text("""
                 SELECT
                     pv.id, pv.sku, pv.size, pv.color, pv.price, pv.cost_price, pv.is_active,
-                    COALESCE(SUM(CASE WHEN se.is_active = true THEN ei.quantity_remaining ELSE 0 END), 0) AS current_stock
+                    COALESCE(vs.on_hand, 0) AS current_stock
                 FROM product_variants pv
-                LEFT JOIN entry_items ei ON ei.variant_id = pv.id AND ei.is_active = true
-                LEFT JOIN stock_entries se ON se.id = ei.entry_id
+                LEFT JOIN variant_stock vs ON vs.variant_id = pv.id
                 WHERE pv.product_id = :pid AND pv.tenant_id = :tid
-                GROUP BY pv.id, pv.sku, pv.size, pv.color, pv.price, pv.cost_price, pv.is_active
                 ORDER BY pv.id
             """),
             {"pid": product_id, "tid": tenant_id}
@@ -5,6 +5,16 @@ Expõe apenas dados seguros para o site público (wamodafitness.com.br):
   - nome, preço de venda, foto, categoria, tamanhos, in_stock (bool)
 
 Nunca expõe: custo, quantidade em estoque, SKU, dados internos.
+
+Produtos: lidos da projeção public_catalog_items (CatalogProjectionService),
+mantida incrementalmente a cada commit que altera produtos/variantes/estoque.
+
+Imagens: ?size=thumb|medium|large devolve as versões WebP geradas pelo
+image_pipeline (storage local). A listagem usa "medium" por padrão e o
+detalhe "large"; size=original devolve o arquivo enviado.
+
+Cache: todas as respostas passam por cached_public_response (ETag pela
+versão do catálogo do tenant, 304, Cache-Control com stale-while-revalidate).
 """
 from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,6 +24,10 @@ from pydantic import BaseModel
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.public_cache import cached_public_response
+from app.models.catalog_projection import PublicCatalogItem
+from app.services.catalog_projection_service import CatalogProjectionService
+from app.services.image_pipeline import image_pipeline
 
 router = APIRouter(prefix="/public", tags=["Catálogo Público"])
 
@@ -53,6 +67,9 @@ class PublicLook(BaseModel):
 
 # ── Helper ───────────────────────────────────────────────────────────────────
 
+_SIZE_PATTERN = "^(thumb|medium|large|original)$"
+
+
 async def _resolve_tenant(db: AsyncSession, request: Request, store: Optional[str] = None) -> int:
     """
     Resolve o tenant público por ordem de prioridade:
@@ -100,6 +117,23 @@ async def _resolve_tenant(db: AsyncSession, request: Request, store: Optional[st
 
 # ── Produtos ─────────────────────────────────────────────────────────────────
 
+def _to_public(item: PublicCatalogItem, size: str) -> dict:
+    return dict(
+        id=item.product_id,
+        name=item.name,
+        sale_price=float(item.sale_price or 0),
+        image_url=image_pipeline.sized_url(item.image_url, size),
+        category=(
+            PublicCategory(id=item.category_id, name=item.category_name)
+            if item.category_id and item.category_name else None
+        ),
+        in_stock=item.in_stock,
+        variant_count=item.variant_count,
+        sizes=list(item.sizes or []),
+        created_at=item.created_at,
+    )
+
+
 @router.get("/products", response_model=List[PublicProduct])
 async def list_public_products(
     request: Request,
@@ -108,76 +142,24 @@ async def list_public_products(
     category_id: Optional[int] = Query(None),
     search: Optional[str] = Query(None),
     store: Optional[str] = Query(None, description="Slug da loja"),
+    size: str = Query("medium", pattern=_SIZE_PATTERN, description="Versão da imagem"),
     db: AsyncSession = Depends(get_db),
 ):
-    """Lista produtos públicos da loja. Não expõe custo nem quantidade."""
-    tenant_id = await _resolve_tenant(db, request, store)
+    """
+    Lista produtos públicos da loja. Não expõe custo nem quantidade.
 
-    q = """
-        SELECT
-            p.id,
-            p.name,
-            COALESCE(
-                (SELECT MIN(pv.price) FROM product_variants pv
-                 WHERE pv.product_id = p.id AND pv.is_active = true),
-                p.base_price, 0
-            )                                    AS sale_price,
-            p.image_url,
-            p.category_id,
-            c.name                               AS category_name,
-            COALESCE((
-                SELECT SUM(inv.quantity)
-                FROM inventory inv
-                JOIN product_variants pv ON pv.id = inv.variant_id
-                WHERE pv.product_id = p.id AND pv.is_active = true
-            ), 0) > 0                            AS in_stock,
-            (
-                SELECT COUNT(*) FROM product_variants pv
-                WHERE pv.product_id = p.id AND pv.is_active = true
-            )                                    AS variant_count,
-            ARRAY(
-                SELECT DISTINCT pv2.size
-                FROM product_variants pv2
-                WHERE pv2.product_id = p.id AND pv2.is_active = true
-                  AND pv2.size IS NOT NULL
-                ORDER BY pv2.size
-            )                                    AS sizes,
-            p.created_at
-        FROM products p
-        LEFT JOIN categories c ON c.id = p.category_id
-        WHERE p.tenant_id  = :tid
-          AND p.is_active  = true
-          AND p.is_catalog = true
+    Lê a projeção public_catalog_items (uma linha por produto, já com preço
+    mínimo, estoque e tamanhos) via índice (tenant_id, in_stock, name).
     """
-    params: dict = {"tid": tenant_id}
-
-    if category_id is not None:
-        q += " AND p.category_id = :cat"
-        params["cat"] = category_id
-    if search:
-        q += " AND p.name ILIKE :search"
-        params["search"] = f"%{search}%"
-
-    q += " ORDER BY in_stock DESC, p.name LIMIT :limit OFFSET :skip"
-    params["limit"] = limit
-    params["skip"] = skip
-
-    rows = (await db.execute(text(q), params)).fetchall()
-
-    return [
-        PublicProduct(
-            id=r[0],
-            name=r[1],
-            sale_price=float(r[2]),
-            image_url=r[3],
-            category=PublicCategory(id=r[4], name=r[5]) if r[4] and r[5] else None,
-            in_stock=bool(r[6]),
-            variant_count=int(r[7] or 0),
-            sizes=list(r[8] or []),
-            created_at=r[9],
+    tenant_id = await _resolve_tenant(db, request, store)
+
+    async def build():
+        items = await CatalogProjectionService(db).list_products(
+            tenant_id, skip=skip, limit=limit, category_id=category_id, search=search,
         )
-        for r in rows
-    ]
+        return [PublicProduct(**_to_public(item, size)) for item in items]
+
+    return await cached_public_response(request, db, tenant_id, build)
 
 
 @router.get("/products/{product_id}", response_model=PublicProductDetail)
@@ -185,66 +167,34 @@ async def get_public_product(
     product_id: int,
     request: Request,
     store: Optional[str] = Query(None, description="Slug da loja"),
+    size: str = Query("large", pattern=_SIZE_PATTERN, description="Versão das imagens"),
     db: AsyncSession = Depends(get_db),
 ):
     """Detalhe de produto público. Não expõe custo nem quantidade."""
     tenant_id = await _resolve_tenant(db, request, store)
 
-    row = (await db.execute(text("""
-        SELECT
-            p.id, p.name,
-            COALESCE(
-                (SELECT MIN(pv.price) FROM product_variants pv
-                 WHERE pv.product_id = p.id AND pv.is_active = true),
-                p.base_price, 0
-            ) AS sale_price,
-            p.image_url, p.category_id, c.name,
-            COALESCE((
-                SELECT SUM(inv.quantity)
-                FROM inventory inv
-                JOIN product_variants pv ON pv.id = inv.variant_id
-                WHERE pv.product_id = p.id AND pv.is_active = true
-            ), 0) > 0 AS in_stock,
-            (SELECT COUNT(*) FROM product_variants pv
-             WHERE pv.product_id = p.id AND pv.is_active = true) AS variant_count,
-            ARRAY(
-                SELECT DISTINCT pv2.size FROM product_variants pv2
-                WHERE pv2.product_id = p.id AND pv2.is_active = true AND pv2.size IS NOT NULL
-                ORDER BY pv2.size
-            ) AS sizes,
-            ARRAY(
-                SELECT DISTINCT pv3.color FROM product_variants pv3
-                WHERE pv3.product_id = p.id AND pv3.is_active = true AND pv3.color IS NOT NULL
-                ORDER BY pv3.color
-            ) AS colors,
-            p.description, p.brand, p.gender, p.material
-        FROM products p
-        LEFT JOIN categories c ON c.id = p.category_id
-        WHERE p.id = :pid AND p.tenant_id = :tid AND p.is_active = true AND p.is_catalog = true
-    """), {"pid": product_id, "tid": tenant_id})).fetchone()
-
-    if not row:
-        raise HTTPException(status_code=404, detail="Produto não encontrado")
-
-    # Buscar galeria de mídia (compatível com SQLite e PostgreSQL)
-    media_rows = (await db.execute(text("""
-        SELECT url FROM product_media
-        WHERE product_id = :pid AND is_active = true
-        ORDER BY is_cover DESC, position ASC
-    """), {"pid": row[0]})).fetchall()
-    media_urls = [r[0] for r in media_rows]
-
-    return PublicProductDetail(
-        id=row[0], name=row[1], sale_price=float(row[2]),
-        image_url=row[3],
-        category=PublicCategory(id=row[4], name=row[5]) if row[4] and row[5] else None,
-        in_stock=bool(row[6]),
-        variant_count=int(row[7] or 0),
-        sizes=list(row[8] or []),
-        colors=list(row[9] or []),
-        description=row[10], brand=row[11], gender=row[12], material=row[13],
-        media=media_urls,
-    )
+    async def build():
+        item = await CatalogProjectionService(db).get_product(tenant_id, product_id)
+        if not item:
+            raise HTTPException(status_code=404, detail="Produto não encontrado")
+
+        # Buscar galeria de mídia (compatível com SQLite e PostgreSQL)
+        media_rows = (await db.execute(text("""
+            SELECT url FROM product_media
+            WHERE product_id = :pid AND is_active = true
+            ORDER BY is_cover DESC, position ASC
+        """), {"pid": item.product_id})).fetchall()
+        media_urls = [image_pipeline.sized_url(r[0], size) for r in media_rows]
+
+        return PublicProductDetail(
+            **_to_public(item, size),
+            colors=list(item.colors or []),
+            description=item.description, brand=item.brand,
+            gender=item.gender, material=item.material,
+            media=media_urls,
+        )
+
+    return await cached_public_response(request, db, tenant_id, build)
 
 
 # ── Categorias ────────────────────────────────────────────────────────────────
@@ -258,15 +208,17 @@ async def list_public_categories(
     """Categorias com pelo menos 1 produto ativo na loja."""
     tenant_id = await _resolve_tenant(db, request, store)
 
-    rows = (await db.execute(text("""
-        SELECT DISTINCT c.id, c.name
-        FROM categories c
-        JOIN products p ON p.category_id = c.id
-        WHERE p.tenant_id = :tid AND p.is_active = true AND p.is_catalog = true
-        ORDER BY c.name
-    """), {"tid": tenant_id})).fetchall()
+    async def build():
+        rows = (await db.execute(text("""
+            SELECT DISTINCT c.id, c.name
+            FROM categories c
+            JOIN products p ON p.category_id = c.id
+            WHERE p.tenant_id = :tid AND p.is_active = true AND p.is_catalog = true
+            ORDER BY c.name
+        """), {"tid": tenant_id})).fetchall()
+        return [PublicCategory(id=r[0], name=r[1]) for r in rows]
 
-    return [PublicCategory(id=r[0], name=r[1]) for r in rows]
+    return await cached_public_response(request, db, tenant_id, build)
 
 
 # ── Looks ─────────────────────────────────────────────────────────────────────
@@ -281,20 +233,22 @@ async def list_public_looks(
     """Looks públicos da loja (is_public=true apenas)."""
     tenant_id = await _resolve_tenant(db, request, store)
 
-    rows = (await db.execute(text("""
-        SELECT l.id, l.name, l.description,
-               COUNT(li.id) AS items_count,
-               COALESCE(SUM(li.unit_price), 0) AS total_price
-        FROM looks l
-        LEFT JOIN look_items li ON li.look_id = l.id
-        WHERE l.tenant_id = :tid AND l.is_public = true AND l.is_active = true
-        GROUP BY l.id, l.name, l.description
-        ORDER BY l.created_at DESC
-        LIMIT :limit
-    """), {"tid": tenant_id, "limit": limit})).fetchall()
-
-    return [
-        PublicLook(id=r[0], name=r[1], description=r[2],
-                   items_count=int(r[3] or 0), total_price=float(r[4] or 0))
-        for r in rows
-    ]
+    async def build():
+        rows = (await db.execute(text("""
+            SELECT l.id, l.name, l.description,
+                   COUNT(li.id) AS items_count,
+                   COALESCE(SUM(li.unit_price), 0) AS total_price
+            FROM looks l
+            LEFT JOIN look_items li ON li.look_id = l.id
+            WHERE l.tenant_id = :tid AND l.is_public = true AND l.is_active = true
+            GROUP BY l.id, l.name, l.description
+            ORDER BY l.created_at DESC
+            LIMIT :limit
+        """), {"tid": tenant_id, "limit": limit})).fetchall()
+        return [
+            PublicLook(id=r[0], name=r[1], description=r[2],
+                       items_count=int(r[3] or 0), total_price=float(r[4] or 0))
+            for r in rows
+        ]
+
+    return await cached_public_response(request, db, tenant_id, build)
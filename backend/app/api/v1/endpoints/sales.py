@@ -1,6 +1,8 @@
 """
 Endpoints de vendas - Criação, Listagem e Detalhes.
 """
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
@@ -14,6 +16,8 @@ from app.api.deps import get_current_active_user, require_role, get_current_tena
 from app.models.user import User, UserRole
 from app.services.audit_service import AuditService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/sales", tags=["Vendas"])
 
 
@@ -584,10 +588,7 @@ async def get_daily_report(
         }
         
     except Exception as e:
-        # Log do erro para debug
-        import traceback
-        print(f" Erro no relatório diário: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Erro no relatório diário")
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1123,9 +1124,7 @@ async def get_top_products(
         }
 
     except Exception as e:
-        import traceback
-        print(f" Erro ao buscar top products: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Erro ao buscar top products")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao buscar produtos mais vendidos: {str(e)}"
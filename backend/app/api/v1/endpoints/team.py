@@ -8,7 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from app.api.deps import get_current_user, require_role
 from app.models.user import User, UserRole
 from app.repositories.user_repository import UserRepository
@@ -137,7 +137,7 @@ async def create_team_member(
         "email": member_data.email,
         "full_name": member_data.full_name,
         "phone": member_data.phone,
-        "hashed_password": get_password_hash(member_data.password),
+        "hashed_password": await get_password_hash_async(member_data.password),
         "role": member_data.role,
         "is_active": True,
     }
@@ -270,7 +270,7 @@ async def reset_member_password(
         )
 
     # Atualizar senha
-    hashed = get_password_hash(password_data.new_password)
+    hashed = await get_password_hash_async(password_data.new_password)
     await repo.update_in_tenant(
         user_id,
         current_user.tenant_id,
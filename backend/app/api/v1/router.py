@@ -50,6 +50,7 @@ from app.api.v1.endpoints import (
     expenses,
     store,
     suppliers,
+    jobs,
 )
 from app.api.v1 import product_variants
 
@@ -216,3 +217,6 @@ api_router.include_router(mp_connect.router)
 
 # Etiquetas e Impressão (Elgin L42 Pro — ZPL via Ethernet/USB/Serial)
 api_router.include_router(label_printers.router)
+
+# Jobs em background (status/progresso de rebuilds, reconciliações...)
+api_router.include_router(jobs.router)
@@ -0,0 +1,114 @@
+"""
+Cache das respostas da IA no AI Scan, por worker.
+
+Chave: (tenant, sha256 da imagem enviada, prompt, provider/modelo). O prompt
+inclui as categorias e o contexto digitado, então mudar qualquer um deles
+gera outra chave. O valor é o JSON já parseado da IA — duplicados, SKU e
+preço continuam calculados a cada scan, com os dados atuais do banco.
+
+Hash exato (e não perceptual) de propósito: fotos quase iguais de peças
+da mesma caixa diferem justamente no tamanho/etiqueta, que um hash
+perceptual não enxerga.
+
+Coalescing: scans simultâneos com a mesma chave aguardam a mesma chamada
+ao provider (uma task; quem desistir não cancela os demais). Falhas não
+são cacheadas.
+"""
+import asyncio
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import register_cache_metrics
+
+ScanKey = Tuple[int, str, str, str]
+
+
+def scan_cache_key(tenant_id: int, image_bytes: bytes, prompt: str, provider: str) -> ScanKey:
+    return (
+        tenant_id,
+        hashlib.sha256(image_bytes).hexdigest(),
+        hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        provider,
+    )
+
+
+class AIScanResultCache:
+    """LRU com TTL das respostas parseadas, com coalescing de chamadas em andamento."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl_seconds = settings.AI_SCAN_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = settings.AI_SCAN_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self._entries: "OrderedDict[ScanKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[ScanKey, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: ScanKey) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            # Cópia: o enriquecimento altera o dict (warnings)
+            return copy.deepcopy(entry[1])
+
+    def set(self, key: ScanKey, value: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_compute(
+        self, key: ScanKey, compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Resposta cacheada, a chamada em andamento para a mesma chave, ou uma nova."""
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def _finish(self, key: ScanKey, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.set(key, task.result())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self.hits = self.misses = self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+ai_scan_cache = AIScanResultCache()
+register_cache_metrics(ai_scan_cache, "ai_scan")
@@ -0,0 +1,52 @@
+"""
+Laço dos workers em background que dormem até o próximo trabalho.
+
+Fila de impressão, dispatcher de SLA e fila de jobs seguem o mesmo ciclo:
+limpar o evento de wakeup, processar, e dormir até `delay` segundos ou até
+alguém chamar notify() (evento setado). O evento é limpo ANTES do passo:
+um notify() durante o processamento não se perde.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+
+async def run_wake_loop(
+    wakeup: asyncio.Event,
+    step: Callable[[], Awaitable[Optional[float]]],
+    *,
+    error_pause: float,
+    logger: logging.Logger,
+    name: str,
+    idle_exit: Optional[float] = None,
+) -> None:
+    """
+    Executa `step` em laço até ser cancelado.
+
+    `step` devolve quanto dormir: 0 = rodar de novo já; segundos = esperar
+    (ou notify); None = sem trabalho — com `idle_exit`, o laço termina se
+    ninguém chamar notify() nesse intervalo. Exceções do passo são logadas
+    e o laço pausa `error_pause` segundos.
+    """
+    while True:
+        wakeup.clear()
+        try:
+            delay = await step()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("%s falhou: %s", name, e, exc_info=True)
+            delay = error_pause
+
+        if delay == 0:
+            continue
+
+        timeout = idle_exit if delay is None else delay
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            # Sem await entre o teste e o return: notify() não se perde
+            if delay is None and idle_exit is not None and not wakeup.is_set():
+                return
@@ -31,6 +31,21 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 10
+    # Migrations rodam no deploy (scripts/db_init.py); o boot só confere a versão
+    # do schema. True volta a rodar "alembic upgrade head" a cada startup.
+    AUTO_MIGRATE_ON_STARTUP: bool = False
+
+    # Sequências (sequence_counters) — >1 pré-aloca blocos de códigos de barras
+    # por worker; valores não usados de um bloco viram lacunas (aceitável p/ EAN)
+    BARCODE_SEQUENCE_BLOCK_SIZE: int = 1
+
+    # Etiquetas renderizadas mantidas em memória por worker (LRU); 0 desativa
+    LABEL_RENDER_CACHE_SIZE: int = 2048
+
+    # Cache HTTP da vitrine (/public): Cache-Control e LRU de respostas por worker
+    PUBLIC_CACHE_MAX_AGE: int = 60
+    PUBLIC_CACHE_STALE_WHILE_REVALIDATE: int = 600
+    PUBLIC_CACHE_MAX_ENTRIES: int = 1000
     
     @field_validator("DATABASE_URL")
     @classmethod
@@ -45,6 +60,56 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Threads dedicadas ao bcrypt (limite de hashes simultâneos por worker)
+    PASSWORD_HASH_WORKERS: int = 2
+    # Audit log bufferizado: intervalo/tamanho do lote e limite da fila em memória
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_FLUSH_BATCH_SIZE: int = 200
+    AUDIT_MAX_BUFFER: int = 10000
+
+    # Retenção de logs (meses; 0 = manter tudo) e partições mensais no PostgreSQL.
+    # Opt-in: só remove meses com LOG_ARCHIVE_DIR absoluto em disco persistente
+    AUDIT_LOG_RETENTION_MONTHS: int = 0
+    NOTIFICATION_LOG_RETENTION_MONTHS: int = 0
+    LOG_PARTITION_MONTHS_AHEAD: int = 2
+    LOG_ARCHIVE_DIR: str = ""  # JSONL gzip dos meses removidos (vazio = não arquiva nem remove)
+
+    # Cache do usuário autenticado por worker (get_current_user); 0 desativa
+    AUTH_USER_CACHE_TTL_SECONDS: int = 30
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 5000
+
+    # Scheduler: só o worker líder roda os jobs ("database" = lease em scheduler_leases; "memory" = processo único/testes)
+    SCHEDULER_LOCK_BACKEND: str = "database"
+    SCHEDULER_LEASE_SECONDS: int = 30
+    SCHEDULER_JOB_LOCK_MAX_SECONDS: int = 3600
+
+    # Notificações de SLA dos condicionais (sla_dispatcher): sono máximo sem
+    # vencimento conhecido, claim abandonado após N segundos e tentativas de envio
+    SLA_DISPATCH_MAX_SLEEP_SECONDS: int = 60
+    SLA_CLAIM_TIMEOUT_SECONDS: int = 300
+    SLA_NOTIFICATION_MAX_ATTEMPTS: int = 3
+
+    # Fila de jobs em background ("database" = background_jobs + SKIP LOCKED; "celery" = broker Redis/Celery)
+    JOB_QUEUE_BACKEND: str = "database"
+    JOB_WORKER_CONCURRENCY: int = 2  # jobs simultâneos por worker uvicorn
+    JOB_POLL_SECONDS: int = 30  # sono máximo do worker sem job agendado
+    JOB_LOCK_TIMEOUT_SECONDS: int = 300  # heartbeat parado há mais que isso = worker morto
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_SECONDS: int = 10  # backoff exponencial entre tentativas
+
+    # Rebuild FIFO do inventário: faixa de product_id por transação (upsert em lote)
+    INVENTORY_REBUILD_CHUNK_SIZE: int = 5000
+
+    # Instrumentação por requisição (app/core/instrumentation.py): header
+    # Server-Timing e detector de N+1 (0 = desligado; N = statement repetido N+ vezes).
+    # Server-Timing expõe tempo de banco e hosts externos: só ligar em dev/benchmark
+    SERVER_TIMING_ENABLED: bool = False
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 0
+
+    # GET /metrics (formato Prometheus). Com token, exige "Authorization: Bearer <token>";
+    # em produção o endpoint não responde sem token configurado
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""
     
     # CORS
     # Mantido como str para evitar que pydantic-settings v2 tente parsear JSON
@@ -96,13 +161,15 @@ class Settings(BaseSettings):
     
     # Logging
     LOG_LEVEL: str = "INFO"
-    LOG_FORMAT: str = "json"
+    LOG_FORMAT: str = "json"  # json | text
+    LOG_DEBUG_SAMPLE_EVERY: int = 1  # emite 1 a cada N eventos DEBUG iguais (1 = todos)
     
     # Upload / Storage
     MAX_UPLOAD_SIZE: int = 10485760  # 10MB
     UPLOAD_DIR: str = "uploads"
     UPLOAD_URL: str = "/uploads"  # URL base para servir arquivos
     STORAGE_TYPE: str = "local"  # local, cloudinary
+    IMAGE_RENDITIONS_ENABLED: bool = True  # versões WebP thumb/medium/large (storage local)
 
     # Cloudinary (produção)
     CLOUDINARY_CLOUD_NAME: str = ""
@@ -113,6 +180,23 @@ class Settings(BaseSettings):
     AI_PROVIDER: str = "gemini"
     AI_SCAN_ENABLED: bool = True
     AI_DEFAULT_MARKUP: float = 100.0
+    # Índices de fingerprint (detecção de duplicados) mantidos em memória por worker
+    DUPLICATE_INDEX_MAX_TENANTS: int = 100
+    # AI Scan: lado maior (px) da imagem enviada ao provider; 0 envia o original
+    AI_SCAN_MAX_IMAGE_SIDE: int = 1536
+    # Cache das respostas da IA por hash da imagem (0 desativa) e das categorias do prompt
+    AI_SCAN_CACHE_TTL_SECONDS: int = 3600
+    AI_SCAN_CACHE_MAX_ENTRIES: int = 500
+    AI_CATEGORY_CACHE_TTL_SECONDS: int = 300
+    # Chamadas ao provider: threads dedicadas e limite por minuto (0 = sem limite)
+    AI_PROVIDER_THREADS: int = 8
+    AI_PROVIDER_RATE_PER_MINUTE: int = 60
+    AI_PROVIDER_BURST: int = 5
+    # Scan em lote: imagens simultâneas, limite por lote, tentativas e retenção do resultado
+    AI_BATCH_CONCURRENCY: int = 4
+    AI_BATCH_MAX_IMAGES: int = 50
+    AI_BATCH_MAX_ATTEMPTS: int = 3
+    AI_BATCH_RETENTION_SECONDS: int = 3600
 
     # Google Gemini
     GEMINI_API_KEY: str = ""
@@ -133,6 +217,9 @@ class Settings(BaseSettings):
     MP_TEST_PAYER_EMAIL: str = ""
     APP_URL: str = "https://localhost:8000"  # URL pública do backend (para webhooks)
 
+    # Bot do WhatsApp — loja atendida (slug); vazio = loja padrão
+    WHATSAPP_BOT_STORE_SLUG: str = ""
+
     # Stone Connect (via Pagar.me API v5)
     # Credenciais de parceiro do SaaS — sk_key de cada lojista fica em PDVTerminal.provider_config
     STONE_SERVICE_REFERER_NAME: str = ""  # Identificador do parceiro Stone (obter no Partner Hub)
@@ -2,6 +2,8 @@
 import time as _time
 from typing import Any, Optional
 
+from app.core.metrics import CACHE_ENTRIES, CACHE_REQUESTS
+
 _dashboard_cache: dict[str, tuple[float, Any]] = {}
 _CACHE_TTL = 60
 
@@ -9,7 +11,9 @@ _CACHE_TTL = 60
 def _cache_get(key: str) -> Optional[Any]:
     entry = _dashboard_cache.get(key)
     if entry and (_time.monotonic() - entry[0]) < _CACHE_TTL:
+        CACHE_REQUESTS.inc(cache="dashboard", result="hit")
         return entry[1]
+    CACHE_REQUESTS.inc(cache="dashboard", result="miss")
     return None
 
 
@@ -23,3 +27,6 @@ def invalidate_dashboard_cache(tenant_id: int) -> None:
     stale = [k for k in list(_dashboard_cache.keys()) if f":{tid}" in k or k == f"stats:{tid}"]
     for k in stale:
         _dashboard_cache.pop(k, None)
+
+
+CACHE_ENTRIES.set_function(lambda: len(_dashboard_cache), cache="dashboard")
@@ -8,8 +8,10 @@ Driver de produção: asyncpg com Python ssl.SSLContext.
 Driver de dev/testes: aiosqlite (SQLite).
 
 Alembic (migrations): usa psycopg2 síncrono — veja alembic/env.py.
-  Startup: alembic upgrade head é executado automaticamente (não-test).
-  Fallback: create_all garante tabelas novas ainda sem migration.
+  Deploy: scripts/db_init.py aplica as migrations uma vez, antes do servidor.
+  Startup: só confere alembic_version contra o head (app/core/schema_version.py);
+  AUTO_MIGRATE_ON_STARTUP=true volta a rodar alembic upgrade head no boot.
+  SQLite dev: create_all garante tabelas novas ainda sem migration.
 """
 
 import asyncio
@@ -19,7 +21,6 @@ import ssl
 from pathlib import Path
 from typing import AsyncGenerator
 
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     create_async_engine,
@@ -28,11 +29,13 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.pool import NullPool, StaticPool
 
 from app.core.config import settings
+from app.core.schema_version import check_schema_version
 from app.models.base import BaseModel
 
 # Importar todos os modelos para garantir que estejam no metadata do create_all
 import app.models.refresh_token  # noqa: F401 — estende Base diretamente
 import app.models.audit_log       # noqa: F401 — estende Base diretamente
+import app.models.catalog_projection  # noqa: F401 — estende Base diretamente
 
 logger = logging.getLogger(__name__)
 
@@ -121,6 +124,29 @@ async_session_maker = async_sessionmaker(
 )
 
 
+def resolve_session_factory(session_factory=None):
+    """
+    Factory de sessões dos workers em background: a explícita (testes) ou o
+    async_session_maker deste módulo, lido a cada chamada para respeitar o
+    override de testes (conftest troca database.async_session_maker).
+    """
+    return session_factory if session_factory is not None else async_session_maker
+
+
+# Hooks de sessão que mantêm o ledger de estoque (variant_stock) e a projeção
+# do catálogo público em dia — nesta ordem: a projeção lê o ledger
+from app.services.stock_ledger_service import install_stock_ledger_hooks  # noqa: E402
+from app.services.catalog_projection_service import install_catalog_projection_hooks  # noqa: E402
+
+install_stock_ledger_hooks()
+install_catalog_projection_hooks()
+
+# Hooks que revogam tokens e limpam o cache de usuários autenticados
+from app.core.user_cache import install_user_cache_hooks  # noqa: E402
+
+install_user_cache_hooks()
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency para obter sessão async do banco."""
     async with async_session_maker() as session:
@@ -160,27 +186,27 @@ def _run_alembic_upgrade() -> None:
 
 
 async def init_db() -> None:
-    """Aplica migrations e verifica conectividade com o banco.
+    """Verifica conectividade e a versão do schema do banco.
 
     Estratégia:
-      1. alembic upgrade head  — aplica migrations pendentes (não-test)
-      2. create_all (checkfirst) — cria tabelas de modelos novos sem migration
-      3. Falha com retry        — aguarda banco ficar disponível (PostgreSQL)
+      1. (opcional) alembic upgrade head — só com AUTO_MIGRATE_ON_STARTUP
+      2. PostgreSQL: alembic_version == head das migrations (aviso se não)
+         SQLite dev: create_all (checkfirst) cria tabelas de modelos novos
+      3. Falha com retry — aguarda banco ficar disponível (PostgreSQL)
     """
-    # ── Passo 1: executar migrations alembic (prod/postgres apenas) ──
-    # SQLite dev: create_all abaixo garante o schema sem precisar de alembic
-    if settings.ENVIRONMENT != "test" and not _is_sqlite:
+    # ── Passo 1: migrations no boot (desligado por padrão: rodam no deploy) ──
+    if settings.AUTO_MIGRATE_ON_STARTUP and settings.ENVIRONMENT != "test" and not _is_sqlite:
         try:
             await asyncio.wait_for(
                 asyncio.to_thread(_run_alembic_upgrade),
                 timeout=30,
             )
         except asyncio.TimeoutError:
-            logger.warning("Alembic upgrade head excedeu 30s — continuando com create_all")
+            logger.warning("Alembic upgrade head excedeu 30s — continuando")
         except Exception as exc:
-            logger.warning("Alembic upgrade head falhou: %s — continuando com create_all", exc)
+            logger.warning("Alembic upgrade head falhou: %s — continuando", exc)
 
-    # ── Passo 2: create_all como rede de segurança + verificar conectividade ──
+    # ── Passo 2: conectividade + schema ──
     max_retries = 5
     for attempt in range(1, max_retries + 1):
         try:
@@ -190,7 +216,13 @@ async def init_db() -> None:
                     await conn.run_sync(BaseModel.metadata.create_all)
                     await conn.commit()
                 else:
-                    await conn.execute(text("SELECT 1"))
+                    status = await check_schema_version(conn)
+                    if not status.up_to_date:
+                        logger.warning(
+                            "Schema desatualizado: banco em %s, código espera %s — "
+                            "rode 'python scripts/db_init.py' no deploy",
+                            sorted(status.current) or "(sem alembic_version)", sorted(status.expected),
+                        )
 
             logger.info("Database initialized successfully")
             return
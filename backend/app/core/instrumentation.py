@@ -0,0 +1,190 @@
+"""
+Instrumentação por requisição: SQL, chamadas externas e Server-Timing.
+
+Cada requisição (RequestInstrumentationMiddleware) abre um RequestMetrics
+num ContextVar; tudo que roda dentro dela acumula ali:
+
+  - SQL: eventos before/after_cursor_execute em Engine (todas as engines,
+    inclusive a de testes) contam statements e somam o tempo de banco;
+  - HTTP externo: httpx.AsyncClient.send é envolvido uma vez
+    (install_instrumentation) e soma tempo por host — provedores de
+    pagamento, Expo, Mercado Pago; track_external("ai:gemini") cobre o que
+    não passa pelo httpx (SDKs de IA em executor);
+  - N+1 (opt-in): com QUERY_N_PLUS_ONE_THRESHOLD > 0 (ou track_queries()
+    nos testes) o mesmo statement repetido N+ vezes é apontado.
+
+O middleware devolve o header Server-Timing e grava uma linha JSON por
+requisição. Fora de requisição (jobs, scripts) nada é contado.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestMetrics:
+    """Contadores de uma requisição (ou de um bloco track_queries)."""
+    n_plus_one_threshold: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    # {nome: [chamadas, segundos]}
+    external: Dict[str, List[float]] = field(default_factory=dict)
+    statements: Counter = field(default_factory=Counter)
+
+    def record_query(self, statement: str, seconds: float) -> None:
+        self.db_queries += 1
+        self.db_seconds += seconds
+        if self.n_plus_one_threshold > 0:
+            self.statements[statement] += 1
+
+    def record_external(self, name: str, seconds: float) -> None:
+        entry = self.external.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def repeated_statements(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Statements executados `threshold`+ vezes (candidatos a N+1), mais repetidos primeiro."""
+        limit = threshold or self.n_plus_one_threshold
+        if limit <= 0:
+            return []
+        return [(stmt, count) for stmt, count in self.statements.most_common() if count >= limit]
+
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Valor do header Server-Timing (durações em ms)."""
+        parts = [
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"',
+        ]
+        for name, (count, seconds) in sorted(self.external.items()):
+            metric = "ext-" + "".join(c if c.isalnum() or c in "-_" else "-" for c in name)
+            parts.append(f'{metric};dur={seconds * 1000:.1f};desc="{int(count)} calls"')
+        parts.append(f"total;dur={self.elapsed_seconds() * 1000:.1f}")
+        return ", ".join(parts)
+
+    def summary(self) -> dict:
+        """Campos para o log estruturado da requisição."""
+        data = {
+            "duration_ms": round(self.elapsed_seconds() * 1000, 1),
+            "db_queries": self.db_queries,
+            "db_ms": round(self.db_seconds * 1000, 1),
+        }
+        if self.external:
+            data["external"] = {
+                name: {"calls": int(count), "ms": round(seconds * 1000, 1)}
+                for name, (count, seconds) in sorted(self.external.items())
+            }
+        repeated = self.repeated_statements()
+        if repeated:
+            data["n_plus_one"] = [{"statement": stmt[:300], "count": count} for stmt, count in repeated]
+        return data
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def track_queries(n_plus_one_threshold: Optional[int] = None) -> Iterator[RequestMetrics]:
+    """
+    Abre um RequestMetrics para o bloco (middleware e testes).
+
+    Ex.: with track_queries(n_plus_one_threshold=3) as m: ...;
+         assert m.repeated_statements() == []
+    """
+    threshold = settings.QUERY_N_PLUS_ONE_THRESHOLD if n_plus_one_threshold is None else n_plus_one_threshold
+    metrics = RequestMetrics(n_plus_one_threshold=threshold)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@asynccontextmanager
+async def track_external(name: str):
+    """Soma o tempo do bloco como chamada externa `name` na requisição atual."""
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.record_external(name, time.perf_counter() - started)
+
+
+# ============================================================================
+# Hooks (SQLAlchemy + httpx)
+# ============================================================================
+
+_QUERY_START = "instrumentation_query_start"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault(_QUERY_START, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    starts = conn.info.get(_QUERY_START)
+    if metrics is None or not starts:
+        return
+    metrics.record_query(statement, time.perf_counter() - starts.pop())
+
+
+def _handle_error(exception_context):
+    # Statement com erro não chega ao after_cursor_execute: descarta o início
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_QUERY_START):
+        conn.info[_QUERY_START].pop()
+
+
+def _instrument_httpx() -> None:
+    try:
+        import httpx
+    except ImportError:
+        return
+    if getattr(httpx.AsyncClient.send, "_instrumented", False):
+        return
+    original_send = httpx.AsyncClient.send
+
+    async def send(self, request, *args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return await original_send(self, request, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await original_send(self, request, *args, **kwargs)
+        finally:
+            metrics.record_external(request.url.host or "http", time.perf_counter() - started)
+
+    send._instrumented = True
+    httpx.AsyncClient.send = send
+
+
+def install_instrumentation() -> None:
+    """Registra os hooks de SQL (todas as engines) e do httpx (idempotente)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+    _instrument_httpx()
@@ -0,0 +1,484 @@
+"""
+Fila de jobs em background para trabalho pesado ou adiável.
+
+O endpoint grava o job (enqueue) e responde na hora com o id; o progresso
+e o resultado são consultados em /jobs/{id}. A tabela background_jobs é a
+fonte de verdade em qualquer backend:
+
+  - tarefas são funções `async def tarefa(ctx: JobContext, **payload)`
+    registradas com @job_task("nome") (app/tasks/jobs.py) — o retorno
+    (dict) vira o resultado do job;
+  - dedup_key: enquanto houver job ativo (queued/running) com a mesma
+    chave, enqueue devolve o existente (índice único parcial no banco);
+  - priority: maior sai antes; run_at adia o início (retries com backoff);
+  - falha → volta para queued com backoff exponencial até max_attempts,
+    depois failed; ctx.progress() grava o percentual e serve de heartbeat;
+  - cancelamento: queued é cancelado na hora; running para no próximo
+    ctx.progress() (cooperativo).
+
+Backends (JOB_QUEUE_BACKEND):
+  - "database" (padrão, sem serviço extra): cada worker uvicorn roda um
+    JobQueue com até JOB_WORKER_CONCURRENCY jobs simultâneos; o claim é
+    um UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED), então
+    vários workers dividem a fila sem pegar o mesmo job. Jobs cujo
+    heartbeat parou há JOB_LOCK_TIMEOUT_SECONDS (worker morto) são
+    retomados.
+  - "celery": o enqueue publica só o id do job no broker
+    (CELERY_BROKER_URL ou Redis); o worker Celery (app/worker.py) faz o
+    mesmo claim e executa. O worker interno do uvicorn não sobe.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.background import run_wake_loop
+from app.core.config import settings
+from app.core.database import resolve_session_factory
+from app.core.metrics import Gauge
+from app.core.scheduler_lock import default_holder
+from app.models.background_job import ACTIVE_JOB_STATUSES, BackgroundJob, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Módulos com as tarefas registradas (importados no primeiro uso da fila)
+TASK_MODULES = ("app.tasks.jobs",)
+
+TaskFunc = Callable[..., Awaitable[Optional[dict]]]
+
+
+@dataclass(frozen=True)
+class JobTask:
+    name: str
+    func: TaskFunc
+    max_attempts: Optional[int] = None
+    timeout_seconds: Optional[float] = None
+
+
+_tasks: Dict[str, JobTask] = {}
+_modules_loaded = False
+
+
+def job_task(name: str, *, max_attempts: Optional[int] = None, timeout_seconds: Optional[float] = None):
+    """Registra a função como tarefa da fila com o nome dado."""
+    def decorator(func: TaskFunc) -> TaskFunc:
+        _tasks[name] = JobTask(name, func, max_attempts, timeout_seconds)
+        return func
+    return decorator
+
+
+def get_task(name: str) -> Optional[JobTask]:
+    global _modules_loaded
+    if not _modules_loaded:
+        for module in TASK_MODULES:
+            importlib.import_module(module)
+        _modules_loaded = True
+    return _tasks.get(name)
+
+
+class JobCancelled(Exception):
+    """O job foi cancelado (ou perdeu o lock) enquanto rodava."""
+
+
+class JobContext:
+    """Passado à tarefa: dados do job, sessões e reporte de progresso."""
+
+    def __init__(self, queue: "JobQueue", job: BackgroundJob):
+        self.queue = queue
+        self.job_id = job.id
+        self.tenant_id = job.tenant_id
+        self.user_id = job.user_id
+        self.attempt = job.attempts
+
+    def session(self) -> AsyncSession:
+        """Nova sessão (async with ctx.session() as db)."""
+        return self.queue._sessions()()
+
+    async def progress(self, percent: int, message: Optional[str] = None) -> None:
+        """Grava o progresso (0-100). Levanta JobCancelled se o job foi cancelado."""
+        async with self.session() as db:
+            result = await db.execute(
+                update(BackgroundJob)
+                .where(
+                    BackgroundJob.id == self.job_id,
+                    BackgroundJob.status == JobStatus.RUNNING,
+                    BackgroundJob.locked_by == self.queue.holder,
+                )
+                .values(
+                    progress=max(0, min(100, int(percent))),
+                    progress_message=message[:255] if message else None,
+                    locked_at=datetime.utcnow(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        if result.rowcount != 1:
+            raise JobCancelled(f"Job {self.job_id} cancelado")
+
+
+class JobQueue:
+    """Enqueue/consulta de jobs e worker do backend "database"."""
+
+    ERROR_PAUSE_SECONDS = 5
+    IDLE_PAUSE_SECONDS = 1
+
+    def __init__(self, session_factory=None, holder: Optional[str] = None, backend: Optional[str] = None):
+        """
+        Args:
+            session_factory: async_sessionmaker do worker (padrão:
+                app.core.database.async_session_maker, resolvido a cada uso
+                para respeitar overrides de teste)
+            holder: identificador gravado em locked_by
+            backend: "database" | "celery" (padrão: JOB_QUEUE_BACKEND)
+        """
+        self._session_factory = session_factory
+        self.holder = holder or default_holder()
+        self._backend = backend
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running: Dict[int, asyncio.Task] = {}
+
+    def _sessions(self):
+        return resolve_session_factory(self._session_factory)
+
+    @property
+    def backend(self) -> str:
+        return self._backend or settings.JOB_QUEUE_BACKEND
+
+    # ------------------------------------------------------------------
+    # API (endpoints/serviços)
+    # ------------------------------------------------------------------
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        task: str,
+        payload: Optional[dict] = None,
+        *,
+        tenant_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        priority: int = 0,
+        dedup_key: Optional[str] = None,
+        delay_seconds: float = 0,
+        max_attempts: Optional[int] = None,
+    ) -> BackgroundJob:
+        """
+        Grava o job, faz commit e despacha. Com dedup_key, se já existe um
+        job ativo com a chave, devolve esse job (sem criar outro).
+
+        Raises:
+            ValueError: tarefa não registrada
+        """
+        registered = get_task(task)
+        if registered is None:
+            raise ValueError(f"Tarefa de background desconhecida: {task}")
+
+        if dedup_key:
+            existing = await self._active_by_dedup(db, dedup_key)
+            if existing is not None:
+                return existing
+
+        job = BackgroundJob(
+            task=task,
+            payload=jsonable_encoder(payload or {}),
+            tenant_id=tenant_id,
+            user_id=user_id,
+            status=JobStatus.QUEUED,
+            priority=priority,
+            dedup_key=dedup_key,
+            run_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+            attempts=0,
+            max_attempts=max_attempts or registered.max_attempts or settings.JOB_MAX_ATTEMPTS,
+            progress=0,
+        )
+        try:
+            # Savepoint: a corrida no índice único não desfaz a transação do chamador
+            async with db.begin_nested():
+                db.add(job)
+        except IntegrityError:
+            existing = await self._active_by_dedup(db, dedup_key)
+            if existing is not None:
+                return existing
+            raise
+        await db.commit()
+        self._dispatch(job.id, priority=priority, countdown=delay_seconds)
+        logger.info(f"Job {job.id} ({task}) enfileirado (tenant {tenant_id})")
+        return job
+
+    async def _active_by_dedup(self, db: AsyncSession, dedup_key: str) -> Optional[BackgroundJob]:
+        result = await db.execute(
+            select(BackgroundJob).where(
+                BackgroundJob.dedup_key == dedup_key,
+                BackgroundJob.status.in_(ACTIVE_JOB_STATUSES),
+            )
+        )
+        return result.scalars().first()
+
+    async def get(self, db: AsyncSession, job_id: int, tenant_id: Optional[int]) -> Optional[BackgroundJob]:
+        result = await db.execute(
+            select(BackgroundJob).where(BackgroundJob.id == job_id, BackgroundJob.tenant_id == tenant_id)
+        )
+        return result.scalars().first()
+
+    async def list_jobs(
+        self, db: AsyncSession, tenant_id: Optional[int], status: Optional[str] = None, limit: int = 50
+    ) -> List[BackgroundJob]:
+        stmt = select(BackgroundJob).where(BackgroundJob.tenant_id == tenant_id)
+        if status:
+            stmt = stmt.where(BackgroundJob.status == status)
+        result = await db.execute(stmt.order_by(BackgroundJob.id.desc()).limit(limit))
+        return result.scalars().all()
+
+    async def cancel(self, db: AsyncSession, job_id: int, tenant_id: Optional[int]) -> Optional[BackgroundJob]:
+        """Cancela job ativo. Retorna o job (None se não existe no tenant)."""
+        job = await self.get(db, job_id, tenant_id)
+        if job is None:
+            return None
+        if job.status in ACTIVE_JOB_STATUSES:
+            job.status = JobStatus.CANCELLED
+            job.finished_at = datetime.utcnow()
+            await db.commit()
+        return job
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    async def claim(self, limit: int = 1, job_id: Optional[int] = None) -> List[int]:
+        """
+        Reivindica até `limit` jobs elegíveis (queued com run_at vencido, ou
+        running com heartbeat parado) num único UPDATE. No PostgreSQL o
+        SELECT interno usa FOR UPDATE SKIP LOCKED.
+        """
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+        claimable = or_(
+            and_(BackgroundJob.status == JobStatus.QUEUED, BackgroundJob.run_at <= now),
+            and_(BackgroundJob.status == JobStatus.RUNNING, BackgroundJob.locked_at < stale_before),
+        )
+        if job_id is not None:
+            claimable = and_(BackgroundJob.id == job_id, claimable)
+        candidates = (
+            select(BackgroundJob.id)
+            .where(claimable)
+            .order_by(BackgroundJob.priority.desc(), BackgroundJob.run_at, BackgroundJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        async with self._sessions()() as db:
+            result = await db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id.in_(candidates.scalar_subquery()), claimable)
+                .values(
+                    status=JobStatus.RUNNING,
+                    locked_by=self.holder,
+                    locked_at=now,
+                    started_at=now,
+                    attempts=BackgroundJob.attempts + 1,
+                )
+                .returning(BackgroundJob.id)
+                .execution_options(synchronize_session=False)
+            )
+            claimed = [row[0] for row in result.all()]
+            await db.commit()
+        return claimed
+
+    async def execute(self, job_id: int) -> str:
+        """Roda um job já reivindicado por este holder. Retorna o status final."""
+        async with self._sessions()() as db:
+            job = await db.get(BackgroundJob, job_id)
+        task = get_task(job.task)
+        if task is None:
+            return await self._finish(job_id, JobStatus.FAILED, error=f"Tarefa desconhecida: {job.task}")
+        if job.attempts > job.max_attempts:
+            # Retomado após worker morto além do limite de tentativas
+            return await self._finish(job_id, JobStatus.FAILED, error=job.error or "Tentativas esgotadas")
+
+        ctx = JobContext(self, job)
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await asyncio.wait_for(
+                task.func(ctx, **(job.payload or {})), timeout=task.timeout_seconds
+            )
+            return await self._finish(
+                job_id, JobStatus.SUCCEEDED, result=jsonable_encoder(result) if result is not None else None
+            )
+        except JobCancelled:
+            return JobStatus.CANCELLED
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            if job.attempts < job.max_attempts:
+                delay = settings.JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+                logger.warning(f"Job {job_id} ({job.task}) falhou, nova tentativa em {delay}s: {error}")
+                status = await self._finish(job_id, JobStatus.QUEUED, error=error, retry_in=delay)
+                if status == JobStatus.QUEUED:
+                    self._dispatch(job_id, priority=job.priority, countdown=delay)
+                return status
+            logger.error(f"Job {job_id} ({job.task}) falhou: {error}", exc_info=True)
+            return await self._finish(job_id, JobStatus.FAILED, error=error)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async def _finish(
+        self,
+        job_id: int,
+        status: str,
+        *,
+        result: Optional[Any] = None,
+        error: Optional[str] = None,
+        retry_in: Optional[float] = None,
+    ) -> str:
+        """Grava o desfecho se o job ainda é deste holder (cancelado continua cancelado)."""
+        now = datetime.utcnow()
+        values: Dict[str, Any] = {"status": status, "error": error, "locked_by": None, "locked_at": None}
+        if status == JobStatus.QUEUED:
+            values["run_at"] = now + timedelta(seconds=retry_in or 0)
+        else:
+            values["finished_at"] = now
+        if status == JobStatus.SUCCEEDED:
+            values.update(result=result, progress=100)
+        async with self._sessions()() as db:
+            updated = await db.execute(
+                update(BackgroundJob)
+                .where(
+                    BackgroundJob.id == job_id,
+                    BackgroundJob.status == JobStatus.RUNNING,
+                    BackgroundJob.locked_by == self.holder,
+                )
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        if updated.rowcount != 1:
+            async with self._sessions()() as db:
+                job = await db.get(BackgroundJob, job_id)
+                return job.status if job else JobStatus.CANCELLED
+        return status
+
+    async def _heartbeat(self, job_id: int) -> None:
+        interval = settings.JOB_LOCK_TIMEOUT_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self._sessions()() as db:
+                    await db.execute(
+                        update(BackgroundJob)
+                        .where(BackgroundJob.id == job_id, BackgroundJob.locked_by == self.holder)
+                        .values(locked_at=datetime.utcnow())
+                        .execution_options(synchronize_session=False)
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Job {job_id}: falha no heartbeat: {e}")
+
+    async def run_job(self, job_id: int) -> Optional[str]:
+        """Reivindica e executa um job específico (worker Celery). None se outro pegou."""
+        if not await self.claim(job_id=job_id):
+            return None
+        return await self.execute(job_id)
+
+    async def run_pending(self, max_jobs: int = 100) -> int:
+        """Executa em sequência os jobs elegíveis (testes / execução manual)."""
+        done = 0
+        while done < max_jobs:
+            claimed = await self.claim()
+            if not claimed:
+                break
+            await self.execute(claimed[0])
+            done += 1
+        return done
+
+    async def next_run_at(self) -> Optional[datetime]:
+        async with self._sessions()() as db:
+            result = await db.execute(
+                select(func.min(BackgroundJob.run_at)).where(BackgroundJob.status == JobStatus.QUEUED)
+            )
+            return result.scalar()
+
+    # ------------------------------------------------------------------
+    # Despacho e worker (backend "database")
+    # ------------------------------------------------------------------
+
+    def _dispatch(self, job_id: int, *, priority: int = 0, countdown: float = 0) -> None:
+        if self.backend == "celery":
+            from app.worker import celery_app
+            celery_app.send_task(
+                "jobs.run", args=[job_id], countdown=countdown or None,
+                priority=max(0, min(9, priority)),
+            )
+        else:
+            self.notify()
+
+    def notify(self) -> None:
+        """Acorda o worker deste processo (job novo ou vaga liberada)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Sobe o worker no backend "database" (no Celery quem executa é app/worker.py)."""
+        if self.backend != "database":
+            return
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="job-queue-worker")
+
+    async def shutdown(self) -> None:
+        """Para o worker e os jobs em andamento (voltam à fila pelo timeout do heartbeat)."""
+        tasks = [t for t in (self._task, *self._running.values()) if t is not None]
+        self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._running.clear()
+
+    def _spawn(self, job_id: int) -> None:
+        task = asyncio.create_task(self.execute(job_id), name=f"job-{job_id}")
+        self._running[job_id] = task
+
+        def _done(_):
+            self._running.pop(job_id, None)
+            self.notify()
+
+        task.add_done_callback(_done)
+
+    async def _sleep_seconds(self, claimed_any: bool) -> float:
+        max_sleep = settings.JOB_POLL_SECONDS
+        if len(self._running) >= settings.JOB_WORKER_CONCURRENCY:
+            return max_sleep  # acorda quando um job termina
+        next_run = await self.next_run_at()
+        if next_run is None:
+            return max_sleep
+        delay = min(max((next_run - datetime.utcnow()).total_seconds(), 0.0), max_sleep)
+        if delay == 0 and not claimed_any:
+            # Elegível mas nada reivindicado: está com outro worker
+            return self.IDLE_PAUSE_SECONDS
+        return delay
+
+    async def _step(self) -> float:
+        free = settings.JOB_WORKER_CONCURRENCY - len(self._running)
+        claimed = await self.claim(limit=free) if free > 0 else []
+        for job_id in claimed:
+            self._spawn(job_id)
+        return await self._sleep_seconds(bool(claimed))
+
+    async def _run(self) -> None:
+        await run_wake_loop(
+            self._wakeup, self._step, error_pause=self.ERROR_PAUSE_SECONDS,
+            logger=logger, name="Job queue worker",
+        )
+
+
+job_queue = JobQueue()
+
+JOBS_RUNNING = Gauge("background_jobs_running", "Jobs da fila em execução neste worker")
+JOBS_RUNNING.set_function(lambda: len(job_queue._running))
@@ -0,0 +1,209 @@
+"""
+Logging estruturado e não bloqueante.
+
+configure_logging() troca o handler síncrono do root por um QueueHandler:
+quem loga (request, job) só enfileira o record; formatação e escrita no
+stderr acontecem na thread do QueueListener. Cada record ganha:
+
+  - request_id e tenant_id dos ContextVars (RequestInstrumentationMiddleware,
+    TenantMiddleware e get_current_tenant_id fazem o bind por requisição);
+  - campos de `extra=` como chaves próprias no JSON (LOG_FORMAT=json) ou
+    `chave=valor` no formato texto;
+  - amostragem de DEBUG: com LOG_DEBUG_SAMPLE_EVERY=N só 1 a cada N eventos
+    DEBUG de uma mesma mensagem (logger + template) é emitido.
+
+Uso nos services:
+    logger.debug("FIFO processado", extra={"product_id": pid, "sources": 2})
+"""
+from __future__ import annotations
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, Optional, Tuple
+
+from app.core.config import settings
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("log_request_id", default=None)
+tenant_id_var: ContextVar[Optional[int]] = ContextVar("log_tenant_id", default=None)
+
+# Atributos próprios do LogRecord: o resto veio de extra= e vai para a saída
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "taskName", "request_id", "tenant_id",
+}
+
+
+@contextmanager
+def log_context(*, request_id: Optional[str] = None, tenant_id: Optional[int] = None) -> Iterator[None]:
+    """Associa request_id/tenant_id aos logs emitidos dentro do bloco."""
+    tokens = [request_id_var.set(request_id)]
+    if tenant_id is not None:
+        tokens.append(tenant_id_var.set(tenant_id))
+    try:
+        yield
+    finally:
+        for token in reversed(tokens):
+            token.var.reset(token)
+
+
+def bind_tenant(tenant_id: Optional[int]) -> None:
+    """Define o tenant dos logs no contexto atual (a task da requisição)."""
+    if tenant_id is not None:
+        tenant_id_var.set(int(tenant_id))
+
+
+def extra_fields(record: logging.LogRecord) -> Dict[str, object]:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class ContextFilter(logging.Filter):
+    """Copia request_id/tenant_id do contexto para o record (extra= explícito prevalece)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        if getattr(record, "tenant_id", None) is None:
+            record.tenant_id = tenant_id_var.get()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Deixa passar 1 a cada `every` records DEBUG por (logger, template da mensagem)."""
+
+    def __init__(self, every: int = 1):
+        super().__init__()
+        self.every = max(1, int(every))
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or record.levelno > logging.DEBUG:
+            return True
+        key = (record.name, str(record.msg))
+        with self._lock:
+            seen = self._counts.get(key, 0)
+            self._counts[key] = seen + 1
+        return seen % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("request_id", "tenant_id"):
+            value = getattr(record, key, None)
+            if value is not None:
+                payload[key] = value
+        payload.update(extra_fields(record))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legível (desenvolvimento): linha clássica + contexto e extras como chave=valor."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = {"request_id": getattr(record, "request_id", None), "tenant_id": getattr(record, "tenant_id", None)}
+        fields.update(extra_fields(record))
+        suffix = " ".join(f"{key}={value}" for key, value in fields.items() if value is not None)
+        if not suffix:
+            return line
+        head, sep, tail = line.partition("\n")
+        return f"{head} [{suffix}]{sep}{tail}"
+
+
+class _ContextQueueHandler(QueueHandler):
+    """
+    QueueHandler que preserva extras e traceback para o formatter da thread.
+
+    O prepare() padrão formata o record na thread de quem loga (justamente o
+    custo que a fila evita) e achata o traceback na mensagem.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[_ContextQueueHandler] = None
+_lock = threading.Lock()
+
+
+def configure_logging(
+    *,
+    level: Optional[str] = None,
+    fmt: Optional[str] = None,
+    stream=None,
+) -> QueueListener:
+    """
+    Instala (ou reinstala) o pipeline: root -> QueueHandler -> listener -> stream.
+
+    Idempotente: chamar de novo troca o handler anterior sem duplicar saída.
+    """
+    global _listener, _queue_handler
+    with _lock:
+        _stop_locked()
+
+        formatter = JsonFormatter() if (fmt or settings.LOG_FORMAT) == "json" else TextFormatter()
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(formatter)
+
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_handler = _ContextQueueHandler(records)
+        _queue_handler.addFilter(ContextFilter())
+        _queue_handler.addFilter(DebugSampler(settings.LOG_DEBUG_SAMPLE_EVERY))
+
+        root = logging.getLogger()
+        root.addHandler(_queue_handler)
+        root.setLevel(getattr(logging, (level or settings.LOG_LEVEL).upper()))
+
+        _listener = QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+
+def _stop_locked() -> None:
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        # stop() drena a fila antes de encerrar a thread
+        _listener.stop()
+        _listener = None
+
+
+def shutdown_logging() -> None:
+    """Descarrega os records pendentes e para a thread do listener."""
+    with _lock:
+        _stop_locked()
+
+
+atexit.register(shutdown_logging)
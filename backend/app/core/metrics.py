@@ -0,0 +1,248 @@
+"""
+Métricas no formato de exposição do Prometheus (texto 0.0.4), sem dependências.
+
+Cada módulo declara as próprias métricas no import e as atualiza no caminho
+quente; GET /metrics (app/main.py) chama render(). Tudo fica em memória,
+por worker — o Prometheus agrega os workers pelo label de instância.
+
+    SALES = Counter("sales_created_total", "Vendas criadas", ["outcome"])
+    SALES.inc(outcome="success")
+
+    LATENCY = Histogram("fifo_process_sale_duration_seconds", "...", ["outcome"])
+    @timed(LATENCY)
+    async def process_sale(...): ...
+
+    CACHE_ENTRIES.set_function(lambda: len(cache), cache="dashboard")
+
+Contadores e histogramas são atualizados só pelo event loop (sem lock):
+chamadas vindas de threads podem, no pior caso, perder uma amostra.
+"""
+from __future__ import annotations
+
+import functools
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Starlette acrescenta "; charset=utf-8" em respostas text/*
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+LabelKey = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+
+    def register(self, metric: "_Metric") -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica já registrada: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional["_Metric"]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render() -> str:
+    """Texto de exposição de todas as métricas registradas."""
+    return REGISTRY.render()
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[Registry] = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: Dict[str, object]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: labels esperados {self.labelnames}, recebidos {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _labels(self, key: LabelKey) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class _ValueMetric(_Metric):
+    """Um valor por combinação de labels, atualizado no código ou lido no render."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+        self._functions: Dict[LabelKey, Callable[[], float]] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def set_function(self, func: Callable[[], float], **labels) -> None:
+        """Valor calculado a cada render (tamanho de cache, contador já existente...)."""
+        self._functions[self._key(labels)] = func
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return float(self._functions[key]())
+        return self._values.get(key, 0)
+
+    def samples(self) -> Iterable[Sample]:
+        values = dict(self._values)
+        for key, func in self._functions.items():
+            try:
+                values[key] = float(func())
+            except Exception:
+                # Coletor quebrado não derruba o /metrics inteiro
+                values[key] = math.nan
+        for key, value in sorted(values.items()):
+            yield self.name, self._labels(key), value
+
+
+class Counter(_ValueMetric):
+    type_name = "counter"
+
+
+class Gauge(_ValueMetric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 registry: Optional[Registry] = REGISTRY):
+        if "le" in labelnames:
+            raise ValueError("'le' é reservado em histogramas")
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # {labels: [contagem por bucket (não cumulativa)..., +Inf, soma]}
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [0] * (len(self.buckets) + 2)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        state[index] += 1
+        state[-1] += value
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return int(sum(state[:-1])) if state else 0
+
+    def sum(self, **labels) -> float:
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0.0
+
+    def samples(self) -> Iterable[Sample]:
+        for key, state in sorted(self._values.items()):
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, state[-1]
+
+
+def timed(histogram: Histogram, **labels):
+    """
+    Decorator de coroutine: observa a duração com outcome=success|error.
+
+    O histograma precisa ter o label "outcome" além dos passados aqui.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "success"
+                return result
+            finally:
+                histogram.observe(time.perf_counter() - started, outcome=outcome, **labels)
+        return wrapper
+    return decorator
+
+
+# ============================================================================
+# Métricas compartilhadas entre módulos
+# ============================================================================
+
+CACHE_ENTRIES = Gauge("cache_entries", "Entradas em caches em memória deste worker", ["cache"])
+CACHE_REQUESTS = Counter("cache_requests_total", "Consultas a caches em memória", ["cache", "result"])
+
+
+def register_cache_metrics(cache, name: str) -> None:
+    """Expõe len(cache) e os contadores hits/misses que o cache já mantém."""
+    CACHE_ENTRIES.set_function(lambda: len(cache), cache=name)
+    CACHE_REQUESTS.set_function(lambda: cache.hits, cache=name, result="hit")
+    CACHE_REQUESTS.set_function(lambda: cache.misses, cache=name, result="miss")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(float(value))
+    return repr(float(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
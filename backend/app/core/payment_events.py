@@ -6,6 +6,8 @@ Funciona em processo único (uvicorn single-worker).
 import asyncio
 from typing import Optional
 
+from app.core.metrics import Gauge
+
 # {payment_id: asyncio.Event}
 _events: dict[str, asyncio.Event] = {}
 # {payment_id: dict}  — resultado final a enviar ao cliente SSE
@@ -39,3 +41,13 @@ def cleanup(payment_id: str) -> None:
     """Remove da memória após o cliente SSE fechar a conexão."""
     _events.pop(payment_id, None)
     _results.pop(payment_id, None)
+
+
+PAYMENT_SSE_WAITERS = Gauge(
+    "payment_sse_waiters", "Conexões SSE aguardando status de pagamento neste worker"
+)
+PAYMENT_SSE_WAITERS.set_function(lambda: len(_events))
+PAYMENT_PENDING_RESULTS = Gauge(
+    "payment_sse_pending_results", "Resultados de pagamento sinalizados e ainda não entregues"
+)
+PAYMENT_PENDING_RESULTS.set_function(lambda: len(_results))
@@ -0,0 +1,170 @@
+"""
+Cache HTTP da vitrine pública (/public).
+
+Cada resposta leva:
+  - ETag forte "{tenant}-{versão}-{hash da URL}", onde versão é o contador
+    (tenant, "catalog_version") incrementado no commit de qualquer mudança
+    de produto, variante, estoque, categoria, mídia ou look
+    (ver catalog_projection_service);
+  - Last-Modified = momento do último incremento;
+  - Cache-Control: public, max-age, stale-while-revalidate — o CDN/navegador
+    serve a cópia e revalida em background.
+
+If-None-Match / If-Modified-Since válidos respondem 304 sem montar o corpo
+(uma consulta indexada em sequence_counters). Os corpos JSON ficam num LRU
+por worker indexado pela versão: mudar a versão invalida tudo do tenant, em
+todos os workers, sem comunicação entre eles.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import register_cache_metrics
+
+CacheKey = Tuple[int, int, str]
+
+
+class PublicResponseCache:
+    """LRU de corpos JSON por (tenant, versão, URL) — thread-safe."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = settings.PUBLIC_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self._entries: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def set(self, key: CacheKey, body: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        tenant_id, version, _ = key
+        with self._lock:
+            if version > self._versions.get(tenant_id, -1):
+                # Versão nova do tenant: as entradas antigas nunca mais serão lidas
+                self._versions[tenant_id] = version
+                for stale in [k for k in self._entries if k[0] == tenant_id and k[1] < version]:
+                    del self._entries[stale]
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, tenant_id: Optional[int] = None) -> None:
+        with self._lock:
+            if tenant_id is None:
+                self._entries.clear()
+                self._versions.clear()
+                return
+            for key in [k for k in self._entries if k[0] == tenant_id]:
+                del self._entries[key]
+            self._versions.pop(tenant_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+public_response_cache = PublicResponseCache()
+register_cache_metrics(public_response_cache, "public_catalog")
+
+
+def _url_hash(request: Request) -> str:
+    """Hash do path + query ordenada (?b=1&a=2 e ?a=2&b=1 são a mesma URL)."""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return hashlib.sha1(f"{request.url.path}?{query}".encode()).hexdigest()[:16]
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Datetime do banco (naive = UTC) para aware UTC sem microssegundos."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Quando presente, If-None-Match tem precedência (RFC 9110 §13.2.2)
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+    return False
+
+
+async def cached_public_response(
+    request: Request,
+    db: AsyncSession,
+    tenant_id: int,
+    build: Callable[[], Awaitable[Any]],
+    cache: Optional[PublicResponseCache] = None,
+) -> Response:
+    """
+    Responde um endpoint público com validação condicional e cache.
+
+    Args:
+        request: requisição (headers condicionais e URL)
+        db: sessão para ler a versão do catálogo
+        tenant_id: tenant já resolvido
+        build: coroutine que monta o payload (só chamada em cache miss);
+            exceções (ex: 404) propagam e nada é cacheado
+        cache: LRU a usar (padrão: public_response_cache)
+    """
+    from app.services.catalog_projection_service import CatalogProjectionService
+
+    cache = public_response_cache if cache is None else cache
+    version, updated_at = await CatalogProjectionService(db).get_version(tenant_id)
+    url_hash = _url_hash(request)
+    etag = f'"{tenant_id}-{version}-{url_hash}"'
+    last_modified = _as_utc(updated_at) if updated_at else None
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={settings.PUBLIC_CACHE_MAX_AGE}, "
+            f"stale-while-revalidate={settings.PUBLIC_CACHE_STALE_WHILE_REVALIDATE}"
+        ),
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    key = (tenant_id, version, url_hash)
+    body = cache.get(key)
+    if body is None:
+        payload = await build()
+        body = json.dumps(
+            jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        cache.set(key, body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,67 @@
+"""
+Limite de taxa assíncrono (token bucket) para APIs externas, por worker.
+
+Usado nas chamadas aos providers de IA: AI_PROVIDER_RATE_PER_MINUTE
+chamadas por minuto por provider, com rajada de até AI_PROVIDER_BURST.
+Quem excede espera (asyncio.sleep) em vez de receber 429 do provider.
+"""
+import asyncio
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+
+class AsyncRateLimiter:
+    """Token bucket: `rate_per_minute` fichas/minuto, no máximo `burst` acumuladas."""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_second > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Consome uma ficha, esperando se preciso. Retorna o tempo esperado (s)."""
+        if not self.enabled:
+            return 0.0
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        waited = 0.0
+        # Lock: a fila de espera é FIFO e cada um calcula a espera com o saldo atualizado
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate_per_second
+                await asyncio.sleep(delay)
+                waited = delay
+                self._refill()
+            self._tokens -= 1
+        return waited
+
+
+_provider_limiters: Dict[str, AsyncRateLimiter] = {}
+
+
+def provider_limiter(provider: str) -> AsyncRateLimiter:
+    """Limiter compartilhado do provider (criado no primeiro uso)."""
+    limiter = _provider_limiters.get(provider)
+    if limiter is None:
+        limiter = AsyncRateLimiter(settings.AI_PROVIDER_RATE_PER_MINUTE, settings.AI_PROVIDER_BURST)
+        _provider_limiters[provider] = limiter
+    return limiter
+
+
+def reset_provider_limiters() -> None:
+    """Descarta os limiters (testes / mudança de configuração)."""
+    _provider_limiters.clear()
@@ -1,16 +1,37 @@
 """
 Background scheduler para tarefas periódicas.
 Usa APScheduler para rodar jobs assíncronos em background.
+
+Todo worker uvicorn inicia o scheduler, mas os jobs só rodam no líder
+(app/core/scheduler_lock.py); nos demais, cada disparo é contado como
+"skipped". Proteção contra sobreposição:
+  - max_instances=1 + coalesce: no mesmo worker, um disparo não começa
+    enquanto o anterior roda, e disparos atrasados viram um só;
+  - lease "job:<id>" durante a execução: na troca de líder, o novo não
+    roda um job que o anterior ainda está executando.
+
+Métricas por job (execuções, falhas, skips, duração, último resultado) em
+job_stats / scheduler_status().
 """
 import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import async_session_maker
+from app.core.metrics import Counter, Gauge, Histogram
+from app.core.scheduler_lock import LeaderElector, LeaseBackend, create_lease_backend
 from app.services.conditional_notification_service import ConditionalNotificationService
 from app.tasks.wishlist_notifier import run_wishlist_notifier
 from app.services.pdv_service import PDVService
+from app.services.catalog_projection_service import CatalogProjectionService
+from app.services.log_retention_service import run_log_retention
+from app.services.stock_ledger_service import StockLedgerService
 
 logger = logging.getLogger(__name__)
 
@@ -18,32 +39,15 @@ logger = logging.getLogger(__name__)
 scheduler = AsyncIOScheduler()
 
 
-async def check_sla_notifications_job():
-    """
-    Job: Verifica SLAs e envia notificações de departure/return.
-    Roda a cada 1 minuto.
-    """
-    try:
-        async with async_session_maker() as db:
-            service = ConditionalNotificationService()
-            result = await service.check_and_send_sla_notifications(db)
-            logger.info(f"SLA check completed: {result}")
-    except Exception as e:
-        logger.error(f"Error in SLA check job: {e}", exc_info=True)
-
-
 async def send_pending_reminder_job():
     """
     Job: Envia lembrete de envios pendentes.
     Roda a cada 2 horas.
     """
-    try:
-        async with async_session_maker() as db:
-            service = ConditionalNotificationService()
-            result = await service.send_pending_shipments_reminder(db)
-            logger.info(f"Pending reminder sent: {result}")
-    except Exception as e:
-        logger.error(f"Error in pending reminder job: {e}", exc_info=True)
+    async with async_session_maker() as db:
+        service = ConditionalNotificationService()
+        result = await service.send_pending_shipments_reminder(db)
+        logger.info(f"Pending reminder sent: {result}")
 
 
 async def send_overdue_alert_job():
@@ -51,13 +55,10 @@ async def send_overdue_alert_job():
     Job: Envia alerta de envios atrasados (SENT/PARTIAL_RETURN com deadline vencido).
     Roda a cada 4 horas.
     """
-    try:
-        async with async_session_maker() as db:
-            service = ConditionalNotificationService()
-            result = await service.send_overdue_shipments_alert(db)
-            logger.info(f"Overdue alert sent: {result}")
-    except Exception as e:
-        logger.error(f"Error in overdue alert job: {e}", exc_info=True)
+    async with async_session_maker() as db:
+        service = ConditionalNotificationService()
+        result = await service.send_overdue_shipments_alert(db)
+        logger.info(f"Overdue alert sent: {result}")
 
 
 async def auto_cancel_stale_terminal_sales_job():
@@ -65,14 +66,11 @@ async def auto_cancel_stale_terminal_sales_job():
     Job: Auto-cancela vendas PENDING de terminal (maquininha) com mais de 30 minutos.
     Roda a cada 5 minutos.
     """
-    try:
-        async with async_session_maker() as db:
-            service = PDVService()
-            count = await service.auto_cancel_stale_pending_sales(db, timeout_minutes=30)
-            if count:
-                logger.info(f"Auto-cancel terminal job: {count} vendas canceladas")
-    except Exception as e:
-        logger.error(f"Error in auto-cancel terminal job: {e}", exc_info=True)
+    async with async_session_maker() as db:
+        service = PDVService()
+        count = await service.auto_cancel_stale_pending_sales(db, timeout_minutes=30)
+        if count:
+            logger.info(f"Auto-cancel terminal job: {count} vendas canceladas")
 
 
 async def expire_pix_transactions_job():
@@ -80,14 +78,48 @@ async def expire_pix_transactions_job():
     Job: Expira transações PIX pendentes cujo QR Code já venceu.
     Roda a cada 5 minutos.
     """
-    try:
-        async with async_session_maker() as db:
-            service = PDVService()
-            count = await service.expire_pending_pix(db)
-            if count:
-                logger.info(f"PIX expiration job: {count} transações expiradas")
-    except Exception as e:
-        logger.error(f"Error in PIX expiration job: {e}", exc_info=True)
+    async with async_session_maker() as db:
+        service = PDVService()
+        count = await service.expire_pending_pix(db)
+        if count:
+            logger.info(f"PIX expiration job: {count} transações expiradas")
+
+
+async def reconcile_catalog_projection_job():
+    """
+    Job: Reconstrói a projeção do catálogo público (public_catalog_items).
+    Rede de segurança para escritas fora do ORM. Roda a cada 24 horas.
+    """
+    async with async_session_maker() as db:
+        published = await CatalogProjectionService(db).rebuild_all()
+        await db.commit()
+        logger.info(f"Catalog projection reconciled: {published} produtos publicados")
+
+
+async def log_retention_job():
+    """
+    Job: Cria as partições mensais futuras de audit_logs/notification_logs
+    e arquiva (JSONL gzip) e remove os meses além da retenção.
+    Roda a cada 24 horas.
+    """
+    async with async_session_maker() as db:
+        summary = await run_log_retention(db)
+        logger.info(f"Log retention: {summary}")
+
+
+async def check_stock_ledger_job():
+    """
+    Job: Confere o ledger de estoque por variante (variant_stock) contra os
+    lotes FIFO e reconta as divergentes. Rede de segurança para escritas
+    fora do ORM. Roda a cada 24 horas.
+    """
+    async with async_session_maker() as db:
+        result = await StockLedgerService(db).check_consistency(repair=True)
+        await db.commit()
+        logger.info(
+            f"Stock ledger checked: {result['variants_checked']} variantes, "
+            f"{result['repaired']} recontadas"
+        )
 
 
 async def send_missed_departure_alert_job():
@@ -95,90 +127,172 @@ async def send_missed_departure_alert_job():
     Job: Envia alerta de envios PENDENTES que perderam o SLA de envio.
     Roda a cada 30 minutos.
     """
+    async with async_session_maker() as db:
+        service = ConditionalNotificationService()
+        result = await service.send_missed_departure_alert(db)
+        logger.info(f"Missed departure alert sent: {result}")
+
+
+class ScheduledJob(NamedTuple):
+    id: str
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    interval: timedelta
+
+
+# Notificações de SLA (antes da saída/retorno) não são job periódico: o
+# sla_dispatcher (app/services/sla_dispatcher.py) dispara no horário exato.
+JOBS = [
+    # Job 1: Lembrete de pendentes a cada 2 horas
+    ScheduledJob("send_pending_reminder", "Enviar lembrete de envios pendentes",
+                 send_pending_reminder_job, timedelta(hours=2)),
+    # Job 2: Alerta de atrasados (SENT/PARTIAL) a cada 4 horas
+    ScheduledJob("send_overdue_alert", "Enviar alerta de envios atrasados",
+                 send_overdue_alert_job, timedelta(hours=4)),
+    # Job 3: Alerta de PENDENTES que perderam SLA a cada 30 minutos
+    ScheduledJob("send_missed_departure_alert", "Enviar alerta de envios pendentes que perderam SLA",
+                 send_missed_departure_alert_job, timedelta(minutes=30)),
+    # Job 4: Notificar wishlist quando produto volta ao estoque (1h)
+    ScheduledJob("wishlist_notifier", "Notificar clientes: produto voltou ao estoque",
+                 run_wishlist_notifier, timedelta(hours=1)),
+    # Job 5: Expirar transações PIX vencidas a cada 5 minutos
+    ScheduledJob("expire_pix_transactions", "Expirar PIX pendentes vencidos",
+                 expire_pix_transactions_job, timedelta(minutes=5)),
+    # Job 6: Auto-cancelar vendas PENDING de terminal após 30 minutos
+    ScheduledJob("auto_cancel_stale_terminal_sales", "Auto-cancelar maquininha PENDING > 30min",
+                 auto_cancel_stale_terminal_sales_job, timedelta(minutes=5)),
+    # Job 7: Reconciliar projeção do catálogo público (1x por dia)
+    ScheduledJob("reconcile_catalog_projection", "Reconstruir projeção do catálogo público",
+                 reconcile_catalog_projection_job, timedelta(hours=24)),
+    # Job 8: Partições e retenção de audit/notification logs (1x por dia)
+    ScheduledJob("log_retention", "Partições e retenção de logs",
+                 log_retention_job, timedelta(hours=24)),
+    # Job 9: Conferir ledger de estoque por variante contra o FIFO (1x por dia)
+    ScheduledJob("check_stock_ledger", "Conferir ledger de estoque contra o FIFO",
+                 check_stock_ledger_job, timedelta(hours=24)),
+]
+JOBS_BY_ID: Dict[str, ScheduledJob] = {job.id: job for job in JOBS}
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_status: Optional[str] = None  # success | error | skipped
+    last_error: Optional[str] = None
+    last_started_at: Optional[datetime] = None
+    last_duration_seconds: Optional[float] = None
+    total_duration_seconds: float = 0.0
+
+
+job_stats: Dict[str, JobStats] = {}
+lease_backend: Optional[LeaseBackend] = None
+leader: Optional[LeaderElector] = None
+
+JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds", "Duração das execuções dos jobs agendados",
+    ["job", "outcome"], buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 3600),
+)
+JOB_SKIPPED = Counter(
+    "scheduler_job_skipped_total", "Disparos ignorados (worker não líder ou job em execução)", ["job"]
+)
+SCHEDULER_LEADER = Gauge("scheduler_is_leader", "1 se este worker é o líder do scheduler")
+SCHEDULER_LEADER.set_function(lambda: 1 if leader is not None and leader.is_leader else 0)
+
+
+def _job_lock_seconds(job: ScheduledJob) -> float:
+    # Lease do job vale até o próximo disparo, limitado: worker morto no meio
+    # do job não bloqueia o próximo líder por um dia inteiro
+    return min(job.interval.total_seconds(), settings.SCHEDULER_JOB_LOCK_MAX_SECONDS)
+
+
+def _skip(job_id: str, stats: JobStats) -> str:
+    JOB_SKIPPED.inc(job=job_id)
+    stats.skipped += 1
+    stats.last_status = "skipped"
+    return "skipped"
+
+
+async def run_job(job_id: str) -> str:
+    """Executa o job se este worker for o líder. Retorna success | error | skipped."""
+    job = JOBS_BY_ID[job_id]
+    stats = job_stats.setdefault(job_id, JobStats())
+    if leader is None or not leader.is_leader:
+        return _skip(job_id, stats)
+
+    lock_name = f"job:{job_id}"
     try:
-        async with async_session_maker() as db:
-            service = ConditionalNotificationService()
-            result = await service.send_missed_departure_alert(db)
-            logger.info(f"Missed departure alert sent: {result}")
+        locked = await lease_backend.acquire(lock_name, leader.holder, _job_lock_seconds(job))
     except Exception as e:
-        logger.error(f"Error in missed departure alert job: {e}", exc_info=True)
+        logger.warning(f"Scheduler: lock do job {job_id} indisponível: {e}")
+        locked = False
+    if not locked:
+        logger.warning(f"Scheduler: {job_id} ainda em execução em outro worker — disparo ignorado")
+        return _skip(job_id, stats)
+
+    stats.last_started_at = datetime.utcnow()
+    started = time.perf_counter()
+    try:
+        await job.func()
+        stats.last_status = "success"
+        stats.last_error = None
+    except Exception as e:
+        stats.failures += 1
+        stats.last_status = "error"
+        stats.last_error = str(e)
+        logger.error(f"Error in {job_id} job: {e}", exc_info=True)
+    finally:
+        duration = time.perf_counter() - started
+        stats.runs += 1
+        stats.last_duration_seconds = duration
+        stats.total_duration_seconds += duration
+        JOB_DURATION.observe(duration, job=job_id, outcome=stats.last_status)
+        try:
+            await lease_backend.release(lock_name, leader.holder)
+        except Exception as e:
+            logger.warning(f"Scheduler: falha ao liberar lock do job {job_id}: {e}")
+    return stats.last_status
+
+
+def scheduler_status() -> Dict[str, Any]:
+    """Liderança deste worker e métricas por job."""
+    return {
+        "holder": leader.holder if leader else None,
+        "is_leader": bool(leader and leader.is_leader),
+        "jobs": {job.id: asdict(job_stats.get(job.id, JobStats())) for job in JOBS},
+    }
 
 
 def start_scheduler():
-    """Inicia o scheduler com todos os jobs configurados."""
-
-    # Job 1: Verificar SLAs a cada 1 minuto (notifica antes do SLA)
-    scheduler.add_job(
-        check_sla_notifications_job,
-        trigger=IntervalTrigger(minutes=1),
-        id="check_sla_notifications",
-        name="Verificar SLAs e enviar notificações",
-        replace_existing=True,
-    )
-
-    # Job 2: Lembrete de pendentes a cada 2 horas
-    scheduler.add_job(
-        send_pending_reminder_job,
-        trigger=IntervalTrigger(hours=2),
-        id="send_pending_reminder",
-        name="Enviar lembrete de envios pendentes",
-        replace_existing=True,
-    )
-
-    # Job 3: Alerta de atrasados (SENT/PARTIAL) a cada 4 horas
-    scheduler.add_job(
-        send_overdue_alert_job,
-        trigger=IntervalTrigger(hours=4),
-        id="send_overdue_alert",
-        name="Enviar alerta de envios atrasados",
-        replace_existing=True,
-    )
-
-    # Job 4: Alerta de PENDENTES que perderam SLA a cada 30 minutos
-    scheduler.add_job(
-        send_missed_departure_alert_job,
-        trigger=IntervalTrigger(minutes=30),
-        id="send_missed_departure_alert",
-        name="Enviar alerta de envios pendentes que perderam SLA",
-        replace_existing=True,
-    )
-
-    # Job 5: Notificar wishlist quando produto volta ao estoque (1h)
-    scheduler.add_job(
-        run_wishlist_notifier,
-        trigger=IntervalTrigger(hours=1),
-        id="wishlist_notifier",
-        name="Notificar clientes: produto voltou ao estoque",
-        replace_existing=True,
-    )
-
-    # Job 6: Expirar transações PIX vencidas a cada 5 minutos
-    scheduler.add_job(
-        expire_pix_transactions_job,
-        trigger=IntervalTrigger(minutes=5),
-        id="expire_pix_transactions",
-        name="Expirar PIX pendentes vencidos",
-        replace_existing=True,
-    )
-
-    # Job 7: Auto-cancelar vendas PENDING de terminal após 30 minutos
-    scheduler.add_job(
-        auto_cancel_stale_terminal_sales_job,
-        trigger=IntervalTrigger(minutes=5),
-        id="auto_cancel_stale_terminal_sales",
-        name="Auto-cancelar maquininha PENDING > 30min",
-        replace_existing=True,
-    )
+    """Inicia a eleição de líder e o scheduler com todos os jobs configurados."""
+    global lease_backend, leader
+    lease_backend = create_lease_backend()
+    leader = LeaderElector(lease_backend)
+    leader.start()
+
+    for job in JOBS:
+        scheduler.add_job(
+            run_job,
+            trigger=IntervalTrigger(seconds=job.interval.total_seconds()),
+            args=[job.id],
+            id=job.id,
+            name=job.name,
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
 
     scheduler.start()
-    logger.info("Background scheduler started with 7 jobs")
-    logger.info("   - SLA check (before deadline): every 1 minute")
+    logger.info(f"Background scheduler started with {len(JOBS)} jobs (holder {leader.holder})")
     logger.info("   - Pending reminder: every 2 hours")
     logger.info("   - Overdue alert (SENT): every 4 hours")
     logger.info("   - Missed departure alert (PENDING): every 30 minutes")
 
 
-def shutdown_scheduler():
-    """Para o scheduler gracefully."""
+async def shutdown_scheduler():
+    """Para o scheduler gracefully e libera a liderança."""
     scheduler.shutdown()
+    if leader is not None:
+        await leader.stop()
     logger.info("Background scheduler stopped")
@@ -0,0 +1,194 @@
+"""
+Leases entre workers: eleição do líder do scheduler e locks por job.
+
+Cada worker uvicorn sobe o seu AsyncIOScheduler (lifespan), mas só o líder
+executa os jobs. A liderança é um lease nomeado ("scheduler:leader") com
+validade de SCHEDULER_LEASE_SECONDS, renovado a cada 1/3 desse tempo:
+
+  - o líder renova o próprio lease; os demais tentam tomá-lo e só
+    conseguem depois que ele expira — se o líder morrer, outro worker
+    assume em no máximo SCHEDULER_LEASE_SECONDS;
+  - se a renovação falhar (banco fora), o worker deixa de se considerar
+    líder na hora, antes de o lease expirar para os outros;
+  - no shutdown o lease é liberado e a troca é imediata.
+
+Lease em tabela (scheduler_leases) e não advisory lock: funciona no
+SQLite dos testes/dev e não depende de uma conexão presa ao worker (o
+advisory lock de sessão some com pgbouncer em transaction pooling).
+
+Backends:
+  - DatabaseLeaseBackend: UPDATE condicional (dono atual ou expirado) e,
+    se a linha não existe, INSERT ... ON CONFLICT DO NOTHING — atômico nos
+    dois bancos.
+  - InMemoryLeaseBackend: mesmo contrato num dict (testes, processo único).
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Protocol, Tuple
+
+from sqlalchemy import case, delete, or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.config import settings
+from app.core.database import resolve_session_factory
+from app.models.scheduler_lease import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+LEADER_LEASE = "scheduler:leader"
+
+
+def default_holder() -> str:
+    """Identificador único do worker: host:pid:aleatório."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaseBackend(Protocol):
+    async def acquire(self, name: str, holder: str, ttl_seconds: float) -> bool: ...
+
+    async def release(self, name: str, holder: str) -> None: ...
+
+
+class InMemoryLeaseBackend:
+    """Leases num dict — vários LeaderElector compartilhando a instância simulam workers."""
+
+    def __init__(self):
+        self._leases: Dict[str, Tuple[str, datetime]] = {}
+
+    async def acquire(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        now = datetime.utcnow()
+        current = self._leases.get(name)
+        if current is not None and current[0] != holder and current[1] > now:
+            return False
+        self._leases[name] = (holder, now + timedelta(seconds=ttl_seconds))
+        return True
+
+    async def release(self, name: str, holder: str) -> None:
+        current = self._leases.get(name)
+        if current is not None and current[0] == holder:
+            del self._leases[name]
+
+    def expire(self, name: str) -> None:
+        """Força a expiração (testes: simula o líder morto)."""
+        if name in self._leases:
+            holder, _ = self._leases[name]
+            self._leases[name] = (holder, datetime.utcnow() - timedelta(seconds=1))
+
+
+class DatabaseLeaseBackend:
+    """Leases na tabela scheduler_leases."""
+
+    def __init__(self, session_factory=None):
+        """
+        Args:
+            session_factory: async_sessionmaker (padrão:
+                app.core.database.async_session_maker, resolvido a cada uso)
+        """
+        self._session_factory = session_factory
+
+    def _sessions(self):
+        return resolve_session_factory(self._session_factory)
+
+    async def acquire(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        async with self._sessions()() as db:
+            result = await db.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == name,
+                    or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now),
+                )
+                .values(
+                    holder=holder,
+                    expires_at=expires_at,
+                    acquired_at=case(
+                        (SchedulerLease.holder == holder, SchedulerLease.acquired_at), else_=now
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            acquired = result.rowcount == 1
+            if not acquired:
+                insert_fn = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+                result = await db.execute(
+                    insert_fn(SchedulerLease)
+                    .values(name=name, holder=holder, expires_at=expires_at, acquired_at=now)
+                    .on_conflict_do_nothing(index_elements=["name"])
+                )
+                acquired = result.rowcount == 1
+            await db.commit()
+        return acquired
+
+    async def release(self, name: str, holder: str) -> None:
+        async with self._sessions()() as db:
+            await db.execute(
+                delete(SchedulerLease).where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+            )
+            await db.commit()
+
+
+def create_lease_backend() -> LeaseBackend:
+    """Backend de SCHEDULER_LOCK_BACKEND ("database" | "memory")."""
+    if settings.SCHEDULER_LOCK_BACKEND == "memory":
+        return InMemoryLeaseBackend()
+    return DatabaseLeaseBackend()
+
+
+class LeaderElector:
+    """Mantém (ou disputa) o lease de líder em background."""
+
+    def __init__(
+        self,
+        backend: LeaseBackend,
+        lease_seconds: Optional[float] = None,
+        holder: Optional[str] = None,
+        name: str = LEADER_LEASE,
+    ):
+        self.backend = backend
+        self.lease_seconds = lease_seconds or settings.SCHEDULER_LEASE_SECONDS
+        self.holder = holder or default_holder()
+        self.name = name
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> bool:
+        """Tenta adquirir/renovar o lease. Em erro, deixa de ser líder."""
+        try:
+            leader = await self.backend.acquire(self.name, self.holder, self.lease_seconds)
+        except Exception as e:
+            logger.warning(f"Scheduler: falha ao renovar liderança ({self.holder}): {e}")
+            leader = False
+        if leader != self.is_leader:
+            logger.info(
+                f"Scheduler: {self.holder} {'assumiu' if leader else 'perdeu'} a liderança"
+            )
+        self.is_leader = leader
+        return leader
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.lease_seconds / 3)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="scheduler-leader-election")
+
+    async def stop(self) -> None:
+        """Para a renovação e libera o lease (outro worker assume sem esperar expirar)."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self.is_leader:
+            self.is_leader = False
+            try:
+                await self.backend.release(self.name, self.holder)
+            except Exception as e:
+                logger.warning(f"Scheduler: falha ao liberar liderança: {e}")
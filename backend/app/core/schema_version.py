@@ -0,0 +1,79 @@
+"""
+Verificação rápida da versão do schema no boot (sem alembic).
+
+As migrations rodam uma vez por deploy (scripts/db_init.py, chamado pelo
+entrypoint.sh / startCommand do Render); o boot só confere se a revisão
+gravada em alembic_version é o head da cadeia em alembic/versions.
+
+O head é calculado lendo `revision`/`down_revision` dos arquivos com regex,
+sem importar o alembic nem os módulos de migration (ScriptDirectory leva
+centenas de ms, o que pesa no cold start).
+"""
+from __future__ import annotations
+
+import ast
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, Iterable, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSIONS_DIR = Path(__file__).parent.parent.parent / "alembic" / "versions"
+
+_ASSIGNMENT = re.compile(r"^(revision|down_revision)\s*(?::[^=\n]+)?=\s*(.+?)\s*$", re.M)
+
+
+def _as_set(value) -> FrozenSet[str]:
+    if value is None:
+        return frozenset()
+    if isinstance(value, str):
+        return frozenset({value})
+    return frozenset(value)
+
+
+@lru_cache(maxsize=4)
+def expected_heads(versions_dir: Path = VERSIONS_DIR) -> FrozenSet[str]:
+    """Revisões que nenhuma outra migration tem como down_revision."""
+    revisions = set()
+    parents = set()
+    for path in versions_dir.glob("*.py"):
+        found = dict(_ASSIGNMENT.findall(path.read_text(encoding="utf-8")))
+        if "revision" not in found:
+            continue
+        revisions.add(ast.literal_eval(found["revision"]))
+        parents |= _as_set(ast.literal_eval(found.get("down_revision", "None")))
+    return frozenset(revisions - parents)
+
+
+@dataclass(frozen=True)
+class SchemaStatus:
+    current: FrozenSet[str]
+    expected: FrozenSet[str]
+
+    @property
+    def up_to_date(self) -> bool:
+        return self.current == self.expected
+
+    @property
+    def pending(self) -> FrozenSet[str]:
+        return self.expected - self.current
+
+
+async def current_revisions(conn: AsyncConnection) -> FrozenSet[str]:
+    """Revisões gravadas em alembic_version (vazio sem a tabela)."""
+    has_table = await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("alembic_version"))
+    if not has_table:
+        return frozenset()
+    rows = await conn.execute(text("SELECT version_num FROM alembic_version"))
+    return frozenset(row[0] for row in rows)
+
+
+async def check_schema_version(
+    conn: AsyncConnection, expected: Optional[Iterable[str]] = None
+) -> SchemaStatus:
+    """Compara alembic_version do banco com o head das migrations do código."""
+    heads = frozenset(expected) if expected is not None else expected_heads()
+    return SchemaStatus(current=await current_revisions(conn), expected=heads)
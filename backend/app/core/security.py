@@ -1,5 +1,7 @@
 """Security utilities for JWT authentication and password hashing."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
@@ -11,6 +13,15 @@ from app.core.config import settings
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt custa ~100-300 ms de CPU por operação. Em rotas async ele roda neste
+# pool (o bcrypt libera o GIL): o event loop segue atendendo PDV/SSE e no
+# máximo PASSWORD_HASH_WORKERS hashes rodam ao mesmo tempo — o excedente de
+# uma rajada de logins espera na fila do pool.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -41,6 +52,37 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password in the password thread pool (use from async code).
+
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password
+
+    Returns:
+        bool: True if password matches
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password in the password thread pool (use from async code).
+
+    Args:
+        password: Plain text password
+
+    Returns:
+        str: Hashed password
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+
 def create_access_token(
     data: Dict[str, Any],
     expires_delta: Optional[timedelta] = None
@@ -0,0 +1,156 @@
+"""
+Cache do usuário autenticado (get_current_user), por worker.
+
+Chave: (user_id, tv) — tv é o claim "token version" do access token, que
+espelha users.token_version no momento da emissão. Entradas vivem
+AUTH_USER_CACHE_TTL_SECONDS; o valor guardado é um snapshot das colunas do
+usuário (sem o hash da senha), reconstruído como instância detached a cada
+requisição — nenhuma instância ORM é compartilhada entre sessões.
+
+Invalidação:
+  - Hooks de sessão (install_user_cache_hooks) incrementam token_version
+    quando role, is_active, tenant_id ou a senha mudam, e após o commit
+    removem o usuário do cache deste worker.
+  - bump_token_version() faz o mesmo para caminhos sem alteração no
+    usuário (revoke_all_user_sessions).
+  - Tokens com tv menor que o token_version do banco são recusados; em
+    outros workers, uma entrada antiga sobrevive no máximo até o TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, update
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.metrics import register_cache_metrics
+from app.models.user import User
+
+# Mudanças que revogam os access tokens já emitidos
+TOKEN_VERSION_FIELDS = ("role", "is_active", "tenant_id", "hashed_password")
+
+_CHANGED_USERS = "auth_changed_users"
+# Nunca guardar o hash da senha em memória
+_EXCLUDED_COLUMNS = {"hashed_password"}
+
+CacheKey = Tuple[int, int]
+
+
+class UserPrincipalCache:
+    """LRU com TTL de snapshots de usuários autenticados — thread-safe."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl_seconds = settings.AUTH_USER_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = settings.AUTH_USER_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, user_id: int, token_version: int) -> Optional[User]:
+        """Usuário detached a partir do snapshot, ou None (ausente/expirado)."""
+        if not self.enabled:
+            return None
+        key = (user_id, token_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            snapshot = entry[1]
+
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, user: User) -> None:
+        if not self.enabled:
+            return
+        snapshot = {
+            attr.key: getattr(user, attr.key)
+            for attr in sa_inspect(User).column_attrs
+            if attr.key not in _EXCLUDED_COLUMNS
+        }
+        key = (user.id, user.token_version or 0)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Remove todas as versões do usuário."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+user_cache = UserPrincipalCache()
+register_cache_metrics(user_cache, "auth_user")
+
+
+# ============================================================================
+# Hooks de sessão
+# ============================================================================
+
+def _bump_on_sensitive_change(session: Session, flush_context, instances) -> None:
+    """before_flush: incrementa token_version de usuários com mudança sensível."""
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        state = sa_inspect(obj)
+        if any(state.attrs[field].history.has_changes() for field in TOKEN_VERSION_FIELDS):
+            obj.token_version = (obj.token_version or 0) + 1
+            session.info.setdefault(_CHANGED_USERS, set()).add(obj.id)
+
+
+def _invalidate_after_commit(session: Session) -> None:
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        user_cache.invalidate(user_id)
+
+
+def _discard_changed(session: Session, *args) -> None:
+    session.info.pop(_CHANGED_USERS, None)
+
+
+def install_user_cache_hooks() -> None:
+    """Registra os hooks em todas as sessões (idempotente)."""
+    if event.contains(Session, "before_flush", _bump_on_sensitive_change):
+        return
+    event.listen(Session, "before_flush", _bump_on_sensitive_change)
+    event.listen(Session, "after_commit", _invalidate_after_commit)
+    event.listen(Session, "after_rollback", _discard_changed)
+
+
+async def bump_token_version(db: AsyncSession, user_id: int) -> None:
+    """
+    Revoga os access tokens emitidos para o usuário (efetivo no commit).
+
+    Para caminhos que não alteram campos do usuário, ex: revogar sessões.
+    """
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.sync_session.info.setdefault(_CHANGED_USERS, set()).add(user_id)
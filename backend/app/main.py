@@ -1,6 +1,7 @@
 """Main FastAPI application with middleware and exception handlers."""
 
 import logging
+import time
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
@@ -8,27 +9,35 @@ from pathlib import Path
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
 from app.core.database import init_db, close_db, engine
+from app.core.instrumentation import install_instrumentation
+from app.core.logging_config import configure_logging
+from app.core import metrics
+from app.core import payment_events  # noqa: F401 — registra os gauges de SSE no /metrics
 from app.core.scheduler import start_scheduler, shutdown_scheduler
+from app.services.printer_service import printer_service
+from app.services.print_queue import print_queue
+from app.services.image_pipeline import image_pipeline
+from app.services.audit_service import audit_writer
+from app.services.ai_batch_scan_service import ai_batch_scanner
+from app.services.sla_dispatcher import sla_dispatcher
+from app.core.job_queue import job_queue
+from app.services.catalog_projection_service import ensure_catalog_projection
 from app.api.v1.router import api_router
 from app.middleware.tenant import TenantMiddleware
-from app.admin.auth import AdminAuth
-from app.admin.views import ALL_VIEWS
+from app.middleware.instrumentation import RequestInstrumentationMiddleware
+from app.admin.lazy import LazyAdmin
 from app.webhooks.whatsapp import router as whatsapp_router
-from sqladmin import Admin
 from starlette.middleware.sessions import SessionMiddleware
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Logging estruturado via fila (formatação/escrita fora do request)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Silenciar loggers ruidosos
@@ -46,20 +55,45 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     Handles startup and shutdown events.
     """
     # Startup
+    started = time.perf_counter()
     logger.info("Starting up application...")
     await init_db()
     logger.info("Database initialized")
 
+    # Gravação em lote do audit log
+    audit_writer.start()
+
+    # Backfill da projeção do catálogo público (primeiro boot após a migration)
+    await ensure_catalog_projection()
+
     # Start background scheduler
     start_scheduler()
     logger.info("Background scheduler started")
 
+    # Retomar fila de impressão (jobs QUEUED de execuções anteriores)
+    await print_queue.start()
+
+    # Notificações de SLA dos condicionais no horário exato (sla_notifications)
+    sla_dispatcher.start()
+
+    # Fila de jobs em background (no backend "celery" quem executa é app/worker.py)
+    job_queue.start()
+
+    logger.info("Startup concluído", extra={"startup_ms": round((time.perf_counter() - started) * 1000, 1)})
+
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
-    shutdown_scheduler()
+    await shutdown_scheduler()
     logger.info("Background scheduler stopped")
+    await print_queue.shutdown()
+    await sla_dispatcher.shutdown()
+    await job_queue.shutdown()
+    await ai_batch_scanner.shutdown()
+    printer_service.close_connections()
+    await image_pipeline.drain()
+    await audit_writer.stop()
     await close_db()
     logger.info("Database connections closed")
 
@@ -83,7 +117,7 @@ app.add_middleware(
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
     allow_methods=settings.cors_allow_methods,
     allow_headers=settings.cors_allow_headers,
-    expose_headers=["X-Total-Count", "X-Page", "X-Page-Size"],
+    expose_headers=["X-Total-Count", "X-Page", "X-Page-Size", "X-Next-Cursor", "Server-Timing", "X-Request-ID"],
 )
 
 # Session middleware (necessário para o painel Admin)
@@ -101,17 +135,9 @@ app.add_middleware(TenantMiddleware)
 # ============================================================================
 # PAINEL ADMINISTRATIVO (SQLAdmin) - acesso em /admin
 # ============================================================================
-authentication_backend = AdminAuth(secret_key=settings.SECRET_KEY)
-admin = Admin(
-    app,
-    engine=engine,
-    authentication_backend=authentication_backend,
-    title="Fitness Store Admin",
-    base_url="/admin",
-)
-
-for view in ALL_VIEWS:
-    admin.add_view(view)
+# Construído na primeira requisição a /admin (fora do caminho do cold start)
+admin = LazyAdmin(engine, base_url="/admin", title="Fitness Store Admin")
+app.mount("/admin", app=admin, name="admin")
 
 
 # ============================================================================
@@ -150,14 +176,10 @@ if not settings.DEBUG:
     )
 
 
-# Request Logging Middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests."""
-    logger.info(f"{request.method} {request.url.path}")
-    response = await call_next(request)
-    logger.info(f"Status: {response.status_code}")
-    return response
+# Instrumentação + log por requisição (Server-Timing, queries, chamadas externas).
+# Adicionado por último = mais externo: mede a requisição inteira.
+install_instrumentation()
+app.add_middleware(RequestInstrumentationMiddleware)
 
 
 # Exception Handlers
@@ -242,6 +264,28 @@ async def health_check():
     }
 
 
+# Prometheus Metrics Endpoint
+def _metrics_exposed() -> bool:
+    """Desligado por padrão; em produção só com METRICS_TOKEN configurado."""
+    if not settings.METRICS_ENABLED:
+        return False
+    return bool(settings.METRICS_TOKEN) or settings.ENVIRONMENT != "production"
+
+
+if settings.METRICS_ENABLED and not _metrics_exposed():
+    logger.warning("METRICS_ENABLED sem METRICS_TOKEN em produção: /metrics não será exposto")
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Métricas deste worker no formato de exposição do Prometheus."""
+    if not _metrics_exposed():
+        return PlainTextResponse("not found", status_code=status.HTTP_404_NOT_FOUND)
+    if settings.METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        return PlainTextResponse("unauthorized", status_code=status.HTTP_401_UNAUTHORIZED)
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # Root Endpoint
 @app.get("/", tags=["Root"])
 async def root():
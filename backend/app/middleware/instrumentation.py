@@ -0,0 +1,88 @@
+"""
+Middleware de instrumentação por requisição (app/core/instrumentation.py).
+
+Abre o RequestMetrics da requisição, devolve o header Server-Timing
+(db, chamadas externas por host e total) e grava um log estruturado com
+método, rota, status, tenant, tempos e contagem de queries. O request id
+(X-Request-ID recebido ou gerado) vai para o contexto de log de tudo que
+roda na requisição e volta no header da resposta. Com o
+detector de N+1 ligado, statements repetidos saem no log como warning.
+Duração e queries também alimentam os histogramas do /metrics, rotulados
+pelo template da rota (/products/{product_id}), nunca pela URL crua.
+"""
+import logging
+import re
+import uuid
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.instrumentation import track_queries
+from app.core.logging_config import log_context
+from app.core.metrics import Histogram
+
+logger = logging.getLogger("app.requests")
+
+# Request id aceito do cliente/proxy; qualquer outra coisa é substituída
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Duração das requisições HTTP por rota",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Queries SQL por requisição HTTP",
+    ["method", "route"], buckets=(1, 2, 5, 10, 20, 50, 100, 200),
+)
+
+
+class RequestInstrumentationMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app):
+        super().__init__(app)
+        # {endpoint: template da rota}, montado sob demanda
+        self._route_paths = {}
+
+    def _route_template(self, request: Request) -> str:
+        endpoint = request.scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            path = next(
+                (route.path for route in request.app.router.routes
+                 if getattr(route, "endpoint", None) is endpoint),
+                "unmatched",
+            )
+            self._route_paths[endpoint] = path
+        return path
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get("x-request-id", "")
+        if not _REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        with log_context(request_id=request_id), track_queries() as metrics:
+            response = await call_next(request)
+            route = self._route_template(request)
+            HTTP_REQUEST_DURATION.observe(
+                metrics.elapsed_seconds(), method=request.method, route=route,
+                status=response.status_code,
+            )
+            HTTP_REQUEST_QUERIES.observe(metrics.db_queries, method=request.method, route=route)
+            if settings.SERVER_TIMING_ENABLED:
+                response.headers["Server-Timing"] = metrics.server_timing()
+            response.headers["X-Request-ID"] = request_id
+
+            record = {
+                "method": request.method,
+                "path": request.url.path,
+                "route": route,
+                "status": response.status_code,
+                "tenant_id": getattr(request.state, "tenant_id", None),
+                **metrics.summary(),
+            }
+            if "n_plus_one" in record:
+                logger.warning("request", extra=record)
+            else:
+                logger.info("request", extra=record)
+        return response
@@ -17,6 +17,7 @@ from starlette.types import ASGIApp
 from sqlalchemy import select
 
 from app.core.database import async_session_maker
+from app.core.logging_config import bind_tenant
 from app.models.store import Store
 
 
@@ -64,6 +65,7 @@ class TenantMiddleware(BaseHTTPMiddleware):
         # Atribui ao state (se encontrado)
         if tenant_id is not None:
             request.state.tenant_id = tenant_id
+            bind_tenant(tenant_id)
 
         response = await call_next(request)
         return response
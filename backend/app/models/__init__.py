@@ -25,6 +25,12 @@ from .expense import Expense, ExpenseCategory
 from .supplier import Supplier
 from .supplier_product import SupplierProduct
 from .audit_log import AuditLog
+from .sequence_counter import SequenceCounter
+from .scheduler_lease import SchedulerLease
+from .sla_notification import SLANotification, SLANotificationKind, SLANotificationStatus
+from .background_job import BackgroundJob, JobStatus
+from .catalog_projection import PublicCatalogItem
+from .variant_stock import VariantStock
 from .product_media import ProductMedia
 from .pdv_terminal import PDVTerminal
 from .pix_transaction import PixTransaction
@@ -113,6 +119,25 @@ __all__ = [
     # Audit
     "AuditLog",
 
+    # Sequências atômicas (barcode, SKU, código de entrada)
+    "SequenceCounter",
+    "PublicCatalogItem",
+
+    # Scheduler (líder e locks de job entre workers)
+    "SchedulerLease",
+
+    # Notificações de SLA agendadas (envios condicionais)
+    "SLANotification",
+    "SLANotificationKind",
+    "SLANotificationStatus",
+
+    # Fila de jobs em background
+    "BackgroundJob",
+    "JobStatus",
+
+    # Ledger de estoque por variante
+    "VariantStock",
+
     # Product Media (galeria)
     "ProductMedia",
 
@@ -2,7 +2,7 @@
 Modelo de audit log para rastreamento de ações críticas.
 """
 from datetime import datetime
-from sqlalchemy import DateTime, Integer, String, Text, ForeignKey
+from sqlalchemy import DateTime, Index, Integer, String, Text, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
 from app.models.base import Base
 
@@ -10,6 +10,11 @@ from app.models.base import Base
 class AuditLog(Base):
     """Registro imutável de ações críticas no sistema."""
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Paginação por keyset (created_at, id) dentro do tenant, com e sem filtro de ação
+        Index("ix_audit_logs_tenant_created", "tenant_id", "created_at", "id"),
+        Index("ix_audit_logs_tenant_action_created", "tenant_id", "action", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     tenant_id: Mapped[int | None] = mapped_column(Integer, index=True, nullable=True)
@@ -0,0 +1,66 @@
+"""
+Model de job em background (fila genérica de trabalho pesado/adiável).
+"""
+from datetime import datetime
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import BaseModel
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+ACTIVE_JOB_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+FINISHED_JOB_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+_ACTIVE_DEDUP = text("status IN ('queued', 'running') AND dedup_key IS NOT NULL")
+
+
+class BackgroundJob(BaseModel):
+    """
+    Um job da fila (app/core/job_queue.py): tarefa registrada + payload JSON.
+
+    A tabela é a fonte de verdade nos dois backends — status, tentativas,
+    progresso e resultado são lidos daqui pelo endpoint /jobs.
+    """
+
+    __tablename__ = "background_jobs"
+    __table_args__ = (
+        # Claim: próximo job elegível por prioridade e horário
+        Index("ix_background_jobs_claim", "status", "priority", "run_at"),
+        # Deduplicação: no máximo um job ativo por dedup_key
+        Index(
+            "uq_background_jobs_active_dedup",
+            "dedup_key",
+            unique=True,
+            postgresql_where=_ACTIVE_DEDUP,
+            sqlite_where=_ACTIVE_DEDUP,
+        ),
+    )
+
+    task: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default=JobStatus.QUEUED)
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # maior sai antes
+    dedup_key: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    run_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    locked_by: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)  # heartbeat
+
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # 0-100
+    progress_message: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
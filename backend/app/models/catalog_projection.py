@@ -0,0 +1,52 @@
+"""
+Projeção denormalizada do catálogo público (uma linha por produto publicado).
+
+Mantida por CatalogProjectionService: cada commit que altera produto,
+variante, estoque ou categoria recalcula apenas as linhas afetadas.
+
+search_text guarda nome, marca e categoria normalizados (minúsculas, sem
+acento — app.utils.text.normalize_search); no PostgreSQL tem índice
+trigram (migration 20261018_bot_search) para LIKE '%termo%'.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Index, Integer, Numeric, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class PublicCatalogItem(Base):
+    """Produto como aparece na vitrine pública (sem custo, quantidade ou SKU)."""
+    __tablename__ = "public_catalog_items"
+    __table_args__ = (
+        # Listagem da vitrine: ORDER BY in_stock DESC, name dentro do tenant
+        Index("ix_public_catalog_listing", "tenant_id", "in_stock", "name"),
+        Index("ix_public_catalog_category", "tenant_id", "category_id", "in_stock", "name"),
+    )
+
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    tenant_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    sale_price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False, default=0)
+    image_url: Mapped[Optional[str]] = mapped_column(String(500))
+    category_id: Mapped[Optional[int]] = mapped_column(Integer)
+    category_name: Mapped[Optional[str]] = mapped_column(String(100))
+    in_stock: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    variant_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sizes: Mapped[List[str]] = mapped_column(JSON, nullable=False, default=list)
+    colors: Mapped[List[str]] = mapped_column(JSON, nullable=False, default=list)
+    # Tamanhos com estoque > 0 (bot do WhatsApp)
+    stock_sizes: Mapped[List[str]] = mapped_column(JSON, nullable=False, default=list)
+    search_text: Mapped[str] = mapped_column(String(500), nullable=False, default="")
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    brand: Mapped[Optional[str]] = mapped_column(String(100))
+    gender: Mapped[Optional[str]] = mapped_column(String(20))
+    material: Mapped[Optional[str]] = mapped_column(String(100))
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
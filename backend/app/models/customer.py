@@ -1,13 +1,14 @@
 """
 Modelo de cliente com programa de fidelidade.
 """
-from sqlalchemy import String, Date, Enum as SQLEnum, Numeric, Text, UniqueConstraint
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Date, Enum as SQLEnum, Index, Numeric, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from enum import Enum
 from datetime import date
 from decimal import Decimal
 from typing import List, TYPE_CHECKING
 from .base import BaseModel
+from app.utils.text import normalize_phone
 
 if TYPE_CHECKING:
     from .sale import Sale
@@ -31,6 +32,8 @@ class Customer(BaseModel):
     __table_args__ = (
         UniqueConstraint('tenant_id', 'email', name='uq_customers_tenant_email'),
         UniqueConstraint('tenant_id', 'document_number', name='uq_customers_tenant_document'),
+        # Busca por telefone (bot do WhatsApp)
+        Index('ix_customers_tenant_phone', 'tenant_id', 'phone_normalized'),
     )
     
     # Informações pessoais
@@ -50,6 +53,11 @@ class Customer(BaseModel):
         String(20),
         comment="Customer phone number"
     )
+
+    phone_normalized: Mapped[str | None] = mapped_column(
+        String(10),
+        comment="DDD + last 8 digits of phone (see normalize_phone)"
+    )
     
     document_number: Mapped[str | None] = mapped_column(
         String(20),
@@ -146,6 +154,12 @@ class Customer(BaseModel):
         order_by="ConditionalShipment.created_at.desc()"
     )
     
+    @validates("phone")
+    def _sync_phone_normalized(self, key: str, value: str | None) -> str | None:
+        """Mantém phone_normalized em dia a cada atribuição de phone."""
+        self.phone_normalized = normalize_phone(value)
+        return value
+
     def __repr__(self) -> str:
         return f"<Customer(id={self.id}, name='{self.full_name}', type='{self.customer_type}')>"
     
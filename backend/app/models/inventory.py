@@ -6,7 +6,7 @@ IMPORTANTE: Após a migração para o sistema de variantes:
 - Cada Inventory agora está vinculado a uma variante específica (tamanho/cor)
 - O campo product_id é mantido para compatibilidade durante a migração
 """
-from sqlalchemy import String, ForeignKey, Enum as SQLEnum, Text, DateTime
+from sqlalchemy import String, ForeignKey, Enum as SQLEnum, Text, DateTime, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from enum import Enum
 from datetime import datetime
@@ -29,6 +29,11 @@ class MovementType(str, Enum):
     EXPIRY = "expiry"         # Vencimento
 
 
+# Linha de inventário "por produto" (legado, sem variante): no máximo uma por
+# (tenant_id, product_id) — alvo do upsert em InventoryService.rebuild_fifo_range
+PRODUCT_LEVEL_INVENTORY = text("product_id IS NOT NULL AND variant_id IS NULL")
+
+
 class Inventory(BaseModel):
     """
     Inventory control model with movement tracking.
@@ -38,6 +43,16 @@ class Inventory(BaseModel):
     Após migração: cada Inventory está vinculado a uma ProductVariant (tamanho/cor).
     """
     __tablename__ = "inventory"
+    __table_args__ = (
+        Index(
+            "uq_inventory_tenant_product",
+            "tenant_id",
+            "product_id",
+            unique=True,
+            postgresql_where=PRODUCT_LEVEL_INVENTORY,
+            sqlite_where=PRODUCT_LEVEL_INVENTORY,
+        ),
+    )
     
     quantity: Mapped[int] = mapped_column(
         nullable=False,
@@ -2,7 +2,8 @@
 Model de job de impressão de etiquetas.
 """
 import enum
-from sqlalchemy import String, Integer, Text, Boolean, Enum as SAEnum, ForeignKey
+from datetime import datetime
+from sqlalchemy import String, Integer, Text, Boolean, DateTime, Enum as SAEnum, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import BaseModel
@@ -20,6 +21,9 @@ class PrintJob(BaseModel):
     """Registro de job de impressão enviado à impressora de etiquetas."""
 
     __tablename__ = "print_jobs"
+    __table_args__ = (
+        Index("ix_print_jobs_printer_status", "printer_id", "status", "id"),
+    )
 
     printer_id: Mapped[int] = mapped_column(ForeignKey("label_printers.id", ondelete="RESTRICT"))
     product_id: Mapped[int | None] = mapped_column(ForeignKey("products.id", ondelete="SET NULL"), nullable=True)
@@ -30,6 +34,11 @@ class PrintJob(BaseModel):
         SAEnum(PrintJobStatus, name="printjobstatus"), default=PrintJobStatus.QUEUED
     )
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Fila assíncrona (print_queue): tentativas de envio e próximo retry
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
     zpl_content: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     # Snapshot dos dados no momento da impressão
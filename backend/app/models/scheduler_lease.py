@@ -0,0 +1,17 @@
+"""
+Modelo de lease do scheduler (eleição de líder e locks de job entre workers).
+"""
+from datetime import datetime
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class SchedulerLease(Base):
+    """Lease nomeado: quem o detém até expires_at ("scheduler:leader", "job:<id>")."""
+    __tablename__ = "scheduler_leases"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(200), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    acquired_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
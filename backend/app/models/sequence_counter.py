@@ -0,0 +1,27 @@
+"""
+Modelo de contador de sequência por tenant (códigos de barras, SKUs, códigos de entrada).
+"""
+from datetime import datetime
+from sqlalchemy import BigInteger, DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class SequenceCounter(Base):
+    """Último valor alocado de uma sequência (tenant, tipo, prefixo)."""
+    __tablename__ = "sequence_counters"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "kind", "prefix", name="uq_sequence_counters_scope"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    tenant_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    kind: Mapped[str] = mapped_column(String(30), nullable=False)     # barcode, sku, entry_code
+    prefix: Mapped[str] = mapped_column(String(100), nullable=False, default="")
+    last_value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
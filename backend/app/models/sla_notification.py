@@ -0,0 +1,54 @@
+"""
+Model das notificações de SLA agendadas dos envios condicionais.
+"""
+from datetime import datetime
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import BaseModel
+
+
+class SLANotificationKind:
+    DEPARTURE = "departure"  # 5 min antes da saída (envio PENDING)
+    RETURN = "return"  # 15 min antes do retorno (envio SENT)
+
+
+class SLANotificationStatus:
+    PENDING = "pending"
+    CLAIMED = "claimed"
+    SENT = "sent"
+    SKIPPED = "skipped"  # envio mudou de status/data até o disparo
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class SLANotification(BaseModel):
+    """
+    Instante exato de uma notificação de SLA (uma linha por envio e tipo).
+
+    Calculado quando o envio é criado/enviado/protelado
+    (ConditionalNotificationService.schedule_sla_notifications) e consumido
+    pelo sla_dispatcher, que dorme até o próximo due_at.
+    """
+
+    __tablename__ = "sla_notifications"
+    __table_args__ = (
+        UniqueConstraint("shipment_id", "kind", name="uq_sla_notifications_shipment_kind"),
+        Index("ix_sla_notifications_status_due", "status", "due_at"),
+    )
+
+    tenant_id: Mapped[int] = mapped_column(ForeignKey("stores.id"), nullable=False, index=True)
+    shipment_id: Mapped[int] = mapped_column(
+        ForeignKey("conditional_shipments.id", ondelete="CASCADE"), nullable=False
+    )
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    event_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)  # saída/retorno previsto
+    due_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)  # quando notificar
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default=SLANotificationStatus.PENDING)
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    claimed_by: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -68,6 +68,16 @@ class User(BaseModel):
         index=True,
         comment="Store (tenant) this user belongs to"
     )
+
+    # Incrementado quando role/is_active/tenant/senha mudam ou as sessões são
+    # revogadas: access tokens com claim "tv" menor deixam de valer
+    token_version: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="Version of issued access tokens (claim tv)"
+    )
     
     # Relacionamentos
     sales: Mapped[List["Sale"]] = relationship(
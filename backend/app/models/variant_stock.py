@@ -0,0 +1,35 @@
+"""
+Saldo em estoque por variante (ledger de estoque).
+
+Uma linha por variante com on_hand = Σ quantity_remaining dos lotes FIFO
+ativos (entry_items ativos de stock_entries ativas, do mesmo tenant da
+variante). Mantida por app/services/stock_ledger_service.py na mesma
+transação de cada escrita FIFO — disponibilidade, resposta de produto,
+vitrine e sugestões leem esta linha em vez de somar os lotes.
+"""
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class VariantStock(Base):
+    """Contador de estoque disponível de uma variante."""
+    __tablename__ = "variant_stock"
+    __table_args__ = (
+        # Totais por produto (listagens, sugestões)
+        Index("ix_variant_stock_tenant_product", "tenant_id", "product_id"),
+    )
+
+    variant_id: Mapped[int] = mapped_column(
+        ForeignKey("product_variants.id", ondelete="CASCADE"), primary_key=True
+    )
+    tenant_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+    )
+    on_hand: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
@@ -1,4 +1,5 @@
-from typing import Any
+from datetime import datetime
+from typing import Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.repositories.base import BaseRepository
@@ -28,3 +29,21 @@ class PushTokenRepository(BaseRepository[PushToken, Any, Any]):
 class NotificationLogRepository(BaseRepository[NotificationLog, Any, Any]):
     def __init__(self):
         super().__init__(NotificationLog)
+
+    async def get_by_period(
+        self,
+        db: AsyncSession,
+        tenant_id: int,
+        start: datetime,
+        end: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> list[NotificationLog]:
+        """Logs do tenant em [start, end) — lê só as partições mensais do período."""
+        from app.services.log_retention_service import within_period
+
+        stmt = within_period(
+            select(NotificationLog).where(NotificationLog.tenant_id == tenant_id),
+            NotificationLog.created_at, start, end,
+        )
+        result = await db.execute(stmt.order_by(NotificationLog.created_at.desc()).limit(limit))
+        return result.scalars().all()
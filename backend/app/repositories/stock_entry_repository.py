@@ -507,6 +507,7 @@ class StockEntryRepository(BaseRepository[StockEntry, dict, dict]):
         """
         from sqlalchemy import update
         from app.models.entry_item import EntryItem
+        from app.services.stock_ledger_service import mark_stock_changed
         
         entry = await self.get_by_id(db, entry_id, tenant_id=tenant_id)
         if not entry:
@@ -518,6 +519,8 @@ class StockEntryRepository(BaseRepository[StockEntry, dict, dict]):
             .where(EntryItem.entry_id == entry_id)
             .values(is_active=False, quantity_remaining=0)
         )
+        # UPDATE em massa não passa pelo hook do ledger: recontar no commit
+        mark_stock_changed(db, entry_ids=[entry_id])
         
         # Desativar a entrada
         entry.is_active = False
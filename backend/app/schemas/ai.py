@@ -73,3 +73,32 @@ class AIStatusResponse(BaseModel):
     enabled: bool
     model: str
     has_api_key: bool
+
+
+class BatchDuplicate(BaseModel):
+    """Outra imagem do mesmo lote que parece o mesmo produto."""
+    index: int
+    filename: str
+    similarity_score: float = Field(..., ge=0.0, le=1.0)
+    reason: str
+
+
+class BatchScanItem(BaseModel):
+    """Resultado de uma imagem do lote."""
+    index: int
+    filename: str
+    status: str = Field(..., description="pending | processing | done | error")
+    attempts: int = 0
+    data: Optional[ProductScanResult] = None
+    error: Optional[str] = None
+    batch_duplicates: List[BatchDuplicate] = Field(default_factory=list)
+
+
+class BatchScanResponse(BaseModel):
+    """Estado de um lote de scan (polling e eventos SSE)."""
+    batch_id: str
+    status: str = Field(..., description="processing | finalizing | done")
+    total: int
+    completed: int
+    failed: int
+    items: List[BatchScanItem] = Field(default_factory=list)
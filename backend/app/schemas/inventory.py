@@ -69,3 +69,19 @@ class CostReconciliationResponse(BaseModel):
     custo_vendido_por_fontes: float
     diferenca: float
     unidades_vendidas_por_fontes: int
+
+
+class StockLedgerMismatch(BaseModel):
+    """Variante cujo saldo no ledger (variant_stock) diverge dos lotes FIFO."""
+    variant_id: int
+    product_id: int
+    tenant_id: int
+    on_hand: int
+    fifo_on_hand: int
+
+
+class StockLedgerConsistencyResponse(BaseModel):
+    """Resultado da verificação do ledger de estoque contra o FIFO."""
+    variants_checked: int
+    mismatches: list[StockLedgerMismatch]
+    repaired: int
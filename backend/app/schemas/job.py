@@ -0,0 +1,31 @@
+"""
+Schemas dos jobs em background (status/progresso/resultado).
+"""
+from datetime import datetime
+from typing import Any, List, Optional
+
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    id: int
+    task: str
+    status: str  # queued | running | succeeded | failed | cancelled
+    priority: int
+    progress: int
+    progress_message: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    run_at: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class JobListResponse(BaseModel):
+    items: List[JobResponse]
+    total: int
@@ -80,6 +80,8 @@ class PrintJobCreate(BaseModel):
     quantity: int = Field(1, ge=1, le=999)
     show_price: bool = True
     show_sku: bool = True
+    # True: grava o job como QUEUED e retorna na hora (worker da impressora envia)
+    queued: bool = False
 
 
 class PrintJobBatchItem(BaseModel):
@@ -91,8 +93,10 @@ class PrintJobBatchItem(BaseModel):
 
 class PrintJobBatchCreate(BaseModel):
     printer_id: int
-    product_id: int
-    items: List[PrintJobBatchItem]
+    # Opcional: sem product_id o lote pode conter variantes de vários produtos
+    product_id: Optional[int] = None
+    items: List[PrintJobBatchItem] = Field(..., max_length=500)
+    queued: bool = False
 
 
 class PrintJobResponse(BaseModel):
@@ -103,6 +107,7 @@ class PrintJobResponse(BaseModel):
     quantity: int
     status: PrintJobStatus
     error_message: Optional[str]
+    attempts: int = 0
     product_name: Optional[str]
     sku: Optional[str]
     variant_label: Optional[str]
@@ -126,3 +131,4 @@ class ZplPreviewResponse(BaseModel):
     label_width_mm: int
     label_height_mm: int
     dpi: int
+    cached: bool = False
@@ -0,0 +1,332 @@
+"""
+Scan de IA em lote (cadastro de coleção nova).
+
+Fluxo:
+  1. submit() registra o lote em memória e dispara o processamento em
+     background — o endpoint responde na hora com o batch_id.
+  2. Cada imagem passa por AIScanService.analyze_image (cache, coalescing e
+     limite por provider já aplicados lá), no máximo AI_BATCH_CONCURRENCY
+     ao mesmo tempo somando todos os lotes do worker. Erros transitórios
+     (RuntimeError: timeout, provider fora) são repetidos com backoff até
+     AI_BATCH_MAX_ATTEMPTS.
+  3. Com todas as imagens processadas, a detecção de duplicados roda uma
+     vez para o lote: contra o estoque (índice de fingerprints do tenant,
+     carregado uma vez) e entre as próprias imagens (batch_duplicates).
+     SKUs sugeridos repetidos dentro do lote ganham sufixo.
+  4. Cada mudança acorda quem acompanha o lote (SSE); polling lê o mesmo
+     estado.
+
+O estado vive no worker que recebeu o lote (como o cache do AI Scan) e é
+descartado AI_BATCH_RETENTION_SECONDS após terminar.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import resolve_session_factory
+from app.schemas.ai import BatchDuplicate, ProductScanResult
+from app.services.ai_scan_service import AIScanService
+from app.services.product_fingerprint_service import (
+    FingerprintIndex,
+    ProductFingerprint,
+    ScanQuery,
+    find_duplicate_products,
+    name_ngrams,
+)
+from app.utils.text import normalize_search
+
+logger = logging.getLogger(__name__)
+
+
+class ItemStatus:
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    ERROR = "error"
+
+
+class BatchStatus:
+    PROCESSING = "processing"
+    FINALIZING = "finalizing"
+    DONE = "done"
+
+
+@dataclass
+class BatchItem:
+    index: int
+    filename: str
+    media_type: str
+    image_bytes: Optional[bytes]
+    status: str = ItemStatus.PENDING
+    attempts: int = 0
+    result: Optional[ProductScanResult] = None
+    error: Optional[str] = None
+    batch_duplicates: List[BatchDuplicate] = field(default_factory=list)
+
+
+@dataclass
+class ScanBatch:
+    id: str
+    tenant_id: int
+    user_id: int
+    items: List[BatchItem]
+    context: Optional[str] = None
+    check_duplicates: bool = True
+    suggest_price: bool = True
+    status: str = BatchStatus.PROCESSING
+    created_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    version: int = 0
+
+    @property
+    def completed(self) -> int:
+        return sum(1 for item in self.items if item.status == ItemStatus.DONE)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for item in self.items if item.status == ItemStatus.ERROR)
+
+
+def _batch_fingerprint(item: BatchItem) -> ProductFingerprint:
+    """Fingerprint do resultado de uma imagem (product_id = posição no lote)."""
+    result = item.result
+    name_key = normalize_search(result.name)
+    color, size = normalize_search(result.color), normalize_search(result.size)
+    return ProductFingerprint(
+        product_id=item.index,
+        name=result.name,
+        sku=result.suggested_sku or "",
+        name_key=name_key,
+        brand_key=normalize_search(result.brand),
+        category_id=result.suggested_category_id,
+        colors=frozenset({color} - {""}),
+        sizes=frozenset({size} - {""}),
+        color_sizes=frozenset({(color, size)}) if color and size else frozenset(),
+        grams=name_ngrams(name_key),
+    )
+
+
+class AIBatchScanner:
+    """Lotes de scan em andamento/recentes deste worker."""
+
+    BACKOFF_BASE_SECONDS = 2.0
+    BACKOFF_MAX_SECONDS = 30.0
+
+    def __init__(self, session_factory=None):
+        """
+        Args:
+            session_factory: async_sessionmaker das sessões de cada imagem
+                (padrão: app.core.database.async_session_maker, resolvido a
+                cada uso para respeitar overrides de teste)
+        """
+        self._session_factory = session_factory
+        self._batches: Dict[str, ScanBatch] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _sessions(self):
+        return resolve_session_factory(self._session_factory)
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def submit(
+        self,
+        tenant_id: int,
+        user_id: int,
+        images: List[tuple[str, bytes, str]],
+        *,
+        context: Optional[str] = None,
+        check_duplicates: bool = True,
+        suggest_price: bool = True,
+    ) -> ScanBatch:
+        """Registra o lote [(filename, bytes, media_type)] e inicia o processamento."""
+        if not images:
+            raise ValueError("Envie ao menos uma imagem")
+        if len(images) > settings.AI_BATCH_MAX_IMAGES:
+            raise ValueError(f"Máximo de {settings.AI_BATCH_MAX_IMAGES} imagens por lote")
+        self._purge_finished()
+
+        batch = ScanBatch(
+            id=uuid.uuid4().hex,
+            tenant_id=tenant_id,
+            user_id=user_id,
+            items=[
+                BatchItem(index=i, filename=name, image_bytes=data, media_type=media_type)
+                for i, (name, data, media_type) in enumerate(images)
+            ],
+            context=context,
+            check_duplicates=check_duplicates,
+            suggest_price=suggest_price,
+        )
+        self._batches[batch.id] = batch
+        task = asyncio.create_task(self._run(batch), name=f"ai-batch-{batch.id}")
+        self._tasks[batch.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(batch.id, None))
+        logger.info(f"AI batch {batch.id}: {len(images)} imagens (tenant {tenant_id})")
+        return batch
+
+    def get(self, batch_id: str, tenant_id: int) -> Optional[ScanBatch]:
+        batch = self._batches.get(batch_id)
+        if batch is None or batch.tenant_id != tenant_id:
+            return None
+        return batch
+
+    async def wait_for_update(self, batch_id: str, timeout: float) -> bool:
+        """Espera a próxima mudança do lote. Retorna False no timeout."""
+        event = self._events.setdefault(batch_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def wait_done(self, batch_id: str, timeout: float = 30) -> None:
+        """Aguarda o lote terminar (usado em testes / shutdown)."""
+        task = self._tasks.get(batch_id)
+        if task is not None:
+            await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # Processamento
+    # ------------------------------------------------------------------
+
+    def _publish(self, batch: ScanBatch) -> None:
+        batch.version += 1
+        event = self._events.pop(batch.id, None)
+        if event:
+            event.set()
+
+    def _purge_finished(self) -> None:
+        limit = time.monotonic() - settings.AI_BATCH_RETENTION_SECONDS
+        for batch_id in [
+            b.id for b in self._batches.values() if b.finished_at and b.finished_at < limit
+        ]:
+            self._batches.pop(batch_id, None)
+            self._events.pop(batch_id, None)
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self.BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), self.BACKOFF_MAX_SECONDS)
+
+    async def _run(self, batch: ScanBatch) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.AI_BATCH_CONCURRENCY)
+        try:
+            await asyncio.gather(*(self._scan_item(batch, item) for item in batch.items))
+            batch.status = BatchStatus.FINALIZING
+            self._publish(batch)
+            await self._finalize(batch)
+        except Exception as e:
+            logger.error(f"AI batch {batch.id}: falha ao finalizar: {e}", exc_info=True)
+        finally:
+            batch.status = BatchStatus.DONE
+            batch.finished_at = time.monotonic()
+            self._publish(batch)
+
+    async def _scan_item(self, batch: ScanBatch, item: BatchItem) -> None:
+        while True:
+            async with self._semaphore:
+                item.status = ItemStatus.PROCESSING
+                item.attempts += 1
+                self._publish(batch)
+                try:
+                    async with self._sessions()() as db:
+                        # Duplicados ficam para a etapa única do lote
+                        item.result = await AIScanService(db).analyze_image(
+                            item.image_bytes,
+                            item.media_type,
+                            tenant_id=batch.tenant_id,
+                            check_duplicates=False,
+                            suggest_price=batch.suggest_price,
+                            context=batch.context,
+                        )
+                    item.status = ItemStatus.DONE
+                    item.error = None
+                except RuntimeError as e:
+                    item.error = str(e)
+                    if item.attempts < settings.AI_BATCH_MAX_ATTEMPTS:
+                        item.status = ItemStatus.PENDING
+                    else:
+                        item.status = ItemStatus.ERROR
+                except Exception as e:
+                    # Configuração/validação (ValueError etc.): repetir não resolve
+                    item.error = str(e)
+                    item.status = ItemStatus.ERROR
+            if item.status != ItemStatus.PENDING:
+                break
+            self._publish(batch)
+            # Backoff fora do semáforo: não segura vaga de quem está pronto
+            await asyncio.sleep(self._backoff(item.attempts))
+
+        item.image_bytes = None
+        self._publish(batch)
+
+    async def _finalize(self, batch: ScanBatch) -> None:
+        """Duplicados (estoque + dentro do lote) e SKUs únicos, uma vez para o lote."""
+        done = [item for item in batch.items if item.status == ItemStatus.DONE]
+        if not done:
+            return
+
+        seen_skus: Dict[str, int] = {}
+        for item in done:
+            sku = item.result.suggested_sku
+            if not sku:
+                continue
+            count = seen_skus.get(sku, 0) + 1
+            seen_skus[sku] = count
+            if count > 1:
+                item.result.suggested_sku = f"{sku}-{count}"
+
+        if not batch.check_duplicates:
+            return
+
+        async with self._sessions()() as db:
+            for item in done:
+                result = item.result
+                result.possible_duplicates = await find_duplicate_products(
+                    db, batch.tenant_id, result.name, result.brand, result.color,
+                    result.size, category_id=result.suggested_category_id,
+                )
+                if result.possible_duplicates:
+                    result.warnings.append(
+                        f"Encontrados {len(result.possible_duplicates)} produtos similares"
+                    )
+
+        index = FingerprintIndex([_batch_fingerprint(item) for item in done])
+        by_index = {item.index: item for item in done}
+        for item in done:
+            query = ScanQuery.build(
+                item.result.name, item.result.brand, item.result.color,
+                item.result.size, item.result.suggested_category_id,
+            )
+            matches = [m for m in index.search(query, limit=len(done)) if m.product_id != item.index]
+            item.batch_duplicates = [
+                BatchDuplicate(
+                    index=m.product_id,
+                    filename=by_index[m.product_id].filename,
+                    similarity_score=m.similarity_score,
+                    reason=m.reason,
+                )
+                for m in matches
+            ]
+            if item.batch_duplicates:
+                item.result.warnings.append(
+                    f"Parecido com {len(item.batch_duplicates)} outra(s) imagem(ns) do lote"
+                )
+
+
+ai_batch_scanner = AIBatchScanner()
@@ -8,21 +8,50 @@ import json
 import logging
 import re
 import time
-from typing import Optional, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional, List, Dict, Any, Tuple
 from decimal import Decimal
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_, func
 from sqlalchemy.orm import selectinload
 
+from app.core.ai_scan_cache import ai_scan_cache, scan_cache_key
 from app.core.config import settings
+from app.core.instrumentation import track_external
+from app.core.rate_limit import provider_limiter
 from app.models.product import Product
 from app.models.category import Category
 from app.schemas.ai import ProductScanResult, DuplicateMatch
+from app.services.image_pipeline import image_pipeline
+from app.services.product_fingerprint_service import find_duplicate_products
 
 logger = logging.getLogger(__name__)
 
 
+class CategoryRef(NamedTuple):
+    """Categoria do prompt (snapshot, sem instância ORM compartilhada entre sessões)."""
+    id: int
+    name: str
+
+
+# Os SDKs dos providers são síncronos e a chamada leva segundos: threads
+# próprias, para não esgotar o executor padrão do loop (to_thread) em lotes
+_provider_executor = ThreadPoolExecutor(
+    max_workers=settings.AI_PROVIDER_THREADS,
+    thread_name_prefix="ai-provider",
+)
+
+# Categorias ativas: (expira_em, lista) — mudam raramente, o prompt usa em todo scan
+_category_cache: Optional[Tuple[float, List[CategoryRef]]] = None
+
+
+def reset_category_cache() -> None:
+    """Descarta as categorias em cache (testes / após editar categorias)."""
+    global _category_cache
+    _category_cache = None
+
+
 class AIScanService:
     """Serviço para análise de imagens de produtos com IA."""
 
@@ -255,22 +284,15 @@ Responda APENAS com o JSON, sem texto adicional."""
         categories = await self._get_categories()
         categories_text = ", ".join([c.name for c in categories])
         prompt = self._build_prompt(categories_text, context)
+        model = settings.GEMINI_MODEL if provider == "gemini" else settings.OPENAI_MODEL
+        cache_key = scan_cache_key(tenant_id, image_bytes, prompt, f"{provider}:{model}")
 
         try:
-            if provider == "gemini":
-                response_text = await asyncio.wait_for(
-                    asyncio.to_thread(self._call_gemini, image_bytes, media_type, prompt),
-                    timeout=55.0,
-                )
-                logger.info(f"Gemini response: {response_text[:500]}...")
-            else:
-                response_text = await asyncio.wait_for(
-                    asyncio.to_thread(self._call_openai, image_bytes, media_type, prompt),
-                    timeout=55.0,
-                )
-                logger.info(f"OpenAI response: {response_text[:500]}...")
-
-            ai_data = self._parse_response(response_text)
+            # Mesma foto já analisada (ou em análise) para o tenant: reaproveita a resposta
+            ai_data = await ai_scan_cache.get_or_compute(
+                cache_key,
+                lambda: self._ask_provider(provider, image_bytes, media_type, prompt),
+            )
             result = await self._enrich_result(
                 ai_data, categories, tenant_id, check_duplicates, suggest_price,
             )
@@ -286,6 +308,33 @@ Responda APENAS com o JSON, sem texto adicional."""
             logger.error(f"Error calling {provider} API: {e}", exc_info=True)
             raise RuntimeError(f"Erro ao analisar imagem: {str(e)}")
 
+    async def _ask_provider(
+        self, provider: str, image_bytes: bytes, media_type: str, prompt: str
+    ) -> Dict[str, Any]:
+        """Reduz a imagem, chama o provider e devolve o JSON parseado. Não usa self.db."""
+        if settings.AI_SCAN_MAX_IMAGE_SIDE > 0:
+            original_size = len(image_bytes)
+            image_bytes, media_type = await image_pipeline.downscale(
+                image_bytes, media_type, settings.AI_SCAN_MAX_IMAGE_SIDE,
+            )
+            if len(image_bytes) < original_size:
+                logger.info(f"AI Scan image downscaled: {original_size} -> {len(image_bytes)} bytes")
+
+        waited = await provider_limiter(provider).acquire()
+        if waited:
+            logger.info(f"AI Scan: aguardou {waited:.1f}s pelo limite de chamadas do {provider}")
+
+        loop = asyncio.get_running_loop()
+        call = self._call_gemini if provider == "gemini" else self._call_openai
+        # SDKs síncronos em executor: não passam pelo httpx instrumentado
+        async with track_external(f"ai-{provider}"):
+            response_text = await asyncio.wait_for(
+                loop.run_in_executor(_provider_executor, call, image_bytes, media_type, prompt),
+                timeout=55.0,
+            )
+        logger.info(f"{provider} response: {response_text[:500]}...")
+        return self._parse_response(response_text)
+
     def _build_prompt(self, categories_text: str, context: Optional[str] = None) -> str:
         """Constrói o prompt para a API."""
         prompt = self.SCAN_PROMPT_TEMPLATE.format(categories=categories_text)
@@ -315,16 +364,23 @@ Responda APENAS com o JSON, sem texto adicional."""
             return result[0]
         return result
 
-    async def _get_categories(self) -> List[Category]:
-        """Busca todas as categorias ativas."""
-        stmt = select(Category).where(Category.is_active == True).order_by(Category.name)
+    async def _get_categories(self) -> List[CategoryRef]:
+        """Categorias ativas, em cache por AI_CATEGORY_CACHE_TTL_SECONDS."""
+        global _category_cache
+        now = time.monotonic()
+        if _category_cache is not None and _category_cache[0] > now:
+            return _category_cache[1]
+
+        stmt = select(Category.id, Category.name).where(Category.is_active == True).order_by(Category.name)
         result = await self.db.execute(stmt)
-        return list(result.scalars().all())
+        categories = [CategoryRef(row.id, row.name) for row in result.all()]
+        _category_cache = (now + settings.AI_CATEGORY_CACHE_TTL_SECONDS, categories)
+        return categories
 
     async def _enrich_result(
         self,
         ai_data: Dict[str, Any],
-        categories: List[Category],
+        categories: List[CategoryRef],
         tenant_id: int,
         check_duplicates: bool,
         suggest_price: bool,
@@ -435,7 +491,7 @@ Responda APENAS com o JSON, sem texto adicional."""
     def _match_category(
         self,
         suggested_name: str,
-        categories: List[Category]
+        categories: List[CategoryRef]
     ) -> tuple[Optional[int], str]:
         """
         Casa a categoria sugerida com uma categoria existente.
@@ -559,13 +615,16 @@ Responda APENAS com o JSON, sem texto adicional."""
         category_id: Optional[int] = None,
     ) -> List[DuplicateMatch]:
         """
-        Busca produtos similares no banco usando múltiplas estratégias.
+        Busca produtos similares no índice de fingerprints do tenant.
+
+        Regras de score (ver product_fingerprint_service.score_fingerprint):
+        1. Marca + cor + tamanho na mesma variante (95%)
+        2. Marca + cor OU marca + tamanho (85%)
+        3. Mesma categoria + cor + tamanho (80%)
+        4. Nome similar ponderado com marca/cor/tamanho (mínimo 50%)
 
-        Estratégias de busca (em ordem de prioridade):
-        1. Combinação exata: marca + cor + tamanho (95% match)
-        2. Combinação parcial: marca + cor OU marca + tamanho (85% match)
-        3. Mesma categoria + cor + tamanho (80% match)
-        4. Nome similar (fallback)
+        O índice fica em memória por versão do catálogo: com ele válido, a
+        checagem custa uma consulta.
 
         Args:
             name: Nome do produto
@@ -577,207 +636,17 @@ Responda APENAS com o JSON, sem texto adicional."""
             category_id: ID da categoria (opcional)
 
         Returns:
-            Lista de possíveis duplicados
+            Até 5 possíveis duplicados, maior score primeiro
         """
-        duplicates: List[DuplicateMatch] = []
-        seen_ids: set = set()  # Evitar duplicatas na lista
-
-        def add_duplicate(product: Product, score: float, reason: str):
-            """Helper para adicionar duplicado evitando repetições."""
-            if product.id not in seen_ids:
-                seen_ids.add(product.id)
-                total_stock = sum(inv.quantity for inv in (product.inventory or []))
-                
-                # Buscar custo da primeira variante ativa
-                variant_cost = None
-                for variant in product.variants:
-                    if variant.is_active and variant.cost_price:
-                        variant_cost = float(variant.cost_price)
-                        break
-                
-                duplicates.append(DuplicateMatch(
-                    product_id=product.id,
-                    product_name=product.name,
-                    sku=product.sku,
-                    similarity_score=score,
-                    reason=reason,
-                    current_stock=total_stock,
-                    cost_price=variant_cost,
-                ))
-
-        base_conditions = [
-            Product.tenant_id == tenant_id,
-            Product.is_active == True,
-        ]
-
-        # ESTRATÉGIA 1: Combinação exata marca + cor + tamanho (95%)
-        # NOTA: Busca por código de barras removida pois Product.barcode é uma property que sempre retorna None
-        # NOTA: color e size são properties do Product, precisamos buscar via variantes
-        if brand and color and size and len(duplicates) < 5:
-            stmt = select(Product).options(
-                selectinload(Product.variants),
-                selectinload(Product.inventory),
-            ).where(
-                *base_conditions,
-                func.lower(Product.brand) == brand.lower(),
-            ).limit(10)
-            result = await self.db.execute(stmt)
-
-            for product in result.scalars().all():
-                # Buscar nas variantes por cor e tamanho
-                for variant in product.variants:
-                    if not variant.is_active:
-                        continue
-                    if (variant.color and variant.color.lower() == color.lower() and
-                        variant.size and variant.size.lower() == size.lower()):
-                        add_duplicate(product, 0.95, "Mesma marca, cor e tamanho")
-                        break
-
-        # ESTRATÉGIA 3a: Marca + cor (sem tamanho) - 85%
-        if brand and color and len(duplicates) < 5:
-            stmt = select(Product).options(
-                selectinload(Product.variants),
-                selectinload(Product.inventory),
-            ).where(
-                *base_conditions,
-                func.lower(Product.brand) == brand.lower(),
-            ).limit(10)
-            result = await self.db.execute(stmt)
-
-            for product in result.scalars().all():
-                # Buscar nas variantes por cor
-                for variant in product.variants:
-                    if not variant.is_active:
-                        continue
-                    if variant.color and variant.color.lower() == color.lower():
-                        add_duplicate(product, 0.85, "Mesma marca e cor")
-                        break
-
-        # ESTRATÉGIA 3b: Marca + tamanho (sem cor) - 85%
-        if brand and size and len(duplicates) < 5:
-            stmt = select(Product).options(
-                selectinload(Product.variants),
-                selectinload(Product.inventory),
-            ).where(
-                *base_conditions,
-                func.lower(Product.brand) == brand.lower(),
-            ).limit(10)
-            result = await self.db.execute(stmt)
-
-            for product in result.scalars().all():
-                # Buscar nas variantes por tamanho
-                for variant in product.variants:
-                    if not variant.is_active:
-                        continue
-                    if variant.size and variant.size.lower() == size.lower():
-                        add_duplicate(product, 0.85, "Mesma marca e tamanho")
-                        break
-
-        # ESTRATÉGIA 4: Categoria + cor + tamanho (80%)
-        if category_id and color and size and len(duplicates) < 5:
-            stmt = select(Product).options(
-                selectinload(Product.variants),
-                selectinload(Product.inventory),
-            ).where(
-                *base_conditions,
-                Product.category_id == category_id,
-            ).limit(10)
-            result = await self.db.execute(stmt)
-
-            for product in result.scalars().all():
-                # Buscar nas variantes por cor e tamanho
-                for variant in product.variants:
-                    if not variant.is_active:
-                        continue
-                    if (variant.color and variant.color.lower() == color.lower() and
-                        variant.size and variant.size.lower() == size.lower()):
-                        add_duplicate(product, 0.80, "Mesma categoria, cor e tamanho")
-                        break
-
-        # ESTRATÉGIA 5: Nome similar (fallback)
-        if name and len(duplicates) < 5:
-            # Buscar por palavras-chave do nome (mais flexível que substring)
-            name_words = [w.lower() for w in name.split() if len(w) > 3][:3]
-
-            if name_words:
-                # Busca por cada palavra-chave
-                for keyword in name_words:
-                    if len(duplicates) >= 5:
-                        break
-
-                    search_pattern = f"%{keyword}%"
-                    stmt = select(Product).options(
-                        selectinload(Product.variants),
-                        selectinload(Product.inventory),
-                    ).where(
-                        *base_conditions,
-                        Product.name.ilike(search_pattern),
-                    ).limit(5)
-
-                    result = await self.db.execute(stmt)
-
-                    for product in result.scalars().all():
-                        score = self._calculate_similarity(
-                            name, brand, color, size,
-                            product.name, product.brand, product.color, product.size,
-                        )
-
-                        if score >= 0.5:  # Threshold mais baixo para nome
-                            reason_parts = []
-                            if name.lower() in product.name.lower() or product.name.lower() in name.lower():
-                                reason_parts.append("Nome similar")
-                            if brand and product.brand and brand.lower() == product.brand.lower():
-                                reason_parts.append("Mesma marca")
-                            if color and product.color and color.lower() == product.color.lower():
-                                reason_parts.append("Mesma cor")
-                            if size and product.size and size.lower() == product.size.lower():
-                                reason_parts.append("Mesmo tamanho")
-
-                            add_duplicate(product, score, ", ".join(reason_parts) or "Produto similar")
-
-        # Ordenar por score (maior primeiro)
-        duplicates.sort(key=lambda d: d.similarity_score, reverse=True)
+        duplicates = await find_duplicate_products(
+            self.db, tenant_id, name, brand, color, size, category_id=category_id,
+        )
 
         # Log para debug
         if duplicates:
             logger.info(f"Found {len(duplicates)} potential duplicates: {[d.product_name for d in duplicates]}")
 
-        return duplicates[:5]
-
-    def _calculate_similarity(
-        self,
-        name1: str, brand1: Optional[str], color1: Optional[str], size1: Optional[str],
-        name2: str, brand2: Optional[str], color2: Optional[str], size2: Optional[str],
-    ) -> float:
-        """Calcula score de similaridade entre dois produtos."""
-        score = 0.0
-        weights = {"name": 0.4, "brand": 0.3, "color": 0.15, "size": 0.15}
-
-        # Nome (40%)
-        if name1 and name2:
-            name1_lower = name1.lower()
-            name2_lower = name2.lower()
-            if name1_lower == name2_lower:
-                score += weights["name"]
-            elif name1_lower in name2_lower or name2_lower in name1_lower:
-                score += weights["name"] * 0.8
-
-        # Marca (30%)
-        if brand1 and brand2:
-            if brand1.lower() == brand2.lower():
-                score += weights["brand"]
-
-        # Cor (15%)
-        if color1 and color2:
-            if color1.lower() == color2.lower():
-                score += weights["color"]
-
-        # Tamanho (15%)
-        if size1 and size2:
-            if size1.upper() == size2.upper():
-                score += weights["size"]
-
-        return min(score, 1.0)
+        return duplicates
 
     async def _suggest_pricing(
         self,
@@ -1,15 +1,138 @@
 """
 Serviço central de audit log.
 Chamado nos pontos críticos do sistema para registrar ações.
+
+Dois modos de gravação:
+  - Bufferizado (padrão): o evento vai para a fila em memória do
+    audit_writer e é gravado em INSERTs multi-linha, a cada
+    AUDIT_FLUSH_INTERVAL_SECONDS ou ao atingir AUDIT_FLUSH_BATCH_SIZE, numa
+    sessão própria — sem round trip na transação de negócio e sem depender
+    do commit dela (ex: LOGIN_FAILED, que termina em 401).
+  - Durável (DURABLE_ACTIONS ou durable=True): add + flush na sessão do
+    chamador, atômico com a operação (movimentações de dinheiro).
+
+Sem o writer iniciado (scripts, testes), todos os eventos usam o modo durável.
 """
+import asyncio
 import json
 import logging
-from typing import Any, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import resolve_session_factory
 from app.models.audit_log import AuditLog
 
 logger = logging.getLogger(__name__)
 
+# Ações gravadas na mesma transação da operação (estorno/confirmação de pagamento)
+DURABLE_ACTIONS = frozenset({
+    "PDV_SALE_CONFIRMED", "PDV_SALE_CANCELLED", "PDV_SALE_REFUNDED", "PDV_MANUAL_CONFIRMED",
+    "PIX_SALE_CONFIRMED", "PIX_SALE_CANCELLED", "PIX_SALE_REFUNDED", "PIX_REFUNDED",
+    "CIELO_PIX_CONFIRMED", "CIELO_PIX_REFUNDED", "CIELO_PIX_REFUNDED_SALE",
+    "SALE_CANCELLED",
+})
+
+
+class AuditLogWriter:
+    """Fila em memória de eventos de auditoria, gravada em lotes em background."""
+
+    def __init__(
+        self,
+        session_factory=None,
+        interval_seconds: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_buffer: Optional[int] = None,
+    ):
+        """
+        Args:
+            session_factory: async_sessionmaker para os flushes (padrão:
+                app.core.database.async_session_maker, resolvido a cada uso)
+        """
+        self._session_factory = session_factory
+        self.interval_seconds = interval_seconds or settings.AUDIT_FLUSH_INTERVAL_SECONDS
+        self.batch_size = batch_size or settings.AUDIT_FLUSH_BATCH_SIZE
+        self.max_buffer = max_buffer or settings.AUDIT_MAX_BUFFER
+        self._buffer: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.dropped = 0
+
+    def _sessions(self):
+        return resolve_session_factory(self._session_factory)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run(), name="audit-log-writer")
+
+    async def stop(self) -> None:
+        """Para o loop e grava o que restou na fila."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+
+    def enqueue(self, row: Dict[str, Any]) -> None:
+        if len(self._buffer) >= self.max_buffer:
+            # Banco fora do ar por muito tempo: descarta o mais antigo, nunca bloqueia
+            self._buffer.pop(0)
+            self.dropped += 1
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def flush(self) -> int:
+        """Grava a fila atual em INSERTs multi-linha. Retorna quantos eventos gravou."""
+        if not self._buffer:
+            return 0
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            rows, self._buffer = self._buffer, []
+            written = 0
+            try:
+                async with self._sessions()() as db:
+                    for start in range(0, len(rows), self.batch_size):
+                        await db.execute(insert(AuditLog), rows[start:start + self.batch_size])
+                        written += min(self.batch_size, len(rows) - start)
+                    await db.commit()
+            except Exception as e:
+                # Devolve para a fila (à frente dos novos) e tenta no próximo ciclo
+                logger.warning(f"AuditLog: falha ao gravar {len(rows)} evento(s): {e}")
+                self._buffer[:0] = rows
+                overflow = len(self._buffer) - self.max_buffer
+                if overflow > 0:
+                    del self._buffer[:overflow]
+                    self.dropped += overflow
+                return 0
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+audit_writer = AuditLogWriter()
+
 
 class AuditService:
     @staticmethod
@@ -24,11 +147,18 @@ class AuditService:
         entity_id: Optional[int] = None,
         detail: Optional[Any] = None,
         ip_address: Optional[str] = None,
+        durable: Optional[bool] = None,
     ) -> None:
-        """Registra uma ação crítica. Falhas são silenciosas para não bloquear o fluxo."""
+        """
+        Registra uma ação crítica. Falhas são silenciosas para não bloquear o fluxo.
+
+        Args:
+            durable: True grava na transação do chamador; None decide por
+                DURABLE_ACTIONS; False usa a fila do audit_writer
+        """
         try:
             detail_str = json.dumps(detail, default=str) if detail and not isinstance(detail, str) else detail
-            entry = AuditLog(
+            row = dict(
                 tenant_id=tenant_id,
                 user_id=user_id,
                 user_email=user_email,
@@ -37,8 +167,15 @@ class AuditService:
                 entity_id=entity_id,
                 detail=detail_str,
                 ip_address=ip_address,
+                created_at=datetime.utcnow(),
             )
-            db.add(entry)
+            if durable is None:
+                durable = action in DURABLE_ACTIONS
+            if not durable and audit_writer.running:
+                audit_writer.enqueue(row)
+                return
+
+            db.add(AuditLog(**row))
             await db.flush()
         except Exception as e:
             logger.warning(f"AuditLog falhou (não crítico): {e}")
@@ -6,7 +6,8 @@ from typing import Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.security import create_access_token, get_password_hash_async, verify_password_async
+from app.core.user_cache import bump_token_version
 from app.models.user import User
 from app.models.refresh_token import RefreshToken
 from app.repositories.user_repository import UserRepository
@@ -33,7 +34,7 @@ class AuthService:
         existing_user = await self.user_repo.get_by_email(user_data.email)
         if existing_user:
             raise ValueError("Email já cadastrado")
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         user_dict = user_data.model_dump(exclude={'password'})
         user_dict['hashed_password'] = hashed_password
         return await self.user_repo.create(user_dict)
@@ -44,7 +45,7 @@ class AuthService:
         user = await self.user_repo.get_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         if not user.is_active:
             return None
@@ -59,6 +60,7 @@ class AuthService:
                 "sub": str(user.id),
                 "role": user.role.value,
                 "tenant_id": user.tenant_id,
+                "tv": user.token_version or 0,
             },
             expires_delta=timedelta(minutes=ACCESS_TOKEN_MINUTES),
         )
@@ -168,7 +170,8 @@ class AuthService:
             await self._revoke_token(record)
 
     async def revoke_all_user_sessions(self, user_id: int) -> None:
-        """Revoga todas as sessões do usuário (troca de senha, etc.)."""
+        """Revoga todas as sessões do usuário (troca de senha, etc.) e seus access tokens."""
+        await bump_token_version(self.db, user_id)
         await self.db.execute(
             delete(RefreshToken).where(
                 RefreshToken.user_id == user_id,
@@ -203,9 +206,9 @@ class AuthService:
         user = await self.user_repo.get(self.db, user_id)
         if not user:
             raise ValueError("Usuário não encontrado")
-        if not verify_password(current_password, user.hashed_password):
+        if not await verify_password_async(current_password, user.hashed_password):
             raise ValueError("Senha atual incorreta")
-        await self.user_repo.update(self.db, user_id, {"hashed_password": get_password_hash(new_password)})
+        await self.user_repo.update(self.db, user_id, {"hashed_password": await get_password_hash_async(new_password)})
         # Revogar todas as sessões ao trocar senha
         await self.revoke_all_user_sessions(user_id)
         return True
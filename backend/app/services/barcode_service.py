@@ -15,9 +15,11 @@ Exemplo: 7890100000015
 import logging
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
+from app.core.config import settings
 from app.models.product import Product
+from app.services.sequence_service import SequenceKind, SequenceService
 
 logger = logging.getLogger(__name__)
 
@@ -80,7 +82,10 @@ class BarcodeService:
         """
         Obtém o próximo número sequencial para o tenant.
 
-        Busca o maior barcode existente do tenant e incrementa.
+        Alocado atomicamente em sequence_counters (UPDATE ... RETURNING),
+        sem corrida entre gerações concorrentes. Product.barcode é apenas
+        uma propriedade legada (a coluna não existe mais), então o contador
+        é a única fonte da numeração.
 
         Args:
             tenant_id: ID do tenant
@@ -88,30 +93,15 @@ class BarcodeService:
         Returns:
             Próximo número sequencial
         """
-        # Prefixo do tenant (ex: 78901 para tenant 1)
-        tenant_prefix = f"{self.PREFIX}{tenant_id:02d}"
+        tenant_prefix = f"{self.PREFIX}{tenant_id % 100:02d}"
 
-        # Buscar o maior barcode do tenant que começa com o prefixo
-        stmt = select(func.max(Product.barcode)).where(
-            Product.tenant_id == tenant_id,
-            Product.barcode.ilike(f"{tenant_prefix}%"),
-            Product.is_active == True,
+        return await SequenceService(self.db).next_value(
+            tenant_id,
+            SequenceKind.BARCODE,
+            tenant_prefix,
+            block_size=settings.BARCODE_SEQUENCE_BLOCK_SIZE,
         )
 
-        result = await self.db.execute(stmt)
-        max_barcode = result.scalar()
-
-        if max_barcode and len(max_barcode) == 13:
-            # Extrair a parte sequencial (posições 5-11, 7 dígitos)
-            try:
-                current_seq = int(max_barcode[5:12])
-                return current_seq + 1
-            except ValueError:
-                pass
-
-        # Começar do 1 se não houver barcodes
-        return 1
-
     async def generate_barcode(self, tenant_id: int, product_id: Optional[int] = None) -> str:
         """
         Gera um novo código de barras EAN-13 único.
@@ -177,7 +167,8 @@ class BarcodeService:
         """
         Gera um código de barras garantidamente único.
 
-        Tenta gerar até max_attempts vezes, incrementando o sequencial.
+        O sequencial já é exclusivo; a verificação protege apenas contra
+        códigos cadastrados manualmente no intervalo do tenant.
 
         Args:
             tenant_id: ID do tenant
@@ -0,0 +1,427 @@
+"""
+Projeção do catálogo público (tabela public_catalog_items).
+
+A vitrine lê uma linha pronta por produto — preço mínimo, in_stock,
+tamanhos, cores, capa e categoria — em vez de agregar variantes e estoque
+a cada requisição. A listagem vira um scan do índice
+(tenant_id, in_stock, name).
+
+Atualização incremental:
+  - Hooks de sessão (install_catalog_projection_hooks) registram, em cada
+    flush, os produtos tocados por mudanças em Product, ProductVariant ou
+    Category; o ledger de estoque (stock_ledger_service) marca as
+    variantes cujo saldo mudou (mark_catalog_variants_sync).
+  - No commit, só as linhas desses produtos são recalculadas, na mesma
+    transação — a projeção nunca fica à frente nem atrás dos dados.
+  - rebuild_all() reconstrói tudo (backfill após a migration e job de
+    reconciliação para escritas que não passam pelo ORM, ex: SQL textual).
+
+Versão do catálogo: o mesmo commit incrementa o contador
+(tenant, "catalog_version") em sequence_counters dos tenants afetados —
+inclusive por mudanças em mídia e looks — com um UPDATE atômico emitido
+como último statement da transação: o lock da linha do contador dura só
+até o COMMIT, sem conexão extra. O cache HTTP da vitrine
+(app/core/public_cache.py) usa essa versão nos ETags; como ela vive no
+banco, a invalidação vale para todos os workers.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.catalog_projection import PublicCatalogItem
+from app.models.category import Category
+from app.models.look import Look, LookItem
+from app.models.product import Product
+from app.models.product_media import ProductMedia
+from app.models.product_variant import ProductVariant
+from app.models.sequence_counter import SequenceCounter
+from app.models.variant_stock import VariantStock
+from app.services.sequence_service import SequenceKind
+from app.utils.text import normalize_search
+
+logger = logging.getLogger(__name__)
+
+REFRESH_CHUNK_SIZE = 500
+
+# Chaves em session.info com o que mudou desde o último commit
+_DIRTY_PRODUCTS = "catalog_dirty_products"
+_DIRTY_VARIANTS = "catalog_dirty_variants"
+_DIRTY_CATEGORIES = "catalog_dirty_categories"
+_DIRTY_TENANTS = "catalog_dirty_tenants"
+_DIRTY_KEYS = (_DIRTY_PRODUCTS, _DIRTY_VARIANTS, _DIRTY_CATEGORIES, _DIRTY_TENANTS)
+
+
+# ============================================================================
+# Recalcular linhas (síncrono — roda dentro de run_sync ou do hook de commit)
+# ============================================================================
+
+def _chunks(ids: List[int]) -> Iterable[List[int]]:
+    for start in range(0, len(ids), REFRESH_CHUNK_SIZE):
+        yield ids[start:start + REFRESH_CHUNK_SIZE]
+
+
+def refresh_products_sync(session: Session, product_ids: Iterable[int]) -> int:
+    """
+    Recalcula as linhas da projeção dos produtos informados.
+
+    Produtos inativos, fora do catálogo ou removidos saem da projeção.
+
+    Returns:
+        Quantidade de produtos publicados após o refresh
+    """
+    ids = sorted({pid for pid in product_ids if pid})
+    published = 0
+    for chunk in _chunks(ids):
+        published += _refresh_chunk(session, chunk)
+    return published
+
+
+def _refresh_chunk(session: Session, product_ids: List[int]) -> int:
+    products = session.execute(
+        select(
+            Product.id, Product.tenant_id, Product.name, Product.base_price,
+            Product.image_url, Product.category_id, Category.name,
+            Product.description, Product.brand, Product.gender, Product.material,
+            Product.created_at,
+        )
+        .outerjoin(Category, Category.id == Product.category_id)
+        .where(
+            Product.id.in_(product_ids),
+            Product.tenant_id.isnot(None),
+            Product.is_active == True,
+            Product.is_catalog == True,
+        )
+    ).all()
+
+    session.execute(
+        delete(PublicCatalogItem)
+        .where(PublicCatalogItem.product_id.in_(product_ids))
+        .execution_options(synchronize_session=False)
+    )
+    if not products:
+        return 0
+
+    published_ids = [p[0] for p in products]
+    prices: dict[int, list] = defaultdict(list)
+    sizes: dict[int, set] = defaultdict(set)
+    colors: dict[int, set] = defaultdict(set)
+    variant_count: dict[int, int] = defaultdict(int)
+
+    for product_id, price, size, color in session.execute(
+        select(ProductVariant.product_id, ProductVariant.price, ProductVariant.size, ProductVariant.color)
+        .where(ProductVariant.product_id.in_(published_ids), ProductVariant.is_active == True)
+    ):
+        variant_count[product_id] += 1
+        if price is not None:
+            prices[product_id].append(price)
+        if size is not None:
+            sizes[product_id].add(size)
+        if color is not None:
+            colors[product_id].add(color)
+
+    stock: dict[int, int] = defaultdict(int)
+    stock_sizes: dict[int, set] = defaultdict(set)
+    for product_id, size, quantity in session.execute(
+        select(ProductVariant.product_id, ProductVariant.size, VariantStock.on_hand)
+        .join(VariantStock, VariantStock.variant_id == ProductVariant.id)
+        .where(ProductVariant.product_id.in_(published_ids), ProductVariant.is_active == True)
+    ):
+        stock[product_id] += quantity or 0
+        if (quantity or 0) > 0 and size is not None:
+            stock_sizes[product_id].add(size)
+
+    now = datetime.utcnow()
+    rows = []
+    for (pid, tenant_id, name, base_price, image_url, category_id, category_name,
+         description, brand, gender, material, created_at) in products:
+        sale_price = min(prices[pid]) if prices[pid] else (base_price or Decimal("0"))
+        rows.append({
+            "product_id": pid,
+            "tenant_id": tenant_id,
+            "name": name,
+            "sale_price": sale_price,
+            "image_url": image_url,
+            "category_id": category_id,
+            "category_name": category_name,
+            "in_stock": (stock.get(pid) or 0) > 0,
+            "variant_count": variant_count[pid],
+            "sizes": sorted(sizes[pid]),
+            "colors": sorted(colors[pid]),
+            "stock_sizes": sorted(stock_sizes[pid]),
+            "search_text": normalize_search(" ".join(filter(None, (name, brand, category_name))))[:500],
+            "description": description,
+            "brand": brand,
+            "gender": gender,
+            "material": material,
+            "created_at": created_at,
+            "refreshed_at": now,
+        })
+    session.execute(insert(PublicCatalogItem), rows)
+    return len(rows)
+
+
+def bump_catalog_versions_sync(conn: Connection, tenant_ids: Iterable[int]) -> None:
+    """
+    Incrementa a versão do catálogo público dos tenants.
+
+    UPDATE atômico "last_value + 1"; só tenants sem contador ainda (primeira
+    mudança do catálogo) passam pelo upsert.
+    """
+    ids = sorted({t for t in tenant_ids if t})
+    if not ids:
+        return
+    now = datetime.utcnow()
+    is_counter = (
+        SequenceCounter.kind == SequenceKind.CATALOG_VERSION,
+        SequenceCounter.prefix == "",
+    )
+    result = conn.execute(
+        update(SequenceCounter)
+        .where(SequenceCounter.tenant_id.in_(ids), *is_counter)
+        .values(last_value=SequenceCounter.last_value + 1, updated_at=now)
+    )
+    if result.rowcount == len(ids):
+        return
+    existing = set(conn.execute(
+        select(SequenceCounter.tenant_id).where(SequenceCounter.tenant_id.in_(ids), *is_counter)
+    ).scalars())
+    rows = [
+        {"tenant_id": tid, "kind": SequenceKind.CATALOG_VERSION, "prefix": "",
+         "last_value": 1, "updated_at": now}
+        for tid in ids if tid not in existing
+    ]
+    if not rows:
+        return
+    insert_fn = pg_insert if conn.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert_fn(SequenceCounter).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "kind", "prefix"],
+        set_={
+            "last_value": SequenceCounter.last_value + 1,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    conn.execute(stmt)
+
+
+def _resolve_dirty_products(session: Session) -> Set[int]:
+    """Converte variantes/categorias alteradas nos produtos afetados."""
+    product_ids = set(session.info.pop(_DIRTY_PRODUCTS, ()))
+    variant_ids = session.info.pop(_DIRTY_VARIANTS, set())
+    category_ids = session.info.pop(_DIRTY_CATEGORIES, set())
+
+    for chunk in _chunks(sorted(variant_ids)):
+        product_ids.update(session.execute(
+            select(ProductVariant.product_id).where(ProductVariant.id.in_(chunk))
+        ).scalars())
+    for chunk in _chunks(sorted(category_ids)):
+        product_ids.update(session.execute(
+            select(Product.id).where(Product.category_id.in_(chunk))
+        ).scalars())
+    return product_ids
+
+
+# ============================================================================
+# Hooks de sessão
+# ============================================================================
+
+def _track_flush(session: Session, flush_context) -> None:
+    """after_flush: anota os produtos tocados por objetos novos/alterados/removidos."""
+    products = session.info.setdefault(_DIRTY_PRODUCTS, set())
+    categories = session.info.setdefault(_DIRTY_CATEGORIES, set())
+    tenants = session.info.setdefault(_DIRTY_TENANTS, set())
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Product):
+            products.add(obj.id)
+        elif isinstance(obj, (ProductVariant, ProductMedia)):
+            products.add(obj.product_id)
+        elif isinstance(obj, (Look, LookItem)):
+            tenants.add(obj.tenant_id)
+        elif isinstance(obj, Category):
+            categories.add(obj.id)
+
+
+def _refresh_before_commit(session: Session) -> None:
+    """before_commit: recalcula as linhas sujas dentro da transação que está fechando."""
+    # O commit só faz o flush depois deste hook — antecipa para ver as mudanças pendentes
+    session.flush()
+    if not any(session.info.get(key) for key in _DIRTY_KEYS):
+        return
+    tenant_ids = set(session.info.pop(_DIRTY_TENANTS, ()))
+    product_ids = _resolve_dirty_products(session)
+    if product_ids:
+        refresh_products_sync(session, product_ids)
+        for chunk in _chunks(sorted(product_ids)):
+            tenant_ids.update(session.execute(
+                select(Product.tenant_id).where(Product.id.in_(chunk)).distinct()
+            ).scalars())
+    # Último statement antes do COMMIT: o lock da linha do contador dura o mínimo
+    bump_catalog_versions_sync(session.connection(), tenant_ids)
+
+
+def _discard_dirty(session: Session, *args) -> None:
+    for key in _DIRTY_KEYS:
+        session.info.pop(key, None)
+
+
+def mark_catalog_variants_sync(session: Session, variant_ids: Iterable[int]) -> None:
+    """Marca variantes cujo saldo mudou (ledger de estoque); o commit recalcula seus produtos."""
+    session.info.setdefault(_DIRTY_VARIANTS, set()).update(v for v in variant_ids if v)
+
+
+def mark_catalog_changed(
+    db: AsyncSession,
+    product_ids: Iterable[int] = (),
+    tenant_ids: Iterable[int] = (),
+) -> None:
+    """
+    Marca produtos/tenants como alterados por escritas fora do ORM
+    (UPDATE em massa); o próximo commit da sessão atualiza projeção e versão.
+    """
+    info = db.sync_session.info
+    info.setdefault(_DIRTY_PRODUCTS, set()).update(product_ids)
+    info.setdefault(_DIRTY_TENANTS, set()).update(tenant_ids)
+
+
+def install_catalog_projection_hooks() -> None:
+    """Registra os hooks em todas as sessões (idempotente)."""
+    if event.contains(Session, "after_flush", _track_flush):
+        return
+    event.listen(Session, "after_flush", _track_flush)
+    event.listen(Session, "before_commit", _refresh_before_commit)
+    event.listen(Session, "after_rollback", _discard_dirty)
+
+
+# ============================================================================
+# API assíncrona
+# ============================================================================
+
+def _where_search(q, term: Optional[str]):
+    """Filtro sem acento/caixa: cada palavra do termo precisa estar em search_text."""
+    for word in normalize_search(term).split():
+        # normalize_search só deixa [a-z0-9]: não há curingas de LIKE para escapar
+        q = q.where(PublicCatalogItem.search_text.like(f"%{word}%"))
+    return q
+
+
+class CatalogProjectionService:
+    """Leitura e manutenção da projeção do catálogo público."""
+
+    def __init__(self, db: AsyncSession):
+        """
+        Args:
+            db: Sessão assíncrona do banco de dados
+        """
+        self.db = db
+
+    async def refresh_products(self, product_ids: Iterable[int]) -> int:
+        """Recalcula as linhas dos produtos na transação atual."""
+        ids = list(product_ids)
+        return await self.db.run_sync(lambda session: refresh_products_sync(session, ids))
+
+    async def rebuild_all(self, tenant_id: Optional[int] = None) -> int:
+        """
+        Reconstrói a projeção (backfill / reconciliação).
+
+        Também remove linhas de produtos que deixaram de existir.
+        """
+        q = select(Product.id)
+        stale = select(PublicCatalogItem.product_id)
+        if tenant_id is not None:
+            q = q.where(Product.tenant_id == tenant_id)
+            stale = stale.where(PublicCatalogItem.tenant_id == tenant_id)
+
+        product_ids = set((await self.db.execute(q)).scalars().all())
+        product_ids.update((await self.db.execute(stale)).scalars().all())
+        published = await self.refresh_products(product_ids)
+
+        tenants = {tenant_id} if tenant_id is not None else set(
+            (await self.db.execute(select(Product.tenant_id).distinct())).scalars().all()
+        )
+        # A versão sobe no commit de quem chamou
+        mark_catalog_changed(self.db, tenant_ids=tenants)
+        logger.info(f"Catalog projection rebuilt: tenant={tenant_id} published={published}")
+        return published
+
+    async def get_version(self, tenant_id: int) -> Tuple[int, Optional[datetime]]:
+        """Versão atual do catálogo do tenant: (versão, última alteração)."""
+        row = (await self.db.execute(
+            select(SequenceCounter.last_value, SequenceCounter.updated_at).where(
+                SequenceCounter.tenant_id == tenant_id,
+                SequenceCounter.kind == SequenceKind.CATALOG_VERSION,
+                SequenceCounter.prefix == "",
+            )
+        )).first()
+        return (row[0], row[1]) if row else (0, None)
+
+    async def is_empty(self) -> bool:
+        row = await self.db.execute(select(PublicCatalogItem.product_id).limit(1))
+        return row.first() is None
+
+    async def list_products(
+        self,
+        tenant_id: int,
+        skip: int = 0,
+        limit: int = 50,
+        category_id: Optional[int] = None,
+        search: Optional[str] = None,
+    ) -> List[PublicCatalogItem]:
+        """Página da vitrine: em estoque primeiro, depois por nome."""
+        q = select(PublicCatalogItem).where(PublicCatalogItem.tenant_id == tenant_id)
+        if category_id is not None:
+            q = q.where(PublicCatalogItem.category_id == category_id)
+        q = _where_search(q, search)
+        q = (
+            q.order_by(PublicCatalogItem.in_stock.desc(), PublicCatalogItem.name)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self.db.execute(q)
+        return list(result.scalars().all())
+
+    async def search_in_stock(self, tenant_id: int, term: str, limit: int = 5) -> List[PublicCatalogItem]:
+        """Produtos com estoque cujo nome/marca/categoria contém todas as palavras do termo."""
+        if not normalize_search(term):
+            return []
+        q = select(PublicCatalogItem).where(
+            PublicCatalogItem.tenant_id == tenant_id,
+            PublicCatalogItem.in_stock == True,
+        )
+        q = _where_search(q, term).order_by(PublicCatalogItem.name).limit(limit)
+        result = await self.db.execute(q)
+        return list(result.scalars().all())
+
+    async def get_product(self, tenant_id: int, product_id: int) -> Optional[PublicCatalogItem]:
+        result = await self.db.execute(
+            select(PublicCatalogItem).where(
+                PublicCatalogItem.product_id == product_id,
+                PublicCatalogItem.tenant_id == tenant_id,
+            )
+        )
+        return result.scalar_one_or_none()
+
+
+async def ensure_catalog_projection() -> None:
+    """Popula a projeção se estiver vazia (primeiro boot após a migration)."""
+    from app.core.database import async_session_maker
+
+    try:
+        async with async_session_maker() as db:
+            service = CatalogProjectionService(db)
+            if await service.is_empty():
+                await service.rebuild_all()
+                await db.commit()
+    except Exception as e:
+        logger.error(f"Catalog projection backfill failed: {e}", exc_info=True)
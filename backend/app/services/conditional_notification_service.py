@@ -1,14 +1,61 @@
 """
 Serviço de notificações agendadas para envios condicionais
+
+Notificações de SLA (5 min antes da saída, 15 min antes do retorno) são
+agendadas pelo horário exato: ao criar, enviar, protelar ou cancelar um
+envio, schedule_sla_notifications grava/atualiza uma linha por tipo em
+sla_notifications (due_at = instante do SLA - antecedência). O
+sla_dispatcher dorme até o próximo due_at e chama
+check_and_send_sla_notifications, que reivindica as linhas vencidas com um
+UPDATE atômico — cada notificação sai uma vez, mesmo com vários workers ou
+com o dispatcher atrasado.
 """
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select, update
+from app.core.config import settings
 from app.models.conditional_shipment import ConditionalShipment
 from app.models.enums import ShipmentStatus
+from app.models.sla_notification import SLANotification, SLANotificationKind, SLANotificationStatus
 from app.services.notification_service import NotificationService
 from app.repositories.conditional_shipment import ConditionalShipmentRepository
 
+DEPARTURE_LEAD = timedelta(minutes=5)
+RETURN_LEAD = timedelta(minutes=15)
+SLA_LEADS = {
+    SLANotificationKind.DEPARTURE: DEPARTURE_LEAD,
+    SLANotificationKind.RETURN: RETURN_LEAD,
+}
+
+
+def sla_event_times(shipment: ConditionalShipment) -> Dict[str, Optional[datetime]]:
+    """
+    Instante de cada SLA que ainda deve ser notificado para o envio.
+
+    - departure: envio PENDING com departure_datetime
+    - return: envio SENT; return_datetime tem prioridade sobre deadline
+      (compatibilidade com dados antigos)
+    """
+    active = shipment.is_active is not False
+    departure = None
+    if active and shipment.status == ShipmentStatus.PENDING.value:
+        departure = shipment.departure_datetime
+    return_at = None
+    if active and shipment.status == ShipmentStatus.SENT.value:
+        return_at = shipment.return_datetime or shipment.deadline
+    return {
+        SLANotificationKind.DEPARTURE: departure,
+        SLANotificationKind.RETURN: return_at,
+    }
+
+
+def _wake_sla_dispatcher() -> None:
+    """Acorda o dispatcher deste worker (chamar após o commit do reagendamento)."""
+    # Import aqui: o dispatcher importa este módulo
+    from app.services.sla_dispatcher import sla_dispatcher
+    sla_dispatcher.notify()
+
 
 class ConditionalNotificationService:
     """Gerencia notificações automáticas de SLA"""
@@ -17,61 +64,176 @@ class ConditionalNotificationService:
         self.notification_service = NotificationService()
         self.shipment_repo = ConditionalShipmentRepository()
 
-    async def check_and_send_sla_notifications(self, db: AsyncSession) -> dict:
+    async def schedule_sla_notifications(
+        self, db: AsyncSession, shipment: ConditionalShipment, now: Optional[datetime] = None
+    ) -> List[SLANotification]:
         """
-        Verifica SLAs e envia notificações se necessário.
-        Rodar a cada 1 minuto via cron/scheduler.
-
-        IMPORTANTE: Este método usa departure_datetime e return_datetime (ou deadline)
-        para determinar quando enviar notificações.
+        (Re)agenda as notificações de SLA do envio. Não faz commit.
+
+        - SLA novo ou com data alterada → linha pendente com o novo due_at
+          (protelar depois de notificado notifica de novo);
+        - mesma data → mantém (não reenvia o que já saiu);
+        - SLA que não se aplica mais (envio saiu, foi cancelado...) →
+          pendente vira cancelada.
+        Vencimento já passado com o SLA ainda no futuro sai imediatamente.
         """
-        now = datetime.utcnow()
-        sent_departure = 0
-        sent_return = 0
-
-        # Buscar todos envios ativos PENDING (para SLA de envio)
+        now = now or datetime.utcnow()
         result = await db.execute(
-            select(ConditionalShipment).where(
-                ConditionalShipment.status == 'PENDING',
-                ConditionalShipment.is_active == True,
-                ConditionalShipment.departure_datetime.isnot(None)
+            select(SLANotification).where(SLANotification.shipment_id == shipment.id)
+        )
+        existing = {row.kind: row for row in result.scalars().all()}
+
+        scheduled = []
+        for kind, event_at in sla_event_times(shipment).items():
+            row = existing.get(kind)
+            if event_at is None or event_at <= now:
+                if row is not None and row.status == SLANotificationStatus.PENDING:
+                    row.status = SLANotificationStatus.CANCELLED
+                continue
+
+            due_at = event_at - SLA_LEADS[kind]
+            if row is None:
+                row = SLANotification(
+                    tenant_id=shipment.tenant_id,
+                    shipment_id=shipment.id,
+                    kind=kind,
+                    event_at=event_at,
+                    due_at=due_at,
+                    status=SLANotificationStatus.PENDING,
+                    attempts=0,
+                )
+                db.add(row)
+            elif row.event_at != event_at or row.status == SLANotificationStatus.CANCELLED:
+                row.event_at = event_at
+                row.due_at = due_at
+                row.status = SLANotificationStatus.PENDING
+                row.attempts = 0
+                row.claimed_by = None
+                row.claimed_at = None
+                row.sent_at = None
+                row.last_error = None
+            scheduled.append(row)
+
+        await db.flush()
+        return scheduled
+
+    async def next_sla_due_at(self, db: AsyncSession) -> Optional[datetime]:
+        """Próximo vencimento pendente (índice status, due_at)."""
+        result = await db.execute(
+            select(func.min(SLANotification.due_at)).where(
+                SLANotification.status == SLANotificationStatus.PENDING
             )
         )
-        pending_shipments = result.scalars().all()
+        return result.scalar()
 
-        for shipment in pending_shipments:
-            # Verificar se falta 5 minutos para SLA de envio
-            time_until_departure = shipment.departure_datetime - now
-            if timedelta(minutes=4) <= time_until_departure <= timedelta(minutes=6):
-                await self._send_departure_notification(db, shipment)
-                sent_departure += 1
-
-        # Buscar todos envios SENT (para SLA de retorno)
-        # Só envia para SENT (não para status finalizados)
+    async def _claim_due_sla_notifications(
+        self, db: AsyncSession, now: datetime, holder: str, limit: int
+    ) -> List[int]:
+        """
+        Reivindica até `limit` notificações vencidas (e claims abandonados há
+        mais de SLA_CLAIM_TIMEOUT_SECONDS) num único UPDATE. No PostgreSQL o
+        SELECT interno usa FOR UPDATE SKIP LOCKED: workers concorrentes pegam
+        linhas diferentes sem esperar um pelo outro.
+        """
+        stale_before = now - timedelta(seconds=settings.SLA_CLAIM_TIMEOUT_SECONDS)
+        claimable = or_(
+            and_(
+                SLANotification.status == SLANotificationStatus.PENDING,
+                SLANotification.due_at <= now,
+            ),
+            and_(
+                SLANotification.status == SLANotificationStatus.CLAIMED,
+                SLANotification.claimed_at < stale_before,
+            ),
+        )
+        candidates = (
+            select(SLANotification.id)
+            .where(claimable)
+            .order_by(SLANotification.due_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
         result = await db.execute(
-            select(ConditionalShipment).where(
-                ConditionalShipment.status == ShipmentStatus.SENT.value,
-                ConditionalShipment.is_active == True,
-                ConditionalShipment.deadline.isnot(None)
+            update(SLANotification)
+            .where(SLANotification.id.in_(candidates.scalar_subquery()), claimable)
+            .values(
+                status=SLANotificationStatus.CLAIMED,
+                claimed_by=holder,
+                claimed_at=now,
+                attempts=SLANotification.attempts + 1,
             )
+            .returning(SLANotification.id)
+            .execution_options(synchronize_session=False)
         )
-        sent_shipments = result.scalars().all()
+        claimed = [row[0] for row in result.all()]
+        await db.commit()
+        return claimed
+
+    async def check_and_send_sla_notifications(
+        self,
+        db: AsyncSession,
+        now: Optional[datetime] = None,
+        holder: str = "manual",
+        limit: int = 100,
+    ) -> dict:
+        """
+        Envia as notificações de SLA vencidas (due_at <= agora).
 
-        for shipment in sent_shipments:
-            # CORRIGIDO: Usar deadline (que agora é baseado em return_datetime)
-            # Prioridade: return_datetime > deadline (para compatibilidade com dados antigos)
-            target_datetime = shipment.return_datetime if shipment.return_datetime else shipment.deadline
+        Chamado pelo sla_dispatcher no horário de cada vencimento; os
+        endpoints de cron/teste continuam podendo chamar diretamente. Antes
+        de enviar, confere o envio: se a data mudou por um caminho que não
+        reagendou, a linha é reagendada; se o status mudou ou o SLA já
+        passou, é descartada (skipped).
+        """
+        now = now or datetime.utcnow()
+        sent_departure = 0
+        sent_return = 0
+        skipped = 0
+        failed = 0
+
+        claimed_ids = await self._claim_due_sla_notifications(db, now, holder, limit)
+        for notification_id in claimed_ids:
+            notification = await db.get(SLANotification, notification_id)
+            shipment = await db.get(ConditionalShipment, notification.shipment_id)
+            event_at = sla_event_times(shipment).get(notification.kind) if shipment else None
+
+            if event_at is None or event_at <= now:
+                notification.status = SLANotificationStatus.SKIPPED
+                await db.commit()
+                skipped += 1
+                continue
+            if event_at != notification.event_at:
+                await self.schedule_sla_notifications(db, shipment, now=now)
+                await db.commit()
+                continue
 
-            if target_datetime:
-                # Verificar se falta 15 minutos para SLA de retorno
-                time_until_return = target_datetime - now
-                if timedelta(minutes=14) <= time_until_return <= timedelta(minutes=16):
+            try:
+                if notification.kind == SLANotificationKind.DEPARTURE:
+                    await self._send_departure_notification(db, shipment)
+                    sent_departure += 1
+                else:
                     await self._send_return_notification(db, shipment)
                     sent_return += 1
+                notification.status = SLANotificationStatus.SENT
+                notification.sent_at = datetime.utcnow()
+                notification.last_error = None
+            except Exception as e:
+                await db.rollback()
+                notification = await db.get(SLANotification, notification_id)
+                notification.last_error = str(e)
+                if notification.attempts < settings.SLA_NOTIFICATION_MAX_ATTEMPTS:
+                    notification.status = SLANotificationStatus.PENDING
+                    notification.due_at = now + timedelta(minutes=notification.attempts)
+                else:
+                    notification.status = SLANotificationStatus.FAILED
+                    failed += 1
+            await db.commit()
 
         return {
             'departure_notifications': sent_departure,
             'return_notifications': sent_return,
+            'skipped': skipped,
+            'failed': failed,
             'checked_at': now.isoformat()
         }
 
@@ -157,8 +319,10 @@ class ConditionalNotificationService:
             raise ValueError("Envio não encontrado ou sem SLA de envio")
 
         shipment.departure_datetime = shipment.departure_datetime + timedelta(minutes=minutes)
+        await self.schedule_sla_notifications(db, shipment)
         await db.commit()
         await db.refresh(shipment)
+        _wake_sla_dispatcher()
         return shipment
 
     async def postpone_return(
@@ -170,8 +334,10 @@ class ConditionalNotificationService:
             raise ValueError("Envio não encontrado ou sem SLA de retorno")
 
         shipment.return_datetime = shipment.return_datetime + timedelta(minutes=minutes)
+        await self.schedule_sla_notifications(db, shipment)
         await db.commit()
         await db.refresh(shipment)
+        _wake_sla_dispatcher()
         return shipment
 
     async def send_pending_shipments_reminder(self, db: AsyncSession) -> dict:
@@ -70,6 +70,7 @@ class ConditionalShipmentService:
                 quantity=item.quantity_sent,
                 variant_id=item.variant_id,
                 tenant_id=tenant_id,
+                include_sources=False,
             )
             if not availability["available"]:
                 product = await product_repo.get(db, item.product_id, tenant_id=tenant_id)
@@ -547,31 +548,21 @@ class ConditionalShipmentService:
 
     async def _schedule_notifications(self, db: AsyncSession, shipment: ConditionalShipment):
         """
-        Cria notificações automáticas baseadas em departure_datetime e return_datetime.
+        (Re)agenda as notificações de SLA do envio e acorda o sla_dispatcher.
 
-        Este método garante que o sistema notifique o usuário:
-        - 5 minutos antes da saída (departure_datetime)
-        - 15 minutos antes do retorno previsto (return_datetime)
+        - 5 minutos antes da saída (departure_datetime), enquanto PENDING
+        - 15 minutos antes do retorno previsto (return_datetime/deadline), enquanto SENT
 
-        As notificações são enviadas pelo ConditionalNotificationService via endpoint de cron.
+        Os instantes exatos ficam em sla_notifications; o dispatcher dorme
+        até o próximo vencimento em vez de varrer os envios a cada minuto.
         """
         # Importar aqui para evitar import circular
         from app.services.conditional_notification_service import ConditionalNotificationService
+        from app.services.sla_dispatcher import sla_dispatcher
 
-        notification_service = ConditionalNotificationService()
-
-        # As notificações são checadas pelo endpoint /sla/check-notifications
-        # que roda a cada 1 minuto via cron
-        # Não precisamos criar registros aqui, apenas garantir que as datas estão corretas
-        # O check_and_send_sla_notifications() vai buscar os envios e enviar notificações
-
-        # Log para debug
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(
-            f"Notificações agendadas para envio #{shipment.id}: "
-            f"departure={shipment.departure_datetime}, return={shipment.return_datetime}"
-        )
+        await ConditionalNotificationService().schedule_sla_notifications(db, shipment)
+        await db.commit()
+        sla_dispatcher.notify()
 
     async def cancel_shipment(
         self,
@@ -637,7 +628,10 @@ class ConditionalShipmentService:
         )
         shipment.notes = (shipment.notes or "") + f"\n[Cancelado] {reason}"
         await db.commit()
-        
+
+        # Descarta as notificações de SLA ainda pendentes
+        await self._schedule_notifications(db, shipment)
+
         return shipment
     
     async def check_overdue_shipments(
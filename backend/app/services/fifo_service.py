@@ -5,7 +5,14 @@ from typing import List, Dict, Any
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.metrics import Histogram, timed
 from app.repositories.entry_item_repository import EntryItemRepository
+from app.services.stock_ledger_service import StockLedgerService
+
+
+FIFO_PROCESS_SALE_DURATION = Histogram(
+    "fifo_process_sale_duration_seconds", "Duração da alocação FIFO de um item vendido", ["outcome"]
+)
 
 
 class FIFOService:
@@ -26,6 +33,7 @@ class FIFOService:
         self.db = db
         self.item_repo = EntryItemRepository()
     
+    @timed(FIFO_PROCESS_SALE_DURATION)
     async def process_sale(
         self,
         product_id: int,
@@ -149,14 +157,20 @@ class FIFOService:
         *,
         variant_id: int | None = None,
         tenant_id: int | None = None,
+        include_sources: bool = True,
     ) -> Dict[str, Any]:
         """
         Verifica disponibilidade de estoque para um produto.
 
+        Com variant_id e include_sources=False o total vem do ledger
+        (variant_stock, uma linha) sem carregar os lotes; sources_count e
+        as datas de entrada ficam None.
+
         Args:
             product_id: ID do produto
             quantity: Quantidade desejada
             tenant_id: ID do tenant (obrigatório em contexto multi-tenant)
+            include_sources: carregar os lotes para sources_count/datas
 
         Returns:
             Dict com informações de disponibilidade:
@@ -170,6 +184,18 @@ class FIFOService:
                     "newest_entry_date": date
                 }
         """
+        if variant_id is not None and not include_sources:
+            total_available = await StockLedgerService(self.db).on_hand(variant_id, tenant_id=tenant_id)
+            return {
+                "available": total_available >= quantity,
+                "total_available": total_available,
+                "requested": quantity,
+                "shortage": max(0, quantity - total_available),
+                "sources_count": None,
+                "oldest_entry_date": None,
+                "newest_entry_date": None,
+            }
+
         # Buscar itens disponíveis — por variante ou por produto (legado)
         if variant_id is not None:
             available_items = await self.item_repo.get_available_for_variant(
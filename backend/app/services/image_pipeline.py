@@ -0,0 +1,201 @@
+"""
+Pipeline de imagens para o storage local.
+
+No upload (LocalStorageService):
+  1. O original é regravado sem EXIF (GPS, modelo da câmera...) já com a
+     orientação aplicada — em thread, fora do event loop.
+  2. Em background são geradas as versões WebP ao lado do original:
+       products/abc.jpg → products/abc.thumb.webp  (200px)
+                          products/abc.medium.webp (600px)
+                          products/abc.large.webp  (1200px)
+
+Na leitura, sized_url(url, size) troca a URL do original pela da versão
+pedida — se ela ainda não existe (processamento em andamento, GIF, upload
+antigo), devolve o original. O Cloudinary já aplica transformações no
+get_url e não passa por aqui.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Literal, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ImageSize = Literal["thumb", "medium", "large"]
+
+# Lado maior (px) de cada versão
+IMAGE_SIZES: Dict[str, int] = {"thumb": 200, "medium": 600, "large": 1200}
+WEBP_QUALITY = 80
+
+PROCESSABLE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+# Pillow é CPU-bound: executor próprio para não ocupar o default do loop
+_image_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-pipeline")
+
+
+def _open(data: bytes):
+    """Abre a imagem aplicando a orientação do EXIF. Retorna (imagem, formato)."""
+    from PIL import Image, ImageOps
+
+    img = Image.open(io.BytesIO(data))
+    fmt = (img.format or "").upper()
+    # Aplica a orientação antes de descartar o EXIF (fotos de celular)
+    return ImageOps.exif_transpose(img), fmt
+
+
+def strip_metadata(data: bytes) -> bytes:
+    """Regrava a imagem sem EXIF/metadata, mantendo formato e qualidade."""
+    img, fmt = _open(data)
+    output = io.BytesIO()
+    if fmt == "JPEG":
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.save(output, format="JPEG", quality=90, optimize=True)
+    elif fmt == "PNG":
+        img.save(output, format="PNG", optimize=True)
+    elif fmt == "WEBP":
+        img.save(output, format="WEBP", quality=90)
+    else:
+        return data
+    return output.getvalue()
+
+
+def build_renditions(data: bytes) -> Dict[str, bytes]:
+    """Gera as versões WebP redimensionadas (nunca amplia a imagem)."""
+    from PIL import Image
+
+    base, _ = _open(data)
+    if base.mode not in ("RGB", "RGBA"):
+        base = base.convert("RGBA" if "A" in base.getbands() else "RGB")
+
+    renditions = {}
+    for name, side in IMAGE_SIZES.items():
+        img = base.copy()
+        img.thumbnail((side, side), Image.LANCZOS)
+        output = io.BytesIO()
+        img.save(output, format="WEBP", quality=WEBP_QUALITY, method=4)
+        renditions[name] = output.getvalue()
+    return renditions
+
+
+def downscale_for_upload(data: bytes, max_side: int, quality: int = 85) -> Optional[bytes]:
+    """
+    JPEG com o lado maior limitado a max_side, para envio a APIs externas.
+    None se a imagem já cabe no limite (ou é GIF) — o chamador usa o original.
+    """
+    from PIL import Image
+
+    img, fmt = _open(data)
+    if fmt == "GIF" or max(img.size) <= max_side:
+        return None
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    img.thumbnail((max_side, max_side), Image.LANCZOS)
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def rendition_path(file_path: str, size: str) -> str:
+    """products/abc.jpg + 'thumb' → products/abc.thumb.webp"""
+    stem, _, _ = file_path.rpartition(".")
+    return f"{stem or file_path}.{size}.webp"
+
+
+def is_processable(file_path: str) -> bool:
+    return Path(file_path).suffix.lower() in PROCESSABLE_EXTENSIONS
+
+
+class ImagePipeline:
+    """Processa uploads do storage local em background."""
+
+    def __init__(self, base_path: Optional[Path] = None, base_url: Optional[str] = None):
+        self.base_path = Path(base_path or settings.UPLOAD_DIR)
+        self.base_url = (base_url or settings.UPLOAD_URL).rstrip("/")
+        self._tasks: set[asyncio.Task] = set()
+        # Versões já vistas em disco — evita stat() repetido no catálogo
+        self._known: set[str] = set()
+
+    async def prepare_original(self, data: bytes, file_path: str) -> bytes:
+        """Remove EXIF do original (em thread). Formatos não suportados passam intactos."""
+        if not is_processable(file_path):
+            return data
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(_image_executor, strip_metadata, data)
+        except Exception as e:
+            logger.warning("Imagem %s não pôde ser sanitizada: %s", file_path, e)
+            return data
+
+    async def downscale(self, data: bytes, media_type: str, max_side: int) -> tuple[bytes, str]:
+        """Reduz a imagem (em thread) antes do upload; em falha, devolve a original."""
+        loop = asyncio.get_running_loop()
+        try:
+            reduced = await loop.run_in_executor(_image_executor, downscale_for_upload, data, max_side)
+        except Exception as e:
+            logger.warning("Imagem não pôde ser reduzida: %s", e)
+            return data, media_type
+        if reduced is None or len(reduced) >= len(data):
+            return data, media_type
+        return reduced, "image/jpeg"
+
+    def schedule(self, file_path: str, data: bytes) -> None:
+        """Agenda a geração das versões WebP do arquivo recém-gravado."""
+        if not settings.IMAGE_RENDITIONS_ENABLED or not is_processable(file_path):
+            return
+        task = asyncio.create_task(self.process(file_path, data))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def process(self, file_path: str, data: bytes) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(_image_executor, self._process_sync, file_path, data)
+        except Exception as e:
+            logger.warning("Falha ao gerar versões de %s: %s", file_path, e)
+
+    def _process_sync(self, file_path: str, data: bytes) -> None:
+        for size, content in build_renditions(data).items():
+            rel = rendition_path(file_path, size)
+            target = self.base_path / rel
+            # Grava em .tmp e renomeia: o StaticFiles nunca serve arquivo parcial
+            tmp = target.with_suffix(".tmp")
+            tmp.write_bytes(content)
+            tmp.replace(target)
+            self._known.add(rel)
+
+    def remove(self, file_path: str) -> None:
+        """Apaga as versões geradas de um arquivo."""
+        for size in IMAGE_SIZES:
+            rel = rendition_path(file_path, size)
+            self._known.discard(rel)
+            (self.base_path / rel).unlink(missing_ok=True)
+
+    def sized_url(self, url: Optional[str], size: Optional[str]) -> Optional[str]:
+        """URL da versão `size` de uma imagem local, ou a própria URL se indisponível."""
+        if not url or not size or size not in IMAGE_SIZES:
+            return url
+        prefix = f"{self.base_url}/"
+        if not url.startswith(prefix) or not is_processable(url):
+            return url
+
+        rel = rendition_path(url[len(prefix):], size)
+        if rel not in self._known:
+            if not (self.base_path / rel).is_file():
+                return url
+            self._known.add(rel)
+        return f"{prefix}{rel}"
+
+    async def drain(self) -> None:
+        """Aguarda os processamentos pendentes (testes / shutdown)."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+image_pipeline = ImagePipeline()
@@ -1,17 +1,47 @@
 """
 Serviço de gerenciamento de estoque e inventário.
 """
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
 
+from sqlalchemy import func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models.inventory import Inventory, MovementType
+from app.core.config import settings
+from app.models.inventory import Inventory, MovementType, PRODUCT_LEVEL_INVENTORY
 from app.models.entry_item import EntryItem
-from app.models.sale import SaleItem
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.stock_entry import StockEntry
 from app.repositories.inventory_repository import InventoryRepository
 from app.repositories.product_repository import ProductRepository
 
 
+# Custo vendido e unidades a partir de sale_items.sale_sources, por dialeto
+# (chave: é PostgreSQL?). Entradas sem quantity_taken/unit_cost contam 0.
+SOURCES_COST_SQL = {
+    True: (
+        "SELECT COALESCE(SUM((s ->> 'quantity_taken')::int * (s ->> 'unit_cost')::numeric), 0), "
+        "COALESCE(SUM((s ->> 'quantity_taken')::int), 0) "
+        "FROM sale_items si CROSS JOIN LATERAL json_array_elements("
+        "CASE WHEN json_typeof(si.sale_sources::json -> 'sources') = 'array' "
+        "THEN si.sale_sources::json -> 'sources' ELSE '[]'::json END) s "
+        "WHERE si.tenant_id = :tenant_id"
+    ),
+    False: (
+        "SELECT COALESCE(SUM(CAST(json_extract(s.value, '$.quantity_taken') AS INTEGER) "
+        "* CAST(json_extract(s.value, '$.unit_cost') AS REAL)), 0), "
+        "COALESCE(SUM(CAST(json_extract(s.value, '$.quantity_taken') AS INTEGER)), 0) "
+        "FROM sale_items si, json_each(si.sale_sources, '$.sources') s "
+        "WHERE si.tenant_id = :tenant_id "
+        "AND json_type(si.sale_sources, '$.sources') = 'array' AND s.type = 'object'"
+    ),
+}
+
+
 class InventoryService:
     """Serviço para operações de negócio com estoque."""
     
@@ -109,112 +139,151 @@ class InventoryService:
             'previous_quantity': previous_qty
         }
 
-    async def rebuild_all_from_fifo(self, *, tenant_id: int) -> list[dict]:
-        """Recalcula inventário de todos os produtos do tenant com base no FIFO.
+    def _fifo_sums_stmt(self, tenant_id: int, start_id: int, end_id: int):
+        """SELECT product_id, fifo_sum do intervalo [start_id, end_id) — agregado no banco.
 
-        Retorna lista de deltas por produto.
+        Soma entry_items ativos por product_id direto e, para dados legados sem
+        product_id, via variant_id. Inventários de produto já existentes entram
+        com 0, para serem zerados quando não há mais entradas ativas.
         """
-        from sqlalchemy import select, func, update
-        from app.models.stock_entry import StockEntry
-        from app.models.product_variant import ProductVariant
-
-        # Somas FIFO diretas por product_id — filtra stock_entry.is_active
-        stmt_direct = (
-            select(
-                EntryItem.product_id,
-                func.coalesce(func.sum(EntryItem.quantity_remaining), 0).label("fifo_sum")
-            )
+        direct = (
+            select(EntryItem.product_id.label("product_id"), EntryItem.quantity_remaining.label("qty"))
             .join(StockEntry, EntryItem.entry_id == StockEntry.id)
             .where(
                 EntryItem.is_active == True,
-                EntryItem.product_id.isnot(None),
+                EntryItem.product_id >= start_id,
+                EntryItem.product_id < end_id,
                 EntryItem.tenant_id == tenant_id,
                 StockEntry.is_active == True,
             )
-            .group_by(EntryItem.product_id)
         )
-        rows_direct = (await self.db.execute(stmt_direct)).all()
-        fifo_map: dict[int, int] = {r[0]: int(r[1]) for r in rows_direct}
-
-        # Somas FIFO via variant_id (entry_items sem product_id — dados legados)
-        stmt_via_variant = (
-            select(
-                ProductVariant.product_id,
-                func.coalesce(func.sum(EntryItem.quantity_remaining), 0).label("fifo_sum")
-            )
+        via_variant = (
+            select(ProductVariant.product_id, EntryItem.quantity_remaining)
             .join(StockEntry, EntryItem.entry_id == StockEntry.id)
             .join(ProductVariant, EntryItem.variant_id == ProductVariant.id)
             .where(
                 EntryItem.is_active == True,
                 EntryItem.product_id.is_(None),
+                ProductVariant.product_id >= start_id,
+                ProductVariant.product_id < end_id,
                 EntryItem.tenant_id == tenant_id,
                 StockEntry.is_active == True,
             )
-            .group_by(ProductVariant.product_id)
         )
-        rows_variant = (await self.db.execute(stmt_via_variant)).all()
-        for r in rows_variant:
-            pid, extra = r[0], int(r[1])
-            fifo_map[pid] = fifo_map.get(pid, 0) + extra
+        existing = select(Inventory.product_id, literal(0)).where(
+            Inventory.tenant_id == tenant_id,
+            PRODUCT_LEVEL_INVENTORY,
+            Inventory.product_id >= start_id,
+            Inventory.product_id < end_id,
+        )
+        rows = union_all(direct, via_variant, existing).subquery("fifo_rows")
+        return (
+            select(rows.c.product_id, func.coalesce(func.sum(rows.c.qty), 0).label("fifo_sum"))
+            .group_by(rows.c.product_id)
+        )
 
-        # Inventários existentes do tenant
-        inv_stmt = select(Inventory).where(Inventory.tenant_id == tenant_id)
-        inv_list = (await self.db.execute(inv_stmt)).scalars().all()
-        inv_map = {inv.product_id: inv for inv in inv_list}
+    async def rebuild_fifo_range(self, *, tenant_id: int, start_id: int, end_id: int) -> list[dict]:
+        """Rebuild FIFO dos produtos com id em [start_id, end_id). Não faz commit.
+
+        Um único INSERT ... SELECT (agregado) ... ON CONFLICT DO UPDATE sobre o
+        índice uq_inventory_tenant_product: cria o inventário que falta e só
+        atualiza onde a quantidade diverge. O RETURNING traz apenas as linhas
+        alteradas, que viram o relatório de deltas.
+        """
+        previous_rows = await self.db.execute(
+            select(Inventory.product_id, Inventory.quantity).where(
+                Inventory.tenant_id == tenant_id,
+                PRODUCT_LEVEL_INVENTORY,
+                Inventory.product_id >= start_id,
+                Inventory.product_id < end_id,
+            )
+        )
+        previous = {pid: qty for pid, qty in previous_rows.all()}
+
+        sums = self._fifo_sums_stmt(tenant_id, start_id, end_id).subquery("fifo_sums")
+        now = datetime.utcnow()
+        insert_fn = pg_insert if self.db.bind.dialect.name == "postgresql" else sqlite_insert
+        stmt = insert_fn(Inventory).from_select(
+            ["tenant_id", "product_id", "quantity", "min_stock", "is_active", "created_at", "updated_at"],
+            select(
+                literal(tenant_id), sums.c.product_id, sums.c.fifo_sum,
+                literal(0), literal(True), literal(now), literal(now),
+            )
+            # WHERE também evita a ambiguidade "SELECT ... ON CONFLICT" no SQLite
+            .where(sums.c.product_id.isnot(None)),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tenant_id", "product_id"],
+            index_where=PRODUCT_LEVEL_INVENTORY,
+            set_={"quantity": stmt.excluded.quantity, "updated_at": stmt.excluded.updated_at},
+            where=Inventory.quantity != stmt.excluded.quantity,
+        ).returning(Inventory.product_id, Inventory.quantity)
+        changed = (await self.db.execute(stmt)).all()
 
         deltas: list[dict] = []
-        touched: set[int] = set()
-
-        # Atualizar/criar para produtos com entry_items
-        for pid, fifo_sum in fifo_map.items():
-            touched.add(pid)
-            inv = inv_map.get(pid)
-            if inv is None:
-                new_inv = Inventory(product_id=pid, quantity=fifo_sum)
-                new_inv.tenant_id = tenant_id
-                self.db.add(new_inv)
-                deltas.append({
-                    'product_id': pid,
-                    'tenant_id': tenant_id,
-                    'fifo_sum': fifo_sum,
-                    'inventory_quantity': fifo_sum,
-                    'created': True,
-                    'updated': False,
-                    'previous_quantity': None,
-                })
-            elif inv.quantity != fifo_sum:
-                prev = inv.quantity
-                inv.quantity = fifo_sum
-                deltas.append({
-                    'product_id': pid,
-                    'tenant_id': tenant_id,
-                    'fifo_sum': fifo_sum,
-                    'inventory_quantity': fifo_sum,
-                    'created': False,
-                    'updated': True,
-                    'previous_quantity': prev,
-                })
-
-        # Para inventários existentes sem entry_items ativos, zera
-        for pid, inv in inv_map.items():
-            if pid in touched:
-                continue
-            if inv.quantity != 0:
-                prev = inv.quantity
-                inv.quantity = 0
-                deltas.append({
-                    'product_id': pid,
-                    'tenant_id': tenant_id,
-                    'fifo_sum': 0,
-                    'inventory_quantity': 0,
-                    'created': False,
-                    'updated': True,
-                    'previous_quantity': prev,
-                })
-
-        if deltas:
-            await self.db.commit()
+        for pid, quantity in sorted(changed):
+            created = pid not in previous
+            deltas.append({
+                'product_id': pid,
+                'tenant_id': tenant_id,
+                'fifo_sum': quantity,
+                'inventory_quantity': quantity,
+                'created': created,
+                'updated': not created,
+                'previous_quantity': previous.get(pid),
+            })
+        self._sync_loaded_inventory(tenant_id, {d['product_id']: d['inventory_quantity'] for d in deltas})
+        return deltas
+
+    def _sync_loaded_inventory(self, tenant_id: int, quantities: dict[int, int]) -> None:
+        """Alinha objetos Inventory já carregados na sessão com o UPDATE em massa."""
+        if not quantities:
+            return
+        for obj in list(self.db.sync_session.identity_map.values()):
+            if (
+                isinstance(obj, Inventory)
+                and obj.tenant_id == tenant_id
+                and obj.variant_id is None
+                and obj.product_id in quantities
+            ):
+                set_committed_value(obj, "quantity", quantities[obj.product_id])
+
+    async def rebuild_all_from_fifo(
+        self,
+        *,
+        tenant_id: int,
+        chunk_size: int | None = None,
+        progress: Callable[[int, int], Awaitable[None]] | None = None,
+    ) -> list[dict]:
+        """Recalcula inventário de todos os produtos do tenant com base no FIFO.
+
+        Processa por faixas de product_id (chunk_size, padrão
+        INVENTORY_REBUILD_CHUNK_SIZE) com commit a cada faixa: cada transação
+        é curta e bloqueia só as linhas da faixa. `progress(feitos, total)` é
+        chamado após cada faixa (ex.: job em background).
 
+        Retorna lista de deltas por produto (só os alterados).
+        """
+        chunk_size = chunk_size or settings.INVENTORY_REBUILD_CHUNK_SIZE
+        bounds = (
+            select(func.min(Product.id), func.max(Product.id))
+            .where(Product.tenant_id == tenant_id)
+        )
+        lowest, highest = (await self.db.execute(bounds)).one()
+        if lowest is None:
+            return []
+
+        starts = list(range(lowest, highest + 1, chunk_size))
+        deltas: list[dict] = []
+        for done, start in enumerate(starts, start=1):
+            chunk = await self.rebuild_fifo_range(
+                tenant_id=tenant_id, start_id=start, end_id=start + chunk_size
+            )
+            if chunk:
+                await self.db.commit()
+            deltas.extend(chunk)
+            if progress is not None:
+                await progress(done, len(starts))
         return deltas
 
     async def reconcile_costs(self, *, tenant_id: int, product_id: int | None = None) -> dict:
@@ -225,9 +294,10 @@ class InventoryService:
         - custo_vendido_entry_items: custo_recebido_total - custo_restante
         - custo_vendido_por_fontes: soma das fontes em sale_sources (se existirem)
         - diferenca: custo_vendido_por_fontes - custo_vendido_entry_items
-        """
-        from sqlalchemy import select, func
 
+        As duas somas rodam no banco (sale_sources é expandido com
+        json_array_elements no PostgreSQL / json_each no SQLite).
+        """
         # Somas por entry_items
         ei_stmt = select(
             func.coalesce(func.sum(EntryItem.quantity_received * EntryItem.unit_cost), 0),
@@ -242,20 +312,14 @@ class InventoryService:
         sold_cost_entry_items = received_cost - remaining_cost
 
         # Somar via sale_sources
-        si_stmt = select(SaleItem.sale_sources).where(SaleItem.tenant_id == tenant_id)
+        sql = SOURCES_COST_SQL[self.db.bind.dialect.name == "postgresql"]
+        params = {"tenant_id": tenant_id}
         if product_id is not None:
-            si_stmt = si_stmt.where(SaleItem.product_id == product_id)
-        rows = (await self.db.execute(si_stmt)).scalars().all()
-        sold_cost_sources = 0.0
-        units_sold_sources = 0
-        for src in rows:
-            if not src or 'sources' not in src:
-                continue
-            for s in src['sources']:
-                qty = int(s.get('quantity_taken', 0))
-                unit_cost = float(s.get('unit_cost', 0))
-                sold_cost_sources += qty * unit_cost
-                units_sold_sources += qty
+            sql += " AND si.product_id = :product_id"
+            params["product_id"] = product_id
+        sold_cost_sources, units_sold_sources = (await self.db.execute(text(sql), params)).one()
+        sold_cost_sources = float(sold_cost_sources or 0)
+        units_sold_sources = int(units_sold_sources or 0)
 
         diff = sold_cost_sources - sold_cost_entry_items
 
@@ -12,13 +12,21 @@ Para adicionar um novo protocolo:
   2. Implementar back_label(), front_label(), test_label()
   3. Adicionar uma entrada em _GENERATORS
   4. Adicionar o valor no enum PrinterProtocol (models/label_printer.py)
+
+Cache de render: etiquetas de verso/frente são memorizadas por conteúdo
+(LabelRenderCache) — a chave reúne tudo que aparece na etiqueta (variante,
+SKU, preço, nome, template, protocolo e dimensões/DPI da impressora), então
+qualquer alteração gera uma chave nova. Reimpressões e preview viram lookup
+em memória; invalidate_variant/invalidate_product liberam entradas antigas.
 """
 from __future__ import annotations
 
 import json
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from decimal import Decimal
-from typing import Optional, TYPE_CHECKING, Union
+from typing import Callable, Hashable, Optional, TYPE_CHECKING, Tuple, Union
 
 if TYPE_CHECKING:
     from app.models.product import Product
@@ -393,6 +401,94 @@ class EscPosGenerator(BaseLabelGenerator):
         return bytes(buf)
 
 
+# ============================================================================
+# CACHE DE RENDER — LRU por conteúdo, índice por variante/produto
+# ============================================================================
+
+class LabelRenderCache:
+    """
+    Cache LRU de etiquetas renderizadas (por worker).
+
+    A chave é o próprio conteúdo de entrada da etiqueta; a saída (str/bytes)
+    é imutável e pode ser compartilhada. Os índices por variante e produto
+    permitem descartar as entradas de uma peça alterada sem varrer o cache.
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[LabelOutput, int, int]]" = OrderedDict()
+        self._by_variant: dict[int, set] = {}
+        self._by_product: dict[int, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(
+        self,
+        key: Hashable,
+        variant_id: int,
+        product_id: int,
+        render: Callable[[], LabelOutput],
+    ) -> Tuple[LabelOutput, bool]:
+        """Retorna (etiqueta, hit). Em miss, renderiza e guarda."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], True
+            self.misses += 1
+
+        output = render()
+        if self.max_entries <= 0:
+            return output, False
+
+        with self._lock:
+            self._entries[key] = (output, variant_id, product_id)
+            self._entries.move_to_end(key)
+            self._by_variant.setdefault(variant_id, set()).add(key)
+            self._by_product.setdefault(product_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, (_, old_variant, old_product) = self._entries.popitem(last=False)
+                self._unindex(old_key, old_variant, old_product)
+        return output, False
+
+    def invalidate_variant(self, variant_id: int) -> int:
+        """Remove as etiquetas da variante. Retorna quantas entradas saíram."""
+        with self._lock:
+            return self._drop(self._by_variant.get(variant_id, set()).copy())
+
+    def invalidate_product(self, product_id: int) -> int:
+        """Remove as etiquetas de todas as variantes do produto."""
+        with self._lock:
+            return self._drop(self._by_product.get(product_id, set()).copy())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_variant.clear()
+            self._by_product.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, keys: set) -> int:
+        for key in keys:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._unindex(key, entry[1], entry[2])
+        return len(keys)
+
+    def _unindex(self, key: Hashable, variant_id: int, product_id: int) -> None:
+        for index, owner in ((self._by_variant, variant_id), (self._by_product, product_id)):
+            keys = index.get(owner)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[owner]
+
+
 # ============================================================================
 # DISPATCHER
 # ============================================================================
@@ -414,6 +510,12 @@ class LabelService:
     DEFAULT_WIDTH_MM = 55
     DEFAULT_HEIGHT_MM = 65
 
+    def __init__(self, cache_size: Optional[int] = None):
+        if cache_size is None:
+            from app.core.config import settings
+            cache_size = settings.LABEL_RENDER_CACHE_SIZE
+        self.render_cache = LabelRenderCache(cache_size)
+
     def _gen(self, printer: Optional["LabelPrinter"]) -> BaseLabelGenerator:
         if printer is None:
             return _GENERATORS[PrinterProtocol.ZPL]
@@ -429,7 +531,28 @@ class LabelService:
         printer: Optional["LabelPrinter"] = None,
     ) -> LabelOutput:
         """Verso da etiqueta: QR Code + dados da peça."""
-        return self._gen(printer).back_label(product, variant, quantity, show_price, show_sku, printer)
+        return self.render_back_label(product, variant, quantity, show_price, show_sku, printer)[0]
+
+    def render_back_label(
+        self,
+        product: "Product",
+        variant: "ProductVariant",
+        quantity: int = 1,
+        show_price: bool = True,
+        show_sku: bool = True,
+        printer: Optional["LabelPrinter"] = None,
+    ) -> Tuple[LabelOutput, bool]:
+        """Como generate(), mas retorna também se veio do cache: (etiqueta, hit)."""
+        gen = self._gen(printer)
+        key = (
+            "back", self._protocol(printer), *gen.dims(printer),
+            *self._content_key(gen, product, variant),
+            quantity, show_price, show_sku,
+        )
+        return self.render_cache.get_or_render(
+            key, variant.id, product.id,
+            lambda: gen.back_label(product, variant, quantity, show_price, show_sku, printer),
+        )
 
     def generate_front_label(
         self,
@@ -440,7 +563,17 @@ class LabelService:
         printer: Optional["LabelPrinter"] = None,
     ) -> LabelOutput:
         """Frente da etiqueta: marca + produto + preço."""
-        return self._gen(printer).front_label(store_name, product, variant, quantity, printer)
+        gen = self._gen(printer)
+        key = (
+            "front", self._protocol(printer), *gen.dims(printer),
+            *self._content_key(gen, product, variant),
+            quantity, store_name,
+        )
+        output, _ = self.render_cache.get_or_render(
+            key, variant.id, product.id,
+            lambda: gen.front_label(store_name, product, variant, quantity, printer),
+        )
+        return output
 
     def generate_test_label(
         self, printer: Optional["LabelPrinter"] = None
@@ -448,6 +581,31 @@ class LabelService:
         """Etiqueta de diagnóstico para testar a conexão."""
         return self._gen(printer).test_label(printer)
 
+    def invalidate_variant(self, variant_id: int) -> None:
+        """Descarta etiquetas cacheadas da variante (chamar após alterá-la)."""
+        self.render_cache.invalidate_variant(variant_id)
+
+    def invalidate_product(self, product_id: int) -> None:
+        """Descarta etiquetas cacheadas do produto (nome aparece na etiqueta)."""
+        self.render_cache.invalidate_product(product_id)
+
+    @staticmethod
+    def _protocol(printer: Optional["LabelPrinter"]) -> PrinterProtocol:
+        return printer.protocol if printer else PrinterProtocol.ZPL
+
+    @staticmethod
+    def _content_key(gen: BaseLabelGenerator, product: "Product", variant: "ProductVariant") -> tuple:
+        """Campos da peça que aparecem na etiqueta (QR, textos e preço)."""
+        return (
+            product.id,
+            product.name,
+            variant.id,
+            variant.sku,
+            getattr(variant, "color", None),
+            getattr(variant, "size", None),
+            gen.get_price(variant),
+        )
+
     # ------------------------------------------------------------------
     # Aliases para compatibilidade com print_job_service (nomes antigos)
     # ------------------------------------------------------------------
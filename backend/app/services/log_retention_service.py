@@ -0,0 +1,266 @@
+"""
+Partições mensais e retenção de audit_logs / notification_logs.
+
+PostgreSQL: as tabelas são particionadas por RANGE(created_at), uma
+partição por mês ({tabela}_pAAAA_MM) mais {tabela}_default (migration
+20261018_log_partitions). ensure_log_partitions() cria as partições dos
+próximos meses antes que as linhas caiam na default; se o job atrasou e a
+default já tem linhas do mês, elas são movidas para a partição nova.
+
+SQLite (dev/testes): tabelas comuns — a mesma API funciona com DELETE por
+faixa de datas.
+
+Retenção (archive_expired_logs, opt-in): meses mais antigos que o limite
+são exportados para {LOG_ARCHIVE_DIR}/{tabela}/{tabela}_AAAA_MM.jsonl.gz e
+só então removidos (DROP da partição no PostgreSQL, DELETE no SQLite). Sem
+LOG_ARCHIVE_DIR absoluto nada é removido: um caminho relativo cairia no
+disco efêmero do container e o "arquivo" sumiria no próximo deploy.
+
+Consultas: within_period() aplica a faixa created_at como constantes para
+o planner podar partições fora do período.
+"""
+import asyncio
+import gzip
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.audit_log import AuditLog
+from app.models.notification import NotificationLog
+
+logger = logging.getLogger(__name__)
+
+# Tabelas particionadas por mês em created_at
+PARTITIONED_LOGS: Dict[str, Type] = {
+    "audit_logs": AuditLog,
+    "notification_logs": NotificationLog,
+}
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def within_period(stmt, column, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Filtra [start, end) em created_at — com literais, o PostgreSQL poda as partições."""
+    if start is not None:
+        stmt = stmt.where(column >= start)
+    if end is not None:
+        stmt = stmt.where(column < end)
+    return stmt
+
+
+def durable_archive_dir(value=None) -> Optional[Path]:
+    """Diretório de arquivo configurado, ou None se não for um caminho absoluto."""
+    raw = settings.LOG_ARCHIVE_DIR if value is None else value
+    if not raw:
+        return None
+    path = Path(raw)
+    return path if path.is_absolute() else None
+
+
+@dataclass
+class ArchivedMonth:
+    table: str
+    month: date
+    rows: int
+    path: Path
+
+
+async def is_partitioned(db: AsyncSession, table: str) -> bool:
+    if db.bind.dialect.name != "postgresql":
+        return False
+    relkind = await db.scalar(
+        text("SELECT relkind FROM pg_class WHERE relname = :t AND relkind IN ('p', 'r')"),
+        {"t": table},
+    )
+    return relkind == "p"
+
+
+async def ensure_log_partitions(db: AsyncSession, months_ahead: Optional[int] = None) -> List[str]:
+    """Cria (se faltarem) as partições do mês atual até `months_ahead` meses à frente."""
+    months_ahead = settings.LOG_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    created = []
+    current = month_start(datetime.utcnow().date())
+    for table in PARTITIONED_LOGS:
+        if not await is_partitioned(db, table):
+            continue
+        for offset in range(months_ahead + 1):
+            start = add_months(current, offset)
+            name = partition_name(table, start)
+            exists = await db.scalar(text("SELECT to_regclass(:n) IS NOT NULL"), {"n": name})
+            if exists:
+                continue
+            await _create_partition(db, table, name, start)
+            created.append(name)
+    return created
+
+
+async def _create_partition(db: AsyncSession, table: str, name: str, start: date) -> None:
+    """
+    CREATE TABLE ... PARTITION OF para o mês. O PostgreSQL recusa a partição
+    se a default tiver linhas da faixa: nesse caso a default é desanexada,
+    as linhas vão para a partição nova e a default volta.
+    """
+    end = add_months(start, 1)
+    create = (
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    default = f"{table}_default"
+    bounds = {
+        "s": datetime.combine(start, datetime.min.time()),
+        "e": datetime.combine(end, datetime.min.time()),
+    }
+    has_default = await db.scalar(text("SELECT to_regclass(:n) IS NOT NULL"), {"n": default})
+    stranded = has_default and await db.scalar(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= :s AND created_at < :e)"), bounds
+    )
+    if not stranded:
+        await db.execute(text(create))
+        return
+
+    await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    await db.execute(text(create))
+    moved = await db.execute(text(
+        f"WITH moved AS (DELETE FROM {default} WHERE created_at >= :s AND created_at < :e RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), bounds)
+    await db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    logger.warning(f"{table}: {moved.rowcount} linhas de {start:%Y-%m} movidas da partição default para {name}")
+
+
+async def _export_month(
+    db: AsyncSession, model, table: str, month: date, archive_dir: Path
+) -> ArchivedMonth:
+    """Grava as linhas do mês em JSONL gzip (arquivo .tmp renomeado no final)."""
+    start = datetime.combine(month, datetime.min.time())
+    end = datetime.combine(add_months(month, 1), datetime.min.time())
+    target_dir = archive_dir / table
+    target_dir.mkdir(parents=True, exist_ok=True)
+    path = target_dir / f"{table}_{month.year:04d}_{month.month:02d}.jsonl.gz"
+    tmp = path.with_suffix(".tmp")
+
+    columns = model.__table__.columns
+    rows = 0
+    last_id = 0
+    with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+        while True:
+            stmt = within_period(select(*columns), model.created_at, start, end)
+            stmt = stmt.where(model.id > last_id).order_by(model.id).limit(EXPORT_CHUNK_SIZE)
+            chunk = (await db.execute(stmt)).mappings().all()
+            if not chunk:
+                break
+            lines = "".join(json.dumps(dict(row), default=str) + "\n" for row in chunk)
+            await asyncio.to_thread(fh.write, lines)
+            rows += len(chunk)
+            last_id = chunk[-1]["id"]
+    tmp.replace(path)
+    return ArchivedMonth(table=table, month=month, rows=rows, path=path)
+
+
+async def _drop_month(db: AsyncSession, model, table: str, month: date, partitioned: bool) -> None:
+    name = partition_name(table, month)
+    if partitioned:
+        exists = await db.scalar(text("SELECT to_regclass(:n) IS NOT NULL"), {"n": name})
+        if exists:
+            await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            await db.execute(text(f"DROP TABLE {name}"))
+            return
+    # SQLite ou linhas antigas que caíram na partição default
+    start = datetime.combine(month, datetime.min.time())
+    end = datetime.combine(add_months(month, 1), datetime.min.time())
+    await db.execute(
+        within_period(delete(model), model.created_at, start, end)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def archive_expired_logs(
+    db: AsyncSession,
+    table: str,
+    retention_months: int,
+    archive_dir: Optional[Path] = None,
+    today: Optional[date] = None,
+) -> List[ArchivedMonth]:
+    """
+    Exporta e remove os meses anteriores a (mês atual - retention_months).
+
+    Cada mês é commitado separadamente: uma falha no meio não perde o que
+    já foi exportado, e o mês com falha é refeito na próxima execução.
+
+    Raises:
+        ValueError: archive_dir (ou LOG_ARCHIVE_DIR) não é um caminho absoluto
+    """
+    model = PARTITIONED_LOGS[table]
+    target = durable_archive_dir(archive_dir)
+    if target is None:
+        raise ValueError(
+            "LOG_ARCHIVE_DIR precisa ser um caminho absoluto em armazenamento persistente "
+            "para remover logs vencidos."
+        )
+    archive_dir = target
+    cutoff = add_months(month_start(today or datetime.utcnow().date()), -retention_months)
+    partitioned = await is_partitioned(db, table)
+
+    oldest = await db.scalar(
+        within_period(select(func.min(model.created_at)), model.created_at,
+                      end=datetime.combine(cutoff, datetime.min.time()))
+    )
+    if oldest is None:
+        return []
+
+    archived = []
+    month = month_start(oldest.date() if isinstance(oldest, datetime) else oldest)
+    while month < cutoff:
+        result = await _export_month(db, model, table, month, archive_dir)
+        await _drop_month(db, model, table, month, partitioned)
+        await db.commit()
+        if result.rows:
+            archived.append(result)
+            logger.info(f"{table}: {result.rows} linhas de {month:%Y-%m} arquivadas em {result.path}")
+        else:
+            result.path.unlink(missing_ok=True)
+        month = add_months(month, 1)
+    return archived
+
+
+async def run_log_retention(db: AsyncSession) -> Dict[str, int]:
+    """Job diário: cria partições futuras e arquiva o que passou da retenção."""
+    await ensure_log_partitions(db)
+    await db.commit()
+
+    retention = {
+        "audit_logs": settings.AUDIT_LOG_RETENTION_MONTHS,
+        "notification_logs": settings.NOTIFICATION_LOG_RETENTION_MONTHS,
+    }
+    summary = {}
+    if any(months > 0 for months in retention.values()) and durable_archive_dir() is None:
+        logger.error(
+            "Retenção de logs configurada sem LOG_ARCHIVE_DIR absoluto: nenhum mês será removido"
+        )
+        return summary
+    for table, months in retention.items():
+        if months <= 0:
+            continue
+        archived = await archive_expired_logs(db, table, months)
+        summary[table] = sum(a.rows for a in archived)
+    return summary
@@ -8,12 +8,56 @@ As implementações concretas ficam em módulos separados:
   - mercadopago.py  → MercadoPagoTerminalProvider, MercadoPagoPixProvider
   - manual.py       → ManualTerminalProvider (Cielo, Stone, Rede, GetNet, etc.)
 """
+import functools
+import inspect
+import time
 from abc import ABC, abstractmethod
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-
-class BaseTerminalProvider(ABC):
+from app.core.metrics import Histogram
+
+PROVIDER_CALL_DURATION = Histogram(
+    "payment_provider_call_duration_seconds",
+    "Duração das operações dos providers de pagamento (inclui chamadas HTTP ao provider)",
+    ["provider", "operation", "outcome"],
+)
+
+
+def _timed_operation(method, operation: str):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await method(self, *args, **kwargs)
+            outcome = "success"
+            return result
+        finally:
+            PROVIDER_CALL_DURATION.observe(
+                time.perf_counter() - started,
+                provider=getattr(self, "provider_name", type(self).__name__),
+                operation=operation,
+                outcome=outcome,
+            )
+    return wrapper
+
+
+class _InstrumentedProvider:
+    """Mede os métodos públicos async de cada provider concreto (payment_provider_call_duration_seconds)."""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, attr in list(vars(cls).items()):
+            if (
+                not name.startswith("_")
+                and inspect.iscoroutinefunction(attr)
+                and not getattr(attr, "__isabstractmethod__", False)
+            ):
+                setattr(cls, name, _timed_operation(attr, name))
+
+
+class BaseTerminalProvider(_InstrumentedProvider, ABC):
     """
     Interface para integração com terminais físicos (maquininhas).
 
@@ -98,7 +142,7 @@ class BaseTerminalProvider(ABC):
         ...
 
 
-class BasePixProvider(ABC):
+class BasePixProvider(_InstrumentedProvider, ABC):
     """
     Interface para geração e consulta de pagamentos PIX.
 
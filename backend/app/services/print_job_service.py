@@ -7,20 +7,28 @@ Fluxo:
   3. Gera conteúdo via LabelService (str para ZPL/CPCL, bytes para ESC/POS)
   4. Envia para impressora via PrinterService
   5. Salva PrintJob com status (done / error)
+
+Modo fila (enqueue/enqueue_batch): os passos 1-3 rodam na requisição, o job
+é salvo como QUEUED e o envio fica com o worker da impressora (print_queue).
 """
 from __future__ import annotations
 
 import logging
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import insert, select
 
 from app.models.label_printer import LabelPrinter
 from app.models.print_job import PrintJob, PrintJobStatus
 from app.models.product import Product
 from app.models.product_variant import ProductVariant
-from app.schemas.label_printer import PrintJobCreate, PrintJobBatchCreate, PrintJobResponse
+from app.schemas.label_printer import (
+    PrintJobCreate,
+    PrintJobBatchCreate,
+    PrintJobBatchItem,
+    PrintJobResponse,
+)
 from app.services.label_service import label_service
 from app.services.printer_service import printer_service
 
@@ -37,8 +45,10 @@ class PrintJobService:
     ) -> PrintJob:
         """Cria job, gera conteúdo de impressão e envia para impressora."""
         printer = await self._get_printer(db, data.printer_id, tenant_id)
-        variant = await self._get_variant(db, data.variant_id)
-        product = await self._get_product(db, data.product_id or (variant.product_id if variant else None))
+        variant = await self._get_variant(db, data.variant_id, tenant_id)
+        product = await self._get_product(
+            db, data.product_id or (variant.product_id if variant else None), tenant_id
+        )
 
         if not variant or not product:
             raise ValueError("Produto ou variante não encontrados.")
@@ -83,57 +93,94 @@ class PrintJobService:
         data: PrintJobBatchCreate,
         tenant_id: int,
     ) -> List[PrintJob]:
-        """Imprime múltiplas variantes de um produto em sequência."""
-        printer = await self._get_printer(db, data.printer_id, tenant_id)
-        product = await self._get_product(db, data.product_id)
-
-        if not product:
-            raise ValueError("Produto não encontrado.")
-
-        jobs: List[PrintJob] = []
-        for item in data.items:
-            if item.quantity <= 0:
-                continue
-
-            variant = await self._get_variant(db, item.variant_id)
-            if not variant:
-                continue
-
-            label_data = label_service.generate_back_label_zpl(
-                product=product,
-                variant=variant,
-                quantity=item.quantity,
-                show_price=item.show_price,
-                show_sku=item.show_sku,
-                printer=printer,
-            )
-
-            success, message = await printer_service.print_label(printer, label_data)
+        """
+        Imprime múltiplas variantes num único envio à impressora.
+
+        Variantes (e seus produtos) são carregadas numa só query, todas as
+        etiquetas são renderizadas e concatenadas num stream enviado pela
+        conexão persistente da impressora, e os PrintJob são gravados com
+        um único INSERT em lote. Sem product_id, o lote pode misturar
+        variantes de produtos diferentes (ex: etiquetas de uma entrada).
+        """
+        printer, rendered = await self._render_batch(db, data, tenant_id)
+        if not rendered:
+            return []
+
+        success, message = await printer_service.print_batch(
+            printer, [label_data for *_, label_data in rendered]
+        )
 
-            job = PrintJob(
-                tenant_id=tenant_id,
-                printer_id=data.printer_id,
-                product_id=product.id,
-                variant_id=variant.id,
-                quantity=item.quantity,
-                show_price=item.show_price,
-                show_sku=item.show_sku,
-                zpl_content=self._serialize_label(label_data),
+        rows = [
+            self._job_row(
+                tenant_id, data.printer_id, item, variant, product, label_data,
                 status=PrintJobStatus.DONE if success else PrintJobStatus.ERROR,
                 error_message=None if success else message,
-                product_name=product.name,
-                sku=variant.sku,
-                variant_label=self._variant_label(variant),
-                price=label_service._format_price(
-                    getattr(variant, "price", None) or getattr(variant, "sale_price", None)
-                ),
             )
-            db.add(job)
-            jobs.append(job)
+            for item, variant, product, label_data in rendered
+        ]
+        result = await db.scalars(insert(PrintJob).returning(PrintJob), rows)
+        return list(result.all())
+
+    # -----------------------------------------------------------------------
+    # Modo fila — persiste QUEUED e retorna; print_queue envia em background
+    # -----------------------------------------------------------------------
 
-        if jobs:
-            await db.flush()
-        return jobs
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        data: PrintJobCreate,
+        tenant_id: int,
+    ) -> PrintJob:
+        """Cria job QUEUED com a etiqueta já renderizada (não bloqueia na impressora)."""
+        batch = PrintJobBatchCreate(
+            printer_id=data.printer_id,
+            product_id=data.product_id,
+            items=[
+                PrintJobBatchItem(
+                    variant_id=data.variant_id or 0,
+                    quantity=data.quantity,
+                    show_price=data.show_price,
+                    show_sku=data.show_sku,
+                )
+            ],
+        )
+        jobs = await self.enqueue_batch(db, batch, tenant_id)
+        if not jobs:
+            raise ValueError("Produto ou variante não encontrados.")
+        return jobs[0]
+
+    async def enqueue_batch(
+        self,
+        db: AsyncSession,
+        data: PrintJobBatchCreate,
+        tenant_id: int,
+    ) -> List[PrintJob]:
+        """Cria um job QUEUED por variante, na ordem recebida, com um único INSERT."""
+        _, rendered = await self._render_batch(db, data, tenant_id)
+        if not rendered:
+            return []
+
+        rows = [
+            self._job_row(
+                tenant_id, data.printer_id, item, variant, product, label_data,
+                status=PrintJobStatus.QUEUED,
+            )
+            for item, variant, product, label_data in rendered
+        ]
+        result = await db.scalars(insert(PrintJob).returning(PrintJob), rows)
+        return list(result.all())
+
+    async def get_job(
+        self, db: AsyncSession, job_id: int, tenant_id: int
+    ) -> Optional[PrintJob]:
+        """Busca um job do tenant (polling de status)."""
+        q = select(PrintJob).where(
+            PrintJob.id == job_id,
+            PrintJob.tenant_id == tenant_id,
+            PrintJob.is_active == True,
+        )
+        result = await db.execute(q)
+        return result.scalar_one_or_none()
 
     async def get_zpl_preview(
         self,
@@ -145,18 +192,22 @@ class PrintJobService:
         show_price: bool = True,
         show_sku: bool = True,
     ) -> dict:
-        """Retorna o ZPL gerado sem imprimir (para debug/preview)."""
+        """
+        Retorna o ZPL gerado sem imprimir (para debug/preview).
+
+        Servido pelo cache de render do LabelService: a etiqueta só é
+        gerada de novo se preço, SKU, nome ou a impressora mudaram.
+        """
         printer = None
         if printer_id:
             printer = await self._get_printer(db, printer_id, tenant_id)
 
-        variant = await self._get_variant(db, variant_id)
-        product = await self._get_product(db, product_id)
-
-        if not variant or not product:
+        pair = (await self._get_variants_with_products(db, [variant_id], tenant_id)).get(variant_id)
+        if not pair or pair[1].id != product_id:
             raise ValueError("Produto ou variante não encontrados.")
+        variant, product = pair
 
-        label_data = label_service.generate_back_label_zpl(
+        label_data, cached = label_service.render_back_label(
             product=product,
             variant=variant,
             quantity=1,
@@ -176,6 +227,7 @@ class PrintJobService:
             "label_width_mm": width_mm,
             "label_height_mm": height_mm,
             "dpi": dpi,
+            "cached": cached,
         }
 
     async def list_jobs(
@@ -278,20 +330,108 @@ class PrintJobService:
         return printer
 
     async def _get_variant(
-        self, db: AsyncSession, variant_id: Optional[int]
+        self, db: AsyncSession, variant_id: Optional[int], tenant_id: int
     ) -> Optional[ProductVariant]:
         if not variant_id:
             return None
-        q = select(ProductVariant).where(ProductVariant.id == variant_id)
+        q = select(ProductVariant).where(
+            ProductVariant.id == variant_id,
+            ProductVariant.tenant_id == tenant_id,
+        )
         result = await db.execute(q)
         return result.scalar_one_or_none()
 
+    async def _render_batch(
+        self, db: AsyncSession, data: PrintJobBatchCreate, tenant_id: int
+    ) -> Tuple[LabelPrinter, list]:
+        """Valida impressora/produto e renderiza as etiquetas do lote (uma query de variantes)."""
+        printer = await self._get_printer(db, data.printer_id, tenant_id)
+
+        if data.product_id is not None:
+            product = await self._get_product(db, data.product_id, tenant_id)
+            if not product:
+                raise ValueError("Produto não encontrado.")
+
+        items = [item for item in data.items if item.quantity > 0]
+        # Variantes de outro tenant não voltam da query e são ignoradas
+        variants = await self._get_variants_with_products(db, [i.variant_id for i in items], tenant_id)
+
+        rendered = []
+        for item in items:
+            pair = variants.get(item.variant_id)
+            if not pair:
+                continue
+            variant, product = pair
+
+            label_data = label_service.generate_back_label_zpl(
+                product=product,
+                variant=variant,
+                quantity=item.quantity,
+                show_price=item.show_price,
+                show_sku=item.show_sku,
+                printer=printer,
+            )
+            rendered.append((item, variant, product, label_data))
+
+        return printer, rendered
+
+    def _job_row(
+        self,
+        tenant_id: int,
+        printer_id: int,
+        item: PrintJobBatchItem,
+        variant: ProductVariant,
+        product: Product,
+        label_data: Union[str, bytes],
+        status: PrintJobStatus,
+        error_message: Optional[str] = None,
+    ) -> dict:
+        """Valores de um PrintJob (snapshot dos dados no momento da impressão)."""
+        return {
+            "tenant_id": tenant_id,
+            "printer_id": printer_id,
+            "product_id": product.id,
+            "variant_id": variant.id,
+            "quantity": item.quantity,
+            "show_price": item.show_price,
+            "show_sku": item.show_sku,
+            "zpl_content": self._serialize_label(label_data),
+            "status": status,
+            "error_message": error_message,
+            "product_name": product.name,
+            "sku": variant.sku,
+            "variant_label": self._variant_label(variant),
+            "price": label_service._format_price(
+                getattr(variant, "price", None) or getattr(variant, "sale_price", None)
+            ),
+        }
+
+    async def _get_variants_with_products(
+        self, db: AsyncSession, variant_ids: List[int], tenant_id: int
+    ) -> Dict[int, Tuple[ProductVariant, Product]]:
+        """
+        Carrega variantes do tenant e seus produtos numa única query:
+        {variant_id: (variant, product)}. Ids de outro tenant ficam de fora.
+        """
+        if not variant_ids:
+            return {}
+        q = (
+            select(ProductVariant, Product)
+            .join(Product, ProductVariant.product_id == Product.id)
+            .where(
+                ProductVariant.id.in_(set(variant_ids)),
+                Product.tenant_id == tenant_id,
+            )
+        )
+        result = await db.execute(q)
+        return {variant.id: (variant, product) for variant, product in result.all()}
+
     async def _get_product(
-        self, db: AsyncSession, product_id: Optional[int]
+        self, db: AsyncSession, product_id: Optional[int], tenant_id: int
     ) -> Optional[Product]:
         if not product_id:
             return None
-        q = select(Product).where(Product.id == product_id)
+        q = select(Product).where(Product.id == product_id, Product.tenant_id == tenant_id)
         result = await db.execute(q)
         return result.scalar_one_or_none()
 
@@ -0,0 +1,277 @@
+"""
+Fila assíncrona de impressão com um worker por impressora.
+
+Fluxo:
+  1. PrintJobService.enqueue/enqueue_batch grava os jobs como QUEUED
+     (etiqueta já renderizada em zpl_content) e o endpoint chama notify()
+     após o commit — a requisição retorna sem esperar a impressora.
+  2. O worker da impressora busca os jobs QUEUED em ordem de id, agrupa os
+     consecutivos já elegíveis (coalescing) e envia tudo num único stream
+     via printer_service.print_batch.
+  3. Sucesso → DONE. Falha → volta para QUEUED com backoff exponencial em
+     next_attempt_at; após MAX_ATTEMPTS vira ERROR.
+  4. Cada mudança de status acorda quem está esperando o job (SSE).
+
+A ordem é estrita por impressora: se o job mais antigo está em backoff, os
+seguintes esperam por ele. O worker encerra sozinho após ficar ocioso.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.background import run_wake_loop
+from app.core.database import resolve_session_factory
+from app.models.label_printer import LabelPrinter, PrinterProtocol
+from app.models.print_job import PrintJob, PrintJobStatus
+from app.services.printer_service import printer_service
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {PrintJobStatus.DONE, PrintJobStatus.ERROR, PrintJobStatus.CANCELLED}
+
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Normaliza datetime do banco (aware no Postgres, naive no SQLite) para UTC naive."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class PrintQueue:
+    """Workers de impressão em background, um por impressora."""
+
+    MAX_ATTEMPTS = 5
+    BACKOFF_BASE_SECONDS = 2
+    BACKOFF_MAX_SECONDS = 60
+    MAX_COALESCE = 50
+    IDLE_EXIT_SECONDS = 30
+    ERROR_PAUSE_SECONDS = 5
+    STALE_PRINTING_MINUTES = 5
+
+    def __init__(self, session_factory=None):
+        """
+        Args:
+            session_factory: async_sessionmaker usado pelos workers
+                (padrão: app.core.database.async_session_maker, resolvido
+                a cada uso para respeitar overrides de teste)
+        """
+        self._session_factory = session_factory
+        self._workers: dict[int, asyncio.Task] = {}
+        self._wakeups: dict[int, asyncio.Event] = {}
+        self._job_events: dict[int, asyncio.Event] = {}
+
+    def _sessions(self):
+        return resolve_session_factory(self._session_factory)
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """
+        Retoma a fila no startup.
+
+        Jobs presos em PRINTING há mais de STALE_PRINTING_MINUTES (worker
+        morto no meio do envio) voltam para QUEUED, e cada impressora com
+        jobs pendentes ganha um worker.
+        """
+        stale_before = datetime.utcnow() - timedelta(minutes=self.STALE_PRINTING_MINUTES)
+        async with self._sessions()() as db:
+            await db.execute(
+                update(PrintJob)
+                .where(
+                    PrintJob.status == PrintJobStatus.PRINTING,
+                    PrintJob.updated_at < stale_before,
+                )
+                .values(status=PrintJobStatus.QUEUED)
+                .execution_options(synchronize_session=False)
+            )
+            result = await db.execute(
+                select(PrintJob.printer_id)
+                .where(PrintJob.status == PrintJobStatus.QUEUED, PrintJob.is_active == True)
+                .distinct()
+            )
+            printer_ids = [row[0] for row in result.all()]
+            await db.commit()
+
+        for printer_id in printer_ids:
+            self.notify(printer_id)
+        if printer_ids:
+            logger.info("Print queue resumed for printers %s", printer_ids)
+
+    async def shutdown(self) -> None:
+        """Cancela os workers (jobs não enviados continuam QUEUED no banco)."""
+        tasks = list(self._workers.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers.clear()
+
+    def notify(self, printer_id: int) -> None:
+        """Acorda (ou cria) o worker da impressora. Chamar após o commit dos jobs."""
+        wakeup = self._wakeups.setdefault(printer_id, asyncio.Event())
+        wakeup.set()
+
+        task = self._workers.get(printer_id)
+        if task is None or task.done():
+            self._workers[printer_id] = asyncio.create_task(
+                self._run_worker(printer_id), name=f"print-worker-{printer_id}"
+            )
+
+    async def wait_idle(self, printer_id: int, timeout: float = 10) -> None:
+        """Aguarda o worker da impressora terminar (usado em testes)."""
+        task = self._workers.get(printer_id)
+        if task is not None:
+            await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+
+    # ------------------------------------------------------------------
+    # Status (polling / SSE)
+    # ------------------------------------------------------------------
+
+    async def wait_for_update(self, job_id: int, timeout: float) -> bool:
+        """Espera a próxima mudança de status do job. Retorna False no timeout."""
+        event = self._job_events.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _publish(self, job_ids: list[int]) -> None:
+        for job_id in job_ids:
+            event = self._job_events.pop(job_id, None)
+            if event:
+                event.set()
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    async def _run_worker(self, printer_id: int) -> None:
+        wakeup = self._wakeups.setdefault(printer_id, asyncio.Event())
+        try:
+            await run_wake_loop(
+                wakeup,
+                lambda: self._drain(printer_id),
+                error_pause=self.ERROR_PAUSE_SECONDS,
+                logger=logger,
+                name=f"Print worker {printer_id}",
+                idle_exit=self.IDLE_EXIT_SECONDS,
+            )
+        finally:
+            if self._workers.get(printer_id) is asyncio.current_task():
+                self._workers.pop(printer_id, None)
+
+    async def _drain(self, printer_id: int) -> Optional[float]:
+        """
+        Processa um grupo de jobs da impressora.
+
+        Returns:
+            0 se processou algo (chamar de novo), segundos até o próximo
+            retry se o job da frente está em backoff, None se a fila está vazia.
+        """
+        async with self._sessions()() as db:
+            result = await db.execute(
+                select(PrintJob)
+                .where(
+                    PrintJob.printer_id == printer_id,
+                    PrintJob.status == PrintJobStatus.QUEUED,
+                    PrintJob.is_active == True,
+                )
+                .order_by(PrintJob.id)
+                .limit(self.MAX_COALESCE)
+            )
+            jobs = list(result.scalars().all())
+            if not jobs:
+                return None
+
+            now = datetime.utcnow()
+            head_due = _utc_naive(jobs[0].next_attempt_at)
+            if head_due and head_due > now:
+                return (head_due - now).total_seconds()
+
+            # Coalescing: jobs consecutivos já elegíveis vão no mesmo envio
+            batch = []
+            for job in jobs:
+                due = _utc_naive(job.next_attempt_at)
+                if due and due > now:
+                    break
+                batch.append(job)
+
+            # Claim condicional — outro processo pode ter pego os mesmos jobs
+            claimed = set(
+                (
+                    await db.execute(
+                        update(PrintJob)
+                        .where(
+                            PrintJob.id.in_([j.id for j in batch]),
+                            PrintJob.status == PrintJobStatus.QUEUED,
+                        )
+                        .values(status=PrintJobStatus.PRINTING, updated_at=now)
+                        .returning(PrintJob.id)
+                        .execution_options(synchronize_session=False)
+                    )
+                ).scalars().all()
+            )
+            await db.commit()
+            batch = [job for job in batch if job.id in claimed]
+            if not batch:
+                return 0
+            for job in batch:
+                set_committed_value(job, "status", PrintJobStatus.PRINTING)
+            self._publish([job.id for job in batch])
+
+            # Jobs já estão PRINTING (commitados): qualquer exceção daqui em
+            # diante vira tentativa falha, senão ficariam presos até o restart
+            final = False
+            try:
+                printer = await db.get(LabelPrinter, printer_id)
+                if printer is None or not printer.is_active:
+                    success, message, final = False, f"Impressora {printer_id} não encontrada.", True
+                else:
+                    chunks = [self._deserialize(job.zpl_content or "", printer) for job in batch]
+                    success, message = await printer_service.print_batch(printer, chunks)
+            except Exception as e:
+                logger.error("Impressora %s: erro ao renderizar/enviar lote: %s", printer_id, e, exc_info=True)
+                success, message = False, f"Erro ao enviar: {e}"
+
+            for job in batch:
+                job.attempts = (job.attempts or 0) + 1
+                if success:
+                    job.status = PrintJobStatus.DONE
+                    job.error_message = None
+                    job.next_attempt_at = None
+                elif final or job.attempts >= self.MAX_ATTEMPTS:
+                    job.status = PrintJobStatus.ERROR
+                    job.error_message = message
+                else:
+                    job.status = PrintJobStatus.QUEUED
+                    job.error_message = message
+                    job.next_attempt_at = now + timedelta(seconds=self._backoff(job.attempts))
+            await db.commit()
+
+            if not success:
+                logger.warning(
+                    "Impressora %s: falha ao enviar %d job(s): %s", printer_id, len(batch), message
+                )
+            self._publish([job.id for job in batch])
+            return 0
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self.BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), self.BACKOFF_MAX_SECONDS)
+
+    @staticmethod
+    def _deserialize(content: str, printer: LabelPrinter):
+        """Inverso de PrintJobService._serialize_label (ESC/POS é salvo em hex)."""
+        if printer.protocol == PrinterProtocol.ESC_POS:
+            return bytes.fromhex(content)
+        return content
+
+
+print_queue = PrintQueue()
@@ -8,17 +8,28 @@ Suporta três modos de conexão:
 
 Aceita tanto str (ZPL, CPCL) quanto bytes (ESC/POS).
 
+Ethernet: a conexão TCP com cada impressora é reaproveitada entre envios
+próximos (pool por host:porta); um timer fecha o socket após
+TCP_IDLE_SECONDS sem uso, liberando a impressora para outros clientes. O
+I/O roda num executor dedicado para não disputar o thread pool padrão do
+loop.
+
 Uso:
     result = await printer_service.print_label(printer, data)
+    result = await printer_service.print_batch(printer, [data1, data2, ...])
     result = await printer_service.test_connection(printer, test_data)
 """
 from __future__ import annotations
 
 import asyncio
 import logging
+import select
 import socket
 import sys
-from typing import TYPE_CHECKING, Union
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterable, Union
 
 if TYPE_CHECKING:
     from app.models.label_printer import LabelPrinter
@@ -31,14 +42,134 @@ logger = logging.getLogger(__name__)
 TCP_TIMEOUT = 10
 # Tamanho do buffer de leitura de resposta (alguns modelos retornam status)
 READ_BUFFER = 1024
+# Conexão ociosa é fechada após este tempo (timer) — impressoras na porta
+# 9100 costumam aceitar um único cliente por vez
+TCP_IDLE_SECONDS = 15
+
+# Executor dedicado ao I/O de impressoras (não ocupa o default executor)
+_printer_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="printer-io")
 
 
 LabelData = Union[str, bytes]
 
 
+def join_label_data(chunks: Iterable[LabelData]) -> LabelData:
+    """
+    Concatena várias etiquetas num único stream.
+
+    ZPL (^XA..^XZ) e CPCL (..PRINT) aceitam formatos consecutivos no mesmo
+    envio; ESC/POS é binário e concatena byte a byte.
+    """
+    items = list(chunks)
+    if any(isinstance(c, bytes) for c in items):
+        return b"".join(c if isinstance(c, bytes) else c.encode("utf-8") for c in items)
+    return "\n".join(items)
+
+
+class _TcpConnectionPool:
+    """
+    Uma conexão TCP persistente por (host, porta), serializada por lock.
+
+    Cada envio reagenda um timer; se nenhum outro envio chegar em
+    idle_seconds, o timer fecha o socket.
+    """
+
+    def __init__(self, idle_seconds: float = TCP_IDLE_SECONDS) -> None:
+        self.idle_seconds = idle_seconds
+        self._conns: dict[tuple[str, int], tuple[socket.socket, float]] = {}
+        self._locks: dict[tuple[str, int], threading.Lock] = {}
+        self._timers: dict[tuple[str, int], threading.Timer] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, key: tuple[str, int]) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def _is_alive(sock: socket.socket) -> bool:
+        """Detecta conexão fechada pela impressora (leitura pronta com 0 bytes)."""
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+            if not readable:
+                return True
+            return bool(sock.recv(READ_BUFFER, socket.MSG_PEEK))
+        except (OSError, ValueError):
+            return False
+
+    def _schedule_reap(self, key: tuple[str, int]) -> None:
+        timer = threading.Timer(self.idle_seconds, self._reap, args=(key,))
+        timer.daemon = True
+        with self._guard:
+            previous = self._timers.pop(key, None)
+            self._timers[key] = timer
+        if previous:
+            previous.cancel()
+        timer.start()
+
+    def _reap(self, key: tuple[str, int]) -> None:
+        """Fecha a conexão se continua ociosa (envio em curso segura o lock)."""
+        with self._lock_for(key):
+            cached = self._conns.get(key)
+            if not cached or time.monotonic() - cached[1] < self.idle_seconds:
+                return
+            del self._conns[key]
+        try:
+            cached[0].close()
+        except OSError:
+            pass
+
+    def send(self, host: str, port: int, raw: bytes) -> bool:
+        """
+        Envia raw pela conexão do pool.
+
+        Returns:
+            True se reaproveitou uma conexão existente, False se abriu nova.
+        """
+        key = (host, port)
+        with self._lock_for(key):
+            cached = self._conns.pop(key, None)
+            if cached:
+                sock, last_used = cached
+                if time.monotonic() - last_used < self.idle_seconds and self._is_alive(sock):
+                    try:
+                        sock.sendall(raw)
+                        self._conns[key] = (sock, time.monotonic())
+                        self._schedule_reap(key)
+                        return True
+                    except OSError:
+                        pass
+                sock.close()
+
+            sock = socket.create_connection((host, port), timeout=TCP_TIMEOUT)
+            try:
+                sock.sendall(raw)
+            except OSError:
+                sock.close()
+                raise
+            self._conns[key] = (sock, time.monotonic())
+            self._schedule_reap(key)
+            return False
+
+    def close_all(self) -> None:
+        """Fecha todas as conexões abertas (shutdown)."""
+        with self._guard:
+            conns, self._conns = self._conns, {}
+            timers, self._timers = self._timers, {}
+        for timer in timers.values():
+            timer.cancel()
+        for sock, _ in conns.values():
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+
 class PrinterService:
     """Envia dados de impressão (ZPL str, CPCL str ou ESC/POS bytes) para impressora de etiquetas."""
 
+    def __init__(self, tcp_idle_seconds: float = TCP_IDLE_SECONDS) -> None:
+        self._tcp_pool = _TcpConnectionPool(idle_seconds=tcp_idle_seconds)
+
     async def print_label(self, printer: "LabelPrinter", data: LabelData) -> tuple[bool, str]:
         """
         Envia dados para a impressora.
@@ -61,6 +192,21 @@ class PrinterService:
             logger.error("Erro ao imprimir na impressora %s: %s", printer.name, e)
             return False, str(e)
 
+    async def print_batch(self, printer: "LabelPrinter", chunks: list[LabelData]) -> tuple[bool, str]:
+        """
+        Envia várias etiquetas num único stream (uma conexão, um envio).
+
+        Returns:
+            (success, message) — o lote é tudo-ou-nada do ponto de vista do envio
+        """
+        if not chunks:
+            return True, "Nada a imprimir."
+        return await self.print_label(printer, join_label_data(chunks))
+
+    def close_connections(self) -> None:
+        """Fecha conexões TCP persistentes (chamado no shutdown da aplicação)."""
+        self._tcp_pool.close_all()
+
     async def print_zpl(self, printer: "LabelPrinter", data: LabelData) -> tuple[bool, str]:
         """Alias de print_label para compatibilidade."""
         return await self.print_label(printer, data)
@@ -80,19 +226,21 @@ class PrinterService:
         loop = asyncio.get_event_loop()
         try:
             result = await loop.run_in_executor(
-                None, self._send_tcp, printer.ip_address, printer.port, data
+                _printer_executor, self._send_tcp, printer.ip_address, printer.port, data
             )
             return result
         except Exception as e:
             return False, f"Erro TCP: {e}"
 
     def _send_tcp(self, host: str, port: int, data: LabelData) -> tuple[bool, str]:
-        """Conecta via TCP e envia dados (síncrono — executado em executor)."""
+        """Envia dados pela conexão TCP persistente (síncrono — executado em executor)."""
         raw = data if isinstance(data, bytes) else data.encode("utf-8")
         try:
-            with socket.create_connection((host, port), timeout=TCP_TIMEOUT) as sock:
-                sock.sendall(raw)
-            logger.info("Dados enviados via TCP → %s:%s (%d bytes)", host, port, len(raw))
+            reused = self._tcp_pool.send(host, port, raw)
+            logger.info(
+                "Dados enviados via TCP → %s:%s (%d bytes, conexão %s)",
+                host, port, len(raw), "reaproveitada" if reused else "nova",
+            )
             return True, "Impresso com sucesso via Ethernet."
         except socket.timeout:
             return False, f"Timeout ao conectar em {host}:{port}. Verifique se a impressora está ligada e na rede."
@@ -109,7 +257,7 @@ class PrinterService:
         loop = asyncio.get_event_loop()
         try:
             result = await loop.run_in_executor(
-                None, self._send_usb, printer.usb_device, data
+                _printer_executor, self._send_usb, printer.usb_device, data
             )
             return result
         except Exception as e:
@@ -154,7 +302,7 @@ class PrinterService:
         loop = asyncio.get_event_loop()
         try:
             result = await loop.run_in_executor(
-                None, self._send_serial, printer.serial_port, printer.baud_rate, data
+                _printer_executor, self._send_serial, printer.serial_port, printer.baud_rate, data
             )
             return result
         except Exception as e:
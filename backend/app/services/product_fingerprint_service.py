@@ -0,0 +1,311 @@
+"""
+Índice de fingerprints de produtos para detecção de duplicados (AI Scan).
+
+Cada produto ativo do tenant vira um ProductFingerprint com os tokens
+normalizados (normalize_search) de marca, categoria, cores, tamanhos, pares
+(cor, tamanho) de variantes ativas e trigramas do nome, além de estoque e
+custo já agregados. O índice do tenant mantém listas invertidas por marca,
+categoria e trigrama: uma busca pontua só os candidatos que compartilham
+algum token, em memória, numa única passada.
+
+Validade: o índice é guardado por worker junto com a versão do catálogo do
+tenant (sequence_counters "catalog_version"), que os hooks da projeção
+incrementam a cada commit que toca Product, ProductVariant ou Category, ou
+que muda o saldo de alguma variante no ledger (variant_stock, de onde vem o
+estoque do índice). Uma checagem de duplicados com índice válido custa uma consulta
+(a versão); após mudanças, o índice é reconstruído em três consultas.
+"""
+import heapq
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.variant_stock import VariantStock
+from app.schemas.ai import DuplicateMatch
+from app.services.catalog_projection_service import CatalogProjectionService
+from app.utils.text import normalize_search
+
+# Pesos do score por atributo (mesmos de AIScanService._calculate_similarity)
+NAME_WEIGHT = 0.4
+BRAND_WEIGHT = 0.3
+COLOR_WEIGHT = 0.15
+SIZE_WEIGHT = 0.15
+
+NAME_MIN_SCORE = 0.5
+MAX_MATCHES = 5
+
+
+def name_ngrams(normalized: str, n: int = 3) -> FrozenSet[str]:
+    """Trigramas de cada palavra (com bordas), ex: 'top' -> {' to', 'top', 'op '}."""
+    grams: Set[str] = set()
+    for word in normalized.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return frozenset(grams)
+
+
+@dataclass(slots=True)
+class ProductFingerprint:
+    product_id: int
+    name: str
+    sku: str
+    name_key: str
+    brand_key: str
+    category_id: Optional[int]
+    colors: FrozenSet[str]
+    sizes: FrozenSet[str]
+    color_sizes: FrozenSet[Tuple[str, str]]
+    grams: FrozenSet[str]
+    total_stock: int = 0
+    cost_price: Optional[float] = None
+
+
+@dataclass
+class ScanQuery:
+    """Atributos detectados pela IA, já normalizados."""
+    name_key: str
+    brand_key: str
+    color_key: str
+    size_key: str
+    category_id: Optional[int]
+    grams: FrozenSet[str]
+
+    @classmethod
+    def build(cls, name, brand, color, size, category_id) -> "ScanQuery":
+        name_key = normalize_search(name)
+        return cls(
+            name_key=name_key,
+            brand_key=normalize_search(brand),
+            color_key=normalize_search(color),
+            size_key=normalize_search(size),
+            category_id=category_id,
+            grams=name_ngrams(name_key),
+        )
+
+
+@dataclass
+class FingerprintIndex:
+    """Fingerprints de um tenant com listas invertidas para gerar candidatos."""
+    fingerprints: List[ProductFingerprint]
+    by_brand: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+    by_category: Dict[int, List[int]] = field(default_factory=lambda: defaultdict(list))
+    by_gram: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+
+    def __post_init__(self):
+        for pos, fp in enumerate(self.fingerprints):
+            if fp.brand_key:
+                self.by_brand[fp.brand_key].append(pos)
+            if fp.category_id is not None:
+                self.by_category[fp.category_id].append(pos)
+            for gram in fp.grams:
+                self.by_gram[gram].append(pos)
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def _candidates(self, query: ScanQuery) -> Set[int]:
+        positions: Set[int] = set()
+        if query.brand_key:
+            positions.update(self.by_brand.get(query.brand_key, ()))
+        if query.category_id is not None and query.color_key and query.size_key:
+            positions.update(self.by_category.get(query.category_id, ()))
+        for gram in query.grams:
+            positions.update(self.by_gram.get(gram, ()))
+        return positions
+
+    def search(self, query: ScanQuery, limit: int = MAX_MATCHES) -> List[DuplicateMatch]:
+        """Pontua os candidatos e devolve os `limit` melhores (score, reason)."""
+        scored = []
+        for pos in self._candidates(query):
+            fp = self.fingerprints[pos]
+            score, reason = score_fingerprint(query, fp)
+            if score > 0:
+                scored.append((score, -fp.product_id, reason, fp))
+
+        return [
+            DuplicateMatch(
+                product_id=fp.product_id,
+                product_name=fp.name,
+                sku=fp.sku,
+                similarity_score=score,
+                reason=reason,
+                current_stock=fp.total_stock,
+                cost_price=fp.cost_price,
+            )
+            for score, _, reason, fp in heapq.nlargest(limit, scored, key=lambda s: (s[0], s[1]))
+        ]
+
+
+def _name_ratio(query: ScanQuery, fp: ProductFingerprint) -> float:
+    if not query.name_key or not fp.name_key:
+        return 0.0
+    if query.name_key == fp.name_key:
+        return 1.0
+    if query.name_key in fp.name_key or fp.name_key in query.name_key:
+        return 0.8
+    # Jaccard dos trigramas — tolera plural, ordem e erros de grafia
+    union = len(query.grams | fp.grams)
+    return len(query.grams & fp.grams) / union if union else 0.0
+
+
+def score_fingerprint(query: ScanQuery, fp: ProductFingerprint) -> Tuple[float, str]:
+    """
+    Score de um produto, mesmas regras das antigas estratégias de
+    _find_duplicates: pares exatos de variante valem 0.95/0.85/0.80; senão,
+    similaridade ponderada com o nome (mínimo NAME_MIN_SCORE).
+    """
+    same_brand = bool(query.brand_key) and query.brand_key == fp.brand_key
+    same_color = bool(query.color_key) and query.color_key in fp.colors
+    same_size = bool(query.size_key) and query.size_key in fp.sizes
+    same_pair = same_color and same_size and (query.color_key, query.size_key) in fp.color_sizes
+
+    if same_brand and same_pair:
+        return 0.95, "Mesma marca, cor e tamanho"
+    if same_brand and same_color:
+        return 0.85, "Mesma marca e cor"
+    if same_brand and same_size:
+        return 0.85, "Mesma marca e tamanho"
+    if same_pair and query.category_id is not None and query.category_id == fp.category_id:
+        return 0.80, "Mesma categoria, cor e tamanho"
+
+    name_ratio = _name_ratio(query, fp)
+    score = (
+        NAME_WEIGHT * name_ratio
+        + BRAND_WEIGHT * same_brand
+        + COLOR_WEIGHT * same_color
+        + SIZE_WEIGHT * same_size
+    )
+    if name_ratio == 0 or score < NAME_MIN_SCORE:
+        return 0.0, ""
+    reasons = ["Nome similar"]
+    if same_brand:
+        reasons.append("Mesma marca")
+    if same_color:
+        reasons.append("Mesma cor")
+    if same_size:
+        reasons.append("Mesmo tamanho")
+    return round(min(score, 1.0), 4), ", ".join(reasons)
+
+
+async def build_fingerprint_index(db: AsyncSession, tenant_id: int) -> FingerprintIndex:
+    """Monta o índice do tenant em três consultas (produtos, variantes, estoque)."""
+    products = (await db.execute(
+        select(Product.id, Product.name, Product.brand, Product.category_id)
+        .where(Product.tenant_id == tenant_id, Product.is_active == True)
+        .order_by(Product.id)
+    )).all()
+    variants = (await db.execute(
+        select(
+            ProductVariant.product_id, ProductVariant.sku, ProductVariant.color,
+            ProductVariant.size, ProductVariant.cost_price,
+        )
+        .join(Product, Product.id == ProductVariant.product_id)
+        .where(
+            Product.tenant_id == tenant_id,
+            Product.is_active == True,
+            ProductVariant.is_active == True,
+        )
+        .order_by(ProductVariant.product_id, ProductVariant.id)
+    )).all()
+    # Estoque por produto no ledger (mesma soma de StockLedgerService.on_hand_by_product)
+    stock = dict((await db.execute(
+        select(VariantStock.product_id, func.sum(VariantStock.on_hand))
+        .join(ProductVariant, ProductVariant.id == VariantStock.variant_id)
+        .where(VariantStock.tenant_id == tenant_id, ProductVariant.is_active == True)
+        .group_by(VariantStock.product_id)
+    )).all())
+
+    variants_by_product = defaultdict(list)
+    for row in variants:
+        variants_by_product[row.product_id].append(row)
+
+    fingerprints = []
+    for product_id, name, brand, category_id in products:
+        rows = variants_by_product.get(product_id, [])
+        colors = {normalize_search(v.color) for v in rows if v.color}
+        sizes = {normalize_search(v.size) for v in rows if v.size}
+        pairs = {
+            (normalize_search(v.color), normalize_search(v.size))
+            for v in rows if v.color and v.size
+        }
+        cost = next((float(v.cost_price) for v in rows if v.cost_price), None)
+        name_key = normalize_search(name)
+        fingerprints.append(ProductFingerprint(
+            product_id=product_id,
+            name=name,
+            sku=rows[0].sku if rows and rows[0].sku else "",
+            name_key=name_key,
+            brand_key=normalize_search(brand),
+            category_id=category_id,
+            colors=frozenset(colors),
+            sizes=frozenset(sizes),
+            color_sizes=frozenset(pairs),
+            grams=name_ngrams(name_key),
+            total_stock=int(stock.get(product_id) or 0),
+            cost_price=cost,
+        ))
+    return FingerprintIndex(fingerprints)
+
+
+class FingerprintIndexCache:
+    """Índices por tenant, válidos enquanto a versão do catálogo não mudar (LRU)."""
+
+    def __init__(self, max_tenants: Optional[int] = None):
+        self.max_tenants = max_tenants or settings.DUPLICATE_INDEX_MAX_TENANTS
+        self._entries: "OrderedDict[int, Tuple[int, FingerprintIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, tenant_id: int, version: int) -> Optional[FingerprintIndex]:
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(tenant_id)
+            return entry[1]
+
+    def set(self, tenant_id: int, version: int, index: FingerprintIndex) -> None:
+        with self._lock:
+            self._entries[tenant_id] = (version, index)
+            self._entries.move_to_end(tenant_id)
+            while len(self._entries) > self.max_tenants:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.builds = 0
+
+    async def index_for(self, db: AsyncSession, tenant_id: int) -> FingerprintIndex:
+        version, _ = await CatalogProjectionService(db).get_version(tenant_id)
+        index = self.get(tenant_id, version)
+        if index is None:
+            index = await build_fingerprint_index(db, tenant_id)
+            self.builds += 1
+            self.set(tenant_id, version, index)
+        return index
+
+
+fingerprint_cache = FingerprintIndexCache()
+
+
+async def find_duplicate_products(
+    db: AsyncSession,
+    tenant_id: int,
+    name: str,
+    brand: Optional[str] = None,
+    color: Optional[str] = None,
+    size: Optional[str] = None,
+    category_id: Optional[int] = None,
+    limit: int = MAX_MATCHES,
+) -> List[DuplicateMatch]:
+    """Top `limit` produtos do tenant parecidos com os atributos informados."""
+    index = await fingerprint_cache.index_for(db, tenant_id)
+    return index.search(ScanQuery.build(name, brand, color, size, category_id), limit)
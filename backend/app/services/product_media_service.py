@@ -17,6 +17,7 @@ from app.models.product import Product
 from app.models.product_variant import ProductVariant
 from app.repositories.product_media_repository import ProductMediaRepository
 from app.repositories.product_repository import ProductRepository
+from app.services.catalog_projection_service import mark_catalog_changed
 
 
 class ProductMediaService:
@@ -100,6 +101,8 @@ class ProductMediaService:
 
         await self._sync_cover_url(product, media.variant_id, media.url)
 
+        # is_cover muda via UPDATE em massa — invisível aos hooks do ORM
+        mark_catalog_changed(self.db, [product_id])
         await self.db.commit()
         await self.db.refresh(media)
         return media
@@ -139,6 +142,7 @@ class ProductMediaService:
                 # Sem fotos restantes — limpa image_url
                 await self._sync_cover_url(product, variant_id, None)
 
+        mark_catalog_changed(self.db, [product_id])
         await self.db.commit()
 
     async def reorder(
@@ -152,6 +156,7 @@ class ProductMediaService:
         if not product:
             raise ValueError(f"Produto {product_id} não encontrado")
         await self.repo.reorder(items)
+        mark_catalog_changed(self.db, [product_id])
         await self.db.commit()
         return await self.repo.list_by_product(product_id)
 
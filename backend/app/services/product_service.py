@@ -12,7 +12,9 @@ from app.repositories.inventory_repository import InventoryRepository
 from app.repositories.product_repository import ProductRepository
 from app.repositories.entry_item_repository import EntryItemRepository
 from app.schemas.product import ProductCreate, ProductUpdate, ProductStatusResponse
+from app.services.label_service import label_service
 from app.core.timezone import now_brazil
+from app.services.stock_ledger_service import mark_stock_changed
 
 # Logger global do módulo
 logger = logging.getLogger(__name__)
@@ -405,6 +407,7 @@ class ProductService:
 
         # Commit das alterações
         await self.db.commit()
+        label_service.invalidate_product(product_id)
         await self.db.refresh(updated_product)
 
         return updated_product
@@ -666,6 +669,7 @@ class ProductService:
                 ),
                 {"pid": product_id, "tid": tenant_id},
             )
+            mark_stock_changed(self.db, product_ids=[product_id])
 
         # Zerar inventory (real_stock > 0 ou desincronizado)
         if inventory and inventory.quantity > 0:
@@ -703,6 +707,7 @@ class ProductService:
         await self.product_repo.update(self.db, id=product_id, obj_in={'is_active': False}, tenant_id=tenant_id)
         
         await self.db.commit()
+        label_service.invalidate_product(product_id)
         return True
     
     async def get_product(self, product_id: int, *, tenant_id: int) -> Optional[Product]:
@@ -960,6 +965,7 @@ class ProductService:
         await self.db.flush()
 
         await self.db.commit()
+        label_service.invalidate_product(product_id)
         await self.db.refresh(product)
         return product
 
@@ -18,6 +18,7 @@ from app.schemas.product_variant import (
     ProductWithVariantsCreate,
     BulkVariantCreate,
 )
+from app.services.label_service import label_service
 
 logger = logging.getLogger(__name__)
 
@@ -253,6 +254,7 @@ class ProductVariantService:
         
         await self.db.commit()
         await self.db.refresh(variant)
+        label_service.invalidate_variant(variant_id)
         
         logger.info(f"Variante atualizada: {variant.sku}")
         return variant
@@ -315,6 +317,7 @@ class ProductVariantService:
         
         await self.variant_repo.deactivate_variant(self.db, variant_id, tenant_id)
         await self.db.commit()
+        label_service.invalidate_variant(variant_id)
         
         logger.info(f"Variante desativada: {variant.sku}")
         return True
@@ -1,6 +1,7 @@
 """
 Serviço de devolução de vendas.
 """
+import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Dict, List, Optional
@@ -23,6 +24,8 @@ from app.schemas.return_schema import (
 from app.services.fifo_service import FIFOService
 from app.services.inventory_service import InventoryService
 
+logger = logging.getLogger(__name__)
+
 
 # Constante: prazo máximo para devolução em dias
 MAX_RETURN_DAYS = 7
@@ -422,7 +425,7 @@ class ReturnService:
                 try:
                     await inv_sync.rebuild_product_from_fifo(product_id, tenant_id=tenant_id)
                 except Exception as sync_err:
-                    print(f"[Inventory Sync] Falha ao sincronizar produto {product_id}: {sync_err}")
+                    logger.warning("Inventory sync falhou para produto %s: %s", product_id, sync_err)
             
             # Recarregar com relacionamentos
             return await self._get_return_with_details(sale_return.id)
@@ -1,6 +1,7 @@
 """
 Servio de gerenciamento de vendas.
 """
+import logging
 from datetime import datetime
 from decimal import Decimal
 from typing import Dict, List, Optional
@@ -8,6 +9,7 @@ from typing import Dict, List, Optional
 from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.metrics import Histogram, timed
 from app.core.timezone import now_brazil
 
 from app.models.inventory import MovementType
@@ -21,6 +23,13 @@ from app.services.fifo_service import FIFOService
 from app.services.inventory_service import InventoryService
 from app.services.payment_discount_service import PaymentDiscountService
 
+logger = logging.getLogger(__name__)
+
+
+SALE_CREATE_DURATION = Histogram(
+    "sale_create_duration_seconds", "Duração de SaleService.create_sale", ["outcome"]
+)
+
 
 class SaleService:
     """Servio para operaes de negcio com vendas."""
@@ -39,6 +48,7 @@ class SaleService:
         self.product_repo = ProductRepository(db)
         self.fifo_service = FIFOService(db)
     
+    @timed(SALE_CREATE_DURATION)
     async def create_sale(
         self,
         sale_data: SaleCreate,
@@ -74,14 +84,15 @@ class SaleService:
         """
         try:
             # 1. Validar estoque disponível via FIFO (entry_items) para TODOS os itens
-            print(f" Validando estoque para {len(sale_data.items)} itens...")
+            logger.debug("Validando estoque", extra={"items": len(sale_data.items)})
             for item in sale_data.items:
-                # Verificar disponibilidade via FIFOService (usa entry_items)
+                # Verificar disponibilidade via FIFOService (ledger variant_stock; legado soma entry_items)
                 availability = await self.fifo_service.check_availability(
                     product_id=item.product_id,
                     quantity=item.quantity,
                     variant_id=item.variant_id,
                     tenant_id=tenant_id,
+                    include_sources=False,
                 )
                 
                 if not availability["available"]:
@@ -95,7 +106,6 @@ class SaleService:
                     )
             
             # 2. Calcular valores
-            print(" Calculando valores...")
             subtotal = Decimal('0')
             for item in sale_data.items:
                 item_subtotal = (
@@ -106,7 +116,6 @@ class SaleService:
             # 2.1. Aplicar desconto por forma de pagamento (se configurado)
             payment_discount_amount = Decimal('0')
             if sale_data.payment_method:
-                print(f" Verificando desconto para forma de pagamento: {sale_data.payment_method.value}")
                 discount_service = PaymentDiscountService(self.db)
                 try:
                     discount_calc = await discount_service.calculate_discount(
@@ -116,9 +125,14 @@ class SaleService:
                     )
                     payment_discount_amount = discount_calc.discount_amount
                     if payment_discount_amount > 0:
-                        print(f"   Desconto aplicado: {discount_calc.discount_percentage}% = R$ {payment_discount_amount:.2f}")
+                        logger.debug(
+                            "Desconto por forma de pagamento aplicado",
+                            extra={"payment_method": sale_data.payment_method.value,
+                                   "discount_percentage": float(discount_calc.discount_percentage),
+                                   "discount_amount": float(payment_discount_amount)},
+                        )
                 except Exception as e:
-                    print(f"   Erro ao calcular desconto: {e}")
+                    logger.warning("Falha ao calcular desconto por forma de pagamento: %s", e)
                     # Continua sem desconto se houver erro
             
             discount_amount = Decimal(str(sale_data.discount_amount or 0)) + payment_discount_amount
@@ -126,7 +140,6 @@ class SaleService:
             total_amount = subtotal - discount_amount + tax_amount
             
             # 3. Validar pagamentos
-            print(" Validando pagamentos...")
             payments_total = sum(
                 Decimal(str(p.amount)) for p in sale_data.payments
             )
@@ -145,7 +158,6 @@ class SaleService:
             sale_number = f"VENDA-{_ts}-{_sfx}"
             
             # 5. Criar Sale
-            print(f" Criando venda {sale_number}...")
             sale_dict = {
                 'sale_number': sale_number,
                 'customer_id': sale_data.customer_id,
@@ -169,7 +181,6 @@ class SaleService:
             await self.db.flush()  # Para obter o ID
             
             # 6. Criar SaleItems
-            print(f" Criando {len(sale_data.items)} itens da venda...")
             for item_data in sale_data.items:
                 item_subtotal = (
                     Decimal(str(item_data.unit_price)) * item_data.quantity
@@ -177,7 +188,6 @@ class SaleService:
                 
                 #  FIFO: Processar venda e obter fontes (de quais entradas saiu)
                 _fifo_label = f"variante {item_data.variant_id}" if item_data.variant_id else f"produto {item_data.product_id}"
-                print(f"    Processando FIFO para {_fifo_label}...")
                 try:
                     fifo_sources = await self.fifo_service.process_sale(
                         product_id=item_data.product_id,
@@ -185,9 +195,8 @@ class SaleService:
                         variant_id=item_data.variant_id,
                         tenant_id=tenant_id,
                     )
-                    print(f"    FIFO processado: {len(fifo_sources)} fonte(s)")
+                    logger.debug("FIFO processado", extra={"fifo_item": _fifo_label, "sources": len(fifo_sources)})
                 except ValueError as fifo_error:
-                    print(f"    Erro FIFO: {str(fifo_error)}")
                     raise ValueError(
                         f"Erro ao processar FIFO para {_fifo_label}: {str(fifo_error)}"
                     )
@@ -219,7 +228,6 @@ class SaleService:
             await self.db.flush()
             
             # 7. Criar Payments
-            print(f" Criando {len(sale_data.payments)} pagamentos...")
             for payment_data in sale_data.payments:
                 payment = Payment(
                     sale_id=sale.id,
@@ -241,7 +249,6 @@ class SaleService:
             # no sendo mais necessrio chamar inventory_repo.remove_stock()
             loyalty_points_earned = Decimal('0')
             if sale_data.customer_id:
-                print(" Atualizando pontos de fidelidade...")
                 customer = await self.customer_repo.get(self.db, sale_data.customer_id, tenant_id=tenant_id)
                 if customer:
                     # Pontos: 1 ponto a cada R$ 10 gastos
@@ -265,7 +272,6 @@ class SaleService:
                     customer.total_purchases = new_total_purchases
             
             # 10. Finalizar venda
-            print(" Finalizando venda...")
             if not keep_pending:
                 sale.status = SaleStatus.COMPLETED.value
             sale.loyalty_points_earned = float(loyalty_points_earned)
@@ -283,10 +289,11 @@ class SaleService:
             for pid in affected_product_ids:
                 try:
                     delta = await inv_sync.rebuild_product_from_fifo(pid, tenant_id=tenant_id)
-                    print(f"  [Inventory Sync] Produto {pid}: fifo={delta['fifo_sum']} inv={delta['inventory_quantity']} created={delta['created']} updated={delta['updated']}")
+                    logger.debug("Inventory sync", extra={"product_id": pid, "fifo_sum": delta["fifo_sum"],
+                                                          "inventory_quantity": delta["inventory_quantity"]})
                 except Exception as sync_err:
                     # Não bloquear venda por falha de sync – logar e continuar
-                    print(f"  [Inventory Sync] Falha ao sincronizar produto {pid}: {sync_err}")
+                    logger.warning("Inventory sync falhou para produto %s: %s", pid, sync_err)
 
             # Recarregar venda com todos os relacionamentos após todos os commits
             from sqlalchemy import select
@@ -306,11 +313,17 @@ class SaleService:
             )
             sale = result.scalar_one()
             
-            print(f" Venda {sale_number} criada com sucesso!")
+            logger.info(
+                "Venda criada",
+                extra={"sale_number": sale_number, "items": len(sale_data.items), "total_amount": float(total_amount)},
+            )
             return sale
             
         except Exception as e:
-            print(f" Erro ao criar venda: {str(e)}")
+            if isinstance(e, ValueError):
+                logger.warning("Falha ao criar venda: %s", e)
+            else:
+                logger.exception("Falha ao criar venda")
             await self.db.rollback()
             raise e
     
@@ -345,30 +358,26 @@ class SaleService:
             if sale.status == SaleStatus.CANCELLED.value:
                 raise ValueError("Venda j est cancelada")
             
-            print(f" Cancelando venda {sale.sale_number}...")
             
             # 1. Reverter estoque usando FIFO
-            print(" Revertendo estoque via FIFO...")
             # Buscar itens da venda atravs de refresh com relationships
             await self.db.refresh(sale, ['items'])
             
             for item in sale.items:
                 #  FIFO: Reverter usando as fontes salvas no sale_sources
                 if item.sale_sources and 'sources' in item.sale_sources:
-                    print(f"    Revertendo FIFO para produto {item.product_id}...")
                     try:
                         await self.fifo_service.reverse_sale(
                             sources=item.sale_sources['sources']
                         )
-                        print(f"    FIFO revertido com sucesso")
+                        logger.debug("FIFO revertido", extra={"product_id": item.product_id})
                     except ValueError as fifo_error:
-                        print(f"    Erro ao reverter FIFO: {str(fifo_error)}")
                         raise ValueError(
                             f"Erro ao reverter FIFO para produto {item.product_id}: {str(fifo_error)}"
                         )
                 else:
                     # Fallback: venda antiga sem FIFO tracking
-                    print(f"    Item {item.id} sem sale_sources, usando mtodo legado")
+                    logger.debug("Item sem sale_sources, revertendo pelo inventário legado", extra={"sale_item_id": item.id})
                     inventory = await self.inventory_repo.get_by_product(item.product_id, tenant_id=tenant_id)
                     if inventory:
                         await self.inventory_repo.add_stock(
@@ -384,7 +393,6 @@ class SaleService:
 
             # 2. Reverter pontos de fidelidade
             if sale.customer_id:
-                print(" Revertendo pontos de fidelidade...")
                 customer = await self.customer_repo.get(self.db, sale.customer_id, tenant_id=tenant_id)
                 if customer:
                     new_loyalty_points = (
@@ -417,9 +425,10 @@ class SaleService:
             for pid in affected_product_ids:
                 try:
                     delta = await inv_sync.rebuild_product_from_fifo(pid, tenant_id=tenant_id)
-                    print(f"  [Inventory Sync] Produto {pid}: fifo={delta['fifo_sum']} inv={delta['inventory_quantity']}")
+                    logger.debug("Inventory sync", extra={"product_id": pid, "fifo_sum": delta["fifo_sum"],
+                                                          "inventory_quantity": delta["inventory_quantity"]})
                 except Exception as sync_err:
-                    print(f"  [Inventory Sync] Falha ao sincronizar produto {pid}: {sync_err}")
+                    logger.warning("Inventory sync falhou para produto %s: %s", pid, sync_err)
 
             # Recarregar venda com todos os relacionamentos necessários para o
             # response schema — refresh() simples não popula relationships
@@ -441,11 +450,14 @@ class SaleService:
             )
             sale = result.scalar_one()
 
-            print(f" Venda {sale.sale_number} cancelada com sucesso!")
+            logger.info("Venda cancelada", extra={"sale_number": sale.sale_number})
             return sale
 
         except Exception as e:
-            print(f" Erro ao cancelar venda: {str(e)}")
+            if isinstance(e, ValueError):
+                logger.warning("Falha ao cancelar venda: %s", e)
+            else:
+                logger.exception("Falha ao cancelar venda")
             await self.db.rollback()
             raise e
     
@@ -0,0 +1,204 @@
+"""
+Alocador atômico de sequências por tenant.
+
+Centraliza a geração de números sequenciais (códigos de barras, SKUs e
+códigos de entrada) na tabela `sequence_counters`. Cada sequência é
+identificada por (tenant_id, kind, prefix) e alocada com um único
+UPDATE ... RETURNING — sem MAX()/LIKE sobre as tabelas de negócio e sem
+corrida entre requisições concorrentes.
+
+Na primeira alocação de uma sequência o contador é semeado a partir dos
+dados existentes (função `seed`), garantindo continuidade com os códigos
+gerados antes da tabela existir.
+
+Pré-alocação em bloco (block_size > 1): o worker reserva N valores de uma
+vez em transação própria e os entrega da memória. Valores não consumidos
+(restart do worker) viram lacunas — use apenas onde lacunas são aceitáveis.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.sequence_counter import SequenceCounter
+
+logger = logging.getLogger(__name__)
+
+SeedFn = Callable[[], Awaitable[int]]
+
+
+class SequenceKind:
+    """Tipos de sequência conhecidos."""
+
+    BARCODE = "barcode"
+    SKU = "sku"
+    ENTRY_CODE = "entry_code"
+    CATALOG_VERSION = "catalog_version"  # versão do catálogo público (cache HTTP)
+
+
+# Blocos pré-alocados por worker: {(tenant_id, kind, prefix): [próximo, último]}
+_blocks: dict[Tuple[int, str, str], list[int]] = {}
+_block_locks: dict[Tuple[int, str, str], asyncio.Lock] = {}
+
+
+def reset_block_cache() -> None:
+    """Descarta os blocos pré-alocados em memória (testes / troca de banco)."""
+    _blocks.clear()
+    _block_locks.clear()
+
+
+class SequenceService:
+    """Serviço de alocação de valores sequenciais por tenant."""
+
+    def __init__(self, db: AsyncSession):
+        """
+        Inicializa o serviço de sequências.
+
+        Args:
+            db: Sessão assíncrona do banco de dados
+        """
+        self.db = db
+
+    async def next_value(
+        self,
+        tenant_id: int,
+        kind: str,
+        prefix: str = "",
+        *,
+        seed: Optional[SeedFn] = None,
+        block_size: int = 1,
+    ) -> int:
+        """
+        Retorna o próximo valor da sequência (tenant_id, kind, prefix).
+
+        Args:
+            tenant_id: ID do tenant
+            kind: Tipo da sequência (ver SequenceKind)
+            prefix: Escopo dentro do tipo (ex: SKU base, prefixo do EAN)
+            seed: Função async que retorna o último valor já usado nos dados
+                legados; chamada apenas quando o contador ainda não existe
+            block_size: >1 ativa pré-alocação em bloco cacheada no worker
+
+        Returns:
+            Valor alocado (exclusivo para o chamador)
+        """
+        if block_size > 1:
+            return await self._next_from_block(tenant_id, kind, prefix, seed, block_size)
+
+        first, _ = await self.allocate(tenant_id, kind, prefix, count=1, seed=seed)
+        return first
+
+    async def allocate(
+        self,
+        tenant_id: int,
+        kind: str,
+        prefix: str = "",
+        *,
+        count: int = 1,
+        seed: Optional[SeedFn] = None,
+    ) -> Tuple[int, int]:
+        """
+        Reserva `count` valores consecutivos na transação da sessão atual.
+
+        Returns:
+            Tupla (primeiro, último) do intervalo reservado
+        """
+        if count < 1:
+            raise ValueError("count deve ser >= 1")
+
+        last = await self._increment(tenant_id, kind, prefix, count)
+        if last is None:
+            await self._create_counter(tenant_id, kind, prefix, seed)
+            last = await self._increment(tenant_id, kind, prefix, count)
+            if last is None:
+                raise RuntimeError(f"Falha ao criar contador {kind}/{prefix} do tenant {tenant_id}")
+
+        return last - count + 1, last
+
+    async def _increment(self, tenant_id: int, kind: str, prefix: str, count: int) -> Optional[int]:
+        """UPDATE ... RETURNING atômico. Retorna None se o contador não existe."""
+        stmt = (
+            update(SequenceCounter)
+            .where(
+                SequenceCounter.tenant_id == tenant_id,
+                SequenceCounter.kind == kind,
+                SequenceCounter.prefix == prefix,
+            )
+            .values(
+                last_value=SequenceCounter.last_value + count,
+                updated_at=datetime.utcnow(),
+            )
+            .returning(SequenceCounter.last_value)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def _create_counter(
+        self, tenant_id: int, kind: str, prefix: str, seed: Optional[SeedFn]
+    ) -> None:
+        """Cria o contador semeado; ignora conflito se outro worker criou antes."""
+        start = int(await seed()) if seed else 0
+
+        insert_fn = pg_insert if self.db.bind.dialect.name == "postgresql" else sqlite_insert
+        stmt = (
+            insert_fn(SequenceCounter)
+            .values(
+                tenant_id=tenant_id,
+                kind=kind,
+                prefix=prefix,
+                last_value=start,
+                updated_at=datetime.utcnow(),
+            )
+            .on_conflict_do_nothing(index_elements=["tenant_id", "kind", "prefix"])
+        )
+        await self.db.execute(stmt)
+        logger.info(f"Sequence counter created: tenant={tenant_id} kind={kind} prefix={prefix!r} start={start}")
+
+    async def _next_from_block(
+        self,
+        tenant_id: int,
+        kind: str,
+        prefix: str,
+        seed: Optional[SeedFn],
+        block_size: int,
+    ) -> int:
+        """Entrega o próximo valor do bloco do worker, reservando outro se esgotado."""
+        key = (tenant_id, kind, prefix)
+        lock = _block_locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            block = _blocks.get(key)
+            if block is None or block[0] > block[1]:
+                first, last = await self._allocate_block(tenant_id, kind, prefix, seed, block_size)
+                block = _blocks[key] = [first, last]
+
+            value = block[0]
+            block[0] += 1
+            return value
+
+    async def _allocate_block(
+        self,
+        tenant_id: int,
+        kind: str,
+        prefix: str,
+        seed: Optional[SeedFn],
+        block_size: int,
+    ) -> Tuple[int, int]:
+        """
+        Reserva um bloco em transação própria (commit imediato).
+
+        O bloco fica cacheado além da transação do chamador; se ele fizesse
+        parte dela, um rollback devolveria ao banco valores ainda em cache.
+        """
+        async with AsyncSession(bind=self.db.bind, expire_on_commit=False) as session:
+            async with session.begin():
+                return await SequenceService(session).allocate(
+                    tenant_id, kind, prefix, count=block_size, seed=seed
+                )
@@ -14,7 +14,7 @@ from sqlalchemy.exc import IntegrityError
 from app.models import Store, User, Subscription
 from app.models.user import UserRole
 from app.schemas.signup import SignupRequest, SignupResponse
-from app.core.security import get_password_hash, create_access_token, create_refresh_token
+from app.core.security import get_password_hash_async, create_access_token, create_refresh_token
 
 logger = logging.getLogger(__name__)
 
@@ -108,7 +108,8 @@ class SignupService:
             access_token = create_access_token({
                 "sub": str(user.id),
                 "role": user.role.value,
-                "tenant_id": store.id  #  ADD TENANT_ID
+                "tenant_id": store.id,  #  ADD TENANT_ID
+                "tv": user.token_version or 0,
             })
             refresh_token = create_refresh_token({"sub": str(user.id)})
             
@@ -294,7 +295,7 @@ class SignupService:
         role: UserRole
     ) -> User:
         """Create User (owner)"""
-        hashed_password = get_password_hash(password)
+        hashed_password = await get_password_hash_async(password)
         
         user = User(
             email=email,
@@ -8,12 +8,14 @@ MARCA-NOME-COR-TAMANHO-XXX (ex: NIKE-LEGGIN-ROS-M-001)
 import logging
 import re
 import unicodedata
+from functools import partial
 from typing import Optional
 from sqlalchemy import select, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.product_variant import ProductVariant
 from app.models.product import Product
+from app.services.sequence_service import SequenceKind, SequenceService
 
 logger = logging.getLogger(__name__)
 
@@ -107,7 +109,8 @@ class SKUGeneratorService:
         """
         Gera um SKU único para o produto.
 
-        Verifica SKUs existentes no tenant e adiciona contador se necessário.
+        O contador vem de sequence_counters (alocação atômica por tenant e
+        SKU base), sem carregar os SKUs existentes a cada geração.
 
         Args:
             name: Nome do produto (obrigatório)
@@ -115,7 +118,8 @@ class SKUGeneratorService:
             color: Cor (opcional)
             size: Tamanho (opcional)
             tenant_id: ID do tenant
-            max_attempts: Número máximo de tentativas (padrão: 1000)
+            max_attempts: Máximo de contadores descartados por colisão com
+                SKUs manuais (padrão: 1000)
 
         Returns:
             SKU único
@@ -128,28 +132,21 @@ class SKUGeneratorService:
             f"Gerando SKU único - Base: {base_sku}, Tenant: {tenant_id}"
         )
 
-        # Buscar todos os SKUs existentes do tenant (incluindo inativos/soft-deleted)
-        # A constraint UNIQUE do banco é em (tenant_id, sku) sem filtro de is_active,
-        # portanto variantes de produtos deletados ainda bloqueiam o SKU.
-        stmt = (
-            select(ProductVariant.sku)
-            .where(
-                and_(
-                    ProductVariant.tenant_id == tenant_id,
-                    ProductVariant.sku.like(f"{base_sku}-%"),
-                )
-            )
-        )
-        result = await self.db.execute(stmt)
-        existing_skus = {row[0].upper() for row in result.fetchall() if row[0]}
+        # Contador atômico por (tenant, SKU base) — semeado uma única vez
+        # com o maior sufixo já existente para esta base
+        sequence = SequenceService(self.db)
+        seed = partial(self._max_existing_counter, base_sku, tenant_id)
 
-        # Tentar encontrar SKU único
-        for counter in range(1, max_attempts + 1):
+        for attempt in range(1, max_attempts + 1):
+            counter = await sequence.next_value(
+                tenant_id, SequenceKind.SKU, base_sku, seed=seed
+            )
             candidate = f"{base_sku}-{counter:03d}"
 
-            if candidate.upper() not in existing_skus:
+            # Protege contra SKUs informados manualmente à frente do contador
+            if await self.validate_sku(candidate, tenant_id=tenant_id):
                 logger.info(
-                    f"SKU único encontrado: {candidate} (tentativa {counter})"
+                    f"SKU único encontrado: {candidate} (tentativa {attempt})"
                 )
                 return candidate
 
@@ -159,6 +156,32 @@ class SKUGeneratorService:
             f"Base SKU: {base_sku}"
         )
 
+    async def _max_existing_counter(self, base_sku: str, tenant_id: int) -> int:
+        """
+        Maior contador numérico já usado para o SKU base (semente da sequência).
+
+        Considera TODAS as variantes (inclusive inativas), pois a constraint
+        UNIQUE do banco em (tenant_id, sku) não filtra is_active.
+        """
+        stmt = (
+            select(ProductVariant.sku)
+            .where(
+                and_(
+                    ProductVariant.tenant_id == tenant_id,
+                    ProductVariant.sku.like(f"{base_sku}-%"),
+                )
+            )
+        )
+        result = await self.db.execute(stmt)
+
+        head = f"{base_sku}-"
+        highest = 0
+        for (sku,) in result.fetchall():
+            suffix = (sku or "").upper()[len(head):]
+            if suffix.isdigit():
+                highest = max(highest, int(suffix))
+        return highest
+
     async def validate_sku(
         self, sku: str, *, tenant_id: int, exclude_variant_id: Optional[int] = None
     ) -> bool:
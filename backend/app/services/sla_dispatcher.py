@@ -0,0 +1,107 @@
+"""
+Dispatcher das notificações de SLA dos envios condicionais.
+
+Em vez de varrer todos os envios a cada minuto, o worker dorme até o
+próximo due_at pendente em sla_notifications (MIN pelo índice
+status, due_at) e, ao acordar, reivindica e envia o que venceu
+(ConditionalNotificationService.check_and_send_sla_notifications):
+
+  - notify() acorda o worker na hora — chamado após o commit de quem
+    agenda/reagenda um envio, já que o novo due_at pode ser o mais próximo;
+  - sem nada agendado (ou com o vencimento longe) acorda no máximo a cada
+    SLA_DISPATCH_MAX_SLEEP_SECONDS, para ver o que outros workers agendaram;
+  - todos os workers rodam o dispatcher: o claim é um UPDATE atômico, então
+    cada notificação sai uma vez, e um worker parado não atrasa as demais.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from app.core.background import run_wake_loop
+from app.core.config import settings
+from app.core.database import resolve_session_factory
+from app.core.scheduler_lock import default_holder
+from app.services.conditional_notification_service import ConditionalNotificationService
+
+logger = logging.getLogger(__name__)
+
+
+class SLANotificationDispatcher:
+    """Worker em background que dispara as notificações de SLA no horário."""
+
+    ERROR_PAUSE_SECONDS = 5
+
+    def __init__(self, session_factory=None, holder: Optional[str] = None):
+        """
+        Args:
+            session_factory: async_sessionmaker do worker (padrão:
+                app.core.database.async_session_maker, resolvido a cada uso
+                para respeitar overrides de teste)
+            holder: identificador gravado em claimed_by
+        """
+        self._session_factory = session_factory
+        self.holder = holder or default_holder()
+        self.next_due_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _sessions(self):
+        return resolve_session_factory(self._session_factory)
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="sla-dispatcher")
+
+    async def shutdown(self) -> None:
+        """Para o worker (notificações não enviadas continuam pendentes no banco)."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def notify(self) -> None:
+        """Acorda o worker para recalcular o próximo vencimento."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Processamento
+    # ------------------------------------------------------------------
+
+    async def run_due(self, now: Optional[datetime] = None) -> dict:
+        """Envia o que venceu e atualiza next_due_at. Retorna o resumo do envio."""
+        service = ConditionalNotificationService()
+        async with self._sessions()() as db:
+            result = await service.check_and_send_sla_notifications(db, now=now, holder=self.holder)
+            self.next_due_at = await service.next_sla_due_at(db)
+        if result['departure_notifications'] or result['return_notifications']:
+            logger.info(f"SLA notifications sent: {result}")
+        return result
+
+    def _sleep_seconds(self) -> float:
+        max_sleep = settings.SLA_DISPATCH_MAX_SLEEP_SECONDS
+        if self.next_due_at is None:
+            return max_sleep
+        delay = (self.next_due_at - datetime.utcnow()).total_seconds()
+        return min(max(delay, 0.0), max_sleep)
+
+    async def _step(self) -> float:
+        await self.run_due()
+        return self._sleep_seconds()
+
+    async def _run(self) -> None:
+        await run_wake_loop(
+            self._wakeup, self._step, error_pause=self.ERROR_PAUSE_SECONDS,
+            logger=logger, name="SLA dispatcher",
+        )
+
+
+sla_dispatcher = SLANotificationDispatcher()
@@ -1,9 +1,12 @@
 """
 Serviço de gerenciamento de entradas de estoque (StockEntry).
 """
+import logging
 from typing import List, Optional, Dict, Any
 from decimal import Decimal
 from datetime import datetime
+from functools import partial
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.timezone import now_brazil, today_brazil
@@ -17,7 +20,9 @@ from app.repositories.inventory_repository import InventoryRepository
 from app.schemas.stock_entry import StockEntryCreate, StockEntryUpdate
 from app.schemas.entry_item import EntryItemCreate
 from app.services.inventory_service import InventoryService
+from app.services.sequence_service import SequenceKind, SequenceService
 
+logger = logging.getLogger(__name__)
 
 class StockEntryService:
     """Serviço para operações de negócio com entradas de estoque."""
@@ -40,6 +45,9 @@ class StockEntryService:
         """
         Gera um código único para entrada, adicionando sufixo se necessário.
 
+        O sufixo vem de um contador atômico por (tenant, código base) em
+        sequence_counters, em vez de testar -1, -2, -3... um a um.
+
         Args:
             base_code: Código base fornecido
             tenant_id: ID do tenant
@@ -52,20 +60,39 @@ class StockEntryService:
         if not existing:
             return base_code
 
-        # Adicionar sufixo numérico até encontrar código único
-        counter = 1
-        while True:
-            new_code = f"{base_code}-{counter}"
-            existing = await self.entry_repo.get_by_code(self.db, new_code, tenant_id=tenant_id)
-            if not existing:
+        sequence = SequenceService(self.db)
+        seed = partial(self._max_entry_code_suffix, base_code, tenant_id)
+
+        # Poucas tentativas: só colide com códigos digitados manualmente
+        for _ in range(10):
+            suffix = await sequence.next_value(
+                tenant_id, SequenceKind.ENTRY_CODE, base_code, seed=seed
+            )
+            new_code = f"{base_code}-{suffix}"
+            if not await self.check_code_exists(new_code, tenant_id=tenant_id):
                 return new_code
-            counter += 1
 
-            # Limite de segurança
-            if counter > 1000:
-                # Usar timestamp se falhar após 1000 tentativas
-                timestamp = now_brazil().strftime("%Y%m%d%H%M%S")
-                return f"{base_code}-{timestamp}"
+        # Usar timestamp se o contador não encontrar código livre
+        timestamp = now_brazil().strftime("%Y%m%d%H%M%S")
+        return f"{base_code}-{timestamp}"
+
+    async def _max_entry_code_suffix(self, base_code: str, tenant_id: int) -> int:
+        """Maior sufixo numérico já usado para o código base (semente do contador)."""
+        result = await self.db.execute(
+            select(StockEntry.entry_code).where(
+                StockEntry.tenant_id == tenant_id,
+                StockEntry.entry_code.like(f"{base_code}-%"),
+            )
+        )
+
+        head = f"{base_code}-"
+        highest = 0
+        for (code,) in result.fetchall():
+            suffix = code[len(head):] if code.startswith(head) else ""
+            # Ignora sufixos de timestamp do fallback antigo
+            if suffix.isdigit() and len(suffix) < 14:
+                highest = max(highest, int(suffix))
+        return highest
 
     async def check_code_exists(self, entry_code: str, tenant_id: int) -> bool:
         """
@@ -205,9 +232,10 @@ class StockEntryService:
             for pid in product_ids:
                 try:
                     delta = await inv_sync.rebuild_product_from_fifo(pid, tenant_id=tenant_id)
-                    print(f"  [Inventory Sync ENTRY] Produto {pid}: fifo={delta['fifo_sum']} inv={delta['inventory_quantity']} created={delta['created']} updated={delta['updated']}")
+                    logger.debug("Inventory sync", extra={"operation": "entry", "product_id": pid,
+                                                          "fifo_sum": delta["fifo_sum"], "inventory_quantity": delta["inventory_quantity"]})
                 except Exception as sync_err:
-                    print(f"  [Inventory Sync ENTRY] Falha sync produto {pid}: {sync_err}")
+                    logger.warning("Inventory sync (entry) falhou para produto %s: %s", pid, sync_err)
             
             return entry
             
@@ -725,13 +753,10 @@ class StockEntryService:
             for pid in non_orphan_ids:
                 try:
                     delta = await inv_sync.rebuild_product_from_fifo(pid, tenant_id=tenant_id)
-                    print(
-                        f"  [Inventory Sync DELETE_ENTRY] Produto {pid}: "
-                        f"fifo={delta['fifo_sum']} inv={delta['inventory_quantity']} "
-                        f"updated={delta['updated']}"
-                    )
+                    logger.debug("Inventory sync", extra={"operation": "delete_entry", "product_id": pid,
+                                                          "fifo_sum": delta["fifo_sum"], "inventory_quantity": delta["inventory_quantity"]})
                 except Exception as sync_err:
-                    print(f"  [Inventory Sync DELETE_ENTRY] Falha sync produto {pid}: {sync_err}")
+                    logger.warning("Inventory sync (delete_entry) falhou para produto %s: %s", pid, sync_err)
 
             await self.db.commit()
 
@@ -1070,12 +1095,11 @@ class StockEntryService:
             inv_service = InventoryService(self.db)
             await inv_service.rebuild_product_from_fifo(item.product_id, tenant_id=tenant_id)
 
-            if __DEV__ if '__DEV__' in dir() else True:
-                print(
-                    f"  [EntryItem Update] Produto {item.product_id}: "
-                    f"delta inventário = {inventory_delta:+d} "
-                    f"(de {old_quantity_remaining} para {new_quantity})"
-                )
+            logger.debug(
+                "EntryItem atualizado",
+                extra={"product_id": item.product_id, "inventory_delta": inventory_delta,
+                       "quantity_remaining": new_quantity},
+            )
 
         # Se custo ou quantidade mudaram, recalcular total_cost da entrada
         if 'unit_cost' in update_data or 'quantity_received' in update_data:
@@ -1090,11 +1114,10 @@ class StockEntryService:
                 entry.total_cost = new_total_cost
                 await self.db.flush()
 
-                if __DEV__ if '__DEV__' in dir() else True:
-                    print(
-                        f"  [EntryItem Update] Entrada {entry.entry_code}: "
-                        f"total_cost recalculado = R$ {new_total_cost:.2f}"
-                    )
+                logger.debug(
+                    "Custo total da entrada recalculado",
+                    extra={"entry_code": entry.entry_code, "total_cost": float(new_total_cost)},
+                )
 
         # Commit final
         await self.db.commit()
@@ -1212,13 +1235,10 @@ class StockEntryService:
         inv_sync = InventoryService(self.db)
         try:
             delta = await inv_sync.rebuild_product_from_fifo(product_id, tenant_id=tenant_id)
-            print(
-                f"  [Inventory Sync ADD_ITEM] Produto {product_id}: "
-                f"fifo={delta['fifo_sum']} inv={delta['inventory_quantity']} "
-                f"created={delta['created']} updated={delta['updated']}"
-            )
+            logger.debug("Inventory sync", extra={"operation": "add_item", "product_id": product_id,
+                                                  "fifo_sum": delta["fifo_sum"], "inventory_quantity": delta["inventory_quantity"]})
         except Exception as sync_err:
-            print(f"  [Inventory Sync ADD_ITEM] Falha sync produto {product_id}: {sync_err}")
+            logger.warning("Inventory sync (add_item) falhou para produto %s: %s", product_id, sync_err)
 
         # Commit
         await self.db.commit()
@@ -1343,9 +1363,10 @@ class StockEntryService:
             inv_sync = InventoryService(self.db)
             try:
                 delta = await inv_sync.rebuild_product_from_fifo(product.id, tenant_id=tenant_id)
-                print(f"  [Inventory Sync NEW_PRODUCT] Produto {product.id}: fifo={delta['fifo_sum']} inv={delta['inventory_quantity']} created={delta['created']} updated={delta['updated']}")
+                logger.debug("Inventory sync", extra={"operation": "new_product", "product_id": product.id,
+                                                      "fifo_sum": delta["fifo_sum"], "inventory_quantity": delta["inventory_quantity"]})
             except Exception as sync_err:
-                print(f"  [Inventory Sync NEW_PRODUCT] Falha sync produto {product.id}: {sync_err}")
+                logger.warning("Inventory sync (new_product) falhou para produto %s: %s", product.id, sync_err)
             
             # 7. Commit de tudo (transação atômica)
             await self.db.commit()
@@ -1486,9 +1507,10 @@ class StockEntryService:
             inv_sync = InventoryService(self.db)
             try:
                 delta = await inv_sync.rebuild_product_from_fifo(product.id, tenant_id=tenant_id)
-                print(f"  [Inventory Sync NEW_PRODUCT_VARIANTS] Produto {product.id}: fifo={delta['fifo_sum']} inv={delta['inventory_quantity']} created={delta['created']} updated={delta['updated']}")
+                logger.debug("Inventory sync", extra={"operation": "new_product_variants", "product_id": product.id,
+                                                      "fifo_sum": delta["fifo_sum"], "inventory_quantity": delta["inventory_quantity"]})
             except Exception as sync_err:
-                print(f"  [Inventory Sync NEW_PRODUCT_VARIANTS] Falha sync produto {product.id}: {sync_err}")
+                logger.warning("Inventory sync (new_product_variants) falhou para produto %s: %s", product.id, sync_err)
             
             # 6. Commit de tudo (transação atômica)
             await self.db.commit()
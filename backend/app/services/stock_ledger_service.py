@@ -0,0 +1,434 @@
+"""
+Ledger de estoque por variante (tabela variant_stock).
+
+on_hand de uma variante = Σ quantity_remaining dos lotes FIFO ativos
+(entry_items ativos, de stock_entries ativas, do tenant da variante).
+Antes, cada leitura somava os lotes (FIFOService.check_availability,
+build_product_response, vitrine, sugestões); agora leem uma linha.
+
+Manutenção na mesma transação da escrita FIFO:
+  - Hook after_flush (install_stock_ledger_hooks): para cada EntryItem
+    novo/alterado/removido e StockEntry ativada/desativada no flush,
+    calcula a variação por variante (valor anterior pelo histórico do ORM)
+    e aplica "UPDATE ... SET on_hand = on_hand + delta" — incremento
+    atômico, seguro com transações concorrentes na mesma variante. Só a
+    linha ainda inexistente é criada pelo upsert com a soma exata dos lotes.
+  - Escritas fora do ORM (UPDATE em massa) chamam mark_stock_changed(); no
+    commit essas variantes são recontadas a partir dos lotes.
+  - check_consistency() compara o ledger com os lotes (job diário e
+    GET /inventory/stock-ledger/consistency) e, com repair, recontabiliza.
+
+Variantes cujo saldo mudou são marcadas na projeção do catálogo, que lê
+in_stock/tamanhos com estoque daqui.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.entry_item import EntryItem
+from app.models.product_variant import ProductVariant
+from app.models.stock_entry import StockEntry
+from app.models.variant_stock import VariantStock
+from app.services.catalog_projection_service import mark_catalog_variants_sync
+
+logger = logging.getLogger(__name__)
+
+RECOUNT_CHUNK_SIZE = 500
+
+# Chaves em session.info com o que precisa ser recontado no commit
+_RECOUNT_VARIANTS = "stock_recount_variants"
+_RECOUNT_PRODUCTS = "stock_recount_products"
+_RECOUNT_ENTRIES = "stock_recount_entries"
+_RECOUNT_KEYS = (_RECOUNT_VARIANTS, _RECOUNT_PRODUCTS, _RECOUNT_ENTRIES)
+
+_UNKNOWN = object()
+
+
+# ============================================================================
+# Escrita no ledger (síncrono — roda no hook de flush/commit ou em run_sync)
+# ============================================================================
+
+def _fifo_on_hand():
+    """Σ dos lotes ativos da variante externa (subquery correlacionada a ProductVariant)."""
+    return (
+        select(func.coalesce(func.sum(EntryItem.quantity_remaining), 0))
+        .join(StockEntry, EntryItem.entry_id == StockEntry.id)
+        .where(
+            EntryItem.variant_id == ProductVariant.id,
+            EntryItem.tenant_id == ProductVariant.tenant_id,
+            EntryItem.is_active == True,
+            StockEntry.is_active == True,
+        )
+        .scalar_subquery()
+    )
+
+
+def _upsert(session: Session, variant_filter, delta: Optional[int]) -> None:
+    """
+    Cria a linha com a soma exata dos lotes; se já existe, soma `delta`
+    (ou, com delta=None, substitui pela soma exata — recontagem).
+    """
+    insert_fn = pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert_fn(VariantStock).from_select(
+        ["variant_id", "tenant_id", "product_id", "on_hand", "updated_at"],
+        select(
+            ProductVariant.id, ProductVariant.tenant_id, ProductVariant.product_id,
+            _fifo_on_hand(), func.current_timestamp(),
+        ).where(ProductVariant.tenant_id.isnot(None), variant_filter),
+    )
+    on_hand = stmt.excluded.on_hand if delta is None else VariantStock.on_hand + delta
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["variant_id"],
+        set_={"on_hand": on_hand, "updated_at": stmt.excluded.updated_at},
+    )
+    session.connection().execute(stmt)
+
+
+def apply_stock_deltas_sync(session: Session, deltas: Dict[Tuple[int, int], int]) -> None:
+    """
+    Aplica variações {(variant_id, tenant_id): delta} ao ledger.
+
+    Caminho quente (toda venda/entrada): UPDATE simples na linha existente.
+    Só quando a linha ainda não existe o upsert soma os lotes da variante.
+    """
+    conn = session.connection()
+    for (variant_id, tenant_id), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        result = conn.execute(
+            update(VariantStock)
+            .where(VariantStock.variant_id == variant_id, VariantStock.tenant_id == tenant_id)
+            .values(on_hand=VariantStock.on_hand + delta, updated_at=func.current_timestamp())
+        )
+        if result.rowcount == 0:
+            _upsert(
+                session,
+                (ProductVariant.id == variant_id) & (ProductVariant.tenant_id == tenant_id),
+                delta,
+            )
+
+
+def recount_variants_sync(session: Session, variant_ids: Iterable[int]) -> None:
+    """Recalcula on_hand das variantes a partir dos lotes FIFO."""
+    ids = sorted({vid for vid in variant_ids if vid})
+    for start in range(0, len(ids), RECOUNT_CHUNK_SIZE):
+        _upsert(session, ProductVariant.id.in_(ids[start:start + RECOUNT_CHUNK_SIZE]), None)
+
+
+# ============================================================================
+# Hooks de sessão
+# ============================================================================
+
+def _committed(obj, attr: str):
+    """Valor de `attr` antes do flush (histórico do ORM); _UNKNOWN se não carregado."""
+    history = sa_inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return _UNKNOWN if history.added else obj.__dict__.get(attr, _UNKNOWN)
+
+
+def _entry_states(session: Session, entry_ids: Set[int]) -> Dict[int, Tuple[bool, bool]]:
+    """{entry_id: (ativa antes do flush, ativa depois)}."""
+    states: Dict[int, Tuple[bool, bool]] = {}
+    for obj in session.new:
+        if isinstance(obj, StockEntry):
+            states[obj.id] = (False, bool(obj.is_active))
+    for obj in session.dirty:
+        if isinstance(obj, StockEntry) and obj.id not in states:
+            old = _committed(obj, "is_active")
+            if old is _UNKNOWN:
+                # Estado anterior não carregado: recontar os lotes da entrada no commit
+                session.info.setdefault(_RECOUNT_ENTRIES, set()).add(obj.id)
+                old = obj.is_active
+            states[obj.id] = (bool(old), bool(obj.is_active))
+    for obj in session.deleted:
+        if isinstance(obj, StockEntry):
+            old = _committed(obj, "is_active")
+            states[obj.id] = (bool(obj.is_active) if old is _UNKNOWN else bool(old), False)
+
+    missing = sorted(eid for eid in entry_ids if eid is not None and eid not in states)
+    if missing:
+        rows = session.connection().execute(
+            select(StockEntry.id, StockEntry.is_active).where(StockEntry.id.in_(missing))
+        )
+        for entry_id, is_active in rows:
+            states[entry_id] = (bool(is_active), bool(is_active))
+    return states
+
+
+def _contribution(variant_id, tenant_id, remaining, item_active, entry_active) -> Optional[tuple]:
+    if variant_id is None or tenant_id is None or not item_active or not entry_active:
+        return None
+    return (variant_id, tenant_id), int(remaining or 0)
+
+
+def _track_flush(session: Session, flush_context) -> None:
+    """after_flush: aplica ao ledger a variação dos lotes FIFO escritos neste flush."""
+    items = [
+        (obj, "new" if obj in session.new else "deleted" if obj in session.deleted else "dirty")
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, EntryItem)
+    ]
+    toggled = [
+        obj for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, StockEntry)
+    ]
+    if not items and not toggled:
+        return
+
+    recount = session.info.setdefault(_RECOUNT_VARIANTS, set())
+    entry_ids = {obj.entry_id for obj, _ in items}
+    old_values = {}
+    for obj, kind in items:
+        if kind != "new":
+            old_values[obj] = {
+                attr: _committed(obj, attr)
+                for attr in ("variant_id", "tenant_id", "quantity_remaining", "is_active", "entry_id")
+            }
+            entry_ids.add(old_values[obj]["entry_id"])
+    states = _entry_states(session, {eid for eid in entry_ids if eid is not _UNKNOWN})
+
+    deltas: Dict[Tuple[int, int], int] = defaultdict(int)
+    handled: Set[int] = set()
+    for obj, kind in items:
+        handled.add(obj.id)
+        if kind != "new":
+            old = old_values[obj]
+            if _UNKNOWN in old.values():
+                # Valor anterior não carregado: recontar no commit
+                recount.update(v for v in (old["variant_id"], obj.variant_id) if v not in (None, _UNKNOWN))
+                continue
+            before = _contribution(
+                old["variant_id"], old["tenant_id"], old["quantity_remaining"], old["is_active"],
+                states.get(old["entry_id"], (False, False))[0],
+            )
+            if before:
+                deltas[before[0]] -= before[1]
+        if kind != "deleted":
+            after = _contribution(
+                obj.variant_id, obj.tenant_id, obj.quantity_remaining, obj.is_active,
+                states.get(obj.entry_id, (False, False))[1],
+            )
+            if after:
+                deltas[after[0]] += after[1]
+
+    # Entrada ativada/desativada: lotes que não mudaram neste flush entram/saem inteiros
+    for entry in toggled:
+        was_active, is_active = states.get(entry.id, (False, False))
+        if was_active == is_active:
+            continue
+        sign = 1 if is_active else -1
+        rows = session.connection().execute(
+            select(EntryItem.id, EntryItem.variant_id, EntryItem.tenant_id, EntryItem.quantity_remaining)
+            .where(
+                EntryItem.entry_id == entry.id,
+                EntryItem.is_active == True,
+                EntryItem.variant_id.isnot(None),
+            )
+        )
+        for item_id, variant_id, tenant_id, remaining in rows:
+            if item_id not in handled and tenant_id is not None:
+                deltas[(variant_id, tenant_id)] += sign * int(remaining or 0)
+
+    changed = {key: delta for key, delta in deltas.items() if delta}
+    if changed:
+        apply_stock_deltas_sync(session, changed)
+        mark_catalog_variants_sync(session, (variant_id for variant_id, _ in changed))
+
+
+def _resolve_recount(session: Session) -> Set[int]:
+    """Converte produtos/entradas marcados nas variantes a recontar."""
+    variant_ids = set(session.info.pop(_RECOUNT_VARIANTS, ()))
+    product_ids = sorted(session.info.pop(_RECOUNT_PRODUCTS, ()))
+    entry_ids = sorted(session.info.pop(_RECOUNT_ENTRIES, ()))
+    for start in range(0, len(product_ids), RECOUNT_CHUNK_SIZE):
+        variant_ids.update(session.connection().execute(
+            select(ProductVariant.id).where(
+                ProductVariant.product_id.in_(product_ids[start:start + RECOUNT_CHUNK_SIZE])
+            )
+        ).scalars())
+    for start in range(0, len(entry_ids), RECOUNT_CHUNK_SIZE):
+        variant_ids.update(session.connection().execute(
+            select(EntryItem.variant_id).where(
+                EntryItem.entry_id.in_(entry_ids[start:start + RECOUNT_CHUNK_SIZE]),
+                EntryItem.variant_id.isnot(None),
+            ).distinct()
+        ).scalars())
+    return variant_ids
+
+
+def _recount_before_commit(session: Session) -> None:
+    """before_commit: reconta as variantes marcadas por escritas fora do ORM."""
+    session.flush()
+    if not any(session.info.get(key) for key in _RECOUNT_KEYS):
+        return
+    variant_ids = _resolve_recount(session)
+    if variant_ids:
+        recount_variants_sync(session, variant_ids)
+        mark_catalog_variants_sync(session, variant_ids)
+
+
+def _discard_recount(session: Session, *args) -> None:
+    for key in _RECOUNT_KEYS:
+        session.info.pop(key, None)
+
+
+def mark_stock_changed(
+    db: AsyncSession,
+    variant_ids: Iterable[int] = (),
+    product_ids: Iterable[int] = (),
+    entry_ids: Iterable[int] = (),
+) -> None:
+    """
+    Marca variantes (diretamente ou via produto/entrada) alteradas por
+    escritas fora do ORM; o próximo commit da sessão reconta o ledger.
+    """
+    info = db.sync_session.info
+    info.setdefault(_RECOUNT_VARIANTS, set()).update(variant_ids)
+    info.setdefault(_RECOUNT_PRODUCTS, set()).update(product_ids)
+    info.setdefault(_RECOUNT_ENTRIES, set()).update(entry_ids)
+
+
+def install_stock_ledger_hooks() -> None:
+    """Registra os hooks em todas as sessões (idempotente).
+
+    Deve ser chamado antes de install_catalog_projection_hooks: a recontagem
+    no commit marca variantes que a projeção recalcula em seguida.
+    """
+    if event.contains(Session, "after_flush", _track_flush):
+        return
+    event.listen(Session, "after_flush", _track_flush)
+    event.listen(Session, "before_commit", _recount_before_commit)
+    event.listen(Session, "after_rollback", _discard_recount)
+
+
+# ============================================================================
+# API assíncrona
+# ============================================================================
+
+class StockLedgerService:
+    """Leitura do saldo por variante e verificação contra os lotes FIFO."""
+
+    def __init__(self, db: AsyncSession):
+        """
+        Args:
+            db: Sessão assíncrona do banco de dados
+        """
+        self.db = db
+
+    async def on_hand(self, variant_id: int, *, tenant_id: Optional[int] = None) -> int:
+        """Saldo da variante (0 sem linha no ledger)."""
+        q = select(VariantStock.on_hand).where(VariantStock.variant_id == variant_id)
+        if tenant_id is not None:
+            q = q.where(VariantStock.tenant_id == tenant_id)
+        return int((await self.db.execute(q)).scalar() or 0)
+
+    async def on_hand_by_variant(
+        self, variant_ids: Iterable[int], *, tenant_id: Optional[int] = None
+    ) -> Dict[int, int]:
+        """{variant_id: saldo} — variantes sem linha ficam de fora (saldo 0)."""
+        ids = sorted(set(variant_ids))
+        if not ids:
+            return {}
+        q = select(VariantStock.variant_id, VariantStock.on_hand).where(VariantStock.variant_id.in_(ids))
+        if tenant_id is not None:
+            q = q.where(VariantStock.tenant_id == tenant_id)
+        return {vid: int(qty) for vid, qty in (await self.db.execute(q)).all()}
+
+    async def on_hand_by_product(
+        self, product_ids: Iterable[int], *, tenant_id: Optional[int] = None
+    ) -> Dict[int, int]:
+        """{product_id: saldo somado das variantes ativas}."""
+        ids = sorted(set(product_ids))
+        if not ids:
+            return {}
+        q = (
+            select(VariantStock.product_id, func.sum(VariantStock.on_hand))
+            .join(ProductVariant, ProductVariant.id == VariantStock.variant_id)
+            .where(VariantStock.product_id.in_(ids), ProductVariant.is_active == True)
+            .group_by(VariantStock.product_id)
+        )
+        if tenant_id is not None:
+            q = q.where(VariantStock.tenant_id == tenant_id)
+        return {pid: int(qty or 0) for pid, qty in (await self.db.execute(q)).all()}
+
+    async def recount(self, variant_ids: Iterable[int]) -> None:
+        """Reconta as variantes na transação atual (sem commit)."""
+        ids = list(variant_ids)
+        await self.db.run_sync(lambda session: recount_variants_sync(session, ids))
+
+    async def check_consistency(self, *, tenant_id: Optional[int] = None, repair: bool = False) -> dict:
+        """
+        Compara o ledger com a soma dos lotes FIFO de cada variante.
+
+        Args:
+            tenant_id: restringe a um tenant (None = todos)
+            repair: reconta as divergentes (sem commit — fica com quem chamou)
+
+        Returns:
+            {"variants_checked", "mismatches": [{variant_id, product_id, tenant_id,
+             on_hand, fifo_on_hand}], "repaired"}
+        """
+        fifo = (
+            select(EntryItem.variant_id, func.sum(EntryItem.quantity_remaining).label("qty"))
+            .join(StockEntry, EntryItem.entry_id == StockEntry.id)
+            .join(ProductVariant, EntryItem.variant_id == ProductVariant.id)
+            .where(
+                EntryItem.tenant_id == ProductVariant.tenant_id,
+                EntryItem.is_active == True,
+                StockEntry.is_active == True,
+            )
+            .group_by(EntryItem.variant_id)
+            .subquery("fifo")
+        )
+        ledger = func.coalesce(VariantStock.on_hand, 0)
+        expected = func.coalesce(fifo.c.qty, 0)
+        scope = [ProductVariant.tenant_id.isnot(None)]
+        if tenant_id is not None:
+            scope.append(ProductVariant.tenant_id == tenant_id)
+
+        checked = (await self.db.execute(
+            select(func.count(ProductVariant.id)).where(*scope)
+        )).scalar() or 0
+        rows = (await self.db.execute(
+            select(ProductVariant.id, ProductVariant.product_id, ProductVariant.tenant_id, ledger, expected)
+            .outerjoin(VariantStock, VariantStock.variant_id == ProductVariant.id)
+            .outerjoin(fifo, fifo.c.variant_id == ProductVariant.id)
+            .where(*scope, ledger != expected)
+            .order_by(ProductVariant.id)
+        )).all()
+
+        mismatches: List[dict] = [
+            {
+                "variant_id": vid,
+                "product_id": pid,
+                "tenant_id": tid,
+                "on_hand": int(on_hand),
+                "fifo_on_hand": int(fifo_qty),
+            }
+            for vid, pid, tid, on_hand, fifo_qty in rows
+        ]
+        if mismatches:
+            logger.warning(f"Stock ledger: {len(mismatches)} variantes divergentes do FIFO (tenant={tenant_id})")
+            if repair:
+                variant_ids = [m["variant_id"] for m in mismatches]
+                await self.db.run_sync(lambda session: (
+                    recount_variants_sync(session, variant_ids),
+                    mark_catalog_variants_sync(session, variant_ids),
+                ))
+        return {
+            "variants_checked": int(checked),
+            "mismatches": mismatches,
+            "repaired": len(mismatches) if repair else 0,
+        }
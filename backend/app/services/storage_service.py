@@ -10,6 +10,7 @@ Para escalar:
 3. Trocar no get_storage_service()
 """
 
+import asyncio
 import os
 import uuid
 import shutil
@@ -18,6 +19,7 @@ from pathlib import Path
 from typing import BinaryIO
 from fastapi import UploadFile
 from app.core.config import settings
+from app.services.image_pipeline import image_pipeline
 
 
 class BaseStorageService(ABC):
@@ -71,6 +73,10 @@ class LocalStorageService(BaseStorageService):
 
     Salva arquivos em: backend/uploads/{folder}/{filename}
     Serve via: GET /uploads/{folder}/{filename}
+
+    Imagens passam pelo image_pipeline: original sem EXIF e versões WebP
+    ({nome}.thumb/.medium/.large.webp) geradas em background. A escrita em
+    disco roda em thread para não bloquear o event loop.
     """
 
     def __init__(self):
@@ -92,16 +98,7 @@ class LocalStorageService(BaseStorageService):
             ext = self._get_extension(file.filename or "image.jpg")
             filename = f"{uuid.uuid4().hex}{ext}"
 
-        # Caminho completo
-        file_path = folder_path / filename
-
-        # Salvar arquivo
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-
-        # Retornar caminho relativo
-        return f"{folder}/{filename}"
+        return await self._store(await file.read(), folder, filename)
 
     async def upload_from_bytes(self, data: bytes, folder: str, filename: str | None = None, ext: str = ".jpg") -> str:
         """Upload de bytes diretamente (útil para base64)."""
@@ -114,22 +111,25 @@ class LocalStorageService(BaseStorageService):
         if not filename:
             filename = f"{uuid.uuid4().hex}{ext}"
 
-        # Caminho completo
-        file_path = folder_path / filename
-
-        # Salvar arquivo
-        with open(file_path, "wb") as buffer:
-            buffer.write(data)
+        return await self._store(data, folder, filename)
 
-        # Retornar caminho relativo
-        return f"{folder}/{filename}"
+    async def _store(self, data: bytes, folder: str, filename: str) -> str:
+        """Sanitiza, grava (em thread) e agenda as versões. Retorna o caminho relativo."""
+        relative_path = f"{folder}/{filename}"
+        # Reupload com o mesmo nome: versões antigas saem até as novas ficarem prontas
+        image_pipeline.remove(relative_path)
+        data = await image_pipeline.prepare_original(data, relative_path)
+        await asyncio.to_thread((self.base_path / relative_path).write_bytes, data)
+        image_pipeline.schedule(relative_path, data)
+        return relative_path
 
     async def delete(self, file_path: str) -> bool:
-        """Deleta arquivo local."""
+        """Deleta arquivo local (e as versões geradas pelo pipeline)."""
         full_path = self.base_path / file_path
 
         if full_path.exists():
             full_path.unlink()
+            image_pipeline.remove(file_path)
             return True
 
         return False
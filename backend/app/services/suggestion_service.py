@@ -19,9 +19,8 @@ from typing import List, Optional
 
 from app.models.product_tag import ProductTag
 from app.models.product import Product
-from app.models.product_variant import ProductVariant
-from app.models.entry_item import EntryItem
 from app.schemas.product_tag import SuggestionResponse, ProductTagCreate, ProductTagResponse
+from app.services.stock_ledger_service import StockLedgerService
 
 # Cores que combinam entre si
 COLOR_PAIRS = {
@@ -144,22 +143,24 @@ class SuggestionService:
             :limit
         ]
 
-        # 5. Buscar dados dos produtos
+        # 5. Buscar dados dos produtos (estoque pelo ledger, uma consulta)
+        stmt = (
+            select(Product)
+            .where(Product.id.in_(sorted_ids), Product.is_active == True)
+            .options(selectinload(Product.variants))
+        )
+        products = {p.id: p for p in (await db.execute(stmt)).scalars().all()}
+        stock = await StockLedgerService(db).on_hand_by_product(products, tenant_id=tenant_id)
+
         suggestions = []
         for pid in sorted_ids:
-            stmt = (
-                select(Product)
-                .where(Product.id == pid, Product.is_active == True)
-                .options(selectinload(Product.variants).selectinload(ProductVariant.entry_items))
-            )
-            result = await db.execute(stmt)
-            product = result.scalar_one_or_none()
+            product = products.get(pid)
             if not product:
                 continue
 
             active_variants = [v for v in product.variants if v.is_active]
             prices = [float(v.price) for v in active_variants if v.price]
-            total_stock = sum(v.get_current_stock() for v in active_variants)
+            total_stock = stock.get(pid, 0)
 
             suggestions.append(
                 SuggestionResponse(
@@ -193,17 +194,20 @@ class SuggestionService:
                 Product.id != product_id,
                 Product.is_active == True,
             )
-            .options(selectinload(Product.variants).selectinload(ProductVariant.entry_items))
+            .options(selectinload(Product.variants))
             .limit(limit)
         )
         result = await db.execute(stmt)
         products = result.scalars().all()
+        stock = await StockLedgerService(db).on_hand_by_product(
+            (p.id for p in products), tenant_id=tenant_id
+        )
 
         suggestions = []
         for p in products:
             active_variants = [v for v in p.variants if v.is_active]
             prices = [float(v.price) for v in active_variants if v.price]
-            total_stock = sum(v.get_current_stock() for v in active_variants)
+            total_stock = stock.get(p.id, 0)
             suggestions.append(
                 SuggestionResponse(
                     product_id=p.id,
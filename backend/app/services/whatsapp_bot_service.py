@@ -0,0 +1,103 @@
+"""
+Consultas do bot do WhatsApp (app/webhooks/whatsapp.py).
+
+Tudo é escopado à loja do bot:
+  - resolve_tenant(): WHATSAPP_BOT_STORE_SLUG ou a loja padrão, resolvido
+    uma vez por worker;
+  - search_products(): projeção public_catalog_items, só produtos com
+    estoque, busca sem acento por search_text (trigram no PostgreSQL);
+  - find_customer(): customers.phone_normalized (DDD + 8 dígitos) via
+    índice (tenant_id, phone_normalized).
+"""
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.models.catalog_projection import PublicCatalogItem
+from app.models.customer import Customer
+from app.models.store import Store
+from app.models.wishlist import Wishlist
+from app.services.catalog_projection_service import CatalogProjectionService
+from app.utils.text import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+# slug configurado ("" = loja padrão) → tenant_id; lojas não mudam de id
+_tenant_cache: Dict[str, int] = {}
+
+
+def reset_bot_tenant_cache() -> None:
+    """Limpa o tenant resolvido (testes / troca de configuração)."""
+    _tenant_cache.clear()
+
+
+class WhatsAppBotService:
+    """Consultas indexadas e por tenant usadas pelo bot."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def resolve_tenant(self) -> Optional[int]:
+        """Loja atendida pelo bot: slug configurado, loja padrão ou primeira ativa."""
+        slug = settings.WHATSAPP_BOT_STORE_SLUG or ""
+        if slug in _tenant_cache:
+            return _tenant_cache[slug]
+
+        tenant_id = None
+        if slug:
+            tenant_id = await self.db.scalar(
+                select(Store.id).where(Store.slug == slug, Store.is_active == True)
+            )
+        if tenant_id is None:
+            tenant_id = await self.db.scalar(
+                select(Store.id).where(Store.is_default == True, Store.is_active == True).limit(1)
+            )
+        if tenant_id is None:
+            tenant_id = await self.db.scalar(
+                select(Store.id).where(Store.is_active == True).order_by(Store.id).limit(1)
+            )
+
+        if tenant_id is not None:
+            _tenant_cache[slug] = tenant_id
+            logger.info(f"WhatsApp bot atendendo tenant {tenant_id} (slug={slug or 'padrão'})")
+        return tenant_id
+
+    async def search_products(self, tenant_id: int, term: str, limit: int = 5) -> List[PublicCatalogItem]:
+        """Produtos publicados com estoque; stock_sizes traz os tamanhos disponíveis."""
+        return await CatalogProjectionService(self.db).search_in_stock(tenant_id, term, limit=limit)
+
+    async def find_customer(self, tenant_id: int, phone: str) -> Optional[Customer]:
+        """Cliente ativo da loja pelo telefone do WhatsApp (com ou sem 55 / nono dígito)."""
+        key = normalize_phone(phone)
+        if key is None:
+            return None
+        result = await self.db.execute(
+            select(Customer)
+            .where(
+                Customer.tenant_id == tenant_id,
+                Customer.phone_normalized == key,
+                Customer.is_active == True,
+            )
+            .order_by(Customer.id)
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_wishlist(self, tenant_id: int, customer_id: int, limit: int = 10) -> List[Wishlist]:
+        """Itens ainda não notificados da wishlist do cliente."""
+        result = await self.db.execute(
+            select(Wishlist)
+            .where(
+                Wishlist.tenant_id == tenant_id,
+                Wishlist.customer_id == customer_id,
+                Wishlist.is_active == True,
+                Wishlist.notified == False,
+            )
+            .options(selectinload(Wishlist.product))
+            .limit(limit)
+        )
+        return list(result.scalars().all())
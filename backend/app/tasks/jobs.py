@@ -0,0 +1,32 @@
+"""
+Tarefas da fila de jobs em background (app/core/job_queue.py).
+
+Cada tarefa recebe o JobContext (tenant, sessões, progresso) e o payload
+do enqueue como kwargs; o dict retornado vira o resultado do job.
+"""
+from app.core.job_queue import JobContext, job_task
+from app.services.inventory_service import InventoryService
+
+
+@job_task("inventory.rebuild_fifo")
+async def rebuild_inventory_from_fifo(ctx: JobContext) -> dict:
+    """Rebuild do inventário do tenant a partir do FIFO (POST /inventory/rebuild/jobs)."""
+    await ctx.progress(5, "Somando entradas FIFO")
+
+    async def report(done: int, total: int) -> None:
+        await ctx.progress(5 + 90 * done // total, f"Faixa {done}/{total} de produtos")
+
+    async with ctx.session() as db:
+        deltas = await InventoryService(db).rebuild_all_from_fifo(
+            tenant_id=ctx.tenant_id, progress=report
+        )
+    updated = sum(1 for d in deltas if d.get("created") or d.get("updated"))
+    return {"updated": updated, "deltas": deltas}
+
+
+@job_task("inventory.reconcile_costs")
+async def reconcile_inventory_costs(ctx: JobContext, product_id: int | None = None) -> dict:
+    """Reconciliação de custo FIFO (POST /inventory/reconciliation/jobs)."""
+    await ctx.progress(5, "Somando custos")
+    async with ctx.session() as db:
+        return await InventoryService(db).reconcile_costs(tenant_id=ctx.tenant_id, product_id=product_id)
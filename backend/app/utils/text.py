@@ -0,0 +1,36 @@
+"""Normalização de texto e telefone para buscas indexadas."""
+import re
+import unicodedata
+from typing import Optional
+
+
+def normalize_search(text: Optional[str]) -> str:
+    """
+    Forma de busca: minúsculas, sem acentos, só letras/números separados por espaço.
+
+    "Top Nadador Açaí-Roxo" → "top nadador acai roxo"
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    ascii_text = decomposed.encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join(re.findall(r"[a-z0-9]+", ascii_text))
+
+
+def normalize_phone(raw: Optional[str]) -> Optional[str]:
+    """
+    Chave de telefone brasileiro: DDD + últimos 8 dígitos.
+
+    O WhatsApp entrega números como 5511999998888 e, para contas antigas,
+    sem o nono dígito (551199998888); cadastros vêm como "(11) 99999-8888".
+    Todos viram "1199998888". Retorna None para números curtos demais.
+    """
+    if not raw:
+        return None
+    digits = re.sub(r"\D", "", raw)
+    if len(digits) >= 12 and digits.startswith("55"):
+        digits = digits[2:]
+    digits = digits.lstrip("0")  # prefixo de operadora/interurbano (0xx11...)
+    if len(digits) < 10:
+        return None
+    return digits[:2] + digits[-8:]
@@ -26,6 +26,7 @@ import os
 
 from app.core.database import get_db
 from app.core.config import settings
+from app.services.whatsapp_bot_service import WhatsAppBotService
 
 logger = logging.getLogger(__name__)
 
@@ -157,18 +158,10 @@ async def whatsapp_webhook(
 async def _handle_product_search(
     db: AsyncSession, from_number: str, search_term: str
 ) -> WhatsAppReply:
-    """Busca produtos pelo nome e retorna lista formatada."""
-    from sqlalchemy import select
-    from app.models.product import Product
-
-    term = f"%{search_term.strip()}%"
-    stmt = (
-        select(Product)
-        .where(Product.is_active == True, Product.name.ilike(term))
-        .limit(5)
-    )
-    result = await db.execute(stmt)
-    products = result.scalars().all()
+    """Busca produtos com estoque da loja do bot e lista os tamanhos disponíveis."""
+    service = WhatsAppBotService(db)
+    tenant_id = await service.resolve_tenant()
+    products = await service.search_products(tenant_id, search_term) if tenant_id else []
 
     if not products:
         site = os.getenv("NEXT_PUBLIC_SITE_URL", "https://fitness-store-management.vercel.app")
@@ -184,7 +177,8 @@ async def _handle_product_search(
     lines = ["🛍️ *Produtos encontrados:*\n"]
     for p in products:
         price = f"R$ {p.sale_price:.2f}" if p.sale_price else "Consulte preço"
-        lines.append(f"• *{p.name}* — {price}")
+        sizes = f" ({', '.join(p.stock_sizes)})" if p.stock_sizes else ""
+        lines.append(f"• *{p.name}* — {price}{sizes}")
 
     site = os.getenv("NEXT_PUBLIC_SITE_URL", "https://fitness-store-management.vercel.app")
     lines.append(f"\n🔗 Ver detalhes: {site}/produtos")
@@ -195,22 +189,9 @@ async def _handle_product_search(
 
 async def _handle_wishlist(db: AsyncSession, from_number: str) -> WhatsAppReply:
     """Mostra wishlist do cliente pelo número de telefone."""
-    from sqlalchemy import select
-    from app.models.customer import Customer
-    from app.models.wishlist import Wishlist
-    from sqlalchemy.orm import selectinload
-
-    # Normalizar número (remover +, espaços)
-    phone_clean = from_number.replace("+", "").replace(" ", "").replace("-", "")
-    # Tentar últimos 11 dígitos para comparação
-    phone_suffix = phone_clean[-11:] if len(phone_clean) >= 11 else phone_clean
-
-    stmt = select(Customer).where(
-        Customer.is_active == True,
-        Customer.phone.like(f"%{phone_suffix}%"),
-    )
-    result = await db.execute(stmt)
-    customer = result.scalar_one_or_none()
+    service = WhatsAppBotService(db)
+    tenant_id = await service.resolve_tenant()
+    customer = await service.find_customer(tenant_id, from_number) if tenant_id else None
 
     if not customer:
         site = os.getenv("NEXT_PUBLIC_SITE_URL", "https://fitness-store-management.vercel.app")
@@ -223,15 +204,7 @@ async def _handle_wishlist(db: AsyncSession, from_number: str) -> WhatsAppReply:
             next_state="menu",
         )
 
-    # Buscar wishlist
-    stmt2 = (
-        select(Wishlist)
-        .where(Wishlist.customer_id == customer.id, Wishlist.is_active == True, Wishlist.notified == False)
-        .options(selectinload(Wishlist.product))
-        .limit(10)
-    )
-    result2 = await db.execute(stmt2)
-    items = result2.scalars().all()
+    items = await service.get_wishlist(tenant_id, customer.id)
 
     if not items:
         return WhatsAppReply(
@@ -0,0 +1,44 @@
+"""
+Worker Celery da fila de jobs (JOB_QUEUE_BACKEND=celery).
+
+    celery -A app.worker worker -Q jobs --concurrency 4
+
+O broker (CELERY_BROKER_URL, padrão: Redis de REDIS_*) carrega só o id do
+job; estado, deduplicação, tentativas e progresso continuam em
+background_jobs (app/core/job_queue.py). Cada processo do worker mantém
+um event loop próprio: o engine async do SQLAlchemy fica preso ao loop em
+que abriu as conexões.
+"""
+import asyncio
+
+from celery import Celery
+
+from app.core.config import settings
+
+celery_app = Celery(
+    "fitness_store",
+    broker=settings.CELERY_BROKER_URL or settings.REDIS_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+)
+celery_app.conf.update(
+    task_default_queue="jobs",
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    broker_transport_options={"queue_order_strategy": "priority"},
+)
+
+_loop = None
+
+
+def _run(coro):
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+@celery_app.task(name="jobs.run")
+def run_background_job(job_id: int):
+    """Reivindica e executa o job (retries são re-despachados pela própria fila)."""
+    from app.core.job_queue import job_queue
+    return _run(job_queue.run_job(job_id))
@@ -0,0 +1,12 @@
+"""
+Suite de benchmark/carga da API (ver scripts/benchmark_load.py).
+
+  - dataset.py:   dataset sintético multi-tenant (lojas, variantes, lotes
+                  FIFO, vendas) inserido em lote, com ledger e catálogo
+                  consistentes;
+  - scenarios.py: cenários roteirizados contra o app ASGI em processo
+                  (checkout do PDV, dashboard, listagem/busca, entrada de
+                  estoque, catálogo público) e micro-benchmarks de service;
+  - report.py:    p50/p95/p99, queries por requisição (header Server-Timing),
+                  vazão e comparação com o baseline salvo (baselines.json).
+"""
@@ -0,0 +1,353 @@
+"""
+Dataset sintético multi-tenant para benchmark.
+
+Cada tenant recebe loja, assinatura, usuário admin, categorias, clientes,
+produtos com variantes, entradas de estoque com lotes e um histórico de
+vendas de 12 meses. O consumo FIFO dos lotes é simulado em memória, então
+quantity_remaining, variant_stock, inventory e o catálogo público saem
+consistentes entre si — os cenários vendem e recebem sobre dados reais.
+
+Inserção via Core em lote (executemany, RETURNING para os ids), um commit
+por tenant. Perfis:
+
+    tiny    2 tenants ×   60 variantes ×    200 vendas  (testes)
+    small   5 tenants × 1000 variantes ×   5000 vendas
+    medium 20 tenants × 2500 variantes ×  10000 vendas
+    large  50 tenants × 5000 variantes ×  10000 vendas  (500k vendas)
+"""
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.models.category import Category
+from app.models.customer import Customer
+from app.models.entry_item import EntryItem
+from app.models.inventory import Inventory
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.sale import Payment, PaymentMethod, Sale, SaleItem, SaleStatus
+from app.models.stock_entry import EntryType, StockEntry
+from app.models.store import Store
+from app.models.subscription import Subscription
+from app.models.user import User, UserRole
+from app.models.variant_stock import VariantStock
+from app.services.catalog_projection_service import CatalogProjectionService
+
+# Hash bcrypt fixo (ninguém faz login: os cenários usam JWT emitido direto)
+_PASSWORD_HASH = "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5NU7qNVlQzKH2"
+_CHUNK = 2000
+
+_CATEGORIES = ["Leggings", "Tops", "Shorts", "Regatas", "Jaquetas", "Macacões", "Meias"]
+_ITEMS = ["Legging", "Top", "Short", "Regata", "Jaqueta", "Macacão", "Bermuda", "Camiseta", "Calça", "Meia"]
+_LINES = ["Fitness", "Seamless", "Dry Fit", "Compressão", "Yoga", "Run", "Cross", "Basic", "Pro", "Flow"]
+_COLORS = ["Preto", "Branco", "Rosa", "Azul", "Verde", "Vinho", "Cinza", "Lilás", "Marinho", "Coral"]
+_SIZES = ["PP", "P", "M", "G", "GG", "XG", "XXG", "U"]
+_BRANDS = ["Acme", "Vitta", "Nordic", "Alto Giro", "Fitz"]
+_METHODS = [PaymentMethod.PIX, PaymentMethod.CREDIT_CARD, PaymentMethod.DEBIT_CARD, PaymentMethod.CASH]
+
+
+@dataclass(frozen=True)
+class DatasetProfile:
+    tenants: int
+    products_per_tenant: int
+    variants_per_product: int
+    sales_per_tenant: int
+    lots_per_variant: int = 2
+    entries_per_tenant: int = 12
+    customers_per_tenant: int = 200
+
+
+PROFILES: Dict[str, DatasetProfile] = {
+    "tiny": DatasetProfile(2, 20, 3, 200, entries_per_tenant=4, customers_per_tenant=10),
+    "small": DatasetProfile(5, 200, 5, 5_000),
+    "medium": DatasetProfile(20, 500, 5, 10_000),
+    "large": DatasetProfile(50, 1_000, 5, 10_000, customers_per_tenant=1_000),
+}
+
+
+@dataclass
+class VariantInfo:
+    variant_id: int
+    product_id: int
+    price: Decimal
+    on_hand: int
+
+
+@dataclass
+class TenantData:
+    tenant_id: int
+    slug: str
+    user_id: int
+    category_ids: List[int]
+    variants: List[VariantInfo]
+    search_terms: List[str] = field(default_factory=list)
+
+    def in_stock(self) -> List[VariantInfo]:
+        return [v for v in self.variants if v.on_hand > 0]
+
+
+@dataclass
+class Dataset:
+    tenants: List[TenantData]
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+async def _insert(conn, model, rows: List[dict], returning: bool = False) -> List[int]:
+    """INSERT em lote; com returning, devolve os ids na ordem das linhas."""
+    ids: List[int] = []
+    table = model.__table__
+    for start in range(0, len(rows), _CHUNK):
+        chunk = rows[start:start + _CHUNK]
+        if returning:
+            result = await conn.execute(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True), chunk
+            )
+            ids.extend(result.scalars().all())
+        else:
+            await conn.execute(insert(table), chunk)
+    return ids
+
+
+def _consume(lots: List[list], quantity: int) -> Optional[Decimal]:
+    """Baixa FIFO nos lotes [remaining, unit_cost] (mais antigos primeiro); devolve o custo do 1º lote."""
+    cost = None
+    for lot in lots:
+        if quantity == 0:
+            break
+        taken = min(lot[0], quantity)
+        if taken:
+            lot[0] -= taken
+            quantity -= taken
+            cost = cost if cost is not None else lot[1]
+    return cost
+
+
+async def _generate_tenant(
+    conn, profile: DatasetProfile, index: int, prefix: str, rng: random.Random
+) -> int:
+    """Insere um tenant completo; retorna o número de linhas inseridas."""
+    now = datetime.now(timezone.utc)
+    rows = 0
+
+    slug = f"{prefix}-{index}"
+    (tenant_id,) = await _insert(conn, Store, [{
+        "name": f"Loja Benchmark {index}", "slug": slug, "is_active": True, "is_default": False,
+    }], returning=True)
+    await _insert(conn, Subscription, [{
+        "tenant_id": tenant_id, "plan": "PRO", "status": "active", "is_trial": False,
+        "current_period_start": now, "current_period_end": now + timedelta(days=365),
+        "max_products": 999_999, "max_users": 50, "is_active": True,
+    }])
+    (user_id,) = await _insert(conn, User, [{
+        "email": f"{slug}@benchmark.local", "full_name": f"Admin {slug}", "hashed_password": _PASSWORD_HASH,
+        "role": UserRole.ADMIN, "tenant_id": tenant_id, "is_active": True,
+    }], returning=True)
+    category_ids = await _insert(conn, Category, [
+        {"name": name, "slug": f"{slug}-{n}", "tenant_id": tenant_id} for n, name in enumerate(_CATEGORIES)
+    ], returning=True)
+    customer_ids = await _insert(conn, Customer, [
+        {"full_name": f"Cliente {n}", "email": f"cliente{n}@{slug}.local", "tenant_id": tenant_id}
+        for n in range(profile.customers_per_tenant)
+    ], returning=True)
+    rows += 3 + len(category_ids) + len(customer_ids)
+
+    # Produtos e variantes
+    products, colors = [], []
+    for n in range(profile.products_per_tenant):
+        item, line, color = rng.choice(_ITEMS), rng.choice(_LINES), rng.choice(_COLORS)
+        colors.append(color)
+        products.append({
+            "name": f"{item} {line} {color} {n}", "brand": rng.choice(_BRANDS),
+            "base_price": Decimal(rng.randrange(49, 399)) + Decimal("0.90"),
+            "category_id": rng.choice(category_ids), "tenant_id": tenant_id, "is_activewear": True,
+        })
+    product_ids = await _insert(conn, Product, products, returning=True)
+    variants = []
+    for product_id, product, color in zip(product_ids, products, colors):
+        for size in _SIZES[:profile.variants_per_product]:
+            variants.append({
+                "product_id": product_id, "sku": f"{slug.upper()}-{product_id}-{size}", "size": size,
+                "color": color, "price": product["base_price"],
+                "cost_price": (product["base_price"] * Decimal("0.45")).quantize(Decimal("0.01")),
+                "tenant_id": tenant_id, "is_active": True,
+            })
+    variant_ids = await _insert(conn, ProductVariant, variants, returning=True)
+    rows += len(product_ids) + len(variant_ids)
+
+    # Entradas (as mais antigas primeiro) e lotes por variante
+    first_day = date.today() - timedelta(days=400)
+    entry_dates = sorted(first_day + timedelta(days=rng.randrange(0, 380)) for _ in range(profile.entries_per_tenant))
+    entries = [{
+        "entry_code": f"{slug.upper()}-E{n:04d}", "entry_date": day, "entry_type": EntryType.LOCAL,
+        "supplier_name": rng.choice(_BRANDS), "total_cost": Decimal("0"), "tenant_id": tenant_id,
+    } for n, day in enumerate(entry_dates)]
+
+    # {variant_id: [[remaining, unit_cost, entry_index, received], ...]} em ordem FIFO
+    lots: Dict[int, List[list]] = {}
+    for variant_id, variant in zip(variant_ids, variants):
+        chosen = sorted(rng.sample(range(len(entries)), min(profile.lots_per_variant, len(entries))))
+        lots[variant_id] = []
+        for entry_index in chosen:
+            received = rng.randrange(5, 40)
+            lots[variant_id].append([received, variant["cost_price"], entry_index, received])
+
+    # Histórico de vendas: baixa FIFO simulada
+    sale_rows, sale_items = [], []
+    for n in range(profile.sales_per_tenant):
+        created = now - timedelta(minutes=rng.randrange(0, 365 * 24 * 60))
+        items, subtotal = [], Decimal("0")
+        for _ in range(rng.choice((1, 1, 1, 2, 2, 3))):
+            index = rng.randrange(len(variant_ids))
+            variant_id = variant_ids[index]
+            quantity = min(rng.choice((1, 1, 2)), sum(lot[0] for lot in lots[variant_id]))
+            if quantity == 0:
+                continue
+            cost = _consume(lots[variant_id], quantity)
+            price = variants[index]["price"]
+            items.append({
+                "product_id": variants[index]["product_id"], "variant_id": variant_id, "quantity": quantity,
+                "unit_price": price, "unit_cost": cost, "subtotal": price * quantity, "tenant_id": tenant_id,
+                "created_at": created,
+            })
+            subtotal += price * quantity
+        if not items:
+            continue
+        sale_rows.append({
+            "sale_number": f"{slug.upper()}-{n:07d}", "status": SaleStatus.COMPLETED, "subtotal": subtotal,
+            "total_amount": subtotal, "payment_method": rng.choice(_METHODS), "seller_id": user_id,
+            "customer_id": rng.choice(customer_ids) if customer_ids and rng.random() < 0.4 else None,
+            "tenant_id": tenant_id, "created_at": created, "updated_at": created,
+        })
+        sale_items.append(items)
+
+    # Custo total por entrada a partir dos lotes
+    totals = [Decimal("0")] * len(entries)
+    for variant_lots in lots.values():
+        for _, unit_cost, entry_index, received in variant_lots:
+            totals[entry_index] += unit_cost * received
+    for entry, total in zip(entries, totals):
+        entry["total_cost"] = total
+    entry_ids = await _insert(conn, StockEntry, entries, returning=True)
+    entry_items = [
+        {"entry_id": entry_ids[entry_index], "variant_id": variant_id, "product_id": None,
+         "quantity_received": received, "quantity_remaining": remaining, "unit_cost": unit_cost,
+         "tenant_id": tenant_id}
+        for variant_id, variant_lots in lots.items()
+        for remaining, unit_cost, entry_index, received in variant_lots
+    ]
+    await _insert(conn, EntryItem, entry_items)
+
+    sale_ids = await _insert(conn, Sale, sale_rows, returning=True)
+    await _insert(conn, SaleItem, [
+        {**item, "sale_id": sale_id} for sale_id, items in zip(sale_ids, sale_items) for item in items
+    ])
+    await _insert(conn, Payment, [
+        {"sale_id": sale_id, "amount": sale["total_amount"], "payment_method": sale["payment_method"],
+         "status": "completed", "tenant_id": tenant_id, "created_at": sale["created_at"]}
+        for sale_id, sale in zip(sale_ids, sale_rows)
+    ])
+    rows += len(entry_ids) + len(entry_items) + 2 * len(sale_ids) + sum(len(items) for items in sale_items)
+
+    # Ledger por variante e inventário por produto, já com o saldo final
+    on_hand = {variant_id: sum(lot[0] for lot in variant_lots) for variant_id, variant_lots in lots.items()}
+    await _insert(conn, VariantStock, [
+        {"variant_id": variant_id, "tenant_id": tenant_id, "product_id": variant["product_id"],
+         "on_hand": on_hand[variant_id], "updated_at": now}
+        for variant_id, variant in zip(variant_ids, variants)
+    ])
+    per_product: Dict[int, int] = {}
+    for variant_id, variant in zip(variant_ids, variants):
+        per_product[variant["product_id"]] = per_product.get(variant["product_id"], 0) + on_hand[variant_id]
+    await _insert(conn, Inventory, [
+        {"product_id": product_id, "quantity": quantity, "min_stock": 5, "tenant_id": tenant_id}
+        for product_id, quantity in per_product.items()
+    ])
+    rows += len(variant_ids) + len(per_product)
+    return rows
+
+
+async def generate_dataset(
+    engine: AsyncEngine,
+    profile: DatasetProfile,
+    *,
+    prefix: str = "bench",
+    seed: int = 42,
+    progress=None,
+) -> Dataset:
+    """
+    Gera o dataset (um commit por tenant) e reconstrói o catálogo público.
+
+    Args:
+        engine: engine do banco alvo (tabelas já criadas)
+        profile: tamanho do dataset (PROFILES)
+        prefix: prefixo dos slugs das lojas — dois datasets no mesmo banco
+            precisam de prefixos diferentes
+        progress: callback opcional (tenants_prontos, total)
+    """
+    started = time.perf_counter()
+    rows = 0
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    for index in range(profile.tenants):
+        rng = random.Random(f"{seed}:{index}")
+        async with engine.begin() as conn:
+            rows += await _generate_tenant(conn, profile, index, prefix, rng)
+        if progress:
+            progress(index + 1, profile.tenants)
+
+    dataset = await load_dataset(session_factory, prefix=prefix)
+    async with session_factory() as db:
+        for tenant in dataset.tenants:
+            rows += await CatalogProjectionService(db).rebuild_all(tenant.tenant_id)
+        await db.commit()
+
+    dataset.rows = rows
+    dataset.seconds = time.perf_counter() - started
+    return dataset
+
+
+async def load_dataset(session_factory, *, prefix: str = "bench") -> Dataset:
+    """Lê do banco um dataset já gerado (lojas com slug '<prefix>-N')."""
+    tenants: List[TenantData] = []
+    async with session_factory() as db:
+        stores = (await db.execute(
+            select(Store.id, Store.slug).where(Store.slug.like(f"{prefix}-%")).order_by(Store.id)
+        )).all()
+        for tenant_id, slug in stores:
+            if not slug[len(prefix) + 1:].isdigit():
+                continue
+            user_id = (await db.execute(
+                select(func.min(User.id)).where(User.tenant_id == tenant_id, User.role == UserRole.ADMIN)
+            )).scalar()
+            category_ids = list((await db.execute(
+                select(Category.id).where(Category.tenant_id == tenant_id).order_by(Category.id)
+            )).scalars())
+            rows: List[Tuple] = (await db.execute(
+                select(ProductVariant.id, ProductVariant.product_id, ProductVariant.price,
+                       func.coalesce(VariantStock.on_hand, 0))
+                .outerjoin(VariantStock, VariantStock.variant_id == ProductVariant.id)
+                .where(ProductVariant.tenant_id == tenant_id, ProductVariant.is_active == True)
+                .order_by(ProductVariant.id)
+            )).all()
+            names = (await db.execute(
+                select(Product.name).where(Product.tenant_id == tenant_id).order_by(Product.id).limit(50)
+            )).scalars().all()
+            terms = sorted({word for name in names for word in name.split()[:2]})
+            tenants.append(TenantData(
+                tenant_id=tenant_id, slug=slug, user_id=user_id, category_ids=category_ids,
+                variants=[VariantInfo(vid, pid, Decimal(price), int(qty)) for vid, pid, price, qty in rows],
+                search_terms=terms,
+            ))
+    return Dataset(tenants=tenants)
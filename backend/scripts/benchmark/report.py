@@ -0,0 +1,106 @@
+"""
+Estatísticas dos cenários e comparação com o baseline salvo.
+
+Baseline (baselines.json) é por perfil de dataset e por banco:
+    {"small:sqlite": {"pdv_checkout": {"p95_ms": 41.2, "queries_per_request": 23.0}, ...}}
+
+Regressão = p95 acima de baseline × (1 + tolerância) ou mais queries por
+requisição que o baseline (+ folga). Latência varia por máquina: grave o
+baseline no mesmo hardware em que a comparação roda (CI ou dev).
+"""
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil por rank mais próximo (0 para lista vazia)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    queries: List[int] = field(default_factory=list)
+    errors: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    error_samples: List[str] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        requests = len(self.latencies_ms)
+        return {
+            "requests": requests,
+            "errors": self.errors,
+            "p50_ms": round(percentile(self.latencies_ms, 50), 2),
+            "p95_ms": round(percentile(self.latencies_ms, 95), 2),
+            "p99_ms": round(percentile(self.latencies_ms, 99), 2),
+            "queries_per_request": round(sum(self.queries) / len(self.queries), 2) if self.queries else None,
+            "requests_per_sec": round(requests / self.seconds, 1) if self.seconds else 0.0,
+            "rows_per_sec": round(self.rows / self.seconds, 1) if self.seconds and self.rows else None,
+        }
+
+
+def load_baselines(path: Path = BASELINES_PATH) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(key: str, summaries: Dict[str, dict], path: Path = BASELINES_PATH) -> None:
+    baselines = load_baselines(path)
+    baselines[key] = {
+        name: {"p95_ms": s["p95_ms"], "queries_per_request": s["queries_per_request"]}
+        for name, s in summaries.items()
+    }
+    path.write_text(json.dumps(baselines, indent=2, sort_keys=True, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def compare_to_baseline(
+    summaries: Dict[str, dict],
+    baseline: Optional[Dict[str, dict]],
+    *,
+    latency_tolerance: float = 0.25,
+    query_slack: float = 0.5,
+) -> List[str]:
+    """Lista de regressões (vazia = ok). Cenários sem baseline são ignorados."""
+    regressions: List[str] = []
+    for name, current in summaries.items():
+        reference = (baseline or {}).get(name)
+        if not reference:
+            continue
+        limit = reference["p95_ms"] * (1 + latency_tolerance)
+        if current["p95_ms"] > limit:
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']:.1f} ms > {limit:.1f} ms (baseline {reference['p95_ms']:.1f})"
+            )
+        ref_queries = reference.get("queries_per_request")
+        if ref_queries is not None and current.get("queries_per_request") is not None:
+            if current["queries_per_request"] > ref_queries + query_slack:
+                regressions.append(
+                    f"{name}: {current['queries_per_request']:.1f} queries/req > baseline {ref_queries:.1f}"
+                )
+    return regressions
+
+
+def format_table(summaries: Dict[str, dict]) -> str:
+    header = f"{'cenário':<22} {'req':>6} {'erros':>6} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'q/req':>7} {'req/s':>8}"
+    lines = [header, "-" * len(header)]
+    for name, s in summaries.items():
+        queries = "-" if s["queries_per_request"] is None else f"{s['queries_per_request']:.1f}"
+        lines.append(
+            f"{name:<22} {s['requests']:>6} {s['errors']:>6} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} "
+            f"{s['p99_ms']:>9.1f} {queries:>7} {s['requests_per_sec']:>8.1f}"
+        )
+    return "\n".join(lines)
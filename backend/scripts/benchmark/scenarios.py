@@ -0,0 +1,262 @@
+"""
+Cenários de carga contra o app ASGI em processo e micro-benchmarks de service.
+
+Cenários HTTP (httpx + ASGITransport, sem rede, middlewares reais):
+
+    pdv_checkout       POST /sales — rajada de vendas de 1-3 itens (FIFO + ledger)
+    dashboard_polling  GET /dashboard/* — polling dos cards do dashboard
+    product_listing    GET /products — listagem paginada e busca
+    stock_receiving    POST /stock-entries — entrada com 3 lotes
+    public_catalog     GET /public/products — vitrine (página, busca, categoria)
+
+As queries por requisição vêm do header Server-Timing (db;desc="N queries").
+Micro-benchmarks chamam os services direto numa sessão, sem HTTP:
+
+    fifo_process_sale  alocação FIFO de 1 unidade (rollback a cada chamada)
+    ledger_on_hand     saldo de 50 produtos pelo ledger
+    catalog_list       página da projeção do catálogo público
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from app.core.instrumentation import track_queries
+from app.core.security import create_access_token
+from app.services.catalog_projection_service import CatalogProjectionService
+from app.services.fifo_service import FIFOService
+from app.services.stock_ledger_service import StockLedgerService
+from scripts.benchmark.dataset import Dataset, TenantData, VariantInfo
+from scripts.benchmark.report import ScenarioResult
+
+API = "/api/v1"
+_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+# (client, tenant, rng, headers) -> (response, linhas lidas/escritas)
+HttpCall = Callable[[httpx.AsyncClient, TenantData, random.Random, dict], Awaitable[Tuple[httpx.Response, int]]]
+# (session, tenant, rng) -> linhas
+MicroCall = Callable[[object, TenantData, random.Random], Awaitable[int]]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    call: HttpCall
+    concurrency: int = 4
+
+
+@dataclass(frozen=True)
+class MicroBenchmark:
+    name: str
+    call: MicroCall
+
+
+def _pick_in_stock(tenant: TenantData, rng: random.Random, exclude=()) -> Optional[VariantInfo]:
+    for _ in range(20):
+        variant = rng.choice(tenant.variants)
+        if variant.on_hand > 0 and variant not in exclude:
+            return variant
+    return next((v for v in tenant.variants if v.on_hand > 0 and v not in exclude), None)
+
+
+def _rows(response: httpx.Response) -> int:
+    if response.status_code >= 400:
+        return 0
+    body = response.json()
+    return len(body) if isinstance(body, list) else 1
+
+
+# ============================================================================
+# Cenários HTTP
+# ============================================================================
+
+async def pdv_checkout(client, tenant: TenantData, rng, headers) -> Tuple[httpx.Response, int]:
+    chosen = []
+    for _ in range(rng.choice((1, 1, 2, 3))):
+        variant = _pick_in_stock(tenant, rng, exclude=chosen)
+        if variant is not None:
+            chosen.append(variant)
+    # Reserva local: vendas concorrentes não disputam a última unidade
+    for variant in chosen:
+        variant.on_hand -= 1
+    total = sum(v.price for v in chosen)
+    response = await client.post(f"{API}/sales/", headers=headers, json={
+        "payment_method": "pix",
+        "items": [
+            {"product_id": v.product_id, "variant_id": v.variant_id, "quantity": 1, "unit_price": str(v.price)}
+            for v in chosen
+        ],
+        "payments": [{"amount": str(total), "payment_method": "pix"}],
+    })
+    if response.status_code >= 400:
+        for variant in chosen:
+            variant.on_hand += 1
+        return response, 0
+    return response, len(chosen)
+
+
+_DASHBOARD = ["/dashboard/stats", "/dashboard/sales/daily", "/dashboard/top-products", "/dashboard/inventory/health"]
+
+
+async def dashboard_polling(client, tenant, rng, headers):
+    response = await client.get(API + rng.choice(_DASHBOARD), headers=headers)
+    return response, 1 if response.status_code < 400 else 0
+
+
+async def product_listing(client, tenant, rng, headers):
+    if tenant.search_terms and rng.random() < 0.4:
+        params = {"search": rng.choice(tenant.search_terms), "limit": 50}
+    else:
+        params = {"skip": rng.randrange(0, max(1, len(tenant.variants) // 10)), "limit": 50}
+    response = await client.get(f"{API}/products", headers=headers, params=params)
+    return response, _rows(response)
+
+
+async def stock_receiving(client, tenant, rng, headers):
+    chosen = rng.sample(tenant.variants, min(3, len(tenant.variants)))
+    response = await client.post(f"{API}/stock-entries/", headers=headers, json={
+        "entry_code": f"LOAD-{uuid.uuid4().hex[:12].upper()}",
+        "entry_date": date.today().isoformat(),
+        "entry_type": "local",
+        "supplier_name": "Fornecedor Benchmark",
+        "items": [
+            {"product_id": v.product_id, "variant_id": v.variant_id, "quantity_received": 10, "unit_cost": "30.00"}
+            for v in chosen
+        ],
+    })
+    if response.status_code >= 400:
+        return response, 0
+    for variant in chosen:
+        variant.on_hand += 10
+    return response, len(chosen)
+
+
+async def public_catalog(client, tenant, rng, headers):
+    params = {"store": tenant.slug, "limit": 24, "skip": 24 * rng.randrange(0, 5)}
+    roll = rng.random()
+    if roll < 0.25 and tenant.search_terms:
+        params["search"] = rng.choice(tenant.search_terms)
+    elif roll < 0.5 and tenant.category_ids:
+        params["category_id"] = rng.choice(tenant.category_ids)
+    response = await client.get(f"{API}/public/products", params=params)
+    return response, _rows(response)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    s.name: s for s in (
+        Scenario("pdv_checkout", pdv_checkout, concurrency=8),
+        Scenario("dashboard_polling", dashboard_polling),
+        Scenario("product_listing", product_listing),
+        Scenario("stock_receiving", stock_receiving, concurrency=2),
+        Scenario("public_catalog", public_catalog, concurrency=8),
+    )
+}
+
+
+def auth_headers(tenant: TenantData) -> dict:
+    token = create_access_token(data={"sub": str(tenant.user_id)})
+    return {"Authorization": f"Bearer {token}", "X-Tenant-Id": str(tenant.tenant_id)}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    dataset: Dataset,
+    scenario: Scenario,
+    *,
+    requests: int,
+    concurrency: Optional[int] = None,
+    seed: int = 42,
+) -> ScenarioResult:
+    """Dispara `requests` chamadas (tenants em rodízio) com `concurrency` clientes simultâneos."""
+    result = ScenarioResult(scenario.name)
+    headers = {t.tenant_id: auth_headers(t) for t in dataset.tenants}
+    counter = iter(range(requests))
+
+    async def worker():
+        for seq in counter:
+            tenant = dataset.tenants[seq % len(dataset.tenants)]
+            rng = random.Random(f"{seed}:{scenario.name}:{seq}")
+            started = time.perf_counter()
+            response, rows = await scenario.call(client, tenant, rng, headers[tenant.tenant_id])
+            result.latencies_ms.append((time.perf_counter() - started) * 1000)
+            result.rows += rows
+            match = _QUERIES.search(response.headers.get("server-timing", ""))
+            if match:
+                result.queries.append(int(match.group(1)))
+            if response.status_code >= 400:
+                result.errors += 1
+                if len(result.error_samples) < 3:
+                    result.error_samples.append(f"{response.status_code} {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency or scenario.concurrency)))
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+# ============================================================================
+# Micro-benchmarks (services, sem HTTP)
+# ============================================================================
+
+async def fifo_process_sale(db, tenant, rng) -> int:
+    variant = _pick_in_stock(tenant, rng)
+    if variant is None:
+        return 0
+    try:
+        sources = await FIFOService(db).process_sale(
+            variant.product_id, 1, variant_id=variant.variant_id, tenant_id=tenant.tenant_id
+        )
+        await db.flush()
+    finally:
+        await db.rollback()
+    return len(sources)
+
+
+async def ledger_on_hand(db, tenant, rng) -> int:
+    product_ids = list({v.product_id for v in rng.sample(tenant.variants, min(50, len(tenant.variants)))})
+    return len(await StockLedgerService(db).on_hand_by_product(product_ids))
+
+
+async def catalog_list(db, tenant, rng) -> int:
+    items = await CatalogProjectionService(db).list_products(tenant.tenant_id, skip=0, limit=24)
+    return len(items)
+
+
+MICRO_BENCHMARKS: Dict[str, MicroBenchmark] = {
+    m.name: m for m in (
+        MicroBenchmark("fifo_process_sale", fifo_process_sale),
+        MicroBenchmark("ledger_on_hand", ledger_on_hand),
+        MicroBenchmark("catalog_list", catalog_list),
+    )
+}
+
+
+async def run_micro(session_factory, dataset: Dataset, bench: MicroBenchmark, *, iterations: int,
+                    seed: int = 42) -> ScenarioResult:
+    """Executa o micro-benchmark em sequência, uma sessão por chamada."""
+    result = ScenarioResult(bench.name)
+    started = time.perf_counter()
+    for seq in range(iterations):
+        tenant = dataset.tenants[seq % len(dataset.tenants)]
+        rng = random.Random(f"{seed}:{bench.name}:{seq}")
+        async with session_factory() as db:
+            with track_queries() as metrics:
+                call_started = time.perf_counter()
+                try:
+                    result.rows += await bench.call(db, tenant, rng)
+                except Exception as e:
+                    result.errors += 1
+                    if len(result.error_samples) < 3:
+                        result.error_samples.append(repr(e)[:200])
+                result.latencies_ms.append((time.perf_counter() - call_started) * 1000)
+            result.queries.append(metrics.db_queries)
+    result.seconds = time.perf_counter() - started
+    return result
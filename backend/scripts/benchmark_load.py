@@ -0,0 +1,156 @@
+"""
+Benchmark de carga: dataset sintético multi-tenant + cenários da API em processo.
+
+Gera (ou reaproveita) o dataset do perfil escolhido num banco dedicado, roda
+os cenários HTTP contra o app ASGI (sem rede) e os micro-benchmarks de
+service, e imprime p50/p95/p99, queries por requisição e vazão. Com baseline
+salvo para o perfil+banco, sai com código 1 se algum cenário regredir.
+
+Executar com:
+    python scripts/benchmark_load.py --profile small --reset
+    python scripts/benchmark_load.py --profile small --reuse --save-baseline
+    python scripts/benchmark_load.py --profile large --database-url postgresql+asyncpg://...
+
+Perfis e cenários: scripts/benchmark/dataset.py e scripts/benchmark/scenarios.py.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profile", default="small", help="tiny | small | medium | large")
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./benchmark.db",
+                        help="Banco dedicado ao benchmark (nunca o de produção)")
+    parser.add_argument("--reset", action="store_true", help="Recria todas as tabelas antes de gerar")
+    parser.add_argument("--reuse", action="store_true", help="Reaproveita o dataset já gerado no banco")
+    parser.add_argument("--scenarios", default="all", help="Lista separada por vírgula (ou 'all'/'none')")
+    parser.add_argument("--micro", default="all", help="Micro-benchmarks (ou 'all'/'none')")
+    parser.add_argument("--requests", type=int, default=200, help="Requisições por cenário")
+    parser.add_argument("--micro-iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=None, help="Sobrescreve a concorrência dos cenários")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", action="store_true", help="Grava o resultado como baseline")
+    parser.add_argument("--latency-tolerance", type=float, default=0.25, help="Folga do p95 (0.25 = +25%%)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Salva o relatório completo em JSON")
+    return parser.parse_args()
+
+
+def _select(names: str, available: dict) -> list:
+    if names == "all":
+        return list(available.values())
+    if names == "none":
+        return []
+    unknown = [n for n in names.split(",") if n not in available]
+    if unknown:
+        raise SystemExit(f"Desconhecido(s): {', '.join(unknown)}. Opções: {', '.join(available)}")
+    return [available[n] for n in names.split(",")]
+
+
+async def main(args: argparse.Namespace) -> int:
+    import logging
+
+    import httpx
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from app import models  # noqa: F401 — registra todas as tabelas no metadata
+    from app.core.database import engine
+    from app.main import app
+    from app.models.base import Base
+    from scripts.benchmark.dataset import PROFILES, generate_dataset, load_dataset
+    from scripts.benchmark.report import compare_to_baseline, format_table, load_baselines, save_baseline
+    from scripts.benchmark.scenarios import MICRO_BENCHMARKS, SCENARIOS, run_micro, run_scenario
+
+    # Uma linha por requisição poluiria o relatório
+    logging.getLogger("app.requests").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.profile not in PROFILES:
+        raise SystemExit(f"Perfil desconhecido: {args.profile}. Opções: {', '.join(PROFILES)}")
+    profile = PROFILES[args.profile]
+    scenarios = _select(args.scenarios, SCENARIOS)
+    micros = _select(args.micro, MICRO_BENCHMARKS)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    prefix = f"bench-{args.profile}"
+
+    async with engine.begin() as conn:
+        if args.reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    dataset = await load_dataset(session_factory, prefix=prefix) if args.reuse else None
+    if not dataset or not dataset.tenants:
+        print(f"\n🏗️  Gerando dataset '{args.profile}' ({profile.tenants} tenants)...")
+        dataset = await generate_dataset(
+            engine, profile, prefix=prefix, seed=args.seed,
+            progress=lambda done, total: print(f"  tenant {done}/{total}", end="\r", flush=True),
+        )
+        print(f"  ✓ {dataset.rows} linhas em {dataset.seconds:.1f}s ({dataset.rows_per_second:,.0f} linhas/s)")
+    else:
+        print(f"\n♻️  Reaproveitando dataset '{args.profile}' ({len(dataset.tenants)} tenants)")
+
+    summaries = {}
+    errors = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=120) as client:
+        for scenario in scenarios:
+            print(f"  ▶ {scenario.name}", flush=True)
+            result = await run_scenario(client, dataset, scenario, requests=args.requests,
+                                        concurrency=args.concurrency, seed=args.seed)
+            summaries[scenario.name] = result.summary()
+            errors[scenario.name] = result.error_samples
+    for bench in micros:
+        print(f"  ▶ {bench.name}", flush=True)
+        result = await run_micro(session_factory, dataset, bench, iterations=args.micro_iterations, seed=args.seed)
+        summaries[bench.name] = result.summary()
+        errors[bench.name] = result.error_samples
+
+    print("\n" + format_table(summaries))
+    for name, samples in errors.items():
+        for sample in samples:
+            print(f"  ⚠️  {name}: {sample}")
+
+    await engine.dispose()
+
+    baseline_key = f"{args.profile}:{engine.dialect.name}"
+    baseline = load_baselines().get(baseline_key)
+    regressions = compare_to_baseline(summaries, baseline, latency_tolerance=args.latency_tolerance)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({
+            "profile": args.profile, "dialect": engine.dialect.name, "dataset_rows": dataset.rows,
+            "dataset_rows_per_sec": round(dataset.rows_per_second, 1), "scenarios": summaries,
+            "regressions": regressions,
+        }, indent=2, ensure_ascii=False), encoding="utf-8")
+    if args.save_baseline:
+        save_baseline(baseline_key, summaries)
+        print(f"\n💾 Baseline '{baseline_key}' salvo")
+        return 0
+
+    if baseline is None:
+        print(f"\nℹ️  Sem baseline '{baseline_key}' (grave com --save-baseline)")
+        return 0
+    if regressions:
+        print(f"\n❌ Regressões contra o baseline '{baseline_key}':")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print(f"\n✅ Sem regressões (baseline '{baseline_key}')")
+    return 0
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # O engine do app é criado no import: aponta para o banco do benchmark antes
+    os.environ["DATABASE_URL"] = args.database_url
+    # Queries por requisição vêm do header Server-Timing (desligado por padrão)
+    os.environ["SERVER_TIMING_ENABLED"] = "true"
+    sys.exit(asyncio.run(main(args)))
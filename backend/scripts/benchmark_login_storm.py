@@ -0,0 +1,107 @@
+"""
+Benchmark: rajada de logins x latência das demais rotas.
+
+Sobe um app FastAPI mínimo em processo (httpx + ASGITransport, sem banco)
+com duas rotas:
+  - POST /login: verificação bcrypt, no modo "sync" (verify_password direto
+    no event loop, como era antes) ou "pool" (verify_password_async)
+  - GET  /ping:  rota trivial, representa PDV/SSE no mesmo worker
+
+Dispara N logins concorrentes enquanto um cliente faz /ping em sequência e
+mede a latência dos pings. No modo "pool" ela deve ficar estável; no "sync"
+cada login trava o loop por ~100-300 ms.
+
+Executar com: python scripts/benchmark_login_storm.py [--logins 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.security import get_password_hash, verify_password, verify_password_async
+
+PASSWORD = "senha-do-benchmark"
+PING_INTERVAL = 0.005
+
+
+def build_app(mode: str, hashed: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if mode == "sync":
+            ok = verify_password(PASSWORD, hashed)
+        else:
+            ok = await verify_password_async(PASSWORD, hashed)
+        return {"ok": ok}
+
+    @app.get("/ping")
+    async def ping():
+        return {"pong": True}
+
+    return app
+
+
+async def run(mode: str, logins: int, hashed: str) -> dict:
+    transport = httpx.ASGITransport(app=build_app(mode, hashed))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/ping")  # aquecimento
+
+        latencies = []
+        storm_done = asyncio.Event()
+
+        async def pinger():
+            # Mede desde o instante em que o ping deveria sair: inclui o
+            # tempo em que o loop ficou travado antes de enviá-lo
+            while not storm_done.is_set():
+                due = time.perf_counter() + PING_INTERVAL
+                await asyncio.sleep(PING_INTERVAL)
+                await client.get("/ping")
+                latencies.append((time.perf_counter() - due) * 1000)
+
+        async def storm():
+            await asyncio.gather(*(client.post("/login") for _ in range(logins)))
+            storm_done.set()
+
+        start = time.perf_counter()
+        await asyncio.gather(pinger(), storm())
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "storm_s": elapsed,
+        "pings": len(latencies),
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "max_ms": latencies[-1],
+    }
+
+
+async def main(logins: int):
+    hashed = get_password_hash(PASSWORD)
+    print(f"\n🔐 Rajada de {logins} logins concorrentes (bcrypt)\n")
+    print(f"{'modo':<6} {'rajada(s)':>10} {'pings':>6} {'p50(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9}")
+    for mode in ("sync", "pool"):
+        r = await run(mode, logins, hashed)
+        print(
+            f"{r['mode']:<6} {r['storm_s']:>10.2f} {r['pings']:>6} "
+            f"{r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['max_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
@@ -1,7 +1,13 @@
 """
-Inicialização inteligente do banco:
+Inicialização inteligente do banco (comando de migrate do deploy):
 - Banco novo (sem alembic_version): create_all + stamp head
 - Banco existente: alembic upgrade head (só migrations novas)
+
+Roda uma vez por deploy, antes do servidor (entrypoint.sh / startCommand do
+Render); o boot do app só confere a versão do schema.
+
+    python scripts/db_init.py           # aplica
+    python scripts/db_init.py --check   # só verifica (exit 1 se pendente)
 """
 import asyncio
 import os
@@ -48,7 +54,33 @@ async def create_all(url: str) -> None:
     await engine.dispose()
 
 
+async def schema_status(url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.core.schema_version import check_schema_version
+    engine = create_async_engine(url)
+    try:
+        async with engine.connect() as conn:
+            return await check_schema_version(conn)
+    finally:
+        await engine.dispose()
+
+
+def check() -> int:
+    status = asyncio.run(schema_status(get_asyncpg_url()))
+    if status.up_to_date:
+        print(f"[db_init] Schema em dia ({', '.join(sorted(status.expected))})")
+        return 0
+    print(
+        f"[db_init] Schema desatualizado: banco={sorted(status.current) or '(vazio)'} "
+        f"esperado={sorted(status.expected)}"
+    )
+    return 1
+
+
 def main():
+    if "--check" in sys.argv[1:]:
+        sys.exit(check())
+
     url = get_asyncpg_url()
     fresh = asyncio.run(is_fresh_db(url))
 
@@ -113,6 +113,16 @@ async def test_engine():
     await engine.dispose()
 
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """Usuários criados em transações revertidas não podem vazar pelo cache"""
+    from app.core.user_cache import user_cache
+
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
 @pytest.fixture
 async def async_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
     """Cria sessão de banco de dados para testes"""
@@ -0,0 +1,155 @@
+"""
+Testes do scan de IA em lote (concorrência, retry, duplicados do lote).
+"""
+import io
+import json
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.ai_scan_cache import ai_scan_cache
+from app.core.config import settings
+from app.core.rate_limit import AsyncRateLimiter, reset_provider_limiters
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.services.ai_batch_scan_service import AIBatchScanner, BatchStatus, ItemStatus
+from app.services.ai_scan_service import AIScanService, reset_category_cache
+from app.services.product_fingerprint_service import fingerprint_cache
+
+TENANT = 931
+
+# Cor do pixel → resposta da IA falsa
+PRODUCTS = {
+    (10, 10, 10): {"name": "Legging Lote", "brand": "Marca Lote", "color": "Preto", "size": "M"},
+    (20, 20, 20): {"name": "Legging Lote", "brand": "Marca Lote", "color": "Preto", "size": "G"},
+    (30, 30, 30): {"name": "Top Diferente", "brand": "Outra Lote", "color": "Rosa", "size": "P"},
+}
+
+
+class FakeProvider:
+    """Provider falso: lê a cor da imagem, mede a concorrência e falha quando pedido."""
+
+    def __init__(self, delay: float = 0.05, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, image_bytes, media_type, prompt):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            fail = self.failures > 0
+            self.failures -= 1
+        try:
+            time.sleep(self.delay)
+            if fail:
+                raise ConnectionError("503 do provider")
+            pixel = Image.open(io.BytesIO(image_bytes)).convert("RGB").getpixel((0, 0))
+            return json.dumps(PRODUCTS[pixel])
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _image(rgb, width=60) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (width, 40), rgb).save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture(autouse=True)
+def fake_settings(monkeypatch):
+    monkeypatch.setattr(settings, "AI_SCAN_ENABLED", True)
+    monkeypatch.setattr(settings, "AI_PROVIDER", "gemini")
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "fake-key")
+    monkeypatch.setattr(settings, "AI_PROVIDER_RATE_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "AI_BATCH_CONCURRENCY", 2)
+    monkeypatch.setattr(AIBatchScanner, "BACKOFF_BASE_SECONDS", 0.01)
+    for cache in (ai_scan_cache, fingerprint_cache):
+        cache.clear()
+    reset_category_cache()
+    reset_provider_limiters()
+    yield
+    ai_scan_cache.clear()
+    fingerprint_cache.clear()
+    reset_provider_limiters()
+
+
+@pytest.mark.asyncio
+async def test_batch_is_bounded_and_flags_duplicates_in_stock_and_within_batch(session_maker, monkeypatch):
+    provider = FakeProvider(delay=0.1)
+    monkeypatch.setattr(AIScanService, "_call_gemini", provider)
+
+    async with session_maker() as db:
+        existing = Product(name="Legging Lote Antiga", brand="Marca Lote", category_id=1, tenant_id=TENANT)
+        db.add(existing)
+        await db.flush()
+        db.add(ProductVariant(product_id=existing.id, sku="LOTE-OLD-M", color="Preto", size="M",
+                              price=Decimal("99.90"), tenant_id=TENANT))
+        await db.commit()
+
+    scanner = AIBatchScanner(session_factory=session_maker)
+    images = [("a.png", _image((10, 10, 10)), "image/png"),
+              ("b.png", _image((20, 20, 20)), "image/png"),
+              ("c.png", _image((30, 30, 30)), "image/png"),
+              ("d.png", _image((30, 30, 30), width=61), "image/png")]
+    batch = scanner.submit(TENANT, 1, images, suggest_price=False)
+    assert scanner.get(batch.id, TENANT + 1) is None
+
+    await scanner.wait_done(batch.id)
+
+    assert batch.status == BatchStatus.DONE
+    assert batch.completed == 4 and batch.failed == 0
+    assert provider.calls == 4
+    assert provider.max_active <= 2
+    assert all(item.image_bytes is None for item in batch.items)
+
+    first = batch.items[0]
+    assert first.result.possible_duplicates[0].product_id == existing.id
+    assert first.result.possible_duplicates[0].reason == "Mesma marca, cor e tamanho"
+    assert [(d.filename, d.reason) for d in first.batch_duplicates] == [("b.png", "Mesma marca e cor")]
+    assert [d.index for d in batch.items[2].batch_duplicates] == [3]
+    # Mesmo produto no lote → SKU sugerido não repete
+    assert batch.items[2].result.suggested_sku != batch.items[3].result.suggested_sku
+
+
+@pytest.mark.asyncio
+async def test_transient_provider_errors_are_retried(session_maker, monkeypatch):
+    provider = FakeProvider(delay=0, failures=1)
+    monkeypatch.setattr(AIScanService, "_call_gemini", provider)
+    monkeypatch.setattr(settings, "AI_BATCH_MAX_ATTEMPTS", 2)
+
+    scanner = AIBatchScanner(session_factory=session_maker)
+    batch = scanner.submit(TENANT, 1, [("x.png", _image((10, 10, 10)), "image/png")],
+                           check_duplicates=False, suggest_price=False)
+    await scanner.wait_done(batch.id)
+
+    item = batch.items[0]
+    assert item.status == ItemStatus.DONE
+    assert item.attempts == 2
+    assert item.error is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_calls_after_burst():
+    limiter = AsyncRateLimiter(rate_per_minute=1200, burst=2)  # 20/s
+    start = time.monotonic()
+    waits = [await limiter.acquire() for _ in range(4)]
+    elapsed = time.monotonic() - start
+
+    assert waits[:2] == [0.0, 0.0]
+    assert elapsed >= 0.09
+    assert await AsyncRateLimiter(rate_per_minute=0).acquire() == 0.0
@@ -0,0 +1,130 @@
+"""
+Testes do cache/coalescing do AI Scan, com provider falso no lugar do Gemini.
+"""
+import asyncio
+import io
+import json
+import threading
+import time
+
+import pytest
+from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.ai_scan_cache import ai_scan_cache
+from app.core.config import settings
+from app.core.rate_limit import reset_provider_limiters
+from app.services import ai_scan_service
+from app.services.ai_scan_service import AIScanService, reset_category_cache
+
+
+class FakeProvider:
+    """Substitui AIScanService._call_gemini: conta chamadas e guarda a imagem recebida."""
+
+    def __init__(self, delay: float = 0.0, fail_first: bool = False):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, image_bytes, media_type, prompt):
+        with self._lock:
+            self.calls.append((image_bytes, media_type))
+            attempt = len(self.calls)
+        time.sleep(self.delay)
+        if self.fail_first and attempt == 1:
+            raise ConnectionError("provider fora do ar")
+        return json.dumps({"name": "Legging Cache", "brand": "Fake", "color": "Preto", "size": "M"})
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture(autouse=True)
+def fake_settings(monkeypatch):
+    monkeypatch.setattr(settings, "AI_SCAN_ENABLED", True)
+    monkeypatch.setattr(settings, "AI_PROVIDER", "gemini")
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "fake-key")
+    monkeypatch.setattr(settings, "AI_PROVIDER_RATE_PER_MINUTE", 0)
+    ai_scan_cache.clear()
+    reset_category_cache()
+    reset_provider_limiters()
+    yield
+    ai_scan_cache.clear()
+    reset_category_cache()
+
+
+def _image(width: int, height: int, fmt: str = "PNG") -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 90)).save(output, format=fmt)
+    return output.getvalue()
+
+
+async def _scan(session_maker, image: bytes, tenant_id: int = 1, context=None):
+    async with session_maker() as db:
+        return await AIScanService(db).analyze_image(
+            image, "image/png", tenant_id=tenant_id,
+            check_duplicates=False, suggest_price=False, context=context,
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_scans_share_one_provider_call(session_maker, monkeypatch):
+    provider = FakeProvider(delay=0.2)
+    monkeypatch.setattr(AIScanService, "_call_gemini", provider)
+    image = _image(50, 50)
+
+    results = await asyncio.gather(*(_scan(session_maker, image) for _ in range(4)))
+    assert len(provider.calls) == 1
+    assert {r.name for r in results} == {"Legging Cache"}
+    assert ai_scan_cache.coalesced == 3
+
+    # Repetição: cache; outro tenant ou outro contexto: nova chamada
+    await _scan(session_maker, image)
+    assert len(provider.calls) == 1
+    await _scan(session_maker, image, tenant_id=2)
+    await _scan(session_maker, image, context="tamanho na etiqueta: G")
+    assert len(provider.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached(session_maker, monkeypatch):
+    provider = FakeProvider(fail_first=True)
+    monkeypatch.setattr(AIScanService, "_call_gemini", provider)
+    image = _image(40, 40)
+
+    with pytest.raises(RuntimeError):
+        await _scan(session_maker, image)
+    result = await _scan(session_maker, image)
+
+    assert result.brand == "Fake"
+    assert len(provider.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_large_images_are_downscaled_before_upload(session_maker, monkeypatch):
+    provider = FakeProvider()
+    monkeypatch.setattr(AIScanService, "_call_gemini", provider)
+    monkeypatch.setattr(settings, "AI_SCAN_MAX_IMAGE_SIDE", 800)
+
+    await _scan(session_maker, _image(3000, 2000))
+    small = _image(300, 200)
+    await _scan(session_maker, small)
+
+    sent, media_type = provider.calls[0]
+    assert media_type == "image/jpeg"
+    assert Image.open(io.BytesIO(sent)).size == (800, 533)
+    assert provider.calls[1] == (small, "image/png")
+
+
+@pytest.mark.asyncio
+async def test_categories_are_cached_between_scans(session_maker):
+    async with session_maker() as db:
+        service = AIScanService(db)
+        first = await service._get_categories()
+        cached = ai_scan_service._category_cache
+        assert await service._get_categories() is first
+
+    assert cached is not None and cached[1] is first
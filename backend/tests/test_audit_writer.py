@@ -0,0 +1,103 @@
+"""
+Testes do audit log bufferizado e da paginação por keyset.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.responses import Response
+
+from app.api.v1.endpoints.audit import list_audit_logs
+from app.models.audit_log import AuditLog
+from app.services import audit_service
+from app.services.audit_service import AuditLogWriter, AuditService
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+async def writer(session_maker, monkeypatch):
+    writer = AuditLogWriter(session_factory=session_maker, interval_seconds=60, batch_size=3)
+    writer.start()
+    monkeypatch.setattr(audit_service, "audit_writer", writer)
+    yield writer
+    await writer.stop()
+
+
+async def _count(session_maker, tenant_id: int, action: str = None) -> int:
+    async with session_maker() as db:
+        stmt = select(func.count(AuditLog.id)).where(AuditLog.tenant_id == tenant_id)
+        if action:
+            stmt = stmt.where(AuditLog.action == action)
+        return await db.scalar(stmt)
+
+
+@pytest.mark.asyncio
+async def test_buffered_events_survive_caller_rollback_and_flush_in_batches(session_maker, writer):
+    """Eventos comuns vão para a fila e são gravados fora da transação do chamador."""
+    async with session_maker() as db:
+        await AuditService.log(db, "LOGIN_FAILED", tenant_id=901, detail={"reason": "x"})
+        await AuditService.log(db, "LOGIN_FAILED", tenant_id=901)
+        assert len(writer) == 2
+        await db.rollback()
+
+    assert await _count(session_maker, 901) == 0
+    assert await writer.flush() == 2
+    assert len(writer) == 0
+    assert await _count(session_maker, 901) == 2
+
+
+@pytest.mark.asyncio
+async def test_durable_actions_are_written_in_caller_transaction(session_maker, writer):
+    """Ações de DURABLE_ACTIONS (e durable=True) são atômicas com a operação."""
+    async with session_maker() as db:
+        await AuditService.log(db, "PIX_REFUNDED", tenant_id=902)
+        await AuditService.log(db, "STOCK_ADJUSTMENT", tenant_id=902, durable=True)
+        await db.rollback()
+    assert len(writer) == 0
+    assert await _count(session_maker, 902) == 0
+
+    async with session_maker() as db:
+        await AuditService.log(db, "PIX_REFUNDED", tenant_id=902)
+        await db.commit()
+    assert await _count(session_maker, 902, "PIX_REFUNDED") == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_size_threshold_wakes_writer(session_maker, writer):
+    async with session_maker() as db:
+        for _ in range(3):
+            await AuditService.log(db, "SALE_CREATED", tenant_id=903)
+
+    for _ in range(50):
+        if await _count(session_maker, 903) == 3:
+            break
+        await asyncio.sleep(0.02)
+    assert await _count(session_maker, 903) == 3
+
+
+@pytest.mark.asyncio
+async def test_list_audit_logs_keyset_pagination(session_maker):
+    async with session_maker() as db:
+        for i in range(5):
+            await AuditService.log(db, "SALE_CREATED", tenant_id=904, entity_id=i)
+        await db.commit()
+
+    pages, cursor = [], None
+    while True:
+        response = Response()
+        async with session_maker() as db:
+            page = await list_audit_logs(
+                response, db, 904, action=None, entity=None, user_id=None,
+                date_from=None, date_to=None, limit=2, cursor=cursor, skip=0,
+            )
+        pages.append([entry.entity_id for entry in page])
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert pages == [[4, 3], [2, 1], [0]]
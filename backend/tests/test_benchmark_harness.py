@@ -0,0 +1,112 @@
+"""
+Testes da suite de benchmark (dataset sintético, cenários em processo e comparação com baseline).
+"""
+import httpx
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.main import app
+from app.models.entry_item import EntryItem
+from app.models.sale import SaleItem
+from app.services.stock_ledger_service import StockLedgerService
+from scripts.benchmark.dataset import PROFILES, generate_dataset, load_dataset
+from scripts.benchmark.report import ScenarioResult, compare_to_baseline, percentile
+from scripts.benchmark.scenarios import MICRO_BENCHMARKS, SCENARIOS, run_micro, run_scenario
+
+PREFIX = "bench-test"
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+async def dataset(test_engine, session_maker):
+    loaded = await load_dataset(session_maker, prefix=PREFIX)
+    if loaded.tenants:
+        return loaded
+    return await generate_dataset(test_engine, PROFILES["tiny"], prefix=PREFIX, seed=7)
+
+
+@pytest.mark.asyncio
+async def test_synthetic_dataset_keeps_fifo_ledger_and_sales_consistent(dataset, session_maker):
+    assert len(dataset.tenants) == PROFILES["tiny"].tenants
+    async with session_maker() as db:
+        for tenant in dataset.tenants:
+            assert len(tenant.variants) == 20 * 3
+            consistency = await StockLedgerService(db).check_consistency(tenant_id=tenant.tenant_id)
+            assert consistency["mismatches"] == []
+
+            received, remaining = (await db.execute(
+                select(func.sum(EntryItem.quantity_received), func.sum(EntryItem.quantity_remaining))
+                .where(EntryItem.tenant_id == tenant.tenant_id)
+            )).one()
+            sold = (await db.execute(
+                select(func.sum(SaleItem.quantity)).where(SaleItem.tenant_id == tenant.tenant_id)
+            )).scalar()
+            assert received - remaining == sold > 0
+            assert sum(v.on_hand for v in tenant.variants) == remaining
+
+    # Mesmo seed, mesmo dataset: o reload enxerga os saldos gravados
+    reloaded = await load_dataset(session_maker, prefix=PREFIX)
+    assert [t.slug for t in reloaded.tenants] == [f"{PREFIX}-0", f"{PREFIX}-1"]
+
+
+@pytest.mark.asyncio
+async def test_scenarios_run_against_asgi_app(dataset, session_maker, monkeypatch):
+    # queries_per_request vem do Server-Timing, desligado por padrão
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", True)
+
+    async def override_get_db():
+        async with session_maker() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    # Só o get_db do teste: overrides esquecidos por outros testes (tenant fixo) mascarariam o X-Tenant-Id
+    saved_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides.clear()
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            results = {
+                name: await run_scenario(client, dataset, SCENARIOS[name], requests=4, concurrency=1)
+                for name in ("pdv_checkout", "product_listing", "public_catalog")
+            }
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(saved_overrides)
+
+    for name, result in results.items():
+        summary = result.summary()
+        assert summary["errors"] == 0, result.error_samples
+        assert summary["requests"] == 4
+        assert summary["queries_per_request"] > 0
+    assert results["pdv_checkout"].rows >= 4
+
+    micro = await run_micro(session_maker, dataset, MICRO_BENCHMARKS["fifo_process_sale"], iterations=3)
+    assert micro.errors == 0 and micro.rows >= 3
+
+
+def test_percentiles_and_baseline_regressions():
+    result = ScenarioResult("listing", latencies_ms=[float(n) for n in range(1, 101)], queries=[4, 4, 5, 5],
+                            seconds=2.0)
+    summary = result.summary()
+    assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"]) == (50.0, 95.0, 99.0)
+    assert summary["queries_per_request"] == 4.5
+    assert summary["requests_per_sec"] == 50.0
+    assert percentile([], 95) == 0.0
+
+    baseline = {"listing": {"p95_ms": 80.0, "queries_per_request": 3.0}}
+    regressions = compare_to_baseline({"listing": summary}, baseline, latency_tolerance=0.1)
+    assert len(regressions) == 2
+    assert compare_to_baseline({"listing": summary}, baseline, latency_tolerance=0.25, query_slack=2) == []
+    assert compare_to_baseline({"new": summary}, baseline) == []
@@ -0,0 +1,101 @@
+"""
+Testes da projeção do catálogo público (public_catalog_items).
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.catalog_projection import PublicCatalogItem
+from app.models.entry_item import EntryItem
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.stock_entry import EntryType, StockEntry
+from app.services.catalog_projection_service import CatalogProjectionService
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _row(session_maker, product_id):
+    async with session_maker() as db:
+        return await db.get(PublicCatalogItem, product_id)
+
+
+@pytest.mark.asyncio
+async def test_projection_follows_variant_stock_and_catalog_changes(session_maker):
+    """Cada commit recalcula só a linha do produto afetado."""
+    async with session_maker() as db:
+        product = Product(name="Top Projecao", brand="Acme", category_id=1, tenant_id=1,
+                          is_catalog=True, base_price=Decimal("99"))
+        db.add(product)
+        await db.flush()
+        small = ProductVariant(product_id=product.id, sku="PROJ-P", size="P", color="Preto",
+                               price=Decimal("50"), tenant_id=1)
+        medium = ProductVariant(product_id=product.id, sku="PROJ-M", size="M", color="Azul",
+                                price=Decimal("40"), tenant_id=1)
+        db.add_all([small, medium])
+        await db.commit()
+
+    row = await _row(session_maker, product.id)
+    assert row.sale_price == Decimal("40")
+    assert row.sizes == ["M", "P"] and row.colors == ["Azul", "Preto"]
+    assert row.variant_count == 2
+    assert row.in_stock is False
+
+    async with session_maker() as db:
+        entry = StockEntry(entry_code="PROJ-ENT-1", entry_date=date.today(), entry_type=EntryType.LOCAL,
+                           supplier_name="Fornecedor", tenant_id=1)
+        db.add(entry)
+        await db.flush()
+        db.add(EntryItem(entry_id=entry.id, variant_id=small.id, quantity_received=3,
+                         quantity_remaining=3, unit_cost=Decimal("20"), tenant_id=1))
+        await db.commit()
+    assert (await _row(session_maker, product.id)).in_stock is True
+
+    async with session_maker() as db:
+        variant = await db.get(ProductVariant, medium.id)
+        variant.price = Decimal("70")
+        await db.commit()
+    assert (await _row(session_maker, product.id)).sale_price == Decimal("50")
+
+    async with session_maker() as db:
+        items = await CatalogProjectionService(db).list_products(1, search="top projecao")
+    assert [i.product_id for i in items] == [product.id]
+
+    async with session_maker() as db:
+        (await db.get(Product, product.id)).is_catalog = False
+        await db.commit()
+    assert await _row(session_maker, product.id) is None
+
+
+@pytest.mark.asyncio
+async def test_rollback_discards_pending_refresh_and_rebuild_restores(session_maker):
+    """Rollback não deixa lixo; rebuild_all reconstrói linhas apagadas."""
+    async with session_maker() as db:
+        product = Product(name="Legging Rebuild", brand="Acme", category_id=1, tenant_id=1, is_catalog=True)
+        db.add(product)
+        await db.flush()
+        db.add(ProductVariant(product_id=product.id, sku="PROJ-RB", size="G", price=Decimal("10"), tenant_id=1))
+        await db.commit()
+
+    async with session_maker() as db:
+        (await db.get(Product, product.id)).name = "Nunca Commitado"
+        await db.flush()
+        await db.rollback()
+        await db.execute(PublicCatalogItem.__table__.delete().where(
+            PublicCatalogItem.product_id == product.id
+        ))
+        await db.commit()
+    assert await _row(session_maker, product.id) is None
+
+    async with session_maker() as db:
+        await CatalogProjectionService(db).rebuild_all(tenant_id=1)
+        await db.commit()
+
+    row = await _row(session_maker, product.id)
+    assert row.name == "Legging Rebuild"
+    assert row.sizes == ["G"]
@@ -0,0 +1,83 @@
+"""
+Testes do boot rápido: checagem de versão do schema sem alembic, admin sob
+demanda e orçamento de tempo do cold start (import + lifespan).
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.schema_version import check_schema_version, expected_heads
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Orçamento generoso para CI compartilhado; localmente o boot leva ~2-3s
+COLD_START_BUDGET_SECONDS = float(os.getenv("COLD_START_BUDGET_SECONDS", "15"))
+
+_BOOT_SCRIPT = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from app.main import admin, app, lifespan
+imported = time.perf_counter() - started
+
+async def boot():
+    async with lifespan(app):
+        ready = time.perf_counter() - started
+        loaded = {name: name in sys.modules for name in ("alembic", "sqladmin", "google.genai", "openai")}
+    return ready, loaded
+
+ready, loaded = asyncio.run(boot())
+print(json.dumps({"import": imported, "ready": ready, "modules": loaded, "admin_built": admin.is_built}))
+"""
+
+
+def test_expected_heads_match_alembic_script_directory():
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(Config(str(BACKEND_DIR / "alembic.ini")))
+    assert expected_heads() == frozenset(script.get_heads())
+
+
+@pytest.mark.asyncio
+async def test_schema_version_check_reads_alembic_version():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    try:
+        async with engine.connect() as conn:
+            missing = await check_schema_version(conn, expected={"head_b"})
+            assert not missing.up_to_date and missing.current == frozenset()
+
+            await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+            await conn.execute(text("INSERT INTO alembic_version VALUES ('head_a')"))
+            stale = await check_schema_version(conn, expected={"head_b"})
+            assert stale.pending == {"head_b"}
+
+            await conn.execute(text("UPDATE alembic_version SET version_num = 'head_b'"))
+            assert (await check_schema_version(conn, expected={"head_b"})).up_to_date
+    finally:
+        await engine.dispose()
+
+
+def test_cold_start_within_budget_without_migrations_or_admin(tmp_path):
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'boot.db'}",
+        "SECRET_KEY": "test-secret-key-for-ci-minimum-32-chars",
+        "LOG_LEVEL": "WARNING",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", _BOOT_SCRIPT], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    boot = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert boot["ready"] < COLD_START_BUDGET_SECONDS, boot
+    # Nada de alembic, painel admin nem SDKs de IA no caminho do boot
+    assert boot["modules"] == {"alembic": False, "sqladmin": False, "google.genai": False, "openai": False}
+    assert boot["admin_built"] is False
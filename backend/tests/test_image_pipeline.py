@@ -0,0 +1,69 @@
+"""
+Testes do pipeline de imagens do storage local (EXIF, versões WebP, URLs).
+"""
+import io
+
+import pytest
+from PIL import Image
+
+from app.services import storage_service
+from app.services.image_pipeline import ImagePipeline, build_renditions, rendition_path, strip_metadata
+
+
+def _jpeg_with_exif(width=1600, height=900) -> bytes:
+    img = Image.new("RGB", (width, height), (200, 30, 90))
+    exif = Image.Exif()
+    exif[0x010F] = "CameraMaker"  # Make
+    exif[0x0112] = 6              # Orientation: girar 90°
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", exif=exif)
+    return buf.getvalue()
+
+
+def test_strip_metadata_removes_exif_and_applies_orientation():
+    cleaned = Image.open(io.BytesIO(strip_metadata(_jpeg_with_exif())))
+
+    assert cleaned.format == "JPEG"
+    assert not cleaned.getexif()
+    assert cleaned.size == (900, 1600)
+
+
+def test_renditions_are_webp_and_never_upscaled():
+    renditions = build_renditions(_jpeg_with_exif(width=400, height=300))
+
+    sizes = {name: Image.open(io.BytesIO(data)) for name, data in renditions.items()}
+    assert all(img.format == "WEBP" for img in sizes.values())
+    assert max(sizes["thumb"].size) == 200
+    assert sizes["medium"].size == (300, 400)
+    assert sizes["large"].size == (300, 400)
+
+
+@pytest.mark.asyncio
+async def test_local_upload_generates_renditions(tmp_path, monkeypatch):
+    """Upload grava original sem EXIF; sized_url passa a apontar para o WebP."""
+    pipeline = ImagePipeline(base_path=tmp_path, base_url="/uploads")
+    monkeypatch.setattr(storage_service, "image_pipeline", pipeline)
+    monkeypatch.setattr(storage_service.settings, "UPLOAD_DIR", str(tmp_path))
+
+    storage = storage_service.LocalStorageService()
+    path = await storage.upload_from_bytes(_jpeg_with_exif(), folder="products", filename="42.jpg")
+    url = storage.get_url(path)
+
+    assert pipeline.sized_url(url, "thumb") in (url, "/uploads/products/42.thumb.webp")
+    await pipeline.drain()
+
+    assert not Image.open(tmp_path / path).getexif()
+    assert pipeline.sized_url(url, "thumb") == "/uploads/products/42.thumb.webp"
+    assert pipeline.sized_url(url, None) == url
+    assert (tmp_path / rendition_path(path, "large")).is_file()
+
+    await storage.delete(path)
+    assert not (tmp_path / rendition_path(path, "thumb")).exists()
+    assert pipeline.sized_url(url, "thumb") == url
+
+
+def test_sized_url_ignores_external_and_gif_urls(tmp_path):
+    pipeline = ImagePipeline(base_path=tmp_path, base_url="/uploads")
+
+    assert pipeline.sized_url("https://res.cloudinary.com/x/image.jpg", "thumb").startswith("https://")
+    assert pipeline.sized_url("/uploads/product_media/a.gif", "thumb") == "/uploads/product_media/a.gif"
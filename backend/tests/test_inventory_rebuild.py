@@ -0,0 +1,174 @@
+"""
+Testes do rebuild FIFO em lote (upsert por faixa de product_id) e da reconciliação de custos.
+"""
+from datetime import date
+from decimal import Decimal
+from itertools import count
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.entry_item import EntryItem
+from app.models.inventory import Inventory
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.sale import SaleItem
+from app.models.stock_entry import EntryType, StockEntry
+from app.services.inventory_service import InventoryService
+
+TENANT = 961
+
+_codes = count(1)
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _product(db, tenant_id: int, name: str) -> Product:
+    product = Product(name=name, brand="Acme", category_id=1, tenant_id=tenant_id)
+    db.add(product)
+    await db.flush()
+    return product
+
+
+async def _entry(db, tenant_id: int, items: list[dict], is_active: bool = True) -> StockEntry:
+    entry = StockEntry(
+        entry_date=date.today(),
+        entry_type=EntryType.LOCAL,
+        supplier_name="Fornecedor Rebuild",
+        entry_code=f"RB-{tenant_id}-{next(_codes)}",
+        is_active=is_active,
+        tenant_id=tenant_id,
+    )
+    db.add(entry)
+    await db.flush()
+    for item in items:
+        db.add(EntryItem(
+            entry_id=entry.id,
+            tenant_id=tenant_id,
+            quantity_received=item.get("received", item["remaining"]),
+            quantity_remaining=item["remaining"],
+            unit_cost=Decimal(item.get("cost", "10.00")),
+            product_id=item.get("product_id"),
+            variant_id=item.get("variant_id"),
+        ))
+    await db.flush()
+    return entry
+
+
+async def _quantities(db, tenant_id: int) -> dict:
+    rows = await db.execute(
+        select(Inventory.product_id, Inventory.variant_id, Inventory.quantity)
+        .where(Inventory.tenant_id == tenant_id)
+    )
+    return {(pid, vid): qty for pid, vid, qty in rows.all()}
+
+
+@pytest.mark.asyncio
+async def test_rebuild_upserts_and_reports_only_changed_rows(session_maker):
+    async with session_maker() as db:
+        fresh = await _product(db, TENANT, "Legging Nova")
+        stale = await _product(db, TENANT, "Top Divergente")
+        correct = await _product(db, TENANT, "Short Certo")
+        emptied = await _product(db, TENANT, "Meia Esgotada")
+        legacy = await _product(db, TENANT, "Regata Sem product_id")
+        variant = ProductVariant(product_id=legacy.id, tenant_id=TENANT, sku=f"RB-{legacy.id}",
+                                 size="M", price=Decimal("50.00"))
+        db.add(variant)
+        await db.flush()
+
+        await _entry(db, TENANT, [
+            {"product_id": fresh.id, "remaining": 4},
+            {"product_id": fresh.id, "remaining": 3},
+            {"product_id": stale.id, "remaining": 8},
+            {"product_id": correct.id, "remaining": 5},
+            {"variant_id": variant.id, "remaining": 6},
+        ])
+        await _entry(db, TENANT, [{"product_id": stale.id, "remaining": 100}], is_active=False)
+        db.add_all([
+            Inventory(tenant_id=TENANT, product_id=stale.id, quantity=2),
+            Inventory(tenant_id=TENANT, product_id=correct.id, quantity=5),
+            Inventory(tenant_id=TENANT, product_id=emptied.id, quantity=9),
+            # Linha por variante: fora do rebuild por produto
+            Inventory(tenant_id=TENANT, variant_id=variant.id, quantity=11),
+        ])
+        await db.commit()
+        loaded_stale = (await db.execute(
+            select(Inventory).where(Inventory.product_id == stale.id)
+        )).scalar_one()
+
+        deltas = await InventoryService(db).rebuild_all_from_fifo(tenant_id=TENANT)
+
+        by_product = {d["product_id"]: d for d in deltas}
+        assert set(by_product) == {fresh.id, stale.id, emptied.id, legacy.id}
+        assert by_product[fresh.id]["created"] and by_product[fresh.id]["inventory_quantity"] == 7
+        assert by_product[stale.id]["updated"] and by_product[stale.id]["previous_quantity"] == 2
+        assert by_product[emptied.id]["inventory_quantity"] == 0
+        assert by_product[legacy.id]["created"] and by_product[legacy.id]["fifo_sum"] == 6
+        # Objeto já carregado na sessão acompanha o UPDATE em massa
+        assert loaded_stale.quantity == 8
+
+        quantities = await _quantities(db, TENANT)
+        assert quantities[(correct.id, None)] == 5
+        assert quantities[(None, variant.id)] == 11
+
+        # Segunda execução: nada mudou, nenhum delta
+        assert await InventoryService(db).rebuild_all_from_fifo(tenant_id=TENANT) == []
+
+
+@pytest.mark.asyncio
+async def test_chunked_rebuild_matches_single_pass_and_reports_progress(session_maker):
+    tenants = (TENANT + 1, TENANT + 2)
+    async with session_maker() as db:
+        for tenant_id in tenants:
+            products = [await _product(db, tenant_id, f"Produto {n}") for n in range(5)]
+            await _entry(db, tenant_id, [
+                {"product_id": p.id, "remaining": n + 1} for n, p in enumerate(products)
+            ])
+        await db.commit()
+
+        service = InventoryService(db)
+        calls = []
+
+        async def progress(done, total):
+            calls.append((done, total))
+
+        single = await service.rebuild_all_from_fifo(tenant_id=tenants[0])
+        chunked = await service.rebuild_all_from_fifo(tenant_id=tenants[1], chunk_size=2,
+                                                      progress=progress)
+
+        assert [d["fifo_sum"] for d in single] == [d["fifo_sum"] for d in chunked] == [1, 2, 3, 4, 5]
+        assert calls == [(1, 3), (2, 3), (3, 3)]
+        assert await InventoryService(db).rebuild_all_from_fifo(tenant_id=TENANT + 3) == []
+
+
+@pytest.mark.asyncio
+async def test_reconcile_costs_sums_sale_sources_in_database(session_maker):
+    tenant_id = TENANT + 4
+    async with session_maker() as db:
+        product = await _product(db, tenant_id, "Legging Reconciliada")
+        await _entry(db, tenant_id, [
+            {"product_id": product.id, "received": 10, "remaining": 6, "cost": "20.00"},
+        ])
+        sources = [
+            {"entry_item_id": 1, "quantity_taken": 3, "unit_cost": 20.0},
+            {"entry_item_id": 1, "quantity_taken": 1, "unit_cost": 25.0},
+        ]
+        for payload in ({"sources": sources}, {"sources": "inválido"}, None):
+            db.add(SaleItem(sale_id=1, tenant_id=tenant_id, product_id=product.id, quantity=1,
+                            unit_price=Decimal("50.00"), subtotal=Decimal("50.00"),
+                            sale_sources=payload))
+        await db.commit()
+
+        result = await InventoryService(db).reconcile_costs(tenant_id=tenant_id)
+        scoped = await InventoryService(db).reconcile_costs(tenant_id=tenant_id, product_id=product.id + 1)
+
+    assert result["custo_recebido_total"] == 200.0
+    assert result["custo_vendido_entry_items"] == 80.0
+    assert result["custo_vendido_por_fontes"] == 85.0
+    assert result["unidades_vendidas_por_fontes"] == 4
+    assert result["diferenca"] == 5.0
+    assert scoped["custo_vendido_por_fontes"] == 0.0
@@ -0,0 +1,126 @@
+"""
+Testes da fila de jobs em background (dedup, prioridade, retry, cancelamento).
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.job_queue import JobQueue, job_task
+from app.models.background_job import BackgroundJob, JobStatus
+
+TENANT = 951
+
+calls = []
+gate = {}
+
+
+@job_task("test.record")
+async def record(ctx, label):
+    calls.append(label)
+    await ctx.progress(50, f"meio de {label}")
+    return {"label": label, "attempt": ctx.attempt}
+
+
+@job_task("test.flaky", max_attempts=2)
+async def flaky(ctx):
+    if ctx.attempt == 1:
+        raise ConnectionError("provider fora")
+    return {"ok": True}
+
+
+@job_task("test.wait")
+async def wait_for_gate(ctx):
+    gate["started"].set()
+    await gate["release"].wait()
+    await ctx.progress(90)
+    return {"finished": True}
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 0)
+    calls.clear()
+
+
+@pytest.mark.asyncio
+async def test_dedup_key_and_priority_order(session_maker):
+    queue = JobQueue(session_factory=session_maker, holder="w1", backend="database")
+    async with session_maker() as db:
+        low = await queue.enqueue(db, "test.record", {"label": "baixa"}, tenant_id=TENANT,
+                                  dedup_key="rec:baixa")
+        again = await queue.enqueue(db, "test.record", {"label": "baixa"}, tenant_id=TENANT,
+                                    dedup_key="rec:baixa")
+        high = await queue.enqueue(db, "test.record", {"label": "alta"}, tenant_id=TENANT, priority=5)
+        with pytest.raises(ValueError):
+            await queue.enqueue(db, "nao.existe", tenant_id=TENANT)
+
+    assert again.id == low.id
+    assert await queue.run_pending() == 2
+    assert calls == ["alta", "baixa"]
+
+    async with session_maker() as db:
+        job = await queue.get(db, low.id, TENANT)
+        assert job.status == JobStatus.SUCCEEDED
+        assert (job.progress, job.progress_message) == (100, "meio de baixa")
+        assert job.result == {"label": "baixa", "attempt": 1}
+        assert await queue.get(db, high.id, TENANT + 1) is None
+
+        # Job terminado libera a chave de dedup
+        fresh = await queue.enqueue(db, "test.record", {"label": "baixa"}, tenant_id=TENANT,
+                                    dedup_key="rec:baixa")
+        assert fresh.id != low.id
+    await queue.run_pending()
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_then_gives_up(session_maker):
+    queue = JobQueue(session_factory=session_maker, holder="w1", backend="database")
+    async with session_maker() as db:
+        job = await queue.enqueue(db, "test.flaky", tenant_id=TENANT)
+        doomed = await queue.enqueue(db, "test.flaky", tenant_id=TENANT, max_attempts=1)
+
+    await queue.run_pending()
+
+    async with session_maker() as db:
+        job = await db.get(BackgroundJob, job.id)
+        doomed = await db.get(BackgroundJob, doomed.id)
+    assert (job.status, job.attempts, job.result) == (JobStatus.SUCCEEDED, 2, {"ok": True})
+    assert (doomed.status, doomed.attempts, doomed.error) == (JobStatus.FAILED, 1, "provider fora")
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_jobs_and_cancel_stops_running_job(session_maker):
+    gate.update(started=asyncio.Event(), release=asyncio.Event())
+    worker = JobQueue(session_factory=session_maker, holder="w1", backend="database")
+    other = JobQueue(session_factory=session_maker, holder="w2", backend="database")
+    worker.start()
+    try:
+        async with session_maker() as db:
+            job = await worker.enqueue(db, "test.wait", tenant_id=TENANT)
+        await asyncio.wait_for(gate["started"].wait(), timeout=5)
+
+        # Já reivindicado por w1: outro worker não pega
+        assert await other.claim() == []
+
+        async with session_maker() as db:
+            cancelled = await worker.cancel(db, job.id, TENANT)
+            assert cancelled.status == JobStatus.CANCELLED
+        gate["release"].set()
+
+        for _ in range(50):
+            if not worker._running:
+                break
+            await asyncio.sleep(0.02)
+        async with session_maker() as db:
+            job = await db.get(BackgroundJob, job.id)
+        assert job.status == JobStatus.CANCELLED
+        assert job.result is None
+    finally:
+        await worker.shutdown()
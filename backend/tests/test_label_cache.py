@@ -0,0 +1,90 @@
+"""
+Testes do cache de render de etiquetas (LabelService / LabelRenderCache).
+"""
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.models.label_printer import PrinterProtocol
+from app.services.label_service import EscPosGenerator, LabelService
+
+
+def _product(name="Legging Cache"):
+    return SimpleNamespace(id=10, name=name)
+
+
+def _variant(price="89.90", sku="LEG-CACHE-M"):
+    return SimpleNamespace(id=20, product_id=10, sku=sku, size="M", color="Preto", price=Decimal(price))
+
+
+def _printer(protocol=PrinterProtocol.ZPL, dpi=203):
+    return SimpleNamespace(protocol=protocol, label_width_mm=55, label_height_mm=65, dpi=dpi)
+
+
+def test_reprint_is_served_from_cache():
+    """Mesma peça e impressora: segunda geração é lookup, saída idêntica."""
+    service = LabelService(cache_size=16)
+    first, hit1 = service.render_back_label(_product(), _variant(), printer=_printer())
+    second, hit2 = service.render_back_label(_product(), _variant(), printer=_printer())
+
+    assert (hit1, hit2) == (False, True)
+    assert first is second
+    assert service.generate(_product(), _variant(), printer=_printer()) is first
+
+
+def test_content_change_misses_cache():
+    """Preço, SKU, nome ou DPI diferentes geram outra etiqueta."""
+    service = LabelService(cache_size=16)
+    base, _ = service.render_back_label(_product(), _variant(), printer=_printer())
+
+    for product, variant, printer in [
+        (_product(), _variant(price="79.90"), _printer()),
+        (_product(), _variant(sku="LEG-CACHE-M2"), _printer()),
+        (_product(name="Legging Nova"), _variant(), _printer()),
+        (_product(), _variant(), _printer(dpi=300)),
+    ]:
+        label, hit = service.render_back_label(product, variant, printer=printer)
+        assert hit is False
+        assert label != base
+
+
+def test_escpos_qr_encoded_once(monkeypatch):
+    """ESC/POS: o bitmap do QR só é codificado no primeiro render."""
+    calls = []
+    original = EscPosGenerator._qr
+
+    def counting_qr(self, data):
+        calls.append(data)
+        return original(self, data)
+
+    monkeypatch.setattr(EscPosGenerator, "_qr", counting_qr)
+    service = LabelService(cache_size=16)
+    printer = _printer(PrinterProtocol.ESC_POS)
+
+    for _ in range(3):
+        label = service.generate(_product(), _variant(), quantity=2, printer=printer)
+
+    assert isinstance(label, bytes)
+    assert len(calls) == 1
+
+
+def test_lru_eviction_and_invalidation():
+    """LRU respeita o limite; invalidate_variant/product limpam os índices."""
+    service = LabelService(cache_size=2)
+    printer = _printer()
+
+    service.generate(_product(), _variant(price="1"), printer=printer)
+    service.generate(_product(), _variant(price="2"), printer=printer)
+    service.generate(_product(), _variant(price="1"), printer=printer)  # toca "1"
+    service.generate(_product(), _variant(price="3"), printer=printer)  # expulsa "2"
+
+    assert len(service.render_cache) == 2
+    assert service.render_back_label(_product(), _variant(price="1"), printer=printer)[1] is True
+    assert service.render_back_label(_product(), _variant(price="2"), printer=printer)[1] is False
+
+    service.generate_front_label("Loja", _product(), _variant(), printer=printer)
+    service.invalidate_variant(20)
+    assert len(service.render_cache) == 0
+
+    service.generate(_product(), _variant(), printer=printer)
+    service.invalidate_product(10)
+    assert len(service.render_cache) == 0
@@ -0,0 +1,56 @@
+"""
+Testes do bcrypt fora do event loop (pool dedicado de hashing).
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.core import security
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
+
+
+@pytest.mark.asyncio
+async def test_async_helpers_match_sync_versions():
+    hashed = await get_password_hash_async("segredo-123")
+
+    assert verify_password("segredo-123", hashed)
+    assert await verify_password_async("segredo-123", hashed) is True
+    assert await verify_password_async("errada", hashed) is False
+
+
+@pytest.mark.asyncio
+async def test_login_storm_runs_on_hash_pool_and_loop_keeps_progressing(monkeypatch):
+    """Logins concorrentes rodam no pool dedicado e o loop continua avançando enquanto isso."""
+    hashed = get_password_hash("segredo-123")
+    threads = []
+
+    def recording_verify(plain, hashed_password):
+        threads.append(threading.current_thread().name)
+        return verify_password(plain, hashed_password)
+
+    monkeypatch.setattr(security, "verify_password", recording_verify)
+    pings = 0
+
+    async def ping(done: asyncio.Event):
+        nonlocal pings
+        while not done.is_set():
+            await asyncio.sleep(0.005)
+            pings += 1
+
+    done = asyncio.Event()
+    beat = asyncio.create_task(ping(done))
+    results = await asyncio.gather(*(verify_password_async("segredo-123", hashed) for _ in range(4)))
+    done.set()
+    await beat
+
+    assert all(results)
+    assert len(threads) == 4
+    assert all(name.startswith("password-hash") for name in threads)
+    # bcrypt no loop bloquearia o ping até o fim do gather; fora dele o ping avança várias vezes
+    assert pings > 3
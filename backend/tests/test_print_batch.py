@@ -0,0 +1,350 @@
+"""
+Testes de impressão em lote e da fila assíncrona contra uma impressora TCP
+simulada (socket local).
+"""
+import asyncio
+import socket
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.label_printer import ConnectionType, LabelPrinter, PrinterProtocol
+from app.models.print_job import PrintJob, PrintJobStatus
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.schemas.label_printer import PrintJobBatchCreate, PrintJobBatchItem, PrintJobCreate
+from app.services.print_job_service import print_job_service
+from app.services.print_queue import PrintQueue
+from app.services.printer_service import PrinterService, join_label_data, printer_service
+
+
+class FakeTcpPrinter:
+    """Servidor TCP local que registra conexões e bytes recebidos."""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.connections = 0
+        self.closed = 0
+        self.received = bytearray()
+        self._stop = False
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        self.sock.settimeout(0.2)
+        while not self._stop:
+            try:
+                conn, _ = self.sock.accept()
+            except (socket.timeout, OSError):
+                continue
+            self.connections += 1
+            threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+
+    def _read(self, conn):
+        conn.settimeout(0.2)
+        with conn:
+            while not self._stop:
+                try:
+                    chunk = conn.recv(65536)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    return
+                if not chunk:
+                    self.closed += 1
+                    return
+                self.received += chunk
+
+    def wait_for(self, size: int, timeout: float = 2.0) -> None:
+        deadline = time.monotonic() + timeout
+        while len(self.received) < size and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        self._stop = True
+        self.sock.close()
+
+
+@pytest.fixture
+def fake_printer():
+    server = FakeTcpPrinter()
+    yield server
+    printer_service.close_connections()
+    server.close()
+
+
+def _ethernet_printer(port: int, tenant_id: int = 1) -> LabelPrinter:
+    return LabelPrinter(
+        name="Fake L42",
+        connection_type=ConnectionType.ETHERNET,
+        protocol=PrinterProtocol.ZPL,
+        ip_address="127.0.0.1",
+        port=port,
+        label_width_mm=55,
+        label_height_mm=65,
+        dpi=203,
+        tenant_id=tenant_id,
+    )
+
+
+def test_join_label_data_mixes_text_and_binary():
+    """ZPL concatena como texto; ESC/POS força stream binário."""
+    assert join_label_data(["^XA^XZ", "^XA^XZ"]) == "^XA^XZ\n^XA^XZ"
+    assert join_label_data([b"\x1b@", "A"]) == b"\x1b@A"
+
+
+@pytest.mark.asyncio
+async def test_print_batch_reuses_single_connection(fake_printer):
+    """Lotes consecutivos usam a mesma conexão TCP persistente."""
+    service = PrinterService()
+    printer = _ethernet_printer(fake_printer.port)
+
+    ok1, _ = await service.print_batch(printer, ["^XA^FDA^FS^XZ", "^XA^FDB^FS^XZ"])
+    ok2, _ = await service.print_label(printer, "^XA^FDC^FS^XZ")
+    expected = "^XA^FDA^FS^XZ\n^XA^FDB^FS^XZ^XA^FDC^FS^XZ".encode()
+    fake_printer.wait_for(len(expected))
+    service.close_connections()
+
+    assert ok1 and ok2
+    assert fake_printer.connections == 1
+    assert bytes(fake_printer.received) == expected
+
+
+@pytest.mark.asyncio
+async def test_idle_connection_is_closed_without_another_send(fake_printer):
+    """Após a janela ociosa o socket é fechado e a impressora fica livre para outros clientes."""
+    service = PrinterService(tcp_idle_seconds=0.2)
+    printer = _ethernet_printer(fake_printer.port)
+
+    ok, _ = await service.print_batch(printer, ["^XA^FDA^FS^XZ"])
+    await asyncio.sleep(0.05)
+    assert ok and fake_printer.closed == 0
+
+    deadline = time.monotonic() + 2
+    while fake_printer.closed == 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.02)
+    assert fake_printer.closed == 1
+    assert service._tcp_pool._conns == {}
+
+    # Próximo envio abre uma conexão nova
+    ok, _ = await service.print_label(printer, "^XA^FDB^FS^XZ")
+    fake_printer.wait_for(len(b"^XA^FDA^FS^XZ^XA^FDB^FS^XZ"))
+    service.close_connections()
+    assert ok and fake_printer.connections == 2
+
+
+@pytest.mark.asyncio
+async def test_print_batch_reports_offline_printer():
+    """Impressora inacessível retorna erro sem levantar exceção."""
+    service = PrinterService()
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    success, message = await service.print_batch(_ethernet_printer(port), ["^XA^XZ"])
+
+    assert success is False
+    assert message
+
+
+@pytest.mark.asyncio
+async def test_create_batch_and_print_sends_one_stream(async_session: AsyncSession, fake_printer):
+    """Lote de variantes: um envio, um job por variante, todos DONE."""
+    printer = _ethernet_printer(fake_printer.port)
+    product = Product(name="Top Batch", brand="Acme", category_id=1, tenant_id=1)
+    async_session.add_all([printer, product])
+    await async_session.flush()
+
+    variants = [
+        ProductVariant(product_id=product.id, sku=f"TOP-BATCH-{i}", size=size, color="Preto",
+                       price=Decimal("59.90"), tenant_id=1)
+        for i, size in enumerate(["P", "M", "G"])
+    ]
+    async_session.add_all(variants)
+    await async_session.flush()
+
+    data = PrintJobBatchCreate(
+        printer_id=printer.id,
+        items=[PrintJobBatchItem(variant_id=v.id, quantity=2) for v in variants]
+        + [PrintJobBatchItem(variant_id=999999, quantity=1)],
+    )
+
+    jobs = await print_job_service.create_batch_and_print(async_session, data, tenant_id=1)
+
+    fake_printer.wait_for(sum(len(j.zpl_content) for j in jobs))
+    assert fake_printer.connections == 1
+    assert fake_printer.received.count(b"^XA") == 3
+    assert [j.variant_id for j in jobs] == [v.id for v in variants]
+    assert all(j.status == PrintJobStatus.DONE and j.id for j in jobs)
+    assert all(j.product_name == "Top Batch" for j in jobs)
+
+    count = await async_session.scalar(
+        select(func.count(PrintJob.id)).where(PrintJob.printer_id == printer.id)
+    )
+    assert count == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_and_preview_ignore_other_tenants_variants(async_session: AsyncSession, fake_printer):
+    """Variantes de outro tenant não são impressas nem pré-visualizadas."""
+    printer = _ethernet_printer(fake_printer.port)
+    own = Product(name="Top Proprio", brand="Acme", category_id=1, tenant_id=1)
+    foreign = Product(name="Top Alheio", brand="Acme", category_id=1, tenant_id=2)
+    async_session.add_all([printer, own, foreign])
+    await async_session.flush()
+    own_variant = ProductVariant(product_id=own.id, sku="TEN-OWN", size="M", price=Decimal("10"), tenant_id=1)
+    foreign_variant = ProductVariant(product_id=foreign.id, sku="TEN-FOREIGN", size="M",
+                                     price=Decimal("10"), tenant_id=2)
+    async_session.add_all([own_variant, foreign_variant])
+    await async_session.flush()
+
+    data = PrintJobBatchCreate(
+        printer_id=printer.id,
+        items=[PrintJobBatchItem(variant_id=own_variant.id), PrintJobBatchItem(variant_id=foreign_variant.id)],
+        queued=True,
+    )
+    jobs = await print_job_service.enqueue_batch(async_session, data, tenant_id=1)
+    assert [j.variant_id for j in jobs] == [own_variant.id]
+
+    with pytest.raises(ValueError):
+        await print_job_service.get_zpl_preview(
+            async_session, foreign_variant.id, foreign.id, None, tenant_id=1
+        )
+
+
+def _closed_port() -> int:
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    return port
+
+
+async def _seed_queue(session_maker, port: int, sizes: list[str]):
+    """Cria impressora, produto e variantes já commitados (visíveis ao worker)."""
+    async with session_maker() as db:
+        printer = _ethernet_printer(port)
+        product = Product(name=f"Queue {port}", brand="Acme", category_id=1, tenant_id=1)
+        db.add_all([printer, product])
+        await db.flush()
+        variants = [
+            ProductVariant(product_id=product.id, sku=f"Q{port}-{size}", size=size, color="Azul",
+                           price=Decimal("30"), tenant_id=1)
+            for size in sizes
+        ]
+        db.add_all(variants)
+        await db.commit()
+        return printer.id, [v.id for v in variants]
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_queued_jobs_are_coalesced_and_printed_in_order(session_maker, fake_printer):
+    """Jobs enfileirados retornam QUEUED e o worker envia todos num único stream."""
+    queue = PrintQueue(session_factory=session_maker)
+    queue.IDLE_EXIT_SECONDS = 0.1
+    printer_id, variant_ids = await _seed_queue(session_maker, fake_printer.port, ["P", "M", "G"])
+
+    async with session_maker() as db:
+        single = await print_job_service.enqueue(
+            db, PrintJobCreate(printer_id=printer_id, variant_id=variant_ids[0], queued=True), tenant_id=1
+        )
+        batch = await print_job_service.enqueue_batch(
+            db,
+            PrintJobBatchCreate(
+                printer_id=printer_id,
+                items=[PrintJobBatchItem(variant_id=v) for v in variant_ids[1:]],
+                queued=True,
+            ),
+            tenant_id=1,
+        )
+        await db.commit()
+    assert single.status == PrintJobStatus.QUEUED
+    assert all(j.status == PrintJobStatus.QUEUED for j in batch)
+
+    queue.notify(printer_id)
+    await queue.wait_idle(printer_id)
+    fake_printer.wait_for(1)
+
+    async with session_maker() as db:
+        jobs = (await db.execute(
+            select(PrintJob).where(PrintJob.printer_id == printer_id).order_by(PrintJob.id)
+        )).scalars().all()
+
+    assert [j.status for j in jobs] == [PrintJobStatus.DONE] * 3
+    assert all(j.attempts == 1 for j in jobs)
+    assert fake_printer.connections == 1
+    skus = [f"Q{fake_printer.port}-{s}".encode() for s in ("P", "M", "G")]
+    positions = [fake_printer.received.find(sku) for sku in skus]
+    assert -1 not in positions and positions == sorted(positions)
+
+
+@pytest.mark.asyncio
+async def test_offline_printer_retries_with_backoff_then_errors(session_maker):
+    """Impressora offline: job volta para a fila com backoff e vira ERROR no limite."""
+    queue = PrintQueue(session_factory=session_maker)
+    queue.IDLE_EXIT_SECONDS = 0.1
+    queue.BACKOFF_BASE_SECONDS = 0.05
+    queue.MAX_ATTEMPTS = 3
+    printer_id, variant_ids = await _seed_queue(session_maker, _closed_port(), ["U"])
+
+    async with session_maker() as db:
+        job = await print_job_service.enqueue(
+            db, PrintJobCreate(printer_id=printer_id, variant_id=variant_ids[0], queued=True), tenant_id=1
+        )
+        await db.commit()
+
+    updates = asyncio.create_task(queue.wait_for_update(job.id, timeout=5))
+    await asyncio.sleep(0)
+    queue.notify(printer_id)
+    assert await updates is True
+    await queue.wait_idle(printer_id)
+
+    async with session_maker() as db:
+        refreshed = await db.get(PrintJob, job.id)
+
+    assert refreshed.status == PrintJobStatus.ERROR
+    assert refreshed.attempts == 3
+    assert refreshed.error_message
+
+
+@pytest.mark.asyncio
+async def test_send_exception_marks_attempt_instead_of_leaving_job_printing(session_maker, monkeypatch):
+    """Exceção no render/envio após o claim segue o fluxo de retry/ERROR (não fica PRINTING)."""
+    queue = PrintQueue(session_factory=session_maker)
+    queue.IDLE_EXIT_SECONDS = 0.1
+    queue.BACKOFF_BASE_SECONDS = 0.05
+    queue.MAX_ATTEMPTS = 2
+    printer_id, variant_ids = await _seed_queue(session_maker, _closed_port(), ["X"])
+
+    async with session_maker() as db:
+        job = await print_job_service.enqueue(
+            db, PrintJobCreate(printer_id=printer_id, variant_id=variant_ids[0], queued=True), tenant_id=1
+        )
+        await db.commit()
+
+    async def boom(printer, chunks):
+        raise RuntimeError("driver quebrou")
+
+    monkeypatch.setattr(printer_service, "print_batch", boom)
+    queue.notify(printer_id)
+    await queue.wait_idle(printer_id)
+
+    async with session_maker() as db:
+        refreshed = await db.get(PrintJob, job.id)
+
+    assert refreshed.status == PrintJobStatus.ERROR
+    assert refreshed.attempts == 2
+    assert "driver quebrou" in refreshed.error_message
@@ -0,0 +1,123 @@
+"""
+Testes da detecção de duplicados por índice de fingerprints (AI Scan).
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.entry_item import EntryItem
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.stock_entry import EntryType, StockEntry
+from app.services.ai_scan_service import AIScanService
+from app.services.product_fingerprint_service import fingerprint_cache, name_ngrams
+
+TENANT = 921
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture(autouse=True)
+def clear_index():
+    fingerprint_cache.clear()
+    yield
+    fingerprint_cache.clear()
+
+
+async def _product(db, name, brand, variants, category_id=1, tenant_id=TENANT):
+    product = Product(name=name, brand=brand, category_id=category_id, tenant_id=tenant_id)
+    db.add(product)
+    await db.flush()
+    # Estoque via lotes FIFO: o ledger (variant_stock) é atualizado no flush
+    entry = StockEntry(entry_code=f"FP-E-{product.id}", entry_date=date.today(),
+                       entry_type=EntryType.LOCAL, supplier_name="Fornecedor", tenant_id=tenant_id)
+    db.add(entry)
+    await db.flush()
+    for i, (color, size, qty) in enumerate(variants):
+        variant = ProductVariant(
+            product_id=product.id, sku=f"FP-{product.id}-{i}", color=color, size=size,
+            price=Decimal("99.90"), cost_price=Decimal("40.00"), tenant_id=tenant_id,
+        )
+        db.add(variant)
+        await db.flush()
+        if qty:
+            db.add(EntryItem(entry_id=entry.id, variant_id=variant.id, quantity_received=qty,
+                             quantity_remaining=qty, unit_cost=Decimal("40"), tenant_id=tenant_id))
+    return product
+
+
+def test_name_ngrams():
+    assert name_ngrams("top") == {" to", "top", "op "}
+    assert name_ngrams("") == frozenset()
+
+
+@pytest.mark.asyncio
+async def test_ranks_candidates_with_reasons_and_uses_one_query_when_warm(session_maker, test_engine):
+    async with session_maker() as db:
+        exact = await _product(db, "Legging Fusion", "Alto Giro", [("Preto", "M", 3), ("Preto", "G", 2)])
+        same_color = await _product(db, "Top Nadador", "Alto Giro", [("Preto", "P", 1)])
+        same_category = await _product(db, "Bermuda Ciclista", "Outra", [("Preto", "M", 0)])
+        by_name = await _product(db, "Legging Fusion Cintura Alta", "Live", [("Preto", "M", 1)], category_id=2)
+        await _product(db, "Luva de Treino", "Outra", [("Rosa", "U", 1)], category_id=2)
+        await _product(db, "Legging Fusion", "Alto Giro", [("Preto", "M", 9)], tenant_id=TENANT + 1)
+        await db.commit()
+
+    async with session_maker() as db:
+        matches = await AIScanService(db)._find_duplicates(
+            "Legging Fusion", "ALTO GIRO", "preto", "m", None, TENANT, category_id=1,
+        )
+
+    assert [m.product_id for m in matches] == [exact.id, same_color.id, same_category.id, by_name.id]
+    assert matches[0].similarity_score == 0.95
+    assert matches[0].reason == "Mesma marca, cor e tamanho"
+    assert matches[0].current_stock == 5
+    assert matches[0].cost_price == 40.0
+    assert matches[1].reason == "Mesma marca e cor"
+    assert matches[2].reason == "Mesma categoria, cor e tamanho"
+    assert matches[3].reason.startswith("Nome similar")
+
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        async with session_maker() as db:
+            again = await AIScanService(db)._find_duplicates(
+                "Legging Fusion", "Alto Giro", "Preto", "M", None, TENANT, category_id=1,
+            )
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", count)
+
+    assert [m.product_id for m in again] == [m.product_id for m in matches]
+    assert len(statements) == 1
+    assert fingerprint_cache.builds == 1
+
+
+@pytest.mark.asyncio
+async def test_index_rebuilds_after_catalog_change(session_maker):
+    async with session_maker() as db:
+        await _product(db, "Regata Dry", "Marca Rebuild", [("Branco", "P", 1)])
+        await db.commit()
+
+    async with session_maker() as db:
+        service = AIScanService(db)
+        assert await service._find_duplicates("Regata Dry", "Marca Rebuild", "Verde", "GG", None, TENANT) != []
+        first = await service._find_duplicates("Short Saia", "Marca Rebuild", "Verde", "GG", None, TENANT)
+        assert all(m.product_name != "Short Saia" for m in first)
+
+        new = await _product(db, "Short Saia", "Marca Rebuild", [("Verde", "GG", 4)])
+        await db.commit()
+
+        matches = await service._find_duplicates("Short Saia", "Marca Rebuild", "Verde", "GG", None, TENANT)
+
+    assert matches[0].product_id == new.id
+    assert matches[0].current_stock == 4
+    assert fingerprint_cache.builds == 2
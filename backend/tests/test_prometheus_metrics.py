@@ -0,0 +1,122 @@
+"""
+Testes das métricas Prometheus (registry em memória, providers de pagamento e GET /metrics).
+"""
+import math
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram, Registry, timed
+from app.main import app
+from app.middleware.instrumentation import HTTP_REQUEST_DURATION, RequestInstrumentationMiddleware
+from app.services.payment_providers.base import PROVIDER_CALL_DURATION, BasePixProvider
+
+
+def test_registry_renders_exposition_format():
+    registry = Registry()
+    sales = Counter("sales_total", "Vendas", ["outcome"], registry=registry)
+    waiters = Gauge("waiters", "Conexões", registry=registry)
+    broken = Gauge("broken", "Coletor com erro", registry=registry)
+    latency = Histogram("latency_seconds", "Latência", ["route"], buckets=(0.1, 1), registry=registry)
+
+    sales.inc(outcome="success")
+    sales.inc(2, outcome="error")
+    waiters.set_function(lambda: 3)
+    broken.set_function(lambda: 1 / 0)
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, route='/a"b')
+    with pytest.raises(ValueError):
+        sales.inc(route="/x")
+    with pytest.raises(ValueError):
+        Counter("sales_total", "Duplicada", registry=registry)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE sales_total counter" in lines
+    assert 'sales_total{outcome="error"} 2' in lines
+    assert "waiters 3" in lines
+    assert "broken NaN" in lines
+    assert 'latency_seconds_bucket{route="/a\\"b",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a\\"b",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a\\"b"} 3' in lines
+    assert math.isclose(latency.sum(route='/a"b'), 5.55)
+
+
+@pytest.mark.asyncio
+async def test_timed_and_payment_provider_calls_record_outcome():
+    histogram = Histogram("unit_op_seconds", "Operação", ["outcome"], registry=None)
+
+    @timed(histogram)
+    async def operation(fail: bool):
+        if fail:
+            raise RuntimeError("falhou")
+        return "ok"
+
+    assert await operation(False) == "ok"
+    with pytest.raises(RuntimeError):
+        await operation(True)
+    assert histogram.count(outcome="success") == histogram.count(outcome="error") == 1
+
+    class FakePixProvider(BasePixProvider):
+        provider_name = "fake_pix"
+
+        async def create_pix_payment(self, db, sale_id, tenant_id, payer_email=None, mp_token=None):
+            return {"sale_id": sale_id}
+
+        async def get_pix_status(self, db, payment_id, tenant_id):
+            raise ConnectionError("provider fora")
+
+        async def refund_pix(self, db, payment_id, tenant_id):
+            return {}
+
+    provider = FakePixProvider()
+    assert await provider.create_pix_payment(None, 7, 1) == {"sale_id": 7}
+    with pytest.raises(ConnectionError):
+        await provider.get_pix_status(None, "p1", 1)
+
+    labels = {"provider": "fake_pix"}
+    assert PROVIDER_CALL_DURATION.count(operation="create_pix_payment", outcome="success", **labels) == 1
+    assert PROVIDER_CALL_DURATION.count(operation="get_pix_status", outcome="error", **labels) == 1
+
+
+@pytest.mark.asyncio
+async def test_http_metrics_use_route_template_and_endpoint_is_exposed(monkeypatch):
+    mini = FastAPI()
+    mini.add_middleware(RequestInstrumentationMiddleware)
+
+    @mini.get("/metrics-test/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=mini), base_url="http://test") as client:
+        for item_id in (1, 2):
+            await client.get(f"/metrics-test/items/{item_id}")
+        await client.get("/metrics-test/missing")
+
+    route = "/metrics-test/items/{item_id}"
+    assert HTTP_REQUEST_DURATION.count(method="GET", route=route, status=200) == 2
+    assert HTTP_REQUEST_DURATION.count(method="GET", route="unmatched", status=404) >= 1
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # Desligado por padrão
+        assert (await client.get("/metrics")).status_code == 404
+        monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+        # Produção sem token: não expõe
+        monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+        assert (await client.get("/metrics")).status_code == 404
+
+        monkeypatch.setattr(settings, "ENVIRONMENT", "development")
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert f'http_request_duration_seconds_count{{method="GET",route="{route}",status="200"}} 2' in response.text
+        assert "payment_sse_waiters 0" in response.text
+
+        monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "segredo")
+        assert (await client.get("/metrics")).status_code == 401
+        authorized = await client.get("/metrics", headers={"Authorization": "Bearer segredo"})
+        assert authorized.status_code == 200
@@ -0,0 +1,150 @@
+"""
+Testes do cache HTTP da vitrine pública (ETag/304 por versão do catálogo).
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.requests import Request
+
+from app.api.v1.endpoints.public_catalog import get_public_product
+from app.core.public_cache import PublicResponseCache, cached_public_response
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.services.catalog_projection_service import CatalogProjectionService
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _request(path: str, query: str = "", headers: dict | None = None) -> Request:
+    raw = [(b"host", b"testserver")] + [
+        (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()
+    ]
+    return Request({
+        "type": "http", "method": "GET", "path": path,
+        "query_string": query.encode(), "headers": raw,
+    })
+
+
+async def _version(session_maker, tenant_id: int = 1) -> int:
+    async with session_maker() as db:
+        version, _ = await CatalogProjectionService(db).get_version(tenant_id)
+    return version
+
+
+@pytest.mark.asyncio
+async def test_commit_bumps_catalog_version_only_when_catalog_changes(session_maker):
+    """Mudanças em produtos incrementam a versão do tenant; rollback não."""
+    before = await _version(session_maker)
+
+    async with session_maker() as db:
+        product = Product(name="Regata Versao", brand="Acme", category_id=1, tenant_id=1, is_catalog=True)
+        db.add(product)
+        await db.flush()
+        db.add(ProductVariant(product_id=product.id, sku="VER-P", size="P", price=Decimal("20"), tenant_id=1))
+        await db.commit()
+    after_create = await _version(session_maker)
+    assert after_create == before + 1
+
+    async with session_maker() as db:
+        (await db.get(Product, product.id)).name = "Nunca Commitado"
+        await db.flush()
+        await db.rollback()
+    assert await _version(session_maker) == after_create
+
+    async with session_maker() as db:
+        (await db.get(Product, product.id)).name = "Regata Versao 2"
+        await db.commit()
+    assert await _version(session_maker) == after_create + 1
+
+
+@pytest.mark.asyncio
+async def test_version_bump_rides_on_the_committing_connection(session_maker, test_engine):
+    """O incremento vai na transação do commit: nenhuma conexão extra por venda/entrada."""
+    before = await _version(session_maker)
+    checkouts = []
+
+    def count(*args):
+        checkouts.append(args)
+
+    async with session_maker() as db:
+        product = Product(name="Regata Mesma Transacao", brand="Acme", category_id=1, tenant_id=1, is_catalog=True)
+        db.add(product)
+        await db.flush()
+        event.listen(test_engine.sync_engine.pool, "checkout", count)
+        try:
+            await db.commit()
+        finally:
+            event.remove(test_engine.sync_engine.pool, "checkout", count)
+
+    assert checkouts == []
+    assert await _version(session_maker) == before + 1
+
+
+@pytest.mark.asyncio
+async def test_etag_revalidation_and_invalidation(session_maker):
+    """304 com ETag atual; depois de alterar o produto o ETag muda."""
+    async with session_maker() as db:
+        product = Product(name="Short Etag", brand="Acme", category_id=1, tenant_id=1, is_catalog=True)
+        db.add(product)
+        await db.flush()
+        db.add(ProductVariant(product_id=product.id, sku="ETAG-M", size="M", price=Decimal("35"), tenant_id=1))
+        await db.commit()
+
+    path = f"/api/v1/public/products/{product.id}"
+
+    async def fetch(headers=None):
+        async with session_maker() as db:
+            return await get_public_product(product.id, _request(path, headers=headers), None, "large", db)
+
+    first = await fetch()
+    assert first.status_code == 200
+    assert b"Short Etag" in first.body
+    assert "stale-while-revalidate" in first.headers["cache-control"]
+    etag = first.headers["etag"]
+
+    not_modified = await fetch({"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+
+    since = await fetch({"If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
+
+    async with session_maker() as db:
+        (await db.get(Product, product.id)).name = "Short Etag Novo"
+        await db.commit()
+
+    changed = await fetch({"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert b"Short Etag Novo" in changed.body
+
+
+@pytest.mark.asyncio
+async def test_response_cache_skips_build_and_does_not_cache_errors(session_maker):
+    """Mesma versão + mesma URL: build roda uma vez; exceções não são cacheadas."""
+    cache = PublicResponseCache(max_entries=10)
+    calls = []
+
+    async def build():
+        calls.append(1)
+        return [{"id": 1}]
+
+    async with session_maker() as db:
+        for query in ("a=1&b=2", "b=2&a=1"):
+            response = await cached_public_response(
+                _request("/api/v1/public/x", query), db, 1, build, cache=cache
+            )
+            assert response.body == b'[{"id":1}]'
+        assert len(calls) == 1
+
+        async def failing():
+            raise ValueError("404")
+
+        with pytest.raises(ValueError):
+            await cached_public_response(_request("/api/v1/public/y"), db, 1, failing, cache=cache)
+    assert len(cache) == 1
@@ -0,0 +1,104 @@
+"""
+Testes da instrumentação por requisição (Server-Timing, chamadas externas e detector de N+1).
+"""
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.instrumentation import install_instrumentation, track_external, track_queries
+from app.middleware.instrumentation import RequestInstrumentationMiddleware
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    install_instrumentation()
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_middleware_returns_server_timing_with_query_count(session_maker, monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", True)
+    app = FastAPI()
+    app.add_middleware(RequestInstrumentationMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        async with session_maker() as db:
+            for _ in range(3):
+                await db.execute(text("SELECT 1"))
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/ping")
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert 'desc="3 queries"' in timing
+    assert "total;dur=" in timing
+
+
+@pytest.mark.asyncio
+async def test_server_timing_is_off_by_default():
+    app = FastAPI()
+    app.add_middleware(RequestInstrumentationMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/ping")
+
+    assert "Server-Timing" not in response.headers
+    assert "X-Request-ID" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_external_calls_are_timed_per_host():
+    install_instrumentation()
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+
+    with track_queries() as metrics:
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("https://api.mercadopago.com/v1/payments")
+            await client.get("https://api.mercadopago.com/v1/payments")
+            await client.get("https://exp.host/--/api/v2/push/send")
+        async with track_external("ai-gemini"):
+            pass
+
+    summary = metrics.summary()
+    assert summary["external"]["api.mercadopago.com"]["calls"] == 2
+    assert summary["external"]["exp.host"]["calls"] == 1
+    assert summary["external"]["ai-gemini"]["calls"] == 1
+    assert "ext-api-mercadopago-com;dur=" in metrics.server_timing()
+
+    # Fora de um bloco instrumentado nada é contado
+    async with httpx.AsyncClient(transport=transport) as client:
+        await client.get("https://exp.host/")
+    assert summary["external"]["exp.host"]["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_n_plus_one_detector_flags_repeated_statements(session_maker):
+    async with session_maker() as db:
+        with track_queries(n_plus_one_threshold=5) as metrics:
+            for product_id in range(6):
+                await db.execute(text("SELECT :pid AS id"), {"pid": product_id})
+            await db.execute(text("SELECT 2"))
+
+    repeated = metrics.repeated_statements()
+    assert metrics.db_queries == 7
+    assert repeated == [("SELECT ? AS id", 6)]
+    assert metrics.summary()["n_plus_one"][0]["count"] == 6
+
+    async with session_maker() as db:
+        with track_queries(n_plus_one_threshold=0) as quiet:
+            for _ in range(6):
+                await db.execute(text("SELECT 1"))
+    assert quiet.db_queries == 6
+    assert "n_plus_one" not in quiet.summary()
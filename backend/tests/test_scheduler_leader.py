@@ -0,0 +1,98 @@
+"""
+Testes da eleição de líder do scheduler e dos locks/métricas por job.
+"""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import scheduler
+from app.core.scheduler_lock import (
+    LEADER_LEASE,
+    DatabaseLeaseBackend,
+    InMemoryLeaseBackend,
+    LeaderElector,
+)
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_single_leader_and_failover_in_memory():
+    backend = InMemoryLeaseBackend()
+    worker_a = LeaderElector(backend, lease_seconds=30, holder="a")
+    worker_b = LeaderElector(backend, lease_seconds=30, holder="b")
+
+    assert await worker_a.refresh() is True
+    assert await worker_b.refresh() is False
+    assert await worker_a.refresh() is True  # renovação
+
+    backend.expire(LEADER_LEASE)  # líder travado/morto: lease vence
+    assert await worker_b.refresh() is True
+    assert await worker_a.refresh() is False
+
+    await worker_b.stop()  # shutdown libera na hora
+    assert await worker_a.refresh() is True
+
+
+@pytest.mark.asyncio
+async def test_database_lease_is_exclusive_until_expired(session_maker):
+    backend = DatabaseLeaseBackend(session_factory=session_maker)
+    name = "test:db-lease"
+
+    assert await backend.acquire(name, "a", 30) is True
+    assert await backend.acquire(name, "b", 30) is False
+    assert await backend.acquire(name, "a", 30) is True
+
+    assert await backend.acquire(name, "a", -1) is True  # renova já vencido
+    assert await backend.acquire(name, "b", 30) is True
+    await backend.release(name, "a")  # não é mais dono: nada muda
+    assert await backend.acquire(name, "a", 30) is False
+    await backend.release(name, "b")
+    assert await backend.acquire(name, "a", 30) is True
+
+
+@pytest.fixture
+def fake_job(monkeypatch):
+    """Registra um job de teste no scheduler com backend em memória."""
+    calls = []
+
+    async def job():
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("falhou")
+        await asyncio.sleep(0)
+
+    entry = scheduler.ScheduledJob("test_job", "Job de teste", job, timedelta(minutes=1))
+    backend = InMemoryLeaseBackend()
+    monkeypatch.setitem(scheduler.JOBS_BY_ID, "test_job", entry)
+    monkeypatch.setattr(scheduler, "lease_backend", backend)
+    monkeypatch.setattr(scheduler, "leader", LeaderElector(backend, holder="worker-1"))
+    monkeypatch.setattr(scheduler, "job_stats", {})
+    return calls, backend
+
+
+@pytest.mark.asyncio
+async def test_run_job_only_on_leader_and_records_metrics(fake_job):
+    calls, backend = fake_job
+
+    assert await scheduler.run_job("test_job") == "skipped"  # ainda não é líder
+    await scheduler.leader.refresh()
+
+    assert await scheduler.run_job("test_job") == "success"
+    assert await scheduler.run_job("test_job") == "error"
+
+    # Job ainda rodando no líder anterior: o lease do job segura o novo líder
+    await backend.acquire("job:test_job", "old-leader", 60)
+    assert await scheduler.run_job("test_job") == "skipped"
+
+    stats = scheduler.job_stats["test_job"]
+    assert len(calls) == 2
+    assert (stats.runs, stats.failures, stats.skipped) == (2, 1, 2)
+    assert stats.last_status == "skipped"
+    assert stats.last_error == "falhou"
+    assert stats.last_duration_seconds is not None and stats.total_duration_seconds >= 0
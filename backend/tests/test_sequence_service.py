@@ -0,0 +1,122 @@
+"""
+Testes do alocador atômico de sequências (barcode, SKU, código de entrada).
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.stock_entry import StockEntry, EntryType
+from app.services.barcode_service import BarcodeService
+from app.services.sequence_service import SequenceService, reset_block_cache
+from app.services.sku_generator_service import SKUGeneratorService
+from app.services.stock_entry_service import StockEntryService
+
+
+@pytest.mark.asyncio
+async def test_next_value_is_sequential_per_scope(async_session: AsyncSession):
+    """Cada (tenant, kind, prefix) tem sua própria sequência."""
+    service = SequenceService(async_session)
+
+    assert await service.next_value(1, "test", "A") == 1
+    assert await service.next_value(1, "test", "A") == 2
+    assert await service.next_value(1, "test", "B") == 1
+    assert await service.next_value(2, "test", "A") == 1
+    assert await service.next_value(1, "test", "A") == 3
+
+
+@pytest.mark.asyncio
+async def test_seed_is_used_only_on_first_allocation(async_session: AsyncSession):
+    """A semente legada é consultada apenas quando o contador não existe."""
+    service = SequenceService(async_session)
+    calls = []
+
+    async def seed() -> int:
+        calls.append(1)
+        return 41
+
+    assert await service.next_value(1, "test", "SEEDED", seed=seed) == 42
+    assert await service.next_value(1, "test", "SEEDED", seed=seed) == 43
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_allocate_reserves_contiguous_range(async_session: AsyncSession):
+    """allocate(count=N) reserva N valores consecutivos."""
+    service = SequenceService(async_session)
+
+    assert await service.allocate(1, "test", "RANGE", count=10) == (1, 10)
+    assert await service.allocate(1, "test", "RANGE", count=5) == (11, 15)
+
+
+@pytest.mark.asyncio
+async def test_block_preallocation_serves_from_memory(async_session: AsyncSession):
+    """Com block_size > 1 os valores saem do bloco cacheado no worker."""
+    reset_block_cache()
+    service = SequenceService(async_session)
+
+    values = [
+        await service.next_value(7, "block", "P", block_size=3)
+        for _ in range(5)
+    ]
+
+    assert values == [1, 2, 3, 4, 5]
+    # Dois blocos reservados no banco: 1-3 e 4-6
+    first, _ = await service.allocate(7, "block", "P")
+    assert first == 7
+    reset_block_cache()
+
+
+@pytest.mark.asyncio
+async def test_barcode_generation_uses_counter(async_session: AsyncSession):
+    """Códigos EAN-13 consecutivos e válidos, sem varrer produtos."""
+    service = BarcodeService(async_session)
+
+    first = await service.generate_unique_barcode(tenant_id=3)
+    second = await service.generate_unique_barcode(tenant_id=3)
+
+    assert BarcodeService.validate_ean13(first)
+    assert BarcodeService.validate_ean13(second)
+    assert int(second[5:12]) == int(first[5:12]) + 1
+
+
+@pytest.mark.asyncio
+async def test_sku_counter_continues_from_existing_skus(async_session: AsyncSession):
+    """O contador de SKU é semeado com o maior sufixo existente da base."""
+    product = Product(name="Legging Seq", brand="Nike", category_id=1, tenant_id=1)
+    async_session.add(product)
+    await async_session.flush()
+
+    async_session.add_all([
+        ProductVariant(product_id=product.id, sku="NIKE-LEGGIN-ROS-M-001", size="M", color="Rosa", price=Decimal("10"), tenant_id=1),
+        ProductVariant(product_id=product.id, sku="NIKE-LEGGIN-ROS-M-007", size="G", color="Rosa", price=Decimal("10"), tenant_id=1),
+    ])
+    await async_session.flush()
+
+    service = SKUGeneratorService(async_session)
+    sku = await service.generate_unique_sku("Legging", "Nike", "Rosa", "M", tenant_id=1)
+    next_sku = await service.generate_unique_sku("Legging", "Nike", "Rosa", "M", tenant_id=1)
+
+    assert sku == "NIKE-LEGGIN-ROS-M-008"
+    assert next_sku == "NIKE-LEGGIN-ROS-M-009"
+
+
+@pytest.mark.asyncio
+async def test_entry_code_suffix_from_counter(async_session: AsyncSession):
+    """Código livre é mantido; duplicado recebe sufixo do contador."""
+    async_session.add_all([
+        StockEntry(entry_code="SEQ-ENT", entry_date=date.today(), entry_type=EntryType.LOCAL,
+                   supplier_name="Fornecedor", total_cost=Decimal("0"), tenant_id=1),
+        StockEntry(entry_code="SEQ-ENT-2", entry_date=date.today(), entry_type=EntryType.LOCAL,
+                   supplier_name="Fornecedor", total_cost=Decimal("0"), tenant_id=1),
+    ])
+    await async_session.flush()
+
+    service = StockEntryService(async_session)
+
+    assert await service._generate_unique_entry_code("SEQ-FREE", tenant_id=1) == "SEQ-FREE"
+    assert await service._generate_unique_entry_code("SEQ-ENT", tenant_id=1) == "SEQ-ENT-3"
+    assert await service._generate_unique_entry_code("SEQ-ENT", tenant_id=1) == "SEQ-ENT-4"
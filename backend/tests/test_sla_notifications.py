@@ -0,0 +1,142 @@
+"""
+Testes do agendamento das notificações de SLA por horário exato.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.conditional_shipment import ConditionalShipment
+from app.models.sla_notification import SLANotification, SLANotificationKind, SLANotificationStatus
+from app.services.conditional_notification_service import ConditionalNotificationService
+from app.services.sla_dispatcher import SLANotificationDispatcher
+
+TENANT = 941
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Troca o envio real (Expo) por uma lista de (tipo, shipment_id)."""
+    calls = []
+
+    async def departure(self, db, shipment):
+        calls.append(("departure", shipment.id))
+
+    async def return_(self, db, shipment):
+        calls.append(("return", shipment.id))
+
+    monkeypatch.setattr(ConditionalNotificationService, "_send_departure_notification", departure)
+    monkeypatch.setattr(ConditionalNotificationService, "_send_return_notification", return_)
+    return calls
+
+
+async def _shipment(db, **fields) -> ConditionalShipment:
+    shipment = ConditionalShipment(
+        tenant_id=TENANT, customer_id=1, shipping_address="Rua Teste, 1", **fields
+    )
+    db.add(shipment)
+    await db.flush()
+    return shipment
+
+
+async def _rows(db, shipment_id):
+    result = await db.execute(
+        select(SLANotification).where(SLANotification.shipment_id == shipment_id)
+    )
+    return {row.kind: row for row in result.scalars().all()}
+
+
+@pytest.mark.asyncio
+async def test_schedule_tracks_exact_instants_through_lifecycle(session_maker):
+    service = ConditionalNotificationService()
+    now = datetime(2040, 1, 1, 12, 0)
+    departure = now + timedelta(hours=1)
+    return_at = now + timedelta(days=2)
+
+    async with session_maker() as db:
+        shipment = await _shipment(db, status="PENDING", departure_datetime=departure,
+                                   return_datetime=return_at)
+        await service.schedule_sla_notifications(db, shipment, now=now)
+        rows = await _rows(db, shipment.id)
+        assert set(rows) == {SLANotificationKind.DEPARTURE}
+        assert rows[SLANotificationKind.DEPARTURE].due_at == departure - timedelta(minutes=5)
+
+        # Protelar: mesmo registro, novo horário
+        shipment.departure_datetime = departure + timedelta(minutes=30)
+        await service.schedule_sla_notifications(db, shipment, now=now)
+        rows = await _rows(db, shipment.id)
+        assert rows[SLANotificationKind.DEPARTURE].due_at == departure + timedelta(minutes=25)
+
+        # Saiu da loja: departure cancelada, retorno agendado
+        shipment.status = "SENT"
+        await service.schedule_sla_notifications(db, shipment, now=now)
+        rows = await _rows(db, shipment.id)
+        assert rows[SLANotificationKind.DEPARTURE].status == SLANotificationStatus.CANCELLED
+        assert rows[SLANotificationKind.RETURN].status == SLANotificationStatus.PENDING
+        assert rows[SLANotificationKind.RETURN].due_at == return_at - timedelta(minutes=15)
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_due_notifications_are_sent_once_and_stale_ones_skipped(session_maker, sent):
+    service = ConditionalNotificationService()
+    now = datetime(2031, 3, 1, 9, 0)
+
+    async with session_maker() as db:
+        due = await _shipment(db, status="PENDING", departure_datetime=now + timedelta(minutes=4))
+        later = await _shipment(db, status="PENDING", departure_datetime=now + timedelta(hours=3))
+        cancelled = await _shipment(db, status="SENT", return_datetime=now + timedelta(minutes=10))
+        for shipment in (due, later, cancelled):
+            await service.schedule_sla_notifications(db, shipment, now=now - timedelta(hours=1))
+        # Cancelado por um caminho que não reagendou: descartado no disparo
+        cancelled.status = "CANCELLED"
+        await db.commit()
+
+        result = await service.check_and_send_sla_notifications(db, now=now)
+        again = await service.check_and_send_sla_notifications(db, now=now + timedelta(minutes=1))
+
+        assert sent == [("departure", due.id)]
+        assert (result["departure_notifications"], result["skipped"]) == (1, 1)
+        assert again["departure_notifications"] == again["return_notifications"] == 0
+        assert (await _rows(db, due.id))[SLANotificationKind.DEPARTURE].status == SLANotificationStatus.SENT
+        assert (await _rows(db, later.id))[SLANotificationKind.DEPARTURE].status == SLANotificationStatus.PENDING
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_sleeps_until_next_due_and_wakes_on_notify(session_maker, sent):
+    dispatcher = SLANotificationDispatcher(session_factory=session_maker, holder="worker-test")
+    service = ConditionalNotificationService()
+    dispatcher.start()
+    try:
+        await asyncio.sleep(0.05)
+        async with session_maker() as db:
+            # Vence em ~0,3 s: o dispatcher acorda pelo notify e dorme até lá
+            departure = datetime.utcnow() + timedelta(minutes=5, seconds=0.3)
+            shipment = await _shipment(db, status="PENDING", departure_datetime=departure)
+            await service.schedule_sla_notifications(db, shipment)
+            await db.commit()
+        dispatcher.notify()
+
+        await asyncio.sleep(0.1)
+        assert dispatcher.next_due_at == departure - timedelta(minutes=5)
+        assert ("departure", shipment.id) not in sent
+
+        for _ in range(40):
+            if ("departure", shipment.id) in sent:
+                break
+            await asyncio.sleep(0.05)
+        assert ("departure", shipment.id) in sent
+
+        async with session_maker() as db:
+            row = (await _rows(db, shipment.id))[SLANotificationKind.DEPARTURE]
+            assert row.claimed_by == "worker-test"
+            assert row.status == SLANotificationStatus.SENT
+    finally:
+        await dispatcher.shutdown()
@@ -0,0 +1,142 @@
+"""
+Testes do ledger de estoque por variante (variant_stock) e do verificador contra o FIFO.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.instrumentation import install_instrumentation, track_queries
+from app.models.entry_item import EntryItem
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.stock_entry import EntryType, StockEntry
+from app.models.variant_stock import VariantStock
+from app.repositories.stock_entry_repository import StockEntryRepository
+from app.services.fifo_service import FIFOService
+from app.services.stock_ledger_service import StockLedgerService
+
+TENANT = 971
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _variant(db, sku: str, tenant_id: int = TENANT) -> ProductVariant:
+    product = Product(name=f"Legging {sku}", brand="Acme", category_id=1, tenant_id=tenant_id)
+    db.add(product)
+    await db.flush()
+    variant = ProductVariant(product_id=product.id, sku=sku, size="M", price=Decimal("99"),
+                             tenant_id=tenant_id)
+    db.add(variant)
+    await db.flush()
+    return variant
+
+
+async def _entry(db, code: str, lots: list, days_ago: int = 0, tenant_id: int = TENANT) -> StockEntry:
+    entry = StockEntry(entry_code=code, entry_date=date.today() - timedelta(days=days_ago),
+                       entry_type=EntryType.LOCAL, supplier_name="Fornecedor", tenant_id=tenant_id)
+    db.add(entry)
+    await db.flush()
+    for variant, qty in lots:
+        db.add(EntryItem(entry_id=entry.id, variant_id=variant.id, quantity_received=qty,
+                         quantity_remaining=qty, unit_cost=Decimal("30"), tenant_id=tenant_id))
+    await db.flush()
+    return entry
+
+
+@pytest.mark.asyncio
+async def test_fifo_writes_keep_counter_in_same_transaction(session_maker):
+    async with session_maker() as db:
+        variant = await _variant(db, "LEDGER-1")
+        old = await _entry(db, "LEDGER-E1", [(variant, 4)], days_ago=10)
+        await _entry(db, "LEDGER-E2", [(variant, 6)])
+        await db.commit()
+        variant_id, product_id, old_id = variant.id, variant.product_id, old.id
+
+        ledger = StockLedgerService(db)
+        fifo = FIFOService(db)
+        assert await ledger.on_hand(variant_id) == 10
+
+        # Venda: o flush já reflete no contador, antes do commit
+        sources = await fifo.process_sale(product_id, 5, variant_id=variant_id, tenant_id=TENANT)
+        await db.flush()
+        assert [s["quantity_taken"] for s in sources] == [4, 1]
+        availability = await fifo.check_availability(
+            product_id, 6, variant_id=variant_id, tenant_id=TENANT, include_sources=False
+        )
+        assert (availability["available"], availability["total_available"]) == (False, 5)
+        await db.rollback()
+        assert await ledger.on_hand(variant_id) == 10
+
+        # Entrada desativada/reativada: seus lotes saem e voltam
+        old = await db.get(StockEntry, old_id)
+        old.is_active = False
+        await db.commit()
+        assert await ledger.on_hand(variant_id) == 6
+        old.is_active = True
+        await db.commit()
+        assert await ledger.on_hand(variant_id) == 10
+
+
+@pytest.mark.asyncio
+async def test_existing_row_takes_plain_update_without_summing_lots(session_maker):
+    install_instrumentation()
+    async with session_maker() as db:
+        variant = await _variant(db, "LEDGER-HOT")
+        await _entry(db, "LEDGER-E-HOT", [(variant, 8)])
+        await db.commit()
+
+        with track_queries(n_plus_one_threshold=1) as metrics:
+            await FIFOService(db).process_sale(variant.product_id, 3, variant_id=variant.id, tenant_id=TENANT)
+            await db.flush()
+        ledger_writes = [stmt for stmt in metrics.statements if "variant_stock" in stmt.lower()]
+        assert ledger_writes and all(stmt.lstrip().upper().startswith("UPDATE") for stmt in ledger_writes)
+        await db.commit()
+        assert await StockLedgerService(db).on_hand(variant.id) == 5
+
+
+@pytest.mark.asyncio
+async def test_bulk_entry_delete_recounts_on_commit(session_maker):
+    async with session_maker() as db:
+        variant = await _variant(db, "LEDGER-2")
+        entry = await _entry(db, "LEDGER-E3", [(variant, 7)])
+        await _entry(db, "LEDGER-E4", [(variant, 2)])
+        await db.commit()
+
+        # UPDATE em massa nos entry_items (fora do ORM) + commit do repositório
+        assert await StockEntryRepository().delete(db, entry.id, tenant_id=TENANT)
+        assert await StockLedgerService(db).on_hand(variant.id) == 2
+        assert await StockLedgerService(db).on_hand_by_product([variant.product_id]) == {variant.product_id: 2}
+
+
+@pytest.mark.asyncio
+async def test_consistency_check_reports_and_repairs_drift(session_maker):
+    tenant_id = TENANT + 1
+    async with session_maker() as db:
+        variant = await _variant(db, "LEDGER-3", tenant_id=tenant_id)
+        untouched = await _variant(db, "LEDGER-4", tenant_id=tenant_id)
+        await _entry(db, "LEDGER-E5", [(variant, 3), (untouched, 1)], tenant_id=tenant_id)
+        await db.commit()
+
+        ledger = StockLedgerService(db)
+        assert (await ledger.check_consistency(tenant_id=tenant_id))["mismatches"] == []
+
+        await db.execute(
+            update(VariantStock).where(VariantStock.variant_id == variant.id).values(on_hand=40)
+        )
+        await db.commit()
+
+        result = await ledger.check_consistency(tenant_id=tenant_id, repair=True)
+        await db.commit()
+        assert result["variants_checked"] == 2
+        assert result["repaired"] == 1
+        assert result["mismatches"] == [{
+            "variant_id": variant.id, "product_id": variant.product_id, "tenant_id": tenant_id,
+            "on_hand": 40, "fifo_on_hand": 3,
+        }]
+        assert await ledger.on_hand_by_variant([variant.id, untouched.id]) == {variant.id: 3, untouched.id: 1}
@@ -0,0 +1,90 @@
+"""
+Testes do logging estruturado (fila + listener, JSON com contexto e amostragem de DEBUG).
+"""
+import io
+import json
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.logging_config import (
+    DebugSampler,
+    configure_logging,
+    log_context,
+    shutdown_logging,
+)
+from app.middleware.instrumentation import RequestInstrumentationMiddleware
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    configure_logging(level="DEBUG", fmt="json", stream=stream)
+    yield stream
+    # Volta ao pipeline padrão do app para os demais testes
+    configure_logging()
+
+
+def _records(stream: io.StringIO) -> list:
+    shutdown_logging()  # drena a fila do listener
+    return [json.loads(line) for line in stream.getvalue().splitlines() if line.strip()]
+
+
+def test_json_records_carry_context_extras_and_traceback(log_stream):
+    logger = logging.getLogger("app.tests.logging")
+    with log_context(request_id="req-1", tenant_id=7):
+        logger.info("Venda criada", extra={"sale_number": "VENDA-1", "items": 2})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Falha ao criar venda")
+    logger.warning("fora da requisição")
+
+    created, failed, outside = [r for r in _records(log_stream) if r["logger"] == "app.tests.logging"]
+    assert created["message"] == "Venda criada"
+    assert (created["request_id"], created["tenant_id"]) == ("req-1", 7)
+    assert (created["sale_number"], created["items"]) == ("VENDA-1", 2)
+    assert failed["level"] == "ERROR" and "ValueError: boom" in failed["exc"]
+    assert "request_id" not in outside and "tenant_id" not in outside
+
+
+def test_debug_sampler_keeps_one_in_n_per_message():
+    sampler = DebugSampler(every=3)
+
+    def record(level, msg):
+        return logging.LogRecord("app.sale", level, __file__, 1, msg, (), None)
+
+    kept = [sampler.filter(record(logging.DEBUG, "FIFO processado")) for _ in range(10)]
+    assert kept.count(True) == 4
+    # Cada mensagem tem seu próprio contador; INFO+ nunca é amostrado
+    assert sampler.filter(record(logging.DEBUG, "Inventory sync"))
+    assert all(sampler.filter(record(logging.INFO, "Venda criada")) for _ in range(5))
+
+
+@pytest.mark.asyncio
+async def test_request_log_gets_request_id_and_echoes_header(log_stream):
+    app = FastAPI()
+    app.add_middleware(RequestInstrumentationMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        logging.getLogger("app.tests.logging").debug("dentro do endpoint")
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        given = await client.get("/ping", headers={"X-Request-ID": "abc-123"})
+        generated = await client.get("/ping", headers={"X-Request-ID": "not valid; has spaces"})
+
+    assert given.headers["X-Request-ID"] == "abc-123"
+    assert len(generated.headers["X-Request-ID"]) == 32
+
+    records = _records(log_stream)
+    inner = [r for r in records if r["logger"] == "app.tests.logging"]
+    requests = [r for r in records if r["logger"] == "app.requests"]
+    assert [r["request_id"] for r in inner] == ["abc-123", generated.headers["X-Request-ID"]]
+    assert requests[0]["request_id"] == "abc-123"
+    assert requests[0]["route"] == "/ping" and requests[0]["status"] == 200
+    assert "db_queries" in requests[0]
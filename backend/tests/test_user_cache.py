@@ -0,0 +1,94 @@
+"""
+Testes do cache de usuário autenticado e da revogação por token_version.
+"""
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.deps import get_current_user
+from app.core.user_cache import user_cache
+from app.models.user import User, UserRole
+from app.services.auth_service import AuthService
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _create_user(session_maker, email: str) -> User:
+    async with session_maker() as db:
+        user = User(email=email, hashed_password="x", full_name="Cache Test",
+                    role=UserRole.SELLER, tenant_id=1)
+        db.add(user)
+        await db.commit()
+        return user
+
+
+def _credentials(user: User) -> HTTPAuthorizationCredentials:
+    token = AuthService(None).create_access_token_for_user(user)
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.mark.asyncio
+async def test_second_request_is_served_from_cache(session_maker):
+    user = await _create_user(session_maker, "cache-hit@test.com")
+    credentials = _credentials(user)
+    user_cache.clear()
+
+    async with session_maker() as db:
+        first = await get_current_user(credentials, db)
+    # Sem sessão: um acesso ao banco falharia
+    second = await get_current_user(credentials, None)
+
+    assert first.id == second.id == user.id
+    assert second.tenant_id == 1 and second.role == UserRole.SELLER
+    assert second.email == "cache-hit@test.com"
+    assert second is not first
+
+
+@pytest.mark.asyncio
+async def test_role_change_revokes_token_and_invalidates_cache(session_maker):
+    user = await _create_user(session_maker, "cache-role@test.com")
+    old_credentials = _credentials(user)
+    async with session_maker() as db:
+        await get_current_user(old_credentials, db)
+
+    async with session_maker() as db:
+        stored = await db.get(User, user.id)
+        stored.role = UserRole.MANAGER
+        await db.commit()
+    assert stored.token_version == 1
+    assert user_cache.get(user.id, 0) is None
+
+    async with session_maker() as db:
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(old_credentials, db)
+        assert exc.value.status_code == 401
+
+        current = await get_current_user(_credentials(stored), db)
+    assert current.role == UserRole.MANAGER
+
+    # Mudança não sensível não revoga
+    async with session_maker() as db:
+        stored = await db.get(User, user.id)
+        stored.full_name = "Outro Nome"
+        await db.commit()
+    assert stored.token_version == 1
+
+
+@pytest.mark.asyncio
+async def test_revoke_all_sessions_bumps_token_version(session_maker):
+    user = await _create_user(session_maker, "cache-revoke@test.com")
+    credentials = _credentials(user)
+    async with session_maker() as db:
+        await get_current_user(credentials, db)
+
+    async with session_maker() as db:
+        await AuthService(db).revoke_all_user_sessions(user.id)
+        assert (await db.get(User, user.id)).token_version == 1
+
+    async with session_maker() as db:
+        with pytest.raises(HTTPException):
+            await get_current_user(credentials, db)
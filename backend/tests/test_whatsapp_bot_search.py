@@ -0,0 +1,85 @@
+"""
+Testes das consultas do bot do WhatsApp (busca por tenant, estoque e telefone).
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.customer import Customer
+from app.models.entry_item import EntryItem
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.stock_entry import EntryType, StockEntry
+from app.services.whatsapp_bot_service import WhatsAppBotService, reset_bot_tenant_cache
+from app.utils.text import normalize_phone, normalize_search
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def test_normalizers():
+    assert normalize_search("Top Nadador Açaí-Roxo") == "top nadador acai roxo"
+    # Com/sem 55, com/sem nono dígito, com máscara: mesma chave
+    keys = {normalize_phone(p) for p in ("5511999998888", "551199998888", "(11) 99999-8888", "011 99999 8888")}
+    assert keys == {"1199998888"}
+    assert normalize_phone("12345") is None
+
+
+async def _product(db, name: str, tenant_id: int, sku: str, quantities: dict) -> Product:
+    product = Product(name=name, brand="Acme", category_id=1, tenant_id=tenant_id, is_catalog=True)
+    db.add(product)
+    entry = StockEntry(entry_code=f"{sku}-ENT", entry_date=date.today(), entry_type=EntryType.LOCAL,
+                       supplier_name="Fornecedor", tenant_id=tenant_id)
+    db.add(entry)
+    await db.flush()
+    for size, qty in quantities.items():
+        variant = ProductVariant(product_id=product.id, sku=f"{sku}-{size}", size=size,
+                                 price=Decimal("89.90"), tenant_id=tenant_id)
+        db.add(variant)
+        await db.flush()
+        # Tamanho sem estoque: lote já esgotado
+        db.add(EntryItem(entry_id=entry.id, variant_id=variant.id, quantity_received=max(qty, 1),
+                         quantity_remaining=qty, unit_cost=Decimal("30"), tenant_id=tenant_id))
+    return product
+
+
+@pytest.mark.asyncio
+async def test_search_is_tenant_scoped_accent_insensitive_and_in_stock_only(session_maker):
+    async with session_maker() as db:
+        in_stock = await _product(db, "Calça Açucena Bot", 1, "BOT-ACU", {"P": 2, "M": 0, "G": 1})
+        await _product(db, "Calça Açucena Esgotada Bot", 1, "BOT-ESG", {"M": 0})
+        await _product(db, "Calça Açucena Outra Loja Bot", 2, "BOT-OUT", {"M": 5})
+        await db.commit()
+
+    reset_bot_tenant_cache()
+    async with session_maker() as db:
+        service = WhatsAppBotService(db)
+        tenant_id = await service.resolve_tenant()
+        results = await service.search_products(tenant_id, "calca acucena")
+        assert await service.search_products(tenant_id, "%") == []
+
+    assert tenant_id == 1
+    assert [p.product_id for p in results] == [in_stock.id]
+    assert results[0].stock_sizes == ["G", "P"]
+
+
+@pytest.mark.asyncio
+async def test_customer_lookup_by_whatsapp_number(session_maker):
+    async with session_maker() as db:
+        customer = Customer(full_name="Maria Bot", phone="(21) 98888-7777", tenant_id=1)
+        other_store = Customer(full_name="Maria Outra", phone="21988887777", tenant_id=2)
+        db.add_all([customer, other_store])
+        await db.commit()
+    assert customer.phone_normalized == "2188887777"
+
+    async with session_maker() as db:
+        service = WhatsAppBotService(db)
+        found = await service.find_customer(1, "552188887777")  # sem o nono dígito
+        missing = await service.find_customer(1, "5521977776666")
+
+    assert found.id == customer.id
+    assert missing is None